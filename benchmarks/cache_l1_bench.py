@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Get/set throughput of the cache-manager L1 tier at 100k keys.
+
+Times ``L1Cache`` (OrderedDict LRU with incremental byte accounting)
+against a copy of the previous L1 implementation: a dict plus a Python
+list for recency order (``list.remove`` on every hit) that re-summed entry
+sizes on every insert. The old structure is O(n) per operation, so it is
+timed on a sample of ``--baseline-ops`` operations and reported as ops/s.
+Each scenario runs once with the item limit above the key count and once
+with a smaller limit so inserts also evict.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from common import ARTIFACT_DIR
+
+CACHE_MANAGER_ROOT = Path(__file__).resolve().parents[1] / "services" / "cache-manager"
+
+
+class ListLRU:
+    """The L1 bookkeeping ``IntelligentCacheManager`` used before ``L1Cache``."""
+
+    def __init__(self, max_items: int, max_bytes: int):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.cache: Dict[str, Any] = {}
+        self.sizes: Dict[str, int] = {}
+        self.order: List[str] = []
+
+    def _touch(self, key: str) -> None:
+        if key in self.order:
+            self.order.remove(key)
+        self.order.append(key)
+
+    def get(self, key: str):
+        if key in self.cache:
+            self._touch(key)
+            return self.cache[key]
+        return None
+
+    def put(self, key: str, value: Any, size_bytes: int) -> None:
+        while len(self.cache) >= self.max_items or sum(self.sizes.values()) + size_bytes > self.max_bytes:
+            lru = self.order[0]
+            del self.cache[lru], self.sizes[lru]
+            self.order.remove(lru)
+        self.cache[key] = value
+        self.sizes[key] = size_bytes
+        self._touch(key)
+
+
+def _ops_per_second(fn: Callable[[str], Any], keys: List[str]) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return len(keys) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=200_000, help="Operations per L1Cache measurement")
+    parser.add_argument("--baseline-ops", type=int, default=2_000, help="Operations per ListLRU measurement")
+    parser.add_argument("--evicting-items", type=int, default=20_000, help="Item limit of the evicting run")
+    parser.add_argument("--value-bytes", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(CACHE_MANAGER_ROOT))
+    from l1_cache import L1Cache
+
+    rng = random.Random(args.seed)
+    keys = [f"cache:{i:016x}" for i in range(args.keys)]
+    value = b"x" * args.value_bytes
+    # 80% of reads go to 20% of the keys
+    hot = keys[: max(1, len(keys) // 5)]
+    reads = [rng.choice(hot) if rng.random() < 0.8 else rng.choice(keys) for _ in range(args.ops)]
+    writes = [rng.choice(keys) for _ in range(args.ops)]
+
+    results = []
+    for label, max_items in (("fits", args.keys + 1), ("evicting", args.evicting_items)):
+        for name, factory, n in (
+            ("L1Cache", L1Cache, args.ops),
+            ("ListLRU", ListLRU, args.baseline_ops),
+        ):
+            cache = factory(max_items=max_items, max_bytes=1 << 40)
+            resident = keys[-(max_items - 1):]
+            if isinstance(cache, ListLRU):
+                # filling through put() would itself be quadratic
+                cache.cache = {k: value for k in resident}
+                cache.sizes = {k: args.value_bytes for k in resident}
+                cache.order = list(resident)
+            else:
+                for key in resident:
+                    cache.put(key, value, args.value_bytes)
+            set_rate = _ops_per_second(lambda k: cache.put(k, value, args.value_bytes), writes[:n])
+            get_rate = _ops_per_second(cache.get, reads[:n])
+            results.append(
+                {
+                    "impl": name,
+                    "scenario": label,
+                    "keys": args.keys,
+                    "max_items": max_items,
+                    "ops_measured": n,
+                    "set_ops_per_s": round(set_rate),
+                    "get_ops_per_s": round(get_rate),
+                }
+            )
+
+    (ARTIFACT_DIR / "cache_manager_l1.json").write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Benchmark doc-entities fuzzy dedupe: pairwise O(n²) vs blocking mode.
+
+Synthetic entity names are generated with controlled typo variants so the
+expected cluster count is known. The pairwise mode is skipped above
+``--pairwise-max`` items because it does not finish in reasonable time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from common import ARTIFACT_DIR
+
+DOC_ENTITIES_ROOT = Path(__file__).resolve().parents[1] / "services" / "doc-entities"
+
+FIRST = ["Anna", "Boris", "Carla", "Dmitri", "Elena", "Farid", "Greta", "Hugo", "Ines", "Jonas"]
+SUFFIX = ["GmbH", "Ltd", "Inc", "Holding", "Group", "Partners", "Systems", "Logistics"]
+
+
+def _typo(value: str, rng: random.Random) -> str:
+    pos = rng.randrange(len(value))
+    op = rng.choice(("swap", "drop", "case"))
+    if op == "drop":
+        return value[:pos] + value[pos + 1 :]
+    if op == "case":
+        return value.lower()
+    return value[:pos] + rng.choice(string.ascii_lowercase) + value[pos + 1 :]
+
+
+def make_names(count: int, variants: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    names: List[str] = []
+    while len(names) < count:
+        token = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 9)))
+        base = f"{rng.choice(FIRST)} {token.capitalize()} {rng.choice(SUFFIX)}"
+        names.append(base)
+        names.extend(_typo(base, rng) for _ in range(rng.randint(0, variants)))
+    rng.shuffle(names)
+    return names[:count]
+
+
+def run(mode: str, names: List[str], threshold: float, workers: int) -> Dict[str, Any]:
+    from fuzzy_matcher import DedupeRequest, FuzzyMatcher
+
+    req = DedupeRequest(items=names, threshold=threshold, mode=mode, workers=workers)
+    start = time.perf_counter()
+    result = FuzzyMatcher.dedupe(req)
+    seconds = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "items": len(names),
+        "clusters": result.unique_clusters,
+        "seconds": seconds,
+        "items_per_second": len(names) / seconds if seconds else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--sizes", default="1000,5000,50000")
+    parser.add_argument("--threshold", type=float, default=90.0)
+    parser.add_argument("--variants", type=int, default=2, help="Max typo variants per name")
+    parser.add_argument("--workers", type=int, default=-1)
+    parser.add_argument("--pairwise-max", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(DOC_ENTITIES_ROOT))
+    results = []
+    for size in [int(x) for x in args.sizes.split(",") if x]:
+        names = make_names(size, args.variants, args.seed)
+        if size <= args.pairwise_max:
+            results.append(run("pairwise", names, args.threshold, args.workers))
+        results.append(run("blocking", names, args.threshold, args.workers))
+
+    (ARTIFACT_DIR / "doc-entities_fuzzy_dedupe.json").write_text(
+        json.dumps(results, indent=2), encoding="utf-8"
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Compare the Cypher and in-memory (CSR) engines of the graph-api algorithms.
+
+Two modes are supported:
+
+* live (default) – hits ``/alg/<algorithm>`` once per engine through the shared
+  HTTP benchmark harness so both runs land in ``artifacts/perf``.
+* ``--offline`` – times the in-memory engine directly on a synthetic random
+  graph, which needs neither Neo4j nor a running service.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from common import ARTIFACT_DIR, BenchmarkConfig, run_benchmark
+
+GRAPH_API_ROOT = Path(__file__).resolve().parents[1] / "services" / "graph-api"
+DEFAULT_BASE_URL = os.getenv("GRAPH_API_BASE_URL", "http://localhost:8612")
+ALGORITHMS = ("pagerank", "betweenness", "louvain", "label-propagation")
+
+
+def run_live(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for engine in ("cypher", "memory"):
+        payload: Dict[str, Any] = {"engine": engine, "limit": args.limit}
+        if args.node_label:
+            payload["nodeLabel"] = args.node_label
+        config = BenchmarkConfig(
+            service_name="graph-api",
+            url=f"{args.base_url.rstrip('/')}/alg/{args.algorithm}",
+            method="POST",
+            payload=payload,
+            concurrency=1,
+            total_requests=args.requests,
+            timeout=args.timeout,
+            output_prefix=f"graph-api_alg_{args.algorithm}_{engine}",
+            simulate=args.simulate,
+        )
+        results[engine] = run_benchmark(config).to_dict()["metrics"]
+    return results
+
+
+def run_offline(args: argparse.Namespace) -> Dict[str, Any]:
+    import numpy as np
+
+    sys.path.insert(0, str(GRAPH_API_ROOT))
+    import graph_engine as ge
+
+    rng = np.random.default_rng(args.seed)
+    sources = rng.integers(0, args.nodes, size=args.edges)
+    targets = rng.integers(0, args.nodes, size=args.edges)
+
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    graph = ge.CSRGraph.from_arrays(range(args.nodes), sources, targets)
+    timings["build_csr"] = time.perf_counter() - start
+
+    runners = {
+        "pagerank": lambda: ge.pagerank(graph),
+        "betweenness": lambda: ge.betweenness(graph, samples=args.samples),
+        "label-propagation": lambda: ge.label_propagation(graph),
+        "louvain": lambda: ge.louvain(graph),
+    }
+    selected = ALGORITHMS if args.algorithm == "all" else (args.algorithm,)
+    for name in selected:
+        start = time.perf_counter()
+        runners[name]()
+        timings[name] = time.perf_counter() - start
+
+    return {
+        "engine": "memory",
+        "nodes": graph.node_count,
+        "edges": graph.edge_count,
+        "seconds": timings,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--algorithm", default="pagerank", choices=ALGORITHMS + ("all",))
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="graph-api base URL")
+    parser.add_argument("--node-label", help="Restrict the projection to one label")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=3, help="Requests per engine (live)")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--simulate", action="store_true", help="Synthetic live metrics")
+    parser.add_argument("--offline", action="store_true", help="Time the CSR engine only")
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--edges", type=int, default=500_000)
+    parser.add_argument("--samples", type=int, default=50, help="Betweenness pivots")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.offline:
+        summary = run_offline(args)
+        out = ARTIFACT_DIR / "graph-api_alg_offline.json"
+        out.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    else:
+        if args.algorithm == "all":
+            parser.error("--algorithm all is only supported with --offline")
+        summary = run_live(args)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
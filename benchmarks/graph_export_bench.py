@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Peak RSS and time-to-first-byte of graph-api exports: buffered vs streaming.
+
+Each (mode, format, size) case runs in a fresh subprocess so ``ru_maxrss`` is
+the peak of that case alone. The data comes from a synthetic in-process
+session that answers the export queries, so no Neo4j is required.
+
+* ``buffered`` – the previous implementation: materialise every element as
+  Python dicts, build the full document (``ElementTree`` for GraphML), then
+  serialise it in one piece.
+* ``stream`` – ``graph_export`` lazy record cursor + incremental serialisation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from common import ARTIFACT_DIR
+
+GRAPH_API_ROOT = Path(__file__).resolve().parents[1] / "services" / "graph-api"
+FORMATS = ("json", "graphml", "ndjson")
+
+
+class SyntheticSession:
+    """Answers the export queries for ``nodes`` nodes and as many edges, lazily."""
+
+    def __init__(self, nodes: int, edges: int):
+        self.nodes = nodes
+        self.edges = edges
+
+    def run(self, query: str, **_params) -> Iterator["_Record"]:
+        import graph_export
+
+        if query == graph_export.NODES_QUERY:
+            for i in range(self.nodes):
+                yield _Record({"id": i, "labels": ["Entity"], "properties": {"name": f"entity-{i}"}})
+        else:
+            for i in range(self.edges):
+                yield _Record(
+                    {
+                        "id": i,
+                        "type": "LINKS",
+                        "source": i % self.nodes,
+                        "target": (i * 7 + 1) % self.nodes,
+                        "properties": {"weight": 1.0},
+                    }
+                )
+
+
+class _Record:
+    def __init__(self, row: Dict[str, Any]):
+        self._row = row
+
+    def data(self) -> Dict[str, Any]:
+        return self._row
+
+
+def _buffered_export(session, fmt: str) -> bytes:
+    import xml.etree.ElementTree as ET
+
+    import graph_export
+
+    nodes = list(graph_export.records(session, graph_export.NODES_QUERY))
+    rels = list(graph_export.records(session, graph_export.RELS_QUERY, eids=None))
+    if fmt == "graphml":
+        gml = ET.Element("graphml", xmlns="http://graphml.graphdrawing.org/xmlns")
+        graph = ET.SubElement(gml, "graph", edgedefault="undirected")
+        for n in nodes:
+            ET.SubElement(graph, "node", id=str(n["id"]))
+        for r in rels:
+            ET.SubElement(
+                graph, "edge", id=str(r["id"]), source=str(r["source"]), target=str(r["target"])
+            )
+        return ET.tostring(gml, encoding="utf-8")
+    if fmt == "ndjson":
+        lines = [json.dumps({"kind": "node", **n}) for n in nodes]
+        lines += [json.dumps({"kind": "relationship", **r}) for r in rels]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+    return json.dumps({"nodes": nodes, "relationships": rels}).encode("utf-8")
+
+
+def run_case(mode: str, fmt: str, elements: int) -> Dict[str, Any]:
+    """Execute one case in the current process and return its measurements."""
+
+    sys.path.insert(0, str(GRAPH_API_ROOT))
+    import graph_export
+
+    nodes = elements // 2
+    session = SyntheticSession(nodes, elements - nodes)
+    start = time.perf_counter()
+    first_byte = None
+    total_bytes = 0
+    if mode == "buffered":
+        body = _buffered_export(session, fmt)
+        first_byte = time.perf_counter() - start
+        total_bytes = len(body)
+    else:
+        elements_iter = graph_export.iter_elements(session)
+        serialiser = {
+            "json": graph_export.json_chunks,
+            "graphml": graph_export.graphml_chunks,
+            "ndjson": graph_export.ndjson_chunks,
+        }[fmt]
+        for chunk in graph_export.buffered(serialiser(elements_iter)):
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            total_bytes += len(chunk)
+    total = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "format": fmt,
+        "elements": elements,
+        "bytes": total_bytes,
+        "ttfb_ms": (first_byte or total) * 1000.0,
+        "total_ms": total * 1000.0,
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--sizes", default="100000,1000000", help="Comma separated element counts")
+    parser.add_argument("--formats", default="json,graphml", help="Comma separated formats")
+    parser.add_argument("--modes", default="buffered,stream")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        mode, fmt, elements = args.case.split(":")
+        print(json.dumps(run_case(mode, fmt, int(elements))))
+        return
+
+    results = []
+    for elements in [int(x) for x in args.sizes.split(",") if x]:
+        for fmt in [f for f in args.formats.split(",") if f]:
+            if fmt not in FORMATS:
+                parser.error(f"unknown format {fmt}")
+            for mode in [m for m in args.modes.split(",") if m]:
+                out = subprocess.run(
+                    [
+                        sys.executable,
+                        __file__,
+                        "--case",
+                        f"{mode}:{fmt}:{elements}",
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    (ARTIFACT_DIR / "graph-api_export.json").write_text(
+        json.dumps(results, indent=2), encoding="utf-8"
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
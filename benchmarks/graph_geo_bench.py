@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Compare the Cypher and in-memory (grid index) geo engines of graph-api.
+
+Two modes are supported:
+
+* live (default) – hits ``/geo/entities`` (bbox) and ``/geo/entities/nearest``
+  once per engine through the shared HTTP benchmark harness so both runs land
+  in ``artifacts/perf``.
+* ``--offline`` – times ``GeoIndex`` bbox, radius and k-nearest queries on
+  synthetic points against a vectorised NumPy full scan of the same columns,
+  which stands in for the label-less property scan and needs neither Neo4j nor
+  a running service.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from common import ARTIFACT_DIR, BenchmarkConfig, run_benchmark
+
+GRAPH_API_ROOT = Path(__file__).resolve().parents[1] / "services" / "graph-api"
+DEFAULT_BASE_URL = os.getenv("GRAPH_API_BASE_URL", "http://localhost:8612")
+# Berlin-sized bbox and a point in Munich
+BBOX = {"south": 52.3, "west": 13.0, "north": 52.7, "east": 13.8}
+CENTER = {"latitude": 48.14, "longitude": 11.58}
+
+
+def run_live(args: argparse.Namespace) -> Dict[str, Any]:
+    base = args.base_url.rstrip("/")
+    results: Dict[str, Any] = {}
+    for engine in ("cypher", "memory"):
+        queries = {
+            "bbox": f"{base}/geo/entities?" + "&".join(f"{k}={v}" for k, v in BBOX.items())
+            + f"&limit={args.limit}&engine={engine}",
+            "nearest": f"{base}/geo/entities/nearest?latitude={CENTER['latitude']}"
+            f"&longitude={CENTER['longitude']}&k={args.k}&engine={engine}",
+        }
+        for name, url in queries.items():
+            config = BenchmarkConfig(
+                service_name="graph-api",
+                url=url,
+                concurrency=1,
+                total_requests=args.requests,
+                timeout=args.timeout,
+                output_prefix=f"graph-api_geo_{name}_{engine}",
+                simulate=args.simulate,
+            )
+            results[f"{name}_{engine}"] = run_benchmark(config).to_dict()["metrics"]
+    return results
+
+
+def _median_ms(fn: Callable[[int], Any], repeats: int) -> float:
+    times = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(i)
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 3)
+
+
+def run_offline(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    import numpy as np
+
+    sys.path.insert(0, str(GRAPH_API_ROOT))
+    from geo_index import GeoIndex, circle_bounds, haversine_km
+
+    rng = np.random.default_rng(args.seed)
+    rows: List[Dict[str, Any]] = []
+    for size in [int(x) for x in args.sizes.split(",") if x]:
+        # uniform over the sphere plus dense clusters around a few cities
+        n_uniform = size // 2
+        lats = np.degrees(np.arcsin(rng.uniform(-1, 1, n_uniform)))
+        lons = rng.uniform(-180, 180, n_uniform)
+        centres = rng.uniform([-50, -180], [60, 180], size=(50, 2))
+        pick = rng.integers(0, len(centres), size - n_uniform)
+        lats = np.concatenate((lats, np.clip(centres[pick, 0] + rng.normal(0, 0.5, len(pick)), -90, 90)))
+        lons = np.concatenate((lons, np.clip(centres[pick, 1] + rng.normal(0, 0.5, len(pick)), -180, 180)))
+        ids = [f"n{i}" for i in range(size)]
+        labels = ["Location"]
+
+        index = GeoIndex(cell_degrees=args.cell_degrees)
+        start = time.perf_counter()
+        index.ensure_loaded(lambda: (
+            {"node_id": node_id, "name": None, "latitude": lat, "longitude": lon, "labels": labels}
+            for node_id, lat, lon in zip(ids, lats.tolist(), lons.tolist())
+        ))
+        build_s = time.perf_counter() - start
+
+        queries = [(float(lats[j]), float(lons[j])) for j in rng.integers(0, size, args.repeats)]
+
+        def scan_bbox(i: int):
+            lat, lon = queries[i]
+            mask = (lats >= lat - 0.2) & (lats <= lat + 0.2) & (lons >= lon - 0.4) & (lons <= lon + 0.4)
+            return np.flatnonzero(mask)[:args.limit]
+
+        def scan_radius(i: int):
+            lat, lon = queries[i]
+            south, north, ranges = circle_bounds(lat, lon, args.radius_km)
+            mask = (lats >= south) & (lats <= north)
+            lon_mask = np.zeros(size, dtype=bool)
+            for west, east in ranges:
+                lon_mask |= (lons >= west) & (lons <= east)
+            idx = np.flatnonzero(mask & lon_mask)
+            dist = haversine_km(lat, lon, lats[idx], lons[idx])
+            return idx[np.argsort(dist[dist <= args.radius_km])][:args.limit]
+
+        def scan_nearest(i: int):
+            lat, lon = queries[i]
+            dist = haversine_km(lat, lon, lats, lons)
+            top = np.argpartition(dist, args.k)[:args.k]
+            return top[np.argsort(dist[top])]
+
+        rows.append({
+            "points": size,
+            "index_build_s": round(build_s, 3),
+            "index_bytes": index.stats()["bytes"],
+            "bbox_index_ms": _median_ms(lambda i: index.bbox(queries[i][0] - 0.2, queries[i][1] - 0.4,
+                                                           queries[i][0] + 0.2, queries[i][1] + 0.4,
+                                                           args.limit), args.repeats),
+            "bbox_scan_ms": _median_ms(scan_bbox, args.repeats),
+            "radius_index_ms": _median_ms(lambda i: index.within(*queries[i], args.radius_km, args.limit),
+                                          args.repeats),
+            "radius_scan_ms": _median_ms(scan_radius, args.repeats),
+            "nearest_index_ms": _median_ms(lambda i: index.nearest(*queries[i], args.k), args.repeats),
+            "nearest_scan_ms": _median_ms(scan_nearest, args.repeats),
+        })
+        print(json.dumps(rows[-1]))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="graph-api base URL")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10, help="Neighbours for k-nearest queries")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per engine and query (live)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--simulate", action="store_true", help="Synthetic live metrics")
+    parser.add_argument("--offline", action="store_true", help="Time the grid index against a full scan")
+    parser.add_argument("--sizes", default="100000,1000000,3000000", help="Point counts (offline)")
+    parser.add_argument("--radius-km", type=float, default=25.0)
+    parser.add_argument("--cell-degrees", type=float, default=0.1)
+    parser.add_argument("--repeats", type=int, default=50, help="Queries per measurement (offline)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.offline:
+        summary: Any = run_offline(args)
+        out = ARTIFACT_DIR / "graph-api_geo_offline.json"
+        out.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    else:
+        summary = run_live(args)
+        print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Throughput of doc-entities annotation: per-document calls vs ``nlp.pipe`` batches.
+
+* ``per_doc`` – the previous path: ``ner_spacy`` followed by
+  ``extract_relations``, which parses every text a second time.
+* ``pipe`` – ``nlp_loader.annotate_batch``: one ``nlp.pipe`` pass whose docs
+  feed both entity and relation extraction.
+
+The configured spaCy model (``NLP_SPACY_MODEL_EN``) is used when installed.
+Otherwise a blank English pipeline with a sentencizer and an entity ruler is
+saved to a temporary directory and loaded in its place, so the batching
+overhead can still be measured offline; the ``pipeline`` field of the output
+records which one ran.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from common import ARTIFACT_DIR
+
+DOC_ENTITIES_ROOT = Path(__file__).resolve().parents[1] / "services" / "doc-entities"
+
+PEOPLE = ["Alice Meyer", "Boris Novak", "Carla Diaz", "Dmitri Orlov", "Elena Rossi"]
+ORGS = ["Acme Corp", "Globex", "Initech", "Umbrella Holdings", "Stark Industries"]
+PLACES = ["Berlin", "Paris", "London", "Madrid", "Vienna"]
+TEMPLATES = [
+    "{p} works at {o} in {g}.",
+    "{o} is based in {g} and hired {p} last year.",
+    "According to the report, {p} visited {g} to meet {p2}.",
+    "{p2} founded {o} after leaving {g}. The company later moved.",
+]
+
+
+def make_texts(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        sentences = [
+            rng.choice(TEMPLATES).format(
+                p=rng.choice(PEOPLE), p2=rng.choice(PEOPLE), o=rng.choice(ORGS), g=rng.choice(PLACES)
+            )
+            for _ in range(rng.randint(2, 6))
+        ]
+        texts.append(" ".join(sentences))
+    return texts
+
+
+def _prepare_pipeline() -> str:
+    """Point ``NLP_SPACY_MODEL_EN`` at a loadable pipeline and return its name."""
+
+    import spacy
+
+    model = os.getenv("NLP_SPACY_MODEL_EN", "en_core_web_sm")
+    try:
+        spacy.load(model)
+        return model
+    except OSError:
+        pass
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns(
+        [{"label": "PERSON", "pattern": name} for name in PEOPLE]
+        + [{"label": "ORG", "pattern": name} for name in ORGS]
+        + [{"label": "GPE", "pattern": name} for name in PLACES]
+    )
+    path = Path(tempfile.mkdtemp(prefix="nlp-bench-")) / "pipeline"
+    nlp.to_disk(path)
+    os.environ["NLP_SPACY_MODEL_EN"] = str(path)
+    return "blank+entity_ruler"
+
+
+def run_per_doc(texts: List[str]) -> float:
+    from nlp_loader import ner_spacy
+    from relation_extractor import extract_relations
+
+    start = time.perf_counter()
+    for text in texts:
+        entities = [
+            {
+                "id": str(i),
+                "text": ent["text"],
+                "label": ent["label"],
+                "span_start": ent["start"],
+                "span_end": ent["end"],
+                "value": ent["text"],
+            }
+            for i, ent in enumerate(ner_spacy(text, "en"))
+        ]
+        extract_relations(text, entities)
+    return time.perf_counter() - start
+
+
+def run_pipe(texts: List[str], batch_size: int, n_process: int) -> float:
+    from nlp_loader import annotate_batch
+
+    start = time.perf_counter()
+    annotate_batch(texts, "en", batch_size=batch_size, n_process=n_process)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--sizes", default="1000,10000")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", default="1,2", help="Comma separated n_process values")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    pipeline = _prepare_pipeline()
+    sys.path.insert(0, str(DOC_ENTITIES_ROOT))
+    import nlp_loader
+    import relation_extractor
+
+    # Both paths must parse with the same pipeline for a fair comparison
+    relation_extractor.relation_extractor.nlp = nlp_loader.get_nlp("en")
+
+    results: List[Dict[str, Any]] = []
+    for size in [int(x) for x in args.sizes.split(",") if x]:
+        texts = make_texts(size, args.seed)
+        cases = [("per_doc", 1, run_per_doc(texts))]
+        for n_process in [int(x) for x in args.n_process.split(",") if x]:
+            cases.append(("pipe", n_process, run_pipe(texts, args.batch_size, n_process)))
+        for mode, n_process, seconds in cases:
+            results.append(
+                {
+                    "mode": mode,
+                    "pipeline": pipeline,
+                    "docs": size,
+                    "batch_size": args.batch_size if mode == "pipe" else None,
+                    "n_process": n_process,
+                    "seconds": seconds,
+                    "docs_per_second": size / seconds if seconds else None,
+                }
+            )
+
+    (ARTIFACT_DIR / "doc-entities_nlp_batch.json").write_text(
+        json.dumps(results, indent=2), encoding="utf-8"
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Request-path cost of persisting performance metrics to Redis.
+
+Runs ``--requests`` concurrent-ish request handlers (``--concurrency`` at a
+time) that each record one metric, against a simulated Redis client that
+charges ``--rtt-ms`` per round trip. Compares the previous path (await LPUSH
+then LTRIM per metric) with ``RedisWriteBehind`` (``submit`` on the request
+path, pipelined flushes in the background) and reports per-request latency,
+total round trips and wall time until everything is persisted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from common import ARTIFACT_DIR
+
+PERFORMANCE_MONITOR_ROOT = Path(__file__).resolve().parents[1] / "services" / "performance-monitor"
+
+
+class SimulatedRedis:
+    """Counts round trips and sleeps ``rtt`` seconds for each one."""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.round_trips = 0
+        self.items = 0
+
+    async def lpush(self, key, *values):
+        self.round_trips += 1
+        self.items += len(values)
+        await asyncio.sleep(self.rtt)
+
+    async def ltrim(self, key, start, stop):
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt)
+
+    def pipeline(self, transaction: bool = True):
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, redis: SimulatedRedis):
+        self.redis = redis
+        self.pushed = 0
+
+    def lpush(self, key, *values):
+        self.pushed += len(values)
+
+    def ltrim(self, key, start, stop):
+        pass
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        self.redis.items += self.pushed
+        await asyncio.sleep(self.redis.rtt)
+
+
+async def _run(mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    from redis_writer import RedisWriteBehind
+
+    redis = SimulatedRedis(args.rtt_ms / 1000)
+    writer = RedisWriteBehind(redis, batch_size=args.batch_size, flush_interval=args.flush_interval)
+    if mode == "write_behind":
+        writer.start()
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def handle(i: int) -> None:
+        async with semaphore:
+            metric = {"id": i, "service_name": "bench", "metric_type": "response_time", "value": 12.5}
+            start = time.perf_counter()
+            if mode == "per_metric":
+                await redis.lpush("metrics:bench:response_time", json.dumps(metric))
+                await redis.ltrim("metrics:bench:response_time", 0, 999)
+            else:
+                writer.submit("metrics:bench:response_time", metric)
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handle(i) for i in range(args.requests)))
+    if mode == "write_behind":
+        await writer.close()
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "mode": mode,
+        "requests": args.requests,
+        "record_p50_ms": round(statistics.median(latencies), 4),
+        "record_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 4),
+        "round_trips": redis.round_trips,
+        "items_persisted": redis.items,
+        "wall_s": round(wall, 3),
+        "writer": writer.stats() if mode == "write_behind" else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="Simulated Redis round-trip time")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(PERFORMANCE_MONITOR_ROOT))
+    results = []
+    for mode in ("per_metric", "write_behind"):
+        row = asyncio.run(_run(mode, args))
+        results.append(row)
+        print(json.dumps(row))
+
+    (ARTIFACT_DIR / "perf_redis_writer.json").write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
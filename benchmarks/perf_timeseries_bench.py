@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Service-summary latency of the performance-monitor time-series store.
+
+For each series size the benchmark fills a ``MetricSeries`` (raw ring sized
+to hold every sample) and times the work ``get_service_summary`` does on it:
+window slice, mean/min/max, p95, trend slope and the windowed count. The
+same query is timed against the previous layout, a list of per-sample
+metric objects filtered with comprehensions and fitted with ``np.polyfit``.
+Also reported: per-sample ``add`` throughput and bytes held per sample.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from common import ARTIFACT_DIR
+
+PERFORMANCE_MONITOR_ROOT = Path(__file__).resolve().parents[1] / "services" / "performance-monitor"
+
+
+@dataclass
+class Sample:
+    timestamp: datetime
+    metric_type: str
+    value: float
+
+
+def _median_ms(fn: Callable[[], Any], repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 3)
+
+
+def _slope(values: np.ndarray) -> float:
+    x = np.arange(len(values), dtype=np.float64)
+    x -= x.mean()
+    return float(np.dot(x, values - values.mean()) / np.dot(x, x))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--sizes", default="10000,100000,1000000,4000000")
+    parser.add_argument("--window-fraction", type=float, default=0.5, help="Share of the series inside the summary window")
+    parser.add_argument("--list-max", type=int, default=1_000_000, help="Largest size run against the object list")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(PERFORMANCE_MONITOR_ROOT))
+    from timeseries import MetricSeries
+
+    rng = np.random.default_rng(args.seed)
+    results: List[Dict[str, Any]] = []
+    for size in [int(x) for x in args.sizes.split(",") if x]:
+        end = time.time()
+        timestamps = np.sort(rng.uniform(end - 7 * 86400, end, size))
+        values = rng.lognormal(4.5, 0.6, size)
+        cutoff = float(timestamps[int(size * (1 - args.window_fraction))])
+
+        series = MetricSeries(raw_capacity=size)
+        series.extend(timestamps, values)
+
+        def store_summary():
+            _, window = series.window(cutoff)
+            stats = series.stats_since(cutoff)
+            return stats["mean"], np.percentile(window, 95), _slope(window), stats["count"]
+
+        row: Dict[str, Any] = {
+            "samples": size,
+            "window_samples": int((timestamps >= cutoff).sum()),
+            "store_summary_ms": _median_ms(store_summary, args.repeats),
+            "store_bytes_per_sample": round(series.nbytes / size, 1),
+        }
+
+        add_series = MetricSeries(raw_capacity=min(size, 100_000))
+        n = min(size, 100_000)
+        start = time.perf_counter()
+        for t, v in zip(timestamps[:n].tolist(), values[:n].tolist()):
+            add_series.add(t, v)
+        row["store_add_per_s"] = round(n / (time.perf_counter() - start))
+
+        if size <= args.list_max:
+            cutoff_dt = datetime.fromtimestamp(cutoff)
+            base = datetime.fromtimestamp(0)
+            samples = [
+                Sample(base + timedelta(seconds=t), "response_time", v)
+                for t, v in zip(timestamps.tolist(), values.tolist())
+            ]
+
+            def list_summary():
+                recent = [m for m in samples if m.timestamp >= cutoff_dt]
+                response_times = [m.value for m in recent if m.metric_type == "response_time"]
+                slope = np.polyfit(np.arange(len(response_times)), response_times, 1)[0]
+                return (np.mean(response_times), np.percentile(response_times, 95), slope,
+                        len([m for m in recent if m.metric_type == "response_time"]))
+
+            row["list_summary_ms"] = _median_ms(list_summary, max(1, args.repeats // 2))
+            del samples
+        results.append(row)
+        print(json.dumps(row))
+
+    (ARTIFACT_DIR / "perf_timeseries.json").write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
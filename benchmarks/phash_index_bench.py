@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Query latency of the media-forensics perceptual-hash index vs index size.
+
+Random 64-bit codes stand in for pHashes; every query is a stored code with
+a few flipped bits, so each has at least one true match. For each size and
+radius the multi-index search (``MultiIndexHash.search``) is timed against
+the vectorised linear popcount scan (``MultiIndexHash.scan``), and the two
+result sets are checked to be identical. The service switches to the scan
+below ``SCAN_BELOW`` codes; here the index is forced on at every size.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from common import ARTIFACT_DIR
+
+MEDIA_FORENSICS_ROOT = Path(__file__).resolve().parents[1] / "services" / "media-forensics"
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[int(0.95 * (len(samples) - 1))],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--sizes", default="10000,100000,1000000,4000000")
+    parser.add_argument("--radii", default="4,8,10", help="Comma separated Hamming radii")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--flips", type=int, default=3, help="Bits flipped in each query")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(MEDIA_FORENSICS_ROOT))
+    from phash_index import MultiIndexHash
+
+    rng = np.random.default_rng(args.seed)
+    results: List[Dict[str, Any]] = []
+    for size in [int(x) for x in args.sizes.split(",") if x]:
+        codes = rng.integers(0, np.iinfo(np.uint64).max, size=size, dtype=np.uint64, endpoint=True)
+        index = MultiIndexHash(scan_below=0)
+        start = time.perf_counter()
+        index.add_many(codes)
+        build_s = time.perf_counter() - start
+
+        queries = []
+        for row in rng.integers(0, size, args.queries):
+            code = int(codes[row])
+            for bit in rng.choice(64, args.flips, replace=False):
+                code ^= 1 << int(bit)
+            queries.append(code)
+
+        for radius in [int(x) for x in args.radii.split(",") if x]:
+            index.search(queries[0], radius)  # warm-up
+            timings: Dict[str, List[float]] = {"mih": [], "scan": []}
+            for q in queries:
+                t0 = time.perf_counter()
+                rows, _ = index.search(q, radius)
+                t1 = time.perf_counter()
+                ref, _ = index.scan(q, radius)
+                t2 = time.perf_counter()
+                assert rows.tolist() == ref.tolist()
+                timings["mih"].append((t1 - t0) * 1e3)
+                timings["scan"].append((t2 - t1) * 1e3)
+            for mode, samples in timings.items():
+                results.append(
+                    {
+                        "mode": mode,
+                        "size": size,
+                        "radius": radius,
+                        "build_seconds": build_s if mode == "mih" else None,
+                        **_percentiles(samples),
+                    }
+                )
+
+    (ARTIFACT_DIR / "media-forensics_phash_index.json").write_text(
+        json.dumps(results, indent=2), encoding="utf-8"
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
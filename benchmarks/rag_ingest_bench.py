@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Ingest throughput of rag-api: per-document ``index_doc`` vs ``bulk_index``.
+
+By default both paths run against a live OpenSearch (``--os-url``) using a
+scratch index that is deleted afterwards. ``--offline`` swaps in an
+in-process client that charges ``--rtt-ms`` per HTTP request and
+``--refresh-ms`` per refresh, so the effect of request count and
+per-document refreshes can be measured without a cluster. Client-side work
+(embedding, serialisation) is real in both modes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from common import ARTIFACT_DIR
+
+RAG_API_ROOT = Path(__file__).resolve().parents[1] / "services" / "rag-api"
+
+WORDS = (
+    "Arbeitgeber Arbeitnehmer Pflicht Schutz Gefährdung Beurteilung Maßnahme Betrieb "
+    "Verordnung Richtlinie Datenschutz Verarbeitung Einwilligung Behörde Frist Meldung "
+    "Haftung Vertrag Kündigung Anspruch Sicherheit Gesundheit Unterweisung Dokumentation"
+).split()
+
+
+def make_docs(count: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"bench-{i}",
+            "title": " ".join(rng.choices(WORDS, k=4)),
+            "paragraph": f"§{rng.randint(1, 400)}",
+            "text": " ".join(rng.choices(WORDS, k=rng.randint(40, 160))),
+            "domain": rng.choice(["compliance", "tax", "labour"]),
+        }
+        for i in range(count)
+    ]
+
+
+class _SimIndices:
+    def __init__(self, owner: "SimulatedOpenSearch"):
+        self.owner = owner
+
+    def refresh(self, index: str) -> None:
+        self.owner.refreshes += 1
+        time.sleep(self.owner.refresh_s)
+
+
+class SimulatedOpenSearch:
+    """Accepts index/bulk calls and sleeps like a cluster would."""
+
+    def __init__(self, rtt_ms: float, refresh_ms: float):
+        from opensearchpy.serializer import JSONSerializer
+
+        self.rtt_s = rtt_ms / 1000.0
+        self.refresh_s = refresh_ms / 1000.0
+        self.transport = type("Transport", (), {"serializer": JSONSerializer()})()
+        self.indices = _SimIndices(self)
+        self.requests = 0
+        self.refreshes = 0
+
+    def index(self, index: str, id: str, body: Dict[str, Any], refresh: bool = False) -> Dict[str, Any]:
+        json.dumps(body)
+        self.requests += 1
+        time.sleep(self.rtt_s)
+        if refresh:
+            self.indices.refresh(index)
+        return {"result": "created"}
+
+    def bulk(self, body: str, **_kwargs: Any) -> Dict[str, Any]:
+        self.requests += 1
+        time.sleep(self.rtt_s)
+        lines = body.strip().split("\n")
+        return {
+            "errors": False,
+            "items": [{"index": {"_id": json.loads(line)["index"]["_id"], "status": 201}} for line in lines[::2]],
+        }
+
+
+def _make_client(args: argparse.Namespace, index: str):
+    from app.opensearch_client import OSClient
+
+    if args.offline:
+        client = OSClient.__new__(OSClient)
+        client.index = index
+        client.use_knn = False
+        client.client = SimulatedOpenSearch(args.rtt_ms, args.refresh_ms)
+        return client
+    return OSClient(args.os_url, index)
+
+
+def run(mode: str, docs: List[Dict[str, Any]], args: argparse.Namespace) -> Dict[str, Any]:
+    index = f"rag-ingest-bench-{mode}-{int(time.time())}"
+    client = _make_client(args, index)
+    try:
+        start = time.perf_counter()
+        if mode == "per_doc":
+            for doc in docs:
+                client.index_doc(doc)
+        else:
+            client.bulk_index(docs, refresh="batch", chunk_docs=args.chunk_docs)
+        seconds = time.perf_counter() - start
+    finally:
+        if not args.offline:
+            client.client.indices.delete(index=index, ignore_unavailable=True)
+    return {
+        "mode": mode,
+        "offline": args.offline,
+        "docs": len(docs),
+        "seconds": seconds,
+        "docs_per_second": len(docs) / seconds if seconds else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--per-doc-max", type=int, default=2000, help="Cap for the slow per-document path")
+    parser.add_argument("--chunk-docs", type=int, default=500)
+    parser.add_argument("--os-url", default="http://localhost:9200")
+    parser.add_argument("--offline", action="store_true", help="Use the simulated cluster")
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    parser.add_argument("--refresh-ms", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(RAG_API_ROOT))
+    docs = make_docs(args.docs, args.seed)
+    results = [
+        run("per_doc", docs[: args.per_doc_max], args),
+        run("bulk", docs, args),
+    ]
+
+    (ARTIFACT_DIR / "rag-api_ingest.json").write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Per-query latency of the search-api rerank scoring kernels.
+
+Only the scoring step is measured (embeddings are precomputed and
+normalised, as they are when served from the cache):
+
+* ``legacy`` – re-normalise, ``sorted(enumerate(...))`` over all scores and
+  list-based min-max normalisation and blending (the previous code path).
+* ``vectorised`` – ``rerank.cosine_scores`` / ``blend`` / ``top_k`` in float32
+  with ``argpartition`` selecting the ``--page`` best results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from common import ARTIFACT_DIR
+
+SERVICES_ROOT = Path(__file__).resolve().parents[1] / "services"
+SEARCH_API_SRC = SERVICES_ROOT / "search-api" / "src"
+
+
+def legacy_rerank(query_vec: np.ndarray, doc_vecs: np.ndarray, bm25: List[float]) -> List[int]:
+    q = query_vec / (np.linalg.norm(query_vec) + 1e-9)
+    docs = doc_vecs / (np.linalg.norm(doc_vecs, axis=1, keepdims=True) + 1e-9)
+    ranks = sorted(list(enumerate(docs.dot(q))), key=lambda x: x[1], reverse=True)
+
+    def normalize(scores: List[float]) -> List[float]:
+        mn, mx = min(scores), max(scores)
+        if mx - mn < 1e-9:
+            return [0.0 for _ in scores]
+        return [(s - mn) / (mx - mn) for s in scores]
+
+    norm_cos = normalize([r[1] for r in ranks])
+    norm_bm = normalize([bm25[r[0]] for r in ranks])
+    blended = [0.7 * norm_cos[i] + 0.3 * norm_bm[i] for i in range(len(ranks))]
+    order = sorted(zip((r[0] for r in ranks), blended), key=lambda x: x[1], reverse=True)
+    return [idx for idx, _ in order]
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "p50_us": statistics.median(samples),
+        "p95_us": samples[int(0.95 * (len(samples) - 1))],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--topk", default="50,200,1000", help="Comma separated rerank_topk values")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--page", type=int, default=20, help="Results that must come back ordered")
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # search_api.app imports the shared API standards from services/
+    sys.path[:0] = [str(SEARCH_API_SRC), str(SERVICES_ROOT)]
+    from search_api.app import rerank as rr
+
+    rng = np.random.default_rng(args.seed)
+    results = []
+    for topk in [int(x) for x in args.topk.split(",") if x]:
+        docs = rng.standard_normal((topk, args.dim)).astype(np.float32)
+        docs /= np.linalg.norm(docs, axis=1, keepdims=True)
+        query = docs[0] + 0.1 * rng.standard_normal(args.dim).astype(np.float32)
+        query /= np.linalg.norm(query)
+        bm25 = np.sort(rng.random(topk, dtype=np.float32) * 20)[::-1].copy()
+        bm25_list = bm25.tolist()
+
+        def vectorised() -> np.ndarray:
+            return rr.top_k(rr.blend(rr.cosine_scores(query, docs), bm25), args.page)
+
+        assert legacy_rerank(query, docs, bm25_list)[: args.page] == vectorised().tolist()
+        for mode, fn in (
+            ("legacy", lambda: legacy_rerank(query, docs, bm25_list)),
+            ("vectorised", vectorised),
+        ):
+            results.append({"mode": mode, "topk": topk, "dim": args.dim, **_time(fn, args.repeat)})
+
+    (ARTIFACT_DIR / "search-api_rerank_kernel.json").write_text(
+        json.dumps(results, indent=2), encoding="utf-8"
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
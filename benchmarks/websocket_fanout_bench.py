@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Broadcast fan-out latency of the websocket-manager with 10k simulated clients.
+
+Each simulated client is a fake socket whose ``send_text`` completes without
+blocking; a ``--slow-fraction`` of them take ``--slow-delay-ms`` per frame,
+standing in for congested links. For every broadcast the benchmark records
+how long the broadcast call itself blocks and when each fast client receives
+the frame (p50/p99/max, the max being the fan-out completion time).
+
+The engine (``ClientOutbox`` per client, message encoded once) is compared
+with the previous delivery loop, which re-encoded the message and awaited
+each client's send in turn, so every slow client delayed all the others.
+The old loop is run for ``--legacy-messages`` broadcasts only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from common import ARTIFACT_DIR
+
+WEBSOCKET_MANAGER_ROOT = Path(__file__).resolve().parents[1] / "services" / "websocket-manager"
+
+
+@dataclass
+class Message:
+    """Field-for-field stand-in for ``main.WebSocketMessage``."""
+
+    id: str
+    type: str
+    channel: str
+    timestamp: datetime
+    data: Dict[str, Any]
+    sender_id: Optional[str] = None
+    target_user_id: Optional[str] = None
+    investigation_id: Optional[str] = None
+    metadata: Dict[str, Any] = None
+
+
+class FakeSocket:
+    def __init__(self, delay: float, round_state: Dict[str, Any]):
+        self.delay = delay
+        self.round = round_state
+
+    async def send_text(self, frame: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            state = self.round
+            state["arrivals"].append(time.perf_counter())
+            if len(state["arrivals"]) == state["expected"]:
+                state["done"].set()
+
+
+def _message(i: int) -> Message:
+    return Message(
+        id=str(uuid.uuid4()),
+        type="entity_discovered",
+        channel="graph_analysis",
+        timestamp=datetime.now(),
+        data={
+            "entity_id": f"entity-{i}",
+            "entity_type": "domain",
+            "entity_name": f"host-{i}.example.com",
+            "discovered_by": "subfinder",
+            "properties": {"source": "bench", "score": 0.87, "tags": ["dns", "passive"]},
+        },
+        investigation_id="inv-bench",
+    )
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p99_ms": round(samples[int(0.99 * (len(samples) - 1))], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+async def _run(impl: str, args: argparse.Namespace, messages: int) -> Dict[str, Any]:
+    from fanout import ClientOutbox, SlowConsumerPolicy, coalesce_key, encode_message
+
+    slow_every = int(1 / args.slow_fraction) if args.slow_fraction else 0
+    state: Dict[str, Any] = {}
+    sockets = [
+        FakeSocket(args.slow_delay_ms / 1000 if slow_every and i % slow_every == 0 else 0.0, state)
+        for i in range(args.clients)
+    ]
+    fast = sum(1 for s in sockets if not s.delay)
+    outboxes = []
+    if impl == "outbox":
+        outboxes = [
+            ClientOutbox(s, max_size=args.queue_size, policy=SlowConsumerPolicy(args.policy))
+            for s in sockets
+        ]
+        for outbox in outboxes:
+            outbox.start()
+
+    call_ms: List[float] = []
+    delivery_ms: List[float] = []
+    completion_ms: List[float] = []
+    for i in range(messages):
+        state.update(arrivals=[], expected=fast, done=asyncio.Event())
+        message = _message(i)
+        start = time.perf_counter()
+        if impl == "outbox":
+            frame = encode_message(message)
+            key = coalesce_key(message)
+            for outbox in outboxes:
+                outbox.put(frame, key)
+        else:
+            for sock in sockets:
+                message_data = asdict(message)
+                message_data["timestamp"] = message.timestamp.isoformat()
+                await sock.send_text(json.dumps(message_data, default=str))
+        call_ms.append((time.perf_counter() - start) * 1000)
+        await state["done"].wait()
+        arrivals = [(t - start) * 1000 for t in state["arrivals"]]
+        delivery_ms.extend(arrivals)
+        completion_ms.append(max(arrivals))
+
+    for outbox in outboxes:
+        outbox.close()
+    await asyncio.sleep(0)
+    stats = outboxes[0].stats if outboxes else {}
+    return {
+        "impl": impl,
+        "clients": args.clients,
+        "slow_clients": args.clients - fast,
+        "messages": messages,
+        "broadcast_call": _summary(call_ms),
+        "fast_client_delivery": _summary(delivery_ms),
+        "fanout_completion": _summary(completion_ms),
+        "dropped_per_outbox_0": stats.get("messages_dropped", 0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--legacy-messages", type=int, default=3)
+    parser.add_argument("--slow-fraction", type=float, default=0.01)
+    parser.add_argument("--slow-delay-ms", type=float, default=20.0)
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--policy", default="drop_oldest", choices=["drop_oldest", "coalesce", "disconnect"])
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(WEBSOCKET_MANAGER_ROOT))
+    results = [
+        asyncio.run(_run("outbox", args, args.messages)),
+        asyncio.run(_run("sequential", args, args.legacy_messages)),
+    ]
+
+    (ARTIFACT_DIR / "websocket_fanout.json").write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+In-memory L1 tier for the cache manager.
+
+An ``OrderedDict`` kept in recency order gives O(1) lookups, recency bumps
+(``move_to_end``) and LRU evictions (``popitem(last=False)``). The byte size
+of the stored entries is tracked incrementally, so both the item limit and
+the byte limit are enforced on every insert without rescanning the cache.
+"""
+
+from collections import OrderedDict
+from typing import Any, Iterator, Optional, Tuple
+
+
+class L1Cache:
+    """LRU map bounded by item count and total ``size_bytes``."""
+
+    def __init__(self, max_items: int = 1000, max_bytes: int = 100 * 1024 * 1024):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: str) -> Any:
+        return self._entries[key][0]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def keys(self):
+        return self._entries.keys()
+
+    def values(self) -> Iterator[Any]:
+        return (value for value, _ in self._entries.values())
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((key, value) for key, (value, _) in self._entries.items())
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value and mark it most recently used."""
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        self._entries.move_to_end(key)
+        return item[0]
+
+    def put(self, key: str, value: Any, size_bytes: int) -> int:
+        """Insert or replace ``key``; returns the number of entries evicted.
+
+        Entries larger than ``max_bytes`` are not admitted (the existing
+        value for ``key``, if any, is dropped).
+        """
+        self.pop(key)
+        if size_bytes > self.max_bytes:
+            return 0
+        evicted = 0
+        while self._entries and (
+            len(self._entries) >= self.max_items or self._bytes + size_bytes > self.max_bytes
+        ):
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            evicted += 1
+        self._entries[key] = (value, size_bytes)
+        self._bytes += size_bytes
+        return evicted
+
+    def pop(self, key: str) -> Optional[Any]:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return None
+        self._bytes -= item[1]
+        return item[0]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
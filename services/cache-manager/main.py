@@ -6,7 +6,7 @@ Supports Redis-backed caching with compression and cache warming strategies.
 """
 
 from fastapi import FastAPI, Request, Response, Depends, HTTPException
-from fastapi.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional, Union
 from datetime import datetime, timedelta
@@ -25,6 +25,8 @@ import pickle
 import re
 from collections import defaultdict
 
+from l1_cache import L1Cache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -37,6 +39,10 @@ class CacheStrategy(str, Enum):
     TTL = "ttl"  # Time To Live based
     ADAPTIVE = "adaptive"  # Adaptive based on usage patterns
 
+# Redis hash holding the access metadata of an L2 entry, so hits only
+# increment counters instead of re-pickling and rewriting the value
+L2_META_PREFIX = "cache-meta:"
+
 class CacheLevel(str, Enum):
     L1_MEMORY = "l1_memory"      # In-memory cache (fastest)
     L2_REDIS = "l2_redis"        # Redis cache (fast, shared)
@@ -169,11 +175,11 @@ class IntelligentCacheManager:
         self.redis_url = redis_url
         self.redis = None
         
-        # L1 Cache (Memory) - LRU with size limit
-        self.l1_cache = {}
-        self.l1_access_order = []
-        self.l1_max_size = 1000  # Max items in memory
-        self.l1_max_bytes = 100 * 1024 * 1024  # 100MB max memory usage
+        # L1 Cache (Memory) - LRU bounded by item count and bytes
+        self.l1_cache = L1Cache(
+            max_items=1000,  # Max items in memory
+            max_bytes=100 * 1024 * 1024,  # 100MB max memory usage
+        )
         
         # Cache statistics
         self.stats = CacheStats(
@@ -200,6 +206,22 @@ class IntelligentCacheManager:
             "user_dashboard:*"
         ]
     
+    @property
+    def l1_max_size(self) -> int:
+        return self.l1_cache.max_items
+
+    @l1_max_size.setter
+    def l1_max_size(self, value: int):
+        self.l1_cache.max_items = value
+
+    @property
+    def l1_max_bytes(self) -> int:
+        return self.l1_cache.max_bytes
+
+    @l1_max_bytes.setter
+    def l1_max_bytes(self, value: int):
+        self.l1_cache.max_bytes = value
+
     async def initialize(self):
         """Initialize cache manager"""
         try:
@@ -216,9 +238,8 @@ class IntelligentCacheManager:
         self.stats.total_requests += 1
         
         # Try L1 cache first
-        if use_l1 and key in self.l1_cache:
-            entry = self.l1_cache[key]
-            
+        entry = self.l1_cache.get(key) if use_l1 else None
+        if entry is not None:
             # Check TTL
             if self._is_expired(entry):
                 await self._evict_from_l1(key)
@@ -226,7 +247,6 @@ class IntelligentCacheManager:
                 # Update access info
                 entry.last_accessed = datetime.now()
                 entry.access_count += 1
-                self._update_l1_access_order(key)
                 
                 self.stats.cache_hits += 1
                 self._record_response_time(start_time)
@@ -241,19 +261,16 @@ class IntelligentCacheManager:
                     
                     # Check TTL
                     if self._is_expired(entry):
-                        await self.redis.delete(key)
+                        await self.redis.delete(key, self._l2_meta_key(key))
                     else:
                         # Update access info
                         entry.last_accessed = datetime.now()
-                        entry.access_count += 1
+                        entry.access_count = await self._touch_l2(key, entry)
                         
                         # Promote to L1 if frequently accessed
                         if entry.access_count > 5:
                             await self._promote_to_l1(key, entry)
                         
-                        # Update in Redis
-                        await self.redis.set(key, pickle.dumps(entry), ex=entry.ttl_seconds)
-                        
                         self.stats.cache_hits += 1
                         self._record_response_time(start_time)
                         return entry
@@ -323,7 +340,7 @@ class IntelligentCacheManager:
         # Delete from L2
         if self.redis:
             try:
-                result = await self.redis.delete(key)
+                result = await self.redis.delete(key, self._l2_meta_key(key))
                 deleted = deleted or bool(result)
             except Exception as e:
                 logger.warning(f"Failed to delete from Redis: {e}")
@@ -356,7 +373,7 @@ class IntelligentCacheManager:
                         if cached_data:
                             entry = pickle.loads(cached_data)
                             if any(tag in entry.tags for tag in tags):
-                                await self.redis.delete(key)
+                                await self.redis.delete(key, self._l2_meta_key(key))
                                 invalidated += 1
                     except Exception:
                         continue
@@ -379,9 +396,9 @@ class IntelligentCacheManager:
         # Invalidate from L2
         if self.redis:
             try:
-                keys = await self.redis.keys(pattern)
+                keys = [k for k in await self.redis.keys(pattern) if not self._is_l2_meta_key(k)]
                 if keys:
-                    await self.redis.delete(*keys)
+                    await self.redis.delete(*keys, *(self._l2_meta_key(k) for k in keys))
                     invalidated += len(keys)
             except Exception as e:
                 logger.warning(f"Failed to invalidate by pattern in Redis: {e}")
@@ -416,42 +433,52 @@ class IntelligentCacheManager:
     
     async def _set_l1(self, key: str, entry: CacheEntry):
         """Set item in L1 cache with eviction management"""
-        # Check if we need to evict
-        while (len(self.l1_cache) >= self.l1_max_size or 
-               sum(e.size_bytes for e in self.l1_cache.values()) + entry.size_bytes > self.l1_max_bytes):
-            await self._evict_lru_from_l1()
-        
-        self.l1_cache[key] = entry
-        self._update_l1_access_order(key)
+        self.stats.evictions += self.l1_cache.put(key, entry, entry.size_bytes)
     
     async def _set_l2(self, key: str, entry: CacheEntry):
         """Set item in L2 cache (Redis)"""
         if self.redis:
             try:
-                await self.redis.set(key, pickle.dumps(entry), ex=entry.ttl_seconds)
+                meta_key = self._l2_meta_key(key)
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.set(key, pickle.dumps(entry), ex=entry.ttl_seconds)
+                pipe.delete(meta_key)
+                pipe.hset(meta_key, mapping={
+                    "access_count": entry.access_count,
+                    "last_accessed": entry.last_accessed.timestamp(),
+                })
+                pipe.expire(meta_key, entry.ttl_seconds)
+                await pipe.execute()
             except Exception as e:
                 logger.warning(f"Failed to set in Redis: {e}")
     
+    @staticmethod
+    def _l2_meta_key(key: Union[str, bytes]) -> str:
+        if isinstance(key, bytes):
+            key = key.decode()
+        return f"{L2_META_PREFIX}{key}"
+    
+    @staticmethod
+    def _is_l2_meta_key(key: Union[str, bytes]) -> bool:
+        if isinstance(key, bytes):
+            key = key.decode()
+        return key.startswith(L2_META_PREFIX)
+    
+    async def _touch_l2(self, key: str, entry: CacheEntry) -> int:
+        """Record an L2 hit in the entry's metadata hash; returns the access count"""
+        meta_key = self._l2_meta_key(key)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hincrby(meta_key, "access_count", 1)
+        pipe.hset(meta_key, "last_accessed", entry.last_accessed.timestamp())
+        pipe.expire(meta_key, entry.ttl_seconds)
+        count, _, _ = await pipe.execute()
+        return int(count)
+    
     async def _evict_from_l1(self, key: str):
         """Evict item from L1 cache"""
-        if key in self.l1_cache:
-            del self.l1_cache[key]
-            if key in self.l1_access_order:
-                self.l1_access_order.remove(key)
+        if self.l1_cache.pop(key) is not None:
             self.stats.evictions += 1
     
-    async def _evict_lru_from_l1(self):
-        """Evict least recently used item from L1"""
-        if self.l1_access_order:
-            lru_key = self.l1_access_order[0]
-            await self._evict_from_l1(lru_key)
-    
-    def _update_l1_access_order(self, key: str):
-        """Update access order for LRU eviction"""
-        if key in self.l1_access_order:
-            self.l1_access_order.remove(key)
-        self.l1_access_order.append(key)
-    
     async def _promote_to_l1(self, key: str, entry: CacheEntry):
         """Promote frequently accessed item from L2 to L1"""
         if entry.size_bytes < 50000:  # Only promote small items
@@ -479,7 +506,7 @@ class IntelligentCacheManager:
         """Get current cache statistics"""
         # Update current stats
         self.stats.total_cached_items = len(self.l1_cache)
-        self.stats.total_cache_size_bytes = sum(e.size_bytes for e in self.l1_cache.values())
+        self.stats.total_cache_size_bytes = self.l1_cache.size_bytes
         
         if self.redis:
             try:
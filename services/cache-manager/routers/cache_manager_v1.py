@@ -16,7 +16,7 @@ from fastapi.responses import JSONResponse
 from werkzeug.utils import secure_filename
 from main import (
     cache_manager, CacheKeyGenerator, CompressionManager,
-    CacheLevel, CacheStrategy
+    CacheLevel, CacheStrategy, L2_META_PREFIX
 )
 from _shared.api_standards.error_schemas import StandardError, ErrorCodes, create_error_response
 from _shared.api_standards.pagination import PaginatedResponse, PaginationParams
@@ -283,7 +283,7 @@ async def get_detailed_cache_stats() -> DetailedCacheStats:
     level_stats.append(CacheLevelStats(
         level=CacheLevel.L1_MEMORY,
         items=len(cache_manager.l1_cache),
-        size_bytes=sum(e.size_bytes for e in cache_manager.l1_cache.values()),
+        size_bytes=cache_manager.l1_cache.size_bytes,
         hits=l1_hits,
         misses=l1_misses,
         hit_ratio=l1_hits / max(l1_total, 1)
@@ -335,7 +335,7 @@ async def get_detailed_cache_stats() -> DetailedCacheStats:
         "system_total_gb": round(memory.total / (1024**3), 2),
         "system_available_gb": round(memory.available / (1024**3), 2),
         "system_usage_percent": memory.percent,
-        "cache_l1_mb": round(sum(e.size_bytes for e in cache_manager.l1_cache.values()) / (1024**2), 2)
+        "cache_l1_mb": round(cache_manager.l1_cache.size_bytes / (1024**2), 2)
     }
     
     return DetailedCacheStats(
@@ -370,7 +370,7 @@ async def get_cache_health() -> CacheHealthStatus:
     # Memory usage
     import psutil
     memory = psutil.virtual_memory()
-    memory_usage_mb = sum(e.size_bytes for e in cache_manager.l1_cache.values()) / (1024**2)
+    memory_usage_mb = cache_manager.l1_cache.size_bytes / (1024**2)
     
     # Overall health determination
     health_checks = [
@@ -656,7 +656,6 @@ async def flush_cache() -> Dict[str, Any]:
     # Flush L1 cache
     l1_count = len(cache_manager.l1_cache)
     cache_manager.l1_cache.clear()
-    cache_manager.l1_access_order.clear()
     flushed_items += l1_count
     
     # Flush L2 cache (Redis)
@@ -667,6 +666,9 @@ async def flush_cache() -> Dict[str, Any]:
             if keys:
                 await cache_manager.redis.delete(*keys)
                 flushed_items += len(keys)
+            meta_keys = await cache_manager.redis.keys(f"{L2_META_PREFIX}*")
+            if meta_keys:
+                await cache_manager.redis.delete(*meta_keys)
         except Exception as e:
             logger.warning(f"Failed to flush Redis cache: {e}")
     
@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+from fnmatch import fnmatchcase
+from pathlib import Path
+import importlib.util
+import pickle
+import sys
+
+import pytest
+
+pytest.importorskip("aioredis")
+
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = ROOT / "services" / "cache-manager"
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+# other services ship a ``main`` module too: load this one under its own name
+_spec = importlib.util.spec_from_file_location("cache_manager_main", SERVICE_DIR / "main.py")
+cache_main = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = cache_main  # CacheEntry is pickled into Redis
+_spec.loader.exec_module(cache_main)
+
+CacheLevel = cache_main.CacheLevel
+IntelligentCacheManager = cache_main.IntelligentCacheManager
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        results = []
+        for name, args, kwargs in self.calls:
+            results.append(await getattr(self.redis, name)(*args, **kwargs))
+        self.redis.pipelines.append([name for name, _, _ in self.calls])
+        return results
+
+
+def _key(key):
+    # like Redis without decode_responses: keys come back as bytes, either form is accepted
+    return key.decode() if isinstance(key, bytes) else key
+
+
+class FakeRedis:
+    """Just enough of ``aioredis.Redis`` for the cache manager's L2 tier."""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self.ttls = {}
+        self.pipelines = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.values.get(_key(key))
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+        return True
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in map(_key, keys):
+            removed += (self.values.pop(key, None) is not None) + (self.hashes.pop(key, None) is not None)
+            self.ttls.pop(key, None)
+        return removed
+
+    async def keys(self, pattern):
+        return [key.encode() for key in (*self.values, *self.hashes) if fnmatchcase(key, pattern)]
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        fields = self.hashes.setdefault(key, {})
+        updates = dict(mapping or {})
+        if field is not None:
+            updates[field] = value
+        fields.update(updates)
+        return len(updates)
+
+    async def hincrby(self, key, field, amount=1):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = int(fields.get(field, 0)) + amount
+        return fields[field]
+
+    async def expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return True
+
+
+@pytest.fixture
+def manager():
+    manager = IntelligentCacheManager()
+    manager.redis = FakeRedis()
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_set_writes_value_and_fresh_metadata_hash(manager):
+    redis = manager.redis
+    await manager.set("cache:a", {"v": 1}, ttl_seconds=600)
+
+    assert "cache:a" in manager.l1_cache
+    assert pickle.loads(redis.values["cache:a"]).value == b'{"v": 1}'
+    assert redis.hashes["cache-meta:cache:a"]["access_count"] == 1
+    assert redis.ttls == {"cache:a": 600, "cache-meta:cache:a": 600}
+    assert redis.pipelines == [["set", "delete", "hset", "expire"]]
+
+    # re-setting the key starts the access metadata over
+    redis.hashes["cache-meta:cache:a"]["access_count"] = 9
+    await manager.set("cache:a", {"v": 2}, ttl_seconds=600)
+    assert redis.hashes["cache-meta:cache:a"]["access_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_l2_hits_only_touch_metadata_and_promote_to_l1(manager):
+    redis = manager.redis
+    await manager.set("cache:a", "value", ttl_seconds=60, force_level=CacheLevel.L2_REDIS)
+    stored = redis.values["cache:a"]
+    assert "cache:a" not in manager.l1_cache
+
+    for count in range(2, 7):
+        entry = await manager.get("cache:a")
+        assert entry.access_count == count
+
+    # the pickled value is never rewritten on a hit
+    assert redis.values["cache:a"] is stored
+    assert redis.pipelines[-1] == ["hincrby", "hset", "expire"]
+    assert redis.hashes["cache-meta:cache:a"]["access_count"] == 6
+    # more than five accesses promote the entry to L1
+    assert "cache:a" in manager.l1_cache
+
+
+@pytest.mark.asyncio
+async def test_expired_l2_entry_drops_its_metadata(manager):
+    redis = manager.redis
+    await manager.set("cache:a", "value", ttl_seconds=60, force_level=CacheLevel.L2_REDIS)
+    entry = pickle.loads(redis.values["cache:a"])
+    entry.created_at = datetime.now() - timedelta(seconds=120)
+    redis.values["cache:a"] = pickle.dumps(entry)
+
+    assert await manager.get("cache:a") is None
+    assert redis.values == {} and redis.hashes == {}
+
+
+@pytest.mark.asyncio
+async def test_delete_and_invalidate_remove_metadata_keys(manager):
+    redis = manager.redis
+    await manager.set("cache:a", "a", ttl_seconds=600, tags=["red"])
+    await manager.set("cache:b", "b", ttl_seconds=600, tags=["blue"])
+    await manager.set("cache:c", "c", ttl_seconds=600)
+    await manager.set("other:d", "d", ttl_seconds=600)
+
+    assert await manager.delete("cache:a")
+    assert "cache:a" not in redis.values and "cache-meta:cache:a" not in redis.hashes
+
+    assert await manager.invalidate_by_tags(["blue"]) == 2  # once in L1, once in L2
+    assert "cache-meta:cache:b" not in redis.hashes
+
+    # metadata hashes matching the pattern are not counted as entries
+    assert await manager.invalidate_by_pattern("cache*") == 2  # cache:c in L1 and L2
+    assert set(redis.values) == {"other:d"}
+    assert set(redis.hashes) == {"cache-meta:other:d"}
+
+
+@pytest.mark.asyncio
+async def test_set_l1_counts_evictions(manager):
+    manager.l1_max_size = 2
+    for key in ("a", "b", "c"):
+        await manager.set(key, key, ttl_seconds=600, force_level=CacheLevel.L1_MEMORY)
+
+    assert list(manager.l1_cache) == ["b", "c"]
+    assert manager.stats.evictions == 1
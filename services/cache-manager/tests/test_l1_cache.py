@@ -0,0 +1,68 @@
+from pathlib import Path
+import sys
+
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = ROOT / "services" / "cache-manager"
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from l1_cache import L1Cache  # type: ignore  # noqa: E402
+
+
+def test_item_limit_evicts_least_recently_used():
+    cache = L1Cache(max_items=3, max_bytes=1000)
+    for key in "abc":
+        assert cache.put(key, key.upper(), 10) == 0
+    assert cache.get("a") == "A"  # bump: b is now the oldest
+
+    assert cache.put("d", "D", 10) == 1
+    assert list(cache) == ["c", "a", "d"]
+    assert cache.size_bytes == 30
+
+
+def test_byte_limit_evicts_oldest_until_the_entry_fits():
+    cache = L1Cache(max_items=10, max_bytes=100)
+    cache.put("a", 1, 40)
+    cache.put("b", 2, 30)
+    cache.put("c", 3, 20)
+    cache.get("a")
+
+    # 90 + 50 > 100: b then c go, a was used most recently before the insert
+    assert cache.put("d", 4, 50) == 2
+    assert list(cache.items()) == [("a", 1), ("d", 4)]
+    assert cache.size_bytes == 90
+
+
+def test_put_replaces_an_existing_key_and_its_size():
+    cache = L1Cache(max_items=2, max_bytes=100)
+    cache.put("a", 1, 60)
+    cache.put("b", 2, 30)
+
+    # the old 60 bytes are released before the new entry is checked, so nothing is evicted
+    assert cache.put("a", 3, 70) == 0
+    assert list(cache.items()) == [("b", 2), ("a", 3)]
+    assert cache.size_bytes == 100 and len(cache) == 2
+
+
+def test_entries_larger_than_max_bytes_are_refused():
+    cache = L1Cache(max_items=10, max_bytes=100)
+    cache.put("a", 1, 10)
+    cache.put("b", 2, 10)
+
+    assert cache.put("big", 3, 101) == 0
+    assert "big" not in cache and list(cache) == ["a", "b"]
+    # replacing with an oversized value drops the old one and keeps the rest
+    assert cache.put("a", 4, 500) == 0
+    assert list(cache) == ["b"] and cache.size_bytes == 10
+
+
+def test_pop_and_clear_release_bytes():
+    cache = L1Cache(max_items=10, max_bytes=100)
+    cache.put("a", 1, 10)
+    cache.put("b", 2, 20)
+
+    assert cache.pop("a") == 1 and cache.pop("a") is None
+    assert cache.size_bytes == 20 and cache.get("a") is None
+    cache.clear()
+    assert len(cache) == 0 and cache.size_bytes == 0
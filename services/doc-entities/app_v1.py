@@ -55,6 +55,13 @@ async def lifespan(app: FastAPI):
             print("✅ Database tables created/verified")
         except Exception as exc:  # pragma: no cover - startup diagnostics
             print(f"⚠️ Database initialization warning: {exc}")
+        try:
+            from resolver import rebuild_candidate_index
+
+            indexed = rebuild_candidate_index()
+            print(f"✅ Candidate index rebuilt ({indexed} names)")
+        except Exception as exc:  # pragma: no cover - startup diagnostics
+            print(f"⚠️ Candidate index rebuild warning: {exc}")
     yield
     print("🛑 Doc-Entities API shutting down")
 
@@ -0,0 +1,215 @@
+"""Character-trigram candidate index for entity resolution.
+
+The resolver used to build the full candidate list for every entity and scan
+it linearly with RapidFuzz, so resolution time grew with the knowledge base.
+:class:`CandidateIndex` keeps an inverted index from padded character
+trigrams to canonical names and aliases and returns a small shortlist of
+entries sharing the most trigrams with the query; only that shortlist is
+fuzzy-scored. The index is updated incrementally whenever a resolution is
+written and can be rebuilt from the database on startup.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+def normalise(value: Optional[str]) -> str:
+    """Lowercase, replace punctuation with spaces and collapse whitespace."""
+
+    if not value:
+        return ""
+    cleaned = re.sub(r"[^\w\s]", " ", value.lower())
+    return re.sub(r"\s+", " ", cleaned).strip()
+
+
+def trigrams(value: str) -> Set[str]:
+    """Return the padded character trigrams of a normalised string."""
+
+    padded = f"  {value} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class IndexEntry:
+    """One searchable surface form (canonical name or alias) of a KB node."""
+
+    node_id: str
+    surface: str
+    name: str
+    type: str
+    description: str = ""
+    confidence: float = 0.9
+    source: str = "kb"
+
+    def as_kb_entry(self) -> Dict[str, Any]:
+        """Shape expected by ``FuzzyMatcher.fuzzy_resolve_entity``."""
+
+        return {
+            "id": self.node_id,
+            "name": self.surface,
+            "canonical_name": self.name,
+            "type": self.type,
+            "description": self.description,
+        }
+
+
+class CandidateIndex:
+    """Thread-safe trigram inverted index over canonical names and aliases."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._entries: List[Optional[IndexEntry]] = []
+        self._grams: List[Set[str]] = []
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._exact: Dict[str, Set[int]] = defaultdict(set)
+        self._keys: Dict[Tuple[str, str], int] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._keys)
+
+    def add(
+        self,
+        node_id: str,
+        surface: str,
+        *,
+        name: Optional[str] = None,
+        type: str = "",
+        description: str = "",
+        confidence: float = 0.9,
+        source: str = "kb",
+    ) -> bool:
+        """Index ``surface`` as a name of ``node_id``; returns False if known."""
+
+        normalised = normalise(surface)
+        if not normalised or not node_id:
+            return False
+        key = (node_id, normalised)
+        with self._lock:
+            if key in self._keys:
+                return False
+            entry_id = len(self._entries)
+            grams = trigrams(normalised)
+            self._entries.append(
+                IndexEntry(
+                    node_id=node_id,
+                    surface=normalised,
+                    name=name or surface,
+                    type=type,
+                    description=description,
+                    confidence=confidence,
+                    source=source,
+                )
+            )
+            self._grams.append(grams)
+            self._keys[key] = entry_id
+            self._exact[normalised].add(entry_id)
+            for gram in grams:
+                self._postings[gram].add(entry_id)
+        return True
+
+    def remove_node(self, node_id: str) -> int:
+        """Drop every surface form of ``node_id``."""
+
+        removed = 0
+        with self._lock:
+            for key in [k for k in self._keys if k[0] == node_id]:
+                entry_id = self._keys.pop(key)
+                for gram in self._grams[entry_id]:
+                    self._postings[gram].discard(entry_id)
+                self._exact[key[1]].discard(entry_id)
+                self._entries[entry_id] = None
+                self._grams[entry_id] = set()
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._grams.clear()
+            self._postings.clear()
+            self._exact.clear()
+            self._keys.clear()
+
+    def exact(self, value: str, type: Optional[str] = None) -> List[IndexEntry]:
+        """Entries whose normalised surface equals ``value``."""
+
+        normalised = normalise(value)
+        wanted = normalise(type) if type else ""
+        with self._lock:
+            entries = [self._entries[i] for i in sorted(self._exact.get(normalised, ()))]
+        return [
+            e
+            for e in entries
+            if e is not None and (not wanted or not e.type or normalise(e.type) == wanted)
+        ]
+
+    def search(
+        self, value: str, type: Optional[str] = None, limit: int = 20, min_similarity: float = 0.2
+    ) -> List[IndexEntry]:
+        """Return up to ``limit`` entries ranked by trigram Dice similarity."""
+
+        normalised = normalise(value)
+        if not normalised:
+            return []
+        query = trigrams(normalised)
+        wanted = normalise(type) if type else ""
+        shared: Dict[int, int] = defaultdict(int)
+        with self._lock:
+            for gram in query:
+                for entry_id in self._postings.get(gram, ()):
+                    shared[entry_id] += 1
+            scored = []
+            for entry_id, count in shared.items():
+                entry = self._entries[entry_id]
+                if entry is None:
+                    continue
+                if wanted and entry.type and normalise(entry.type) != wanted:
+                    continue
+                dice = 2.0 * count / (len(query) + len(self._grams[entry_id]))
+                if dice >= min_similarity:
+                    scored.append((dice, entry_id, entry))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [entry for _, _, entry in scored[:limit]]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Return every live entry in the form accepted by :meth:`load`."""
+
+        with self._lock:
+            entries = [e for e in self._entries if e is not None]
+        return [
+            {
+                "node_id": e.node_id,
+                "surface": e.surface,
+                "name": e.name,
+                "type": e.type,
+                "description": e.description,
+                "confidence": e.confidence,
+                "source": e.source,
+            }
+            for e in entries
+        ]
+
+    def load(self, entries: Iterable[Dict[str, Any]], replace: bool = False) -> int:
+        """Bulk add ``{"node_id", "surface", ...}`` mappings.
+
+        With ``replace`` the index is cleared first while holding the lock, so
+        readers never observe a half-built index.
+        """
+
+        entries = [dict(payload) for payload in entries]
+        added = 0
+        with self._lock:
+            if replace:
+                self.clear()
+            for payload in entries:
+                added += self.add(payload.pop("node_id"), payload.pop("surface"), **payload)
+        return added
+
+
+__all__ = ["CandidateIndex", "IndexEntry", "normalise", "trigrams"]
@@ -3,7 +3,10 @@ Fuzzy string matching module integrated from entity-resolution service.
 Provides RapidFuzz-based string matching and deduplication capabilities.
 """
 
-from typing import List, Dict, Any, Tuple, Optional
+import re
+import unicodedata
+from collections import defaultdict
+from typing import List, Dict, Any, Tuple, Optional, Iterable
 from rapidfuzz import process, fuzz
 from pydantic import BaseModel
 
@@ -28,6 +31,10 @@ class DedupeRequest(BaseModel):
     items: List[str]
     threshold: float = 90.0
     scorer: str = "token_sort_ratio"
+    mode: str = "pairwise"  # or "blocking" for large inputs
+    blocking: List[str] = ["prefix", "phonetic"]  # plus optional "ngram"
+    workers: int = -1  # RapidFuzz cdist workers, -1 = all cores
+    max_block_size: int = 2000  # larger blocks are too common to be selective
 
 
 class DedupeResult(BaseModel):
@@ -38,6 +45,102 @@ class DedupeResult(BaseModel):
     deduplication_ratio: float
 
 
+_NON_ALNUM = re.compile(r"[^0-9a-z ]+")
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def normalize_name(value: str) -> str:
+    """Lowercase, strip accents/punctuation and collapse whitespace."""
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return " ".join(_NON_ALNUM.sub(" ", value.lower()).split())
+
+
+def soundex(token: str) -> str:
+    """Classic four character Soundex code of a single token."""
+    letters = [ch for ch in token if ch.isalpha()]
+    if not letters:
+        return token[:4]
+    code = letters[0].upper()
+    last = _SOUNDEX_CODES.get(letters[0], "")
+    for ch in letters[1:]:
+        digit = _SOUNDEX_CODES.get(ch, "")
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in "hw":
+            last = digit
+    return code.ljust(4, "0")
+
+
+def blocking_keys(
+    value: str,
+    kinds: Iterable[str] = ("prefix", "phonetic"),
+    token_counts: Optional[Dict[str, int]] = None,
+) -> List[str]:
+    """Return the candidate blocks a string falls into.
+
+    ``prefix`` uses the first characters of the normalised form, the
+    token-sorted form and the rarest token, ``phonetic`` the Soundex of the two
+    rarest tokens and ``ngram`` every character 4-gram of the token-sorted
+    form. Rarity comes from ``token_counts`` (corpus frequencies) and falls
+    back to token length, so common words such as legal suffixes do not
+    produce huge blocks.
+    """
+    norm = normalize_name(value)
+    if not norm:
+        return ["empty:"]
+    tokens = norm.split()
+    sorted_form = " ".join(sorted(tokens))
+    counts = token_counts or {}
+    by_rarity = sorted(set(tokens), key=lambda token: (counts.get(token, 0), -len(token), token))
+    rarest = by_rarity[0]
+    keys: List[str] = []
+    for kind in kinds:
+        if kind == "prefix":
+            keys.append("p:" + norm[:4])
+            keys.append("s:" + sorted_form[:4])
+            keys.append("t:" + rarest[:4])
+        elif kind == "phonetic":
+            keys.extend("f:" + soundex(token) for token in by_rarity[:2])
+        elif kind == "ngram":
+            compact = sorted_form.replace(" ", "")
+            keys.extend("g:" + compact[i:i + 4] for i in range(max(len(compact) - 3, 1)))
+    return keys
+
+
+class _UnionFind:
+    """Disjoint sets with path halving and union by size."""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+
 class FuzzyMatcher:
     """Enhanced fuzzy string matcher with multiple scoring algorithms."""
     
@@ -93,6 +196,9 @@ class FuzzyMatcher:
         Returns:
             Deduplication result with clustered groups
         """
+        if req.mode == "blocking":
+            return cls.dedupe_blocked(req)
+
         scorer = cls.SCORERS.get(req.scorer, fuzz.token_sort_ratio)
         clusters: List[List[str]] = []
         visited = set()
@@ -117,11 +223,80 @@ class FuzzyMatcher:
             
             clusters.append(cluster)
         
-        # Calculate deduplication statistics
-        total_items = len(req.items)
+        return cls._dedupe_result(clusters, len(req.items))
+
+    @classmethod
+    def dedupe_blocked(cls, req: DedupeRequest) -> DedupeResult:
+        """
+        Scalable deduplication for large inputs.
+
+        Candidate pairs are restricted to strings sharing a blocking key,
+        each block is scored in bulk with ``process.cdist`` and matches are
+        merged transitively with union-find. Unlike :meth:`dedupe`, if A~B and
+        B~C all three end up in one cluster.
+
+        Args:
+            req: Deduplication request (``blocking``/``workers`` apply)
+
+        Returns:
+            Deduplication result with clusters in first-appearance order
+        """
+        scorer = cls.SCORERS.get(req.scorer, fuzz.token_sort_ratio)
+        items = req.items
+
+        # Identical strings are merged up front and scored only once.
+        unique_index: Dict[str, int] = {}
+        owners: List[int] = []
+        for item in items:
+            owners.append(unique_index.setdefault(item, len(unique_index)))
+        uniques = list(unique_index)
+
+        token_counts: Dict[str, int] = defaultdict(int)
+        for value in uniques:
+            for token in set(normalize_name(value).split()):
+                token_counts[token] += 1
+
+        blocks: Dict[str, List[int]] = defaultdict(list)
+        for idx, value in enumerate(uniques):
+            for key in dict.fromkeys(blocking_keys(value, req.blocking, token_counts)):
+                blocks[key].append(idx)
+
+        sets = _UnionFind(len(uniques))
+        scored = set()
+        for key, members in blocks.items():
+            if len(members) < 2:
+                continue
+            if len(members) > req.max_block_size:
+                continue  # too common to be selective; other keys still apply
+            signature = tuple(members)
+            if signature in scored:
+                continue
+            scored.add(signature)
+            values = [uniques[i] for i in members]
+            matrix = process.cdist(
+                values,
+                values,
+                scorer=scorer,
+                score_cutoff=req.threshold,
+                # spinning up a thread pool costs more than scoring tiny blocks
+                workers=req.workers if len(members) >= 256 else 1,
+            )
+            rows, cols = (matrix >= req.threshold).nonzero()
+            for row, col in zip(rows.tolist(), cols.tolist()):
+                if row < col:
+                    sets.union(members[row], members[col])
+
+        grouped: Dict[int, List[str]] = {}
+        for item, owner in zip(items, owners):
+            grouped.setdefault(sets.find(owner), []).append(item)
+        return cls._dedupe_result(list(grouped.values()), len(items))
+
+    @staticmethod
+    def _dedupe_result(clusters: List[List[str]], total_items: int) -> DedupeResult:
+        """Wrap clusters with deduplication statistics."""
         unique_clusters = len(clusters)
         deduplication_ratio = (total_items - unique_clusters) / total_items if total_items > 0 else 0.0
-        
+
         return DedupeResult(
             clusters=clusters,
             total_items=total_items,
@@ -230,7 +405,8 @@ class EntityDeduplicator:
         cls,
         entities: List[Dict[str, Any]],
         threshold: float = 85.0,
-        key_field: str = "value"
+        key_field: str = "value",
+        mode: str = "pairwise"
     ) -> Dict[str, Any]:
         """
         Deduplicate entity list based on entity values.
@@ -239,6 +415,7 @@ class EntityDeduplicator:
             entities: List of entity dictionaries
             threshold: Similarity threshold for clustering
             key_field: Field to use for comparison
+            mode: "pairwise" or "blocking" (see FuzzyMatcher.dedupe_blocked)
             
         Returns:
             Deduplication result with original entity references
@@ -256,8 +433,13 @@ class EntityDeduplicator:
         values = [entity.get(key_field, "") for entity in entities]
         
         # Perform deduplication
-        req = DedupeRequest(items=values, threshold=threshold)
+        req = DedupeRequest(items=values, threshold=threshold, mode=mode)
         dedupe_result = FuzzyMatcher.dedupe(req)
+
+        # First entity carrying each value
+        first_by_value: Dict[str, Dict[str, Any]] = {}
+        for entity in entities:
+            first_by_value.setdefault(entity.get(key_field, ""), entity)
         
         # Map clusters back to original entities
         entity_clusters = []
@@ -268,12 +450,7 @@ class EntityDeduplicator:
                 continue
                 
             # Find entities for this cluster
-            cluster_entities = []
-            for value in cluster:
-                for i, entity in enumerate(entities):
-                    if entity.get(key_field, "") == value:
-                        cluster_entities.append(entity)
-                        break
+            cluster_entities = [first_by_value[value] for value in cluster if value in first_by_value]
             
             entity_clusters.append(cluster_entities)
             
@@ -70,3 +70,12 @@ RESOLVER_LATENCY = _get_or_register(
     ),
 )
 
+RESOLVER_PHASE_LATENCY = _get_or_register(
+    "doc_entities_resolver_phase_seconds",
+    lambda: Histogram(
+        "doc_entities_resolver_phase_seconds",
+        "Bulk resolver latency per phase (fetch / score / apply / index)",
+        ["phase"],
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+    ),
+)
@@ -42,6 +42,26 @@ class NERResponse(BaseModel):
     processing_time_ms: int = Field(..., description="Processing time in milliseconds")
 
 
+class BatchAnnotationRequest(BaseModel):
+    texts: List[str] = Field(..., description="Texts to analyze", max_length=10000)
+    language: str = Field("en", description="Language for NER")
+    extract_relations: bool = Field(True, description="Also extract relations from the same parse")
+    batch_size: Optional[int] = Field(None, ge=1, le=10000, description="nlp.pipe batch size")
+    n_process: Optional[int] = Field(None, ge=1, le=64, description="nlp.pipe worker processes")
+
+
+class AnnotatedText(BaseModel):
+    entities: List[EntityModel] = Field(default_factory=list)
+    relations: List[RelationModel] = Field(default_factory=list)
+
+
+class BatchAnnotationResponse(BaseModel):
+    documents: List[AnnotatedText] = Field(default_factory=list)
+    language: str = Field(..., description="Language processed")
+    processing_time_ms: int = Field(..., description="Processing time in milliseconds")
+    docs_per_second: float = Field(..., description="Throughput of the batch")
+
+
 class RelationExtractionRequest(BaseModel):
     text: str = Field(..., description="Document text")
     language: str = Field("en", description="Language code")
@@ -127,6 +147,11 @@ class FuzzyDedupeRequest(BaseModel):
     strings: List[str] = Field(..., description="Strings to deduplicate")
     threshold: float = Field(85.0, ge=0.0, le=100.0, description="Similarity threshold")
     scorer: str = Field("fuzz.ratio", description="Scoring algorithm")
+    mode: str = Field(
+        "pairwise",
+        pattern="^(pairwise|blocking)$",
+        description="pairwise (exhaustive) or blocking (scalable, transitive clusters)",
+    )
 
 
 class FuzzyDedupeResponse(BaseModel):
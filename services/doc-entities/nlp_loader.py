@@ -1,10 +1,15 @@
-import os, functools
+import os, functools, uuid
 import spacy
 
 DEFAULT_LANG = os.getenv("NLP_DEFAULT_LANG", "en")
 SPACY_EN = os.getenv("NLP_SPACY_MODEL_EN", "en_core_web_sm")
 SPACY_DE = os.getenv("NLP_SPACY_MODEL_DE", "de_core_news_sm")
 BACKEND   = os.getenv("NLP_BACKEND", "spacy")  # spacy|transformers
+BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "64"))
+N_PROCESS = int(os.getenv("NLP_N_PROCESS", "1"))
+
+# Components each task needs; everything else is disabled while piping
+NER_PIPES = {"tok2vec", "transformer", "ner", "entity_ruler", "sentencizer"}
 
 @functools.lru_cache(maxsize=4)
 def get_nlp(lang: str):
@@ -14,8 +19,66 @@ def get_nlp(lang: str):
 def ner_spacy(text: str, lang: str):
     nlp = get_nlp(lang)
     doc = nlp(text)
+    return _entity_dicts(doc)
+
+def _entity_dicts(doc):
     return [{"text": e.text, "label": e.label_, "start": e.start_char, "end": e.end_char} for e in doc.ents]
 
+def _disabled_pipes(nlp, relations: bool):
+    """Pipes not needed for NER; relations need the full pipeline (parser, tagger, lemmas)."""
+    if relations:
+        return []
+    return [name for name in getattr(nlp, "pipe_names", []) if name not in NER_PIPES]
+
+def annotate_batch(texts, lang: str, relations: bool = True, batch_size: int | None = None, n_process: int | None = None):
+    """Annotate many texts with a single ``nlp.pipe`` pass.
+
+    Each text is parsed once; the same ``Doc`` feeds both entity extraction
+    and, with ``relations``, the relation extractor. Returns one
+    ``{"entities", "relations"}`` dict per text, in input order; entities
+    carry an ``id`` that the relations' subject/object ids refer to.
+    """
+    texts = list(texts)
+    nlp = get_nlp(lang)
+    batch_size = batch_size or BATCH_SIZE
+    n_process = n_process or N_PROCESS
+    if hasattr(nlp, "pipe"):
+        docs = nlp.pipe(
+            texts,
+            batch_size=batch_size,
+            n_process=n_process,
+            disable=_disabled_pipes(nlp, relations),
+        )
+    else:
+        # plain callables (tests, custom backends) have no pipe()
+        docs = (nlp(text) for text in texts)
+
+    if relations:
+        from relation_extractor import relation_extractor
+
+    results = []
+    for text, doc in zip(texts, docs):
+        entities = [{"id": str(uuid.uuid4()), **ent} for ent in _entity_dicts(doc)]
+        found = []
+        if relations and len(entities) >= 2:
+            found = relation_extractor.extract_relations_from_doc(
+                text,
+                [
+                    {
+                        "id": ent["id"],
+                        "text": ent["text"],
+                        "label": ent["label"],
+                        "span_start": ent["start"],
+                        "span_end": ent["end"],
+                        "value": ent["text"],
+                    }
+                    for ent in entities
+                ],
+                doc,
+            )
+        results.append({"entities": entities, "relations": found})
+    return results
+
 def summarize(text: str, lang: str):
     if BACKEND == "transformers":
         try:
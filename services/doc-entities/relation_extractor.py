@@ -119,18 +119,23 @@ class RelationExtractor:
         if not entities or len(entities) < 2:
             return []
         
-        doc = self.nlp(text)
+        return self.extract_relations_from_doc(text, entities, self.nlp(text))
+
+    def extract_relations_from_doc(
+        self, text: str, entities: List[Dict[str, Any]], doc
+    ) -> List[Dict[str, Any]]:
+        """Extract relations from an already parsed ``doc`` of ``text``.
+
+        Lets batch annotation reuse the ``Doc`` produced for NER instead of
+        parsing the text a second time.
+        """
+        if not entities or len(entities) < 2:
+            return []
+
         relations = []
         
-        # Create entity map for quick lookup
-        entity_map = {}
-        for entity in entities:
-            for token_idx in range(entity.get("span_start", 0), entity.get("span_end", 0)):
-                if token_idx < len(text):
-                    entity_map[token_idx] = entity
-        
-        # Method 1: Dependency parsing (skip when parser unavailable)
-        if self.supports_dependencies:
+        # Method 1: Dependency parsing (skip when the doc carries no parse)
+        if self._has_dependencies(doc):
             dependency_relations = self._extract_dependency_relations(doc, entities)
             relations.extend(dependency_relations)
         
@@ -147,9 +152,18 @@ class RelationExtractor:
         
         return relations
     
+    def _has_dependencies(self, doc) -> bool:
+        """Whether ``doc`` was parsed; docs from other pipelines are checked directly."""
+        if hasattr(doc, "has_annotation"):
+            try:
+                return doc.has_annotation("DEP")
+            except Exception:  # pragma: no cover - defensive guard
+                return False
+        return self.supports_dependencies
+
     def _extract_dependency_relations(self, doc, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Extract relations using spaCy dependency parsing."""
-        if not self.supports_dependencies:
+        if not self._has_dependencies(doc):
             return []
         relations = []
         
@@ -2,19 +2,23 @@
 
 from __future__ import annotations
 
+import multiprocessing
 import os
-import re
 import time
 import uuid
 from collections import Counter
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from candidate_index import CandidateIndex, normalise as _index_normalise
 from fuzzy_matcher import FuzzyMatcher
 
 from metrics import (
     RESOLVER_CONFIDENCE,
     RESOLVER_LATENCY,
     RESOLVER_OUTCOMES,
+    RESOLVER_PHASE_LATENCY,
     RESOLVER_RUNS,
 )
 
@@ -67,11 +71,114 @@ _ALIAS_KB: Dict[str, Dict[str, Any]] = {
 }
 
 
+# Knowledge base used by the fuzzy fallback - in production this would be real KB
+_FUZZY_KB: List[Dict[str, str]] = [
+    {"id": "person:barack-obama", "name": "Barack Obama", "type": "Person", "description": "44th President"},
+    {"id": "person:donald-trump", "name": "Donald Trump", "type": "Person", "description": "45th President"},
+    {"id": "org:apple-inc", "name": "Apple Inc", "type": "Organization", "description": "Technology company"},
+    {"id": "org:microsoft", "name": "Microsoft Corporation", "type": "Organization", "description": "Tech company"},
+    {"id": "org:google", "name": "Google LLC", "type": "Organization", "description": "Search company"},
+    {"id": "loc:new-york", "name": "New York City", "type": "Location", "description": "Major US city"},
+    {"id": "loc:london", "name": "London", "type": "Location", "description": "UK capital"},
+    {"id": "loc:paris", "name": "Paris", "type": "Location", "description": "French capital"},
+]
+
+# Sources whose surface forms count as exact aliases (the fuzzy KB does not)
+_ALIAS_SOURCES = {"alias", "learned"}
+
+_CANDIDATE_INDEX = CandidateIndex()
+
+
 def _normalise(value: Optional[str]) -> str:
-    if not value:
-        return ""
-    cleaned = re.sub(r"[^\w\s]", " ", value.lower())
-    return re.sub(r"\s+", " ", cleaned).strip()
+    return _index_normalise(value)
+
+
+def _static_index_entries() -> Iterator[Dict[str, Any]]:
+    """Surface forms of the static alias and fuzzy knowledge bases."""
+
+    for node_id, payload in _ALIAS_KB.items():
+        for surface in (payload.get("name"), *sorted(payload.get("aliases", set()))):
+            yield {
+                "node_id": node_id,
+                "surface": surface,
+                "name": payload.get("name"),
+                "type": payload.get("type", ""),
+                "confidence": float(payload.get("confidence", 0.9)),
+                "source": "alias",
+            }
+    for entry in _FUZZY_KB:
+        yield {
+            "node_id": entry["id"],
+            "surface": entry["name"],
+            "name": entry["name"],
+            "type": entry["type"],
+            "description": entry.get("description", ""),
+            "source": "fuzzy_kb",
+        }
+
+
+def _learned_entry(
+    node_id: Optional[str],
+    value: Optional[str],
+    score: Optional[float],
+    candidates: Optional[List[Dict[str, Any]]],
+) -> Optional[Dict[str, Any]]:
+    """Index entry recording a resolved entity value as an alias of ``node_id``."""
+
+    if not node_id or not value:
+        return None
+    best = next((c for c in candidates or [] if c.get("node_id") == node_id), {})
+    return {
+        "node_id": node_id,
+        "surface": value,
+        "name": best.get("name") or value,
+        "type": best.get("type") or "",
+        "description": best.get("description") or "",
+        "confidence": float(score if score is not None else 0.9),
+        "source": "learned",
+    }
+
+
+_CANDIDATE_INDEX.load(_static_index_entries())
+
+
+def get_candidate_index() -> CandidateIndex:
+    """Return the process-wide candidate index."""
+
+    return _CANDIDATE_INDEX
+
+
+def rebuild_candidate_index(db=None) -> int:
+    """Rebuild the index from the static KB and resolved entities in the DB.
+
+    Every resolved entity value becomes a learned alias of its node. Returns
+    the number of indexed surface forms.
+    """
+
+    from db import SessionLocal
+    from models import Entity, EntityResolution
+    from sqlalchemy import select
+
+    stmt = (
+        select(
+            Entity.value,
+            EntityResolution.node_id,
+            EntityResolution.score,
+            EntityResolution.candidates,
+        )
+        .join(EntityResolution, EntityResolution.entity_id == Entity.id)
+        .where(EntityResolution.status == "resolved")
+    )
+    if db is None:
+        with SessionLocal() as session:
+            rows = session.execute(stmt).all()
+    else:
+        rows = db.execute(stmt).all()
+
+    learned = [_learned_entry(*row) for row in rows]
+    entries = [*_static_index_entries(), *(entry for entry in learned if entry)]
+    _CANDIDATE_INDEX.load(entries, replace=True)
+    return len(_CANDIDATE_INDEX)
 
 
 def _alias_candidates(entity: Any) -> List[Dict[str, Any]]:
@@ -83,28 +190,34 @@ def _alias_candidates(entity: Any) -> List[Dict[str, Any]]:
         return aliases
 
     entity_type = _normalise(getattr(entity, "label", ""))
-    for node_id, payload in _ALIAS_KB.items():
-        kb_type = _normalise(payload.get("type"))
-        if kb_type and entity_type and kb_type != entity_type:
+    for entry in _CANDIDATE_INDEX.exact(normalised_value, entity_type or None):
+        if entry.source not in _ALIAS_SOURCES:
             continue
-        if normalised_value in payload.get("aliases", set()):
-            aliases.append(
-                {
-                    "node_id": node_id,
-                    "score": float(payload.get("confidence", 0.9)),
-                    "name": payload.get("name"),
-                    "type": payload.get("type"),
-                    "source": "alias_match",
-                    "fuzzy_match": False,
-                    "match_value": normalised_value,
-                }
-            )
+        aliases.append(
+            {
+                "node_id": entry.node_id,
+                "score": float(entry.confidence),
+                "name": entry.name,
+                "type": entry.type,
+                "source": "alias_match",
+                "fuzzy_match": False,
+                "match_value": normalised_value,
+            }
+        )
 
     return aliases
 
 
 def resolve_entities(entity_ids: Iterable[str], mode: str = "async") -> List[Dict[str, Any]]:
-    """Resolve a batch of entities and record observability metrics."""
+    """Resolve a batch of entities and record observability metrics.
+
+    Batches of at least ``RESOLVE_BULK_MIN`` entities (default 200) take the
+    set-based :func:`resolve_entities_bulk` path.
+    """
+
+    entity_ids = list(entity_ids)
+    if len(entity_ids) >= int(os.getenv("RESOLVE_BULK_MIN", "200")):
+        return resolve_entities_bulk(entity_ids, mode=mode)["results"]
 
     RESOLVER_RUNS.labels(mode=mode).inc()
     start = time.perf_counter()
@@ -134,14 +247,161 @@ def resolve_entities(entity_ids: Iterable[str], mode: str = "async") -> List[Dic
 
         db.commit()
 
+    _learn_resolved(results)
+    _record_outcomes(mode, status_counter, observed_scores, start)
+
+    return results
+
+
+def resolve_entities_bulk(
+    entity_ids: Iterable[str],
+    mode: str = "bulk",
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Resolve many entities with set-based queries and parallel scoring.
+
+    Phases:
+
+    * ``fetch`` – entities and existing resolutions in ``IN`` queries of
+      ``RESOLVE_BULK_CHUNK`` ids.
+    * ``score`` – candidates per distinct ``(value, label)`` pair, in a process
+      pool of ``workers`` processes (``RESOLVE_WORKERS``, default all cores)
+      once there are at least ``RESOLVE_POOL_MIN`` distinct pairs.
+    * ``apply`` – resolution rows updated and committed in one transaction.
+    * ``index`` – resolved values learned by the candidate index.
+
+    Returns ``{"results", "counts", "timings"}`` where timings are seconds.
+    """
+
+    from db import SessionLocal
+    from models import Entity, EntityResolution
+    from sqlalchemy import select
+
+    RESOLVER_RUNS.labels(mode=mode).inc()
+    start = time.perf_counter()
+    timings: Dict[str, float] = {}
+    status_counter: Counter[str] = Counter()
+    observed_scores: List[float] = []
+    results: List[Dict[str, Any]] = []
+
+    ids: List[uuid.UUID] = []
+    for entity_id in dict.fromkeys(str(e) for e in entity_ids):
+        try:
+            ids.append(uuid.UUID(entity_id))
+        except ValueError:
+            status_counter["invalid_id"] += 1
+
+    chunk = int(os.getenv("RESOLVE_BULK_CHUNK", "1000"))
+    with SessionLocal() as db:
+        phase = time.perf_counter()
+        entities: List[Any] = []
+        resolutions: Dict[uuid.UUID, Any] = {}
+        for i in range(0, len(ids), chunk):
+            part = ids[i : i + chunk]
+            entities.extend(db.scalars(select(Entity).where(Entity.id.in_(part))))
+            for resolution in db.scalars(
+                select(EntityResolution).where(EntityResolution.entity_id.in_(part))
+            ):
+                resolutions[resolution.entity_id] = resolution
+        if len(entities) < len(ids):
+            status_counter["missing"] += len(ids) - len(entities)
+        timings["fetch"] = time.perf_counter() - phase
+
+        phase = time.perf_counter()
+        keys = list(dict.fromkeys((e.value, e.label) for e in entities))
+        scored = dict(zip(keys, _score_keys(keys, workers)))
+        timings["score"] = time.perf_counter() - phase
+
+        phase = time.perf_counter()
+        for entity in entities:
+            resolution = resolutions.get(entity.id)
+            if resolution is None:
+                resolution = EntityResolution(entity_id=entity.id, status="processing")
+                db.add(resolution)
+            status, best_score = _apply_resolution(resolution, scored[(entity.value, entity.label)])
+            status_counter[status] += 1
+            if best_score is not None and status in {"resolved", "ambiguous"}:
+                observed_scores.append(best_score)
+            results.append(
+                {
+                    "entity_id": str(entity.id),
+                    "value": entity.value,
+                    "status": resolution.status,
+                    "node_id": resolution.node_id,
+                    "score": resolution.score,
+                    "candidates": resolution.candidates or [],
+                }
+            )
+        db.commit()
+        timings["apply"] = time.perf_counter() - phase
+
+    phase = time.perf_counter()
+    _learn_resolved(results)
+    timings["index"] = time.perf_counter() - phase
+
+    for name, seconds in timings.items():
+        RESOLVER_PHASE_LATENCY.labels(phase=name).observe(seconds)
+    _record_outcomes(mode, status_counter, observed_scores, start)
+    timings["total"] = time.perf_counter() - start
+    print(
+        f"Bulk resolved {len(results)} entities ({len(keys)} distinct): "
+        + ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in timings.items())
+    )
+
+    return {"results": results, "counts": dict(status_counter), "timings": timings}
+
+
+def _score_keys(
+    keys: List[Tuple[str, str]], workers: Optional[int] = None
+) -> List[List[Dict[str, Any]]]:
+    """Find candidates for ``(value, label)`` pairs, in parallel when worthwhile."""
+
+    if workers is None:
+        workers = int(os.getenv("RESOLVE_WORKERS", "0")) or os.cpu_count() or 1
+    pool_min = int(os.getenv("RESOLVE_POOL_MIN", "500"))
+    if workers <= 1 or len(keys) < pool_min:
+        return _score_chunk(keys)
+
+    size = -(-len(keys) // (workers * 4))
+    chunks = [keys[i : i + size] for i in range(0, len(keys), size)]
+    # spawn: the service runs background threads, which fork does not handle safely
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_score_worker,
+        initargs=(_CANDIDATE_INDEX.snapshot(),),
+    ) as pool:
+        return [candidates for part in pool.map(_score_chunk, chunks) for candidates in part]
+
+
+def _init_score_worker(entries: List[Dict[str, Any]]) -> None:
+    """Give a scoring process the parent's candidate index, learned aliases included."""
+
+    _CANDIDATE_INDEX.load(entries, replace=True)
+
+
+def _score_chunk(keys: List[Tuple[str, str]]) -> List[List[Dict[str, Any]]]:
+    return [_find_candidates(SimpleNamespace(value=value, label=label)) for value, label in keys]
+
+
+def _learn_resolved(results: List[Dict[str, Any]]) -> None:
+    learned = [
+        _learned_entry(p["node_id"], p["value"], p["score"], p["candidates"])
+        for p in results
+        if p["status"] == "resolved"
+    ]
+    _CANDIDATE_INDEX.load(entry for entry in learned if entry)
+
+
+def _record_outcomes(
+    mode: str, status_counter: Counter[str], observed_scores: List[float], start: float
+) -> None:
     for status, count in status_counter.items():
         RESOLVER_OUTCOMES.labels(status=status).inc(count)
     for score in observed_scores:
         RESOLVER_CONFIDENCE.observe(score)
     RESOLVER_LATENCY.labels(mode=mode).observe(time.perf_counter() - start)
 
-    return results
-
 
 def _resolve_single(
     db,
@@ -172,6 +432,7 @@ def _resolve_single(
 
     payload = {
         "entity_id": str(entity.id),
+        "value": entity.value,
         "status": resolution.status,
         "node_id": resolution.node_id,
         "score": resolution.score,
@@ -397,42 +658,47 @@ def _find_candidates(entity: Any) -> List[Dict[str, Any]]:
     return candidates
 
 
+def _kb_type(label: Optional[str]) -> Optional[str]:
+    """Map a NER label onto the knowledge base type vocabulary."""
+
+    if label == "PERSON":
+        return "Person"
+    if label in ["ORG", "ORGANIZATION"]:
+        return "Organization"
+    if label in ["GPE", "LOCATION", "LOC"]:
+        return "Location"
+    return None
+
+
 def _fuzzy_resolve_fallback(entity: Any) -> List[Dict[str, Any]]:
-    """Fuzzy matching fallback for entity resolution."""
+    """Fuzzy matching fallback for entity resolution.
+
+    The trigram index narrows the knowledge base to a shortlist first, so only
+    a bounded number of names is fuzzy-scored regardless of KB size.
+    """
     if not entity or not entity.value:
         return []
-        
-    # Mock knowledge base for fuzzy matching - in production this would be real KB
-    mock_knowledge_base = [
-        {"id": "person:barack-obama", "name": "Barack Obama", "type": "Person", "description": "44th President"},
-        {"id": "person:donald-trump", "name": "Donald Trump", "type": "Person", "description": "45th President"}, 
-        {"id": "org:apple-inc", "name": "Apple Inc", "type": "Organization", "description": "Technology company"},
-        {"id": "org:microsoft", "name": "Microsoft Corporation", "type": "Organization", "description": "Tech company"},
-        {"id": "org:google", "name": "Google LLC", "type": "Organization", "description": "Search company"},
-        {"id": "loc:new-york", "name": "New York City", "type": "Location", "description": "Major US city"},
-        {"id": "loc:london", "name": "London", "type": "Location", "description": "UK capital"},
-        {"id": "loc:paris", "name": "Paris", "type": "Location", "description": "French capital"}
-    ]
-    
+
     try:
-        # Filter knowledge base by entity type if possible
-        filtered_kb = mock_knowledge_base
-        if entity.label == "PERSON":
-            filtered_kb = [kb for kb in mock_knowledge_base if kb["type"] == "Person"]
-        elif entity.label in ["ORG", "ORGANIZATION"]: 
-            filtered_kb = [kb for kb in mock_knowledge_base if kb["type"] == "Organization"]
-        elif entity.label in ["GPE", "LOCATION", "LOC"]:
-            filtered_kb = [kb for kb in mock_knowledge_base if kb["type"] == "Location"]
-        
+        shortlist_size = int(os.getenv("RESOLVE_CANDIDATE_SHORTLIST", "25"))
+        shortlist = _CANDIDATE_INDEX.search(
+            entity.value, type=_kb_type(entity.label), limit=shortlist_size
+        )
+        if not shortlist:
+            return []
+        canonical = {entry.node_id: entry.name for entry in shortlist}
+
         # Use fuzzy matching to find candidates
         fuzzy_threshold = float(os.getenv("RESOLVE_FUZZY_THRESHOLD", "65.0"))
         fuzzy_results = FuzzyMatcher.fuzzy_resolve_entity(
             entity.value,
-            filtered_kb, 
+            [entry.as_kb_entry() for entry in shortlist],
             scorer="WRatio",
             threshold=fuzzy_threshold
         )
-        
+        for result in fuzzy_results:
+            result["name"] = canonical.get(result["node_id"], result["name"])
+
         return fuzzy_results
         
     except Exception as e:
@@ -12,7 +12,7 @@ from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
 
 from _shared.api_standards import APIError, ErrorCodes
 from fuzzy_matcher import DedupeRequest, FuzzyMatcher, MatchRequest
-from nlp_loader import ner_spacy, summarize
+from nlp_loader import annotate_batch, ner_spacy, summarize
 from nlp_client import ner as nlp_ner
 from relation_extractor import extract_relations
 from resolver import resolve_entities
@@ -21,6 +21,9 @@ from metrics import RESOLVER_STATUS_COUNTS
 from ..db import SessionLocal
 from ..models import Document, Entity, EntityResolution, Relation, RelationResolution
 from ..models.api_models import (
+    AnnotatedText,
+    BatchAnnotationRequest,
+    BatchAnnotationResponse,
     DocumentAnnotationRequest,
     DocumentAnnotationResponse,
     DocumentModel,
@@ -150,6 +153,48 @@ class DocEntitiesService:
             processing_time_ms=int((time.time() - start_time) * 1000),
         )
 
+    def annotate_batch(self, request: BatchAnnotationRequest) -> BatchAnnotationResponse:
+        start_time = time.time()
+        annotated = annotate_batch(
+            request.texts,
+            request.language,
+            relations=request.extract_relations,
+            batch_size=request.batch_size,
+            n_process=request.n_process,
+        )
+        documents = []
+        for result in annotated:
+            by_id = {ent["id"]: ent for ent in result["entities"]}
+            relations = []
+            for rel in result["relations"]:
+                subject_entity = by_id.get(rel["subject_entity_id"])
+                object_entity = by_id.get(rel["object_entity_id"])
+                if subject_entity and object_entity:
+                    relations.append(
+                        RelationModel(
+                            subject=subject_entity["text"],
+                            subject_label=subject_entity["label"],
+                            predicate=rel["predicate"],
+                            object=object_entity["text"],
+                            object_label=object_entity["label"],
+                            confidence=rel.get("confidence", 0.5),
+                            context=rel.get("context", ""),
+                        )
+                    )
+            documents.append(
+                AnnotatedText(
+                    entities=[EntityModel(**ent) for ent in result["entities"]],
+                    relations=relations,
+                )
+            )
+        elapsed = time.time() - start_time
+        return BatchAnnotationResponse(
+            documents=documents,
+            language=request.language,
+            processing_time_ms=int(elapsed * 1000),
+            docs_per_second=len(documents) / elapsed if elapsed > 0 else float(len(documents)),
+        )
+
     def extract_text_relations(self, request: RelationExtractionRequest) -> RelationExtractionResponse:
         start_time = time.time()
         if request.entities:
@@ -582,7 +627,12 @@ class DocEntitiesService:
 
     def fuzzy_dedupe(self, request: FuzzyDedupeRequest) -> FuzzyDedupeResponse:
         result = FuzzyMatcher.dedupe(
-            DedupeRequest(strings=request.strings, threshold=request.threshold, scorer=request.scorer)
+            DedupeRequest(
+                items=request.strings,
+                threshold=request.threshold,
+                scorer=request.scorer,
+                mode=request.mode,
+            )
         )
         return FuzzyDedupeResponse(
             clusters=result.clusters,
@@ -605,6 +655,14 @@ def build_doc_entities_router(service: DocEntitiesService) -> APIRouter:
         tags=["nlp"],
     )(service.extract_entities)
 
+    router.post(
+        "/extract/batch",
+        response_model=BatchAnnotationResponse,
+        summary="Batch annotate texts",
+        description="Extract entities and relations for many texts with one batched spaCy pass",
+        tags=["nlp"],
+    )(service.annotate_batch)
+
     router.post(
         "/extract/relations",
         response_model=RelationExtractionResponse,
@@ -25,6 +25,11 @@ def test_api_endpoints():
         )
         assert r3.status_code == 200
 
+        r_batch = c.post("/v1/extract/batch", json={"texts": ["Alice", "Alice again"], "batch_size": 8})
+        assert r_batch.status_code == 200
+        batch = r_batch.json()
+        assert [d["entities"][0]["text"] for d in batch["documents"]] == ["Alice", "Alice"]
+
         doc_payload = {
             "text": "Alice meets Bob",
             "language": "en",
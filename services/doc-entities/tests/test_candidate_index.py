@@ -0,0 +1,85 @@
+"""Tests for the trigram candidate index used by the resolver."""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
+
+from candidate_index import CandidateIndex, trigrams
+
+
+class TestCandidateIndex:
+    def test_trigrams_are_padded(self):
+        assert "  b" in trigrams("bob")
+        assert "ob " in trigrams("bob")
+
+    def test_search_ranks_closest_names_first(self):
+        index = CandidateIndex()
+        for node_id, name in enumerate(["Barack Obama", "Michelle Obama", "Barack Schmidt", "Paris"]):
+            index.add(f"n{node_id}", name, type="Person")
+        hits = index.search("Barak Obama", limit=2)
+        assert [hit.name for hit in hits] == ["Barack Obama", "Michelle Obama"]
+        assert index.search("zzzz") == []
+
+    def test_type_filter_and_exact(self):
+        index = CandidateIndex()
+        index.add("person:paris", "Paris Hilton", type="Person")
+        index.add("loc:paris", "Paris", type="Location")
+        assert [hit.node_id for hit in index.search("Paris", type="Location")] == ["loc:paris"]
+        assert [hit.node_id for hit in index.exact("PARIS!")] == ["loc:paris"]
+        assert index.exact("Paris", type="Person") == []
+
+    def test_incremental_add_and_remove(self):
+        index = CandidateIndex()
+        assert index.add("n1", "Acme Corp")
+        assert not index.add("n1", "acme corp")
+        index.add("n1", "Acme Corporation")
+        assert len(index) == 2
+        assert index.remove_node("n1") == 2
+        assert index.search("Acme Corp") == []
+        assert index.load([{"node_id": "n2", "surface": "Globex"}], replace=True) == 1
+        assert [hit.node_id for hit in index.search("Globex")] == ["n2"]
+
+
+def test_resolver_learns_resolved_aliases(monkeypatch):
+    import resolver
+
+    index = CandidateIndex()
+    monkeypatch.setattr(resolver, "_CANDIDATE_INDEX", index)
+    index.load(resolver._static_index_entries())
+
+    entity = SimpleNamespace(value="B. H. Obama", label="PERSON")
+    assert resolver._alias_candidates(entity) == []
+
+    entry = resolver._learned_entry(
+        "person:barack-obama",
+        "B. H. Obama",
+        0.93,
+        [{"node_id": "person:barack-obama", "name": "Barack Obama", "type": "Person"}],
+    )
+    index.load([entry])
+    [candidate] = resolver._alias_candidates(entity)
+    assert candidate["node_id"] == "person:barack-obama"
+    assert candidate["name"] == "Barack Obama"
+    assert candidate["score"] == 0.93
+
+
+def test_fuzzy_fallback_uses_shortlist(monkeypatch):
+    import resolver
+
+    monkeypatch.setenv("RESOLVE_CANDIDATE_SHORTLIST", "3")
+    seen = {}
+    real = resolver.FuzzyMatcher.fuzzy_resolve_entity
+
+    def spy(value, kb, **kwargs):
+        seen["kb"] = kb
+        return real(value, kb, **kwargs)
+
+    monkeypatch.setattr(resolver.FuzzyMatcher, "fuzzy_resolve_entity", spy)
+    results = resolver._fuzzy_resolve_fallback(SimpleNamespace(value="Microsft Corp", label="ORG"))
+    assert len(seen["kb"]) <= 3
+    assert results[0]["node_id"] == "org:microsoft"
+    assert results[0]["name"] == "Microsoft Corporation"
@@ -78,6 +78,43 @@ class TestFuzzyMatcher:
         
         assert low_result.unique_clusters <= high_result.unique_clusters
     
+    def test_fuzzy_dedupe_blocking_matches_pairwise(self):
+        """Blocking mode finds the same clusters on well separated names."""
+        items = [
+            "Barack Obama",
+            "barack obama",
+            "Donald Trump",
+            "Donald J. Trump",
+            "Joe Biden",
+            "Apple Inc",
+            "Apple Inc.",
+            "Apple Inc",
+        ]
+
+        pairwise = FuzzyMatcher.dedupe(DedupeRequest(items=items, threshold=85.0))
+        blocked = FuzzyMatcher.dedupe(DedupeRequest(items=items, threshold=85.0, mode="blocking"))
+
+        assert blocked.total_items == len(items)
+        assert sorted(map(sorted, blocked.clusters)) == sorted(map(sorted, pairwise.clusters))
+        assert ["Apple Inc", "Apple Inc.", "Apple Inc"] in blocked.clusters
+
+    def test_fuzzy_dedupe_blocking_is_transitive(self):
+        """Union-find merges chains that the greedy pairwise pass splits."""
+        items = ["abcdefgh", "abcdefgX", "abcdefXY"]
+
+        req = DedupeRequest(items=items, threshold=85.0, scorer="ratio", mode="blocking")
+        result = FuzzyMatcher.dedupe(req)
+
+        assert result.clusters == [items]
+
+    def test_blocking_keys(self):
+        """Blocking keys normalise case, punctuation and token order."""
+        from fuzzy_matcher import blocking_keys, soundex
+
+        assert soundex("robert") == soundex("rupert") == "R163"
+        assert set(blocking_keys("Müller, Hans")) & set(blocking_keys("hans muller"))
+        assert any(k.startswith("g:") for k in blocking_keys("Hans", ["ngram"]))
+
     def test_find_best_match(self):
         """Test finding single best match."""
         candidates = ["Barack Obama", "Donald Trump", "Joe Biden"]
@@ -19,3 +19,70 @@ def test_summarize_fallback(monkeypatch):
     monkeypatch.setitem(sys.modules, "transformers", fake)
     nl = importlib.reload(__import__("nlp_loader"))
     assert nl.summarize("Hello. World", "en").startswith("Hello")
+
+
+def _ruler_pipeline():
+    import spacy
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns(
+        [
+            {"label": "PERSON", "pattern": "Alice"},
+            {"label": "ORG", "pattern": "Acme"},
+            {"label": "GPE", "pattern": "Berlin"},
+        ]
+    )
+    return nlp
+
+
+def test_annotate_batch_parses_each_text_once(monkeypatch):
+    import nlp_loader
+    import relation_extractor
+
+    nlp = _ruler_pipeline()
+    piped = []
+    real_pipe = nlp.pipe
+
+    def pipe(texts, **kwargs):
+        piped.append(kwargs)
+        return real_pipe(texts, **kwargs)
+
+    monkeypatch.setattr(nlp, "pipe", pipe)
+    monkeypatch.setattr(nlp_loader, "get_nlp", lambda lang: nlp)
+    monkeypatch.setattr(
+        relation_extractor.relation_extractor,
+        "nlp",
+        lambda text: (_ for _ in ()).throw(AssertionError("text parsed twice")),
+    )
+
+    texts = ["Alice works at Acme in Berlin.", "Nothing here.", "Acme is based in Berlin."]
+    results = nlp_loader.annotate_batch(texts, "en", batch_size=2)
+
+    assert piped == [{"batch_size": 2, "n_process": 1, "disable": []}]
+    assert [len(r["entities"]) for r in results] == [3, 0, 2]
+    ids = {ent["id"] for ent in results[0]["entities"]}
+    predicates = {rel["predicate"] for rel in results[0]["relations"]}
+    assert "WORKS_AT" in predicates
+    assert all(rel["subject_entity_id"] in ids for rel in results[0]["relations"])
+
+
+def test_annotate_batch_ner_only_disables_unused_pipes(monkeypatch):
+    import nlp_loader
+
+    nlp = _ruler_pipeline()
+    nlp.add_pipe("lemmatizer", config={"mode": "lookup"})
+    seen = {}
+    real_pipe = nlp.pipe
+
+    def pipe(texts, **kwargs):
+        seen.update(kwargs)
+        return real_pipe(texts, **kwargs)
+
+    monkeypatch.setattr(nlp, "pipe", pipe)
+    monkeypatch.setattr(nlp_loader, "get_nlp", lambda lang: nlp)
+    results = nlp_loader.annotate_batch(["Alice"], "en", relations=False)
+    assert seen["disable"] == ["lemmatizer"]
+    assert results[0]["relations"] == []
+    assert results[0]["entities"][0]["label"] == "PERSON"
@@ -65,6 +65,40 @@ def test_resolver_alias_gold_sample(db_setup):
         assert stored.score >= 0.9
 
 
+@pytest.mark.parametrize("workers", [1, 2])
+def test_bulk_resolver_matches_single_path(db_setup, monkeypatch, workers):
+    """Bulk resolution should agree with the per-entity path and report phases."""
+
+    from db import SessionLocal
+    from models import Document, Entity, EntityResolution
+    from resolver import resolve_entities_bulk
+
+    monkeypatch.setenv("RESOLVE_POOL_MIN", "1")
+    samples = [("PERSON", "Barack Obama"), ("ORG", "Apple"), ("GPE", "Berlin"), ("PERSON", "Barack Obama")]
+    doc_id = uuid.uuid4()
+    with SessionLocal() as session:
+        session.add(Document(id=doc_id, title="Bulk Doc"))
+        entities = [
+            Entity(doc_id=doc_id, label=label, value=value, span_start=0, span_end=len(value))
+            for label, value in samples
+        ]
+        session.add_all(entities)
+        session.commit()
+        entity_ids = [str(entity.id) for entity in entities]
+
+    report = resolve_entities_bulk(entity_ids + ["not-a-uuid", str(uuid.uuid4())], workers=workers)
+
+    assert set(report["timings"]) == {"fetch", "score", "apply", "index", "total"}
+    assert report["counts"] == {"resolved": 4, "invalid_id": 1, "missing": 1}
+    by_id = {payload["entity_id"]: payload for payload in report["results"]}
+    assert by_id[entity_ids[0]]["node_id"] == "person:barack-obama"
+    assert by_id[entity_ids[1]]["node_id"] == "org:apple-inc"
+    with SessionLocal() as session:
+        stored = session.get(EntityResolution, uuid.UUID(entity_ids[2]))
+        assert stored.status == "resolved"
+        assert stored.node_id == "location:berlin"
+
+
 def test_annotation_metadata_exposes_linking_counts():
     """Annotate endpoint should surface linking metadata and statuses."""
 
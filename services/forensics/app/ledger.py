@@ -0,0 +1,388 @@
+"""Segmented, indexed storage for the chain-of-custody ledger.
+
+The ledger used to be a single JSONL file that was scanned and parsed on
+every lookup. :class:`Ledger` keeps the same record format and hash chain
+(``record_hash = sha256(json(entry + prev_hash))``) but stores records in
+size-bounded segment files under one directory::
+
+    segment-000001.jsonl   records, one JSON object per line
+    index.tsv              sha256 <TAB> segment <TAB> offset <TAB> length
+    checkpoints.jsonl      one checkpoint per sealed segment
+    .lock                  flock serialising writers across processes
+
+The index sidecar is loaded on open, so the tail hash, record count and the
+position of every record are kept in memory: appends need no read, receipts
+are one dict lookup plus one ``pread``-sized read, and pages seek straight to
+their first record. When a segment reaches ``segment_bytes`` it is sealed with
+a checkpoint holding its SHA256 digest and boundary hashes, each checkpoint
+chained to the previous one. :meth:`Ledger.verify` only re-checks records
+appended since the last verification unless ``full=True``.
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+LEDGER_PATH = os.getenv("FORENSICS_LEDGER", "/data/forensics_ledger.jsonl")
+LEDGER_DIR = os.getenv("FORENSICS_LEDGER_DIR") or os.path.splitext(LEDGER_PATH)[0]
+SEGMENT_BYTES = int(os.getenv("FORENSICS_LEDGER_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+FSYNC = os.getenv("FORENSICS_LEDGER_FSYNC", "0").lower() in ("1", "true", "yes")
+
+INDEX_FILE = "index.tsv"
+CHECKPOINT_FILE = "checkpoints.jsonl"
+
+
+def sha256_bytes(b: bytes) -> str:
+    return hashlib.sha256(b).hexdigest()
+
+
+def record_hash(entry: Dict[str, Any]) -> str:
+    """Hash of a record as written by :meth:`Ledger.append` (without ``record_hash``)."""
+    body = {k: v for k, v in entry.items() if k != "record_hash"}
+    return sha256_bytes(json.dumps(body, ensure_ascii=False).encode())
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _legacy_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Records of a single-file ledger.
+
+    Older v1 builds separated records with a literal ``\\n`` instead of a
+    newline, so records are decoded one JSON value at a time.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = f.read()
+    decoder = json.JSONDecoder()
+    pos = 0
+    while pos < len(data):
+        while pos < len(data) and (data[pos].isspace() or data.startswith("\\n", pos)):
+            pos += 2 if data.startswith("\\n", pos) else 1
+        if pos >= len(data):
+            break
+        obj, pos = decoder.raw_decode(data, pos)
+        if isinstance(obj, dict):
+            yield obj
+
+
+class Ledger:
+    """Append-only hash-chained ledger with an in-memory position index."""
+
+    def __init__(self, root: str, segment_bytes: int = SEGMENT_BYTES,
+                 legacy_path: Optional[str] = None, fsync: bool = FSYNC):
+        self.root = root
+        self.segment_bytes = max(1, segment_bytes)
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._seg = array("I")
+        self._off = array("Q")
+        self._len = array("I")
+        self._by_sha: Dict[str, int] = {}
+        self._index_pos = 0
+        self._tail_hash: Optional[str] = None
+        self._tail_seq = -1
+        self._active = 1
+        self._active_size = 0
+        self._checkpoints: List[Dict[str, Any]] = []
+        self._checkpoint_pos = 0
+        self._verified_seq = 0
+        self._verified_hash: Optional[str] = None
+        self._digests_ok: set = set()
+        os.makedirs(root, exist_ok=True)
+        with self._lock, self._write_lock():
+            if legacy_path and os.path.exists(legacy_path) and not os.path.exists(self._path(INDEX_FILE)):
+                self._import_legacy(legacy_path)
+            self._sync(recover=True)
+
+    # -- files -------------------------------------------------------------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _segment_path(self, seg: int) -> str:
+        return self._path(f"segment-{seg:06d}.jsonl")
+
+    @contextlib.contextmanager
+    def _write_lock(self):
+        with open(self._path(".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, path: str, data: bytes) -> None:
+        with open(path, "ab") as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def _read(self, seq: int) -> bytes:
+        with open(self._segment_path(self._seg[seq]), "rb") as f:
+            f.seek(self._off[seq])
+            return f.read(self._len[seq])
+
+    # -- loading -----------------------------------------------------------
+
+    def _remember(self, sha: Optional[str], seg: int, off: int, length: int) -> None:
+        seq = len(self._off)
+        self._seg.append(seg)
+        self._off.append(off)
+        self._len.append(length)
+        if sha:
+            self._by_sha.setdefault(sha, seq)
+
+    def _sync(self, recover: bool = False) -> None:
+        """Pick up index rows and checkpoints written since the last call.
+
+        Other processes may append to the same directory; only complete
+        lines are consumed. With ``recover`` (on open, under the write lock)
+        records that reached a segment but not the index are re-indexed and
+        a torn final line is truncated.
+        """
+        index_path = self._path(INDEX_FILE)
+        if os.path.exists(index_path) and os.path.getsize(index_path) > self._index_pos:
+            with open(index_path, "rb") as f:
+                f.seek(self._index_pos)
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            for row in data[:end].splitlines():
+                sha, seg, off, length = row.decode().split("\t")
+                self._remember(sha or None, int(seg), int(off), int(length))
+            self._index_pos += end
+        cp_path = self._path(CHECKPOINT_FILE)
+        if os.path.exists(cp_path) and os.path.getsize(cp_path) > self._checkpoint_pos:
+            with open(cp_path, "rb") as f:
+                f.seek(self._checkpoint_pos)
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            self._checkpoints.extend(json.loads(line) for line in data[:end].splitlines())
+            self._checkpoint_pos += end
+
+        if self._seg:
+            self._active = self._seg[-1]
+            self._active_size = self._off[-1] + self._len[-1]
+        if recover:
+            self._recover_tail()
+        if self._checkpoints and self._checkpoints[-1]["segment"] >= self._active:
+            # sealed by another writer before its first append to the next segment
+            self._active = self._checkpoints[-1]["segment"] + 1
+            self._active_size = 0
+        if self._tail_seq != len(self._off) - 1:
+            self._tail_seq = len(self._off) - 1
+            self._tail_hash = json.loads(self._read(self._tail_seq)).get("record_hash") if self._off else None
+
+    def _recover_tail(self) -> None:
+        segs = sorted(
+            int(name[len("segment-"):-len(".jsonl")])
+            for name in os.listdir(self.root)
+            if name.startswith("segment-") and name.endswith(".jsonl")
+        )
+        if not segs:
+            return
+        start = self._seg[-1] if self._seg else segs[0]
+        for seg in (s for s in segs if s >= start):
+            path = self._segment_path(seg)
+            off = self._off[-1] + self._len[-1] if self._seg and self._seg[-1] == seg else 0
+            with open(path, "rb") as f:
+                f.seek(off)
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                with open(path, "r+b") as f:
+                    f.truncate(off + end)
+            rows = []
+            for line in data[:end].splitlines(keepends=True):
+                sha = json.loads(line).get("sha256") or ""
+                rows.append(f"{sha}\t{seg}\t{off}\t{len(line)}\n")
+                self._remember(sha or None, seg, off, len(line))
+                off += len(line)
+            if rows:
+                self._write(self._path(INDEX_FILE), "".join(rows).encode())
+                self._index_pos = os.path.getsize(self._path(INDEX_FILE))
+            self._active, self._active_size = seg, off
+
+    def _import_legacy(self, path: str) -> None:
+        seg, off, rows = 1, 0, []
+        with open(self._segment_path(seg), "ab") as out:
+            for obj in _legacy_records(path):
+                line = (json.dumps(obj, ensure_ascii=False) + "\n").encode()
+                out.write(line)
+                rows.append(f"{obj.get('sha256') or ''}\t{seg}\t{off}\t{len(line)}\n")
+                off += len(line)
+        self._write(self._path(INDEX_FILE), "".join(rows).encode())
+
+    # -- writing -----------------------------------------------------------
+
+    def _seal(self) -> None:
+        seg = self._active
+        last = self._checkpoints[-1] if self._checkpoints else None
+        first = last["first_seq"] + last["count"] if last else 0
+        prev_cp = last["checkpoint_hash"] if last else None
+        checkpoint = {
+            "segment": seg,
+            "first_seq": first,
+            "count": len(self._off) - first,
+            "first_prev_hash": json.loads(self._read(first)).get("prev_hash"),
+            "last_record_hash": self._tail_hash,
+            "sha256": _file_digest(self._segment_path(seg)),
+            "prev_checkpoint_hash": prev_cp,
+        }
+        checkpoint["checkpoint_hash"] = sha256_bytes(json.dumps(checkpoint, sort_keys=True).encode())
+        self._write(self._path(CHECKPOINT_FILE), (json.dumps(checkpoint) + "\n").encode())
+        self._checkpoints.append(checkpoint)
+        self._checkpoint_pos = os.path.getsize(self._path(CHECKPOINT_FILE))
+        self._active += 1
+        self._active_size = 0
+
+    def append(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Link ``entry`` to the tail, write it and return it with its hashes."""
+        with self._lock, self._write_lock():
+            self._sync()
+            if self._active_size >= self.segment_bytes and self._seg and self._seg[-1] == self._active:
+                self._seal()
+            entry["prev_hash"] = self._tail_hash
+            payload = json.dumps(entry, ensure_ascii=False)
+            entry["record_hash"] = sha256_bytes(payload.encode())
+            line = (json.dumps(entry, ensure_ascii=False) + "\n").encode()
+            off = self._active_size
+            self._write(self._segment_path(self._active), line)
+            sha = entry.get("sha256") or ""
+            self._write(self._path(INDEX_FILE), f"{sha}\t{self._active}\t{off}\t{len(line)}\n".encode())
+            self._index_pos = os.path.getsize(self._path(INDEX_FILE))
+            self._remember(sha or None, self._active, off, len(line))
+            self._active_size = off + len(line)
+            self._tail_seq = len(self._off) - 1
+            self._tail_hash = entry["record_hash"]
+            return entry
+
+    # -- reading -----------------------------------------------------------
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._off)
+
+    @property
+    def tail_hash(self) -> Optional[str]:
+        with self._lock:
+            self._sync()
+            return self._tail_hash
+
+    def get(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """First record for the evidence digest ``sha256``, or None."""
+        with self._lock:
+            self._sync()
+            seq = self._by_sha.get(sha256)
+            if seq is None:
+                return None
+            return json.loads(self._read(seq))
+
+    def page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Records ``offset .. offset+limit`` in chain order, read by seeking."""
+        with self._lock:
+            self._sync()
+            stop = min(len(self._off), max(0, offset) + max(0, limit))
+            seqs = range(max(0, offset), stop)
+            out: List[Dict[str, Any]] = []
+            i = seqs.start
+            while i < stop:
+                seg = self._seg[i]
+                j = i
+                while j + 1 < stop and self._seg[j + 1] == seg:
+                    j += 1
+                with open(self._segment_path(seg), "rb") as f:
+                    f.seek(self._off[i])
+                    data = f.read(self._off[j] + self._len[j] - self._off[i])
+                out.extend(json.loads(line) for line in data.splitlines())
+                i = j + 1
+            return out
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Stream all records in chain order."""
+        with self._lock:
+            self._sync()
+            count = len(self._off)
+            segs = sorted(set(self._seg))
+        seen = 0
+        for seg in segs:
+            with open(self._segment_path(seg), "r", encoding="utf-8") as f:
+                for line in f:
+                    if seen >= count:
+                        return
+                    seen += 1
+                    yield json.loads(line)
+
+    # -- verification ------------------------------------------------------
+
+    def verify(self, full: bool = False) -> Dict[str, Any]:
+        """Check the hash chain, segment digests and checkpoint links.
+
+        Records already verified by a previous call are skipped unless
+        ``full`` is set, so repeated calls cost O(new records).
+        """
+        with self._lock:
+            self._sync()
+            if full:
+                self._verified_seq, self._verified_hash = 0, None
+                self._digests_ok.clear()
+            result: Dict[str, Any] = {"ok": True, "records": len(self._off), "checked": 0,
+                                      "segments": self._active, "sealed": len(self._checkpoints)}
+            prev_cp = None
+            for cp in self._checkpoints:
+                body = {k: v for k, v in cp.items() if k != "checkpoint_hash"}
+                if cp.get("prev_checkpoint_hash") != prev_cp or \
+                        sha256_bytes(json.dumps(body, sort_keys=True).encode()) != cp.get("checkpoint_hash"):
+                    return self._fail(result, f"checkpoint chain broken at segment {cp['segment']}")
+                prev_cp = cp["checkpoint_hash"]
+                if cp["segment"] in self._digests_ok:
+                    continue
+                if _file_digest(self._segment_path(cp["segment"])) != cp["sha256"]:
+                    return self._fail(result, f"segment {cp['segment']} does not match its checkpoint")
+                self._digests_ok.add(cp["segment"])
+
+            expected = self._verified_hash
+            for seq in range(self._verified_seq, len(self._off)):
+                obj = json.loads(self._read(seq))
+                if obj.get("prev_hash") != expected:
+                    return self._fail(result, f"record {seq} does not link to its predecessor")
+                if obj.get("record_hash") != record_hash(obj):
+                    return self._fail(result, f"record {seq} hash mismatch")
+                expected = obj["record_hash"]
+                result["checked"] += 1
+            self._verified_seq, self._verified_hash = len(self._off), expected
+            return result
+
+    def _fail(self, result: Dict[str, Any], error: str) -> Dict[str, Any]:
+        self._verified_seq, self._verified_hash = 0, None
+        self._digests_ok.clear()
+        result.update(ok=False, error=error)
+        return result
+
+
+_ledger: Optional[Ledger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> Ledger:
+    """Process-wide ledger for ``FORENSICS_LEDGER_DIR``.
+
+    An existing single-file ledger at ``FORENSICS_LEDGER`` is imported into
+    the first segment when the directory is new.
+    """
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = Ledger(LEDGER_DIR, legacy_path=LEDGER_PATH)
+        return _ledger
@@ -5,7 +5,6 @@ Provides evidence ingestion, verification, receipts, and chain reporting.
 
 import hashlib
 import json
-import os
 from datetime import datetime
 from typing import Dict, Any, Optional
 from fastapi import APIRouter, UploadFile, File, HTTPException, status
@@ -37,8 +36,6 @@ except ImportError:
 
 router = APIRouter(tags=["Forensics"], prefix="/v1")
 
-LEDGER_PATH = os.getenv("FORENSICS_LEDGER", "/data/forensics_ledger.jsonl")
-
 
 def sha256_bytes(b: bytes) -> str:
     """Calculate SHA256 hash of bytes."""
@@ -47,27 +44,7 @@ def sha256_bytes(b: bytes) -> str:
 
 def append_ledger(entry: dict):
     """Append entry to blockchain-like ledger with previous hash linking."""
-    os.makedirs(os.path.dirname(LEDGER_PATH), exist_ok=True)
-    
-    prev = None
-    if os.path.exists(LEDGER_PATH):
-        with open(LEDGER_PATH, 'rb') as f:
-            try:
-                f.seek(-2, os.SEEK_END)
-                while f.read(1) != b"\\n":
-                    f.seek(-2, os.SEEK_CUR)
-                last = f.readline().decode().strip()
-                if last:
-                    prev = json.loads(last).get("record_hash")
-            except Exception:
-                prev = None
-    
-    entry["prev_hash"] = prev
-    payload = json.dumps(entry, ensure_ascii=False)
-    entry["record_hash"] = sha256_bytes(payload.encode())
-    
-    with open(LEDGER_PATH, 'a', encoding='utf-8') as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\\n")
+    return get_ledger().append(entry)
 
 
 # Import models
@@ -79,6 +56,7 @@ from ..models import (
     ReceiptResponse,
     ChainReport
 )
+from ..app.ledger import get_ledger
 
 
 # API Endpoints
@@ -120,27 +98,23 @@ def verify_evidence(req: VerifyRequest):
     """
     Verify if evidence exists in chain of custody.
     
-    Searches the immutable ledger for the given SHA256 hash.
+    Looks the SHA256 hash up in the ledger index.
     """
     try:
-        if not os.path.exists(LEDGER_PATH):
+        ledger = get_ledger()
+        if not len(ledger):
             return VerifyResponse(
                 present=False,
                 message="Chain of custody ledger is empty"
             )
         
-        with open(LEDGER_PATH, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    obj = json.loads(line)
-                    if obj.get("sha256") == req.sha256:
-                        return VerifyResponse(
-                            present=True,
-                            entry=EvidenceEntry(**obj),
-                            message="Evidence found in chain of custody"
-                        )
-                except Exception:
-                    continue
+        obj = ledger.get(req.sha256)
+        if obj is not None:
+            return VerifyResponse(
+                present=True,
+                entry=EvidenceEntry(**obj),
+                message="Evidence found in chain of custody"
+            )
         
         return VerifyResponse(
             present=False,
@@ -159,32 +133,28 @@ def get_receipt(sha256: str):
     Returns the evidence entry with a digital signature for legal proof.
     """
     try:
-        if not os.path.exists(LEDGER_PATH):
+        ledger = get_ledger()
+        if not len(ledger):
             raise_http_error("LEDGER_EMPTY", "Chain of custody ledger is empty")
         
-        with open(LEDGER_PATH, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    obj = json.loads(line)
-                    if obj.get('sha256') == sha256:
-                        # Create receipt payload
-                        receipt_data = {k: obj[k] for k in ['ts','filename','size','sha256','prev_hash','record_hash'] if k in obj}
-                        payload = json.dumps(receipt_data, ensure_ascii=False).encode()
-                        
-                        # Import crypto utils for signing
-                        try:
-                            from ..app.crypto_utils import sign_message
-                            sig = sign_message(payload)
-                        except ImportError:
-                            # Fallback signature for demo
-                            sig = f"demo_signature_{sha256_bytes(payload)[:16]}"
-                        
-                        return ReceiptResponse(
-                            entry=EvidenceEntry(**obj),
-                            signature=sig
-                        )
-                except Exception:
-                    continue
+        obj = ledger.get(sha256)
+        if obj is not None:
+            # Create receipt payload
+            receipt_data = {k: obj[k] for k in ['ts','filename','size','sha256','prev_hash','record_hash'] if k in obj}
+            payload = json.dumps(receipt_data, ensure_ascii=False).encode()
+            
+            # Import crypto utils for signing
+            try:
+                from ..app.crypto_utils import sign_message
+                sig = sign_message(payload)
+            except ImportError:
+                # Fallback signature for demo
+                sig = f"demo_signature_{sha256_bytes(payload)[:16]}"
+            
+            return ReceiptResponse(
+                entry=EvidenceEntry(**obj),
+                signature=sig
+            )
         
         raise_http_error("EVIDENCE_NOT_FOUND", f"Evidence with SHA256 {sha256} not found in ledger")
         
@@ -202,25 +172,12 @@ def get_chain_report():
     Returns all evidence entries with integrity verification.
     """
     try:
-        items = []
-        if os.path.exists(LEDGER_PATH):
-            with open(LEDGER_PATH, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        obj = json.loads(line)
-                        items.append(EvidenceEntry(**obj))
-                    except Exception:
-                        continue
+        ledger = get_ledger()
+        items = [EvidenceEntry(**obj) for obj in ledger.iter_records()]
         
-        # Basic integrity check - verify hash chain
-        integrity_verified = True
-        if len(items) > 1:
-            for i in range(1, len(items)):
-                expected_prev = items[i-1].record_hash
-                actual_prev = items[i].prev_hash
-                if expected_prev != actual_prev:
-                    integrity_verified = False
-                    break
+        # Full re-check: an incremental verify would trust records and
+        # sealed segments that were edited after an earlier verification
+        integrity_verified = ledger.verify(full=True)["ok"]
         
         return ChainReport(
             items=items,
@@ -240,21 +197,11 @@ def list_evidence(page: int = 1, size: int = 10):
     Returns paginated list of all evidence in chain of custody.
     """
     try:
-        items = []
-        if os.path.exists(LEDGER_PATH):
-            with open(LEDGER_PATH, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        obj = json.loads(line)
-                        items.append(obj)
-                    except Exception:
-                        continue
+        ledger = get_ledger()
         
-        # Apply pagination
-        total = len(items)
-        start = (page - 1) * size
-        end = start + size
-        paginated_items = items[start:end]
+        # Seek directly to the requested page
+        total = len(ledger)
+        paginated_items = ledger.page((page - 1) * size, size)
         
         return PaginatedResponse(
             items=paginated_items,
@@ -265,3 +212,17 @@ def list_evidence(page: int = 1, size: int = 10):
         
     except Exception as e:
         raise_http_error("LIST_FAILED", f"Failed to list evidence: {str(e)}")
+
+
+@router.get("/chain/verify")
+def verify_chain(full: bool = False) -> Dict[str, Any]:
+    """
+    Verify ledger integrity.
+    
+    Checks checkpoint links and segment digests and re-hashes records added
+    since the last verification; ``full=true`` re-hashes every record.
+    """
+    try:
+        return get_ledger().verify(full=full)
+    except Exception as e:
+        raise_http_error("VERIFY_CHAIN_FAILED", f"Failed to verify chain: {str(e)}")
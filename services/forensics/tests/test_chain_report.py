@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+SERVICES_DIR = Path(__file__).resolve().parents[2]
+if str(SERVICES_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICES_DIR))
+
+from forensics.app import ledger as ledger_mod  # noqa: E402
+from forensics.routers import forensics_v1  # noqa: E402
+
+
+def _entry(i):
+    return {"ts": f"2024-01-01T00:00:{i:02d}", "filename": f"f{i}.bin", "size": i, "sha256": f"{i:064x}"}
+
+
+def test_chain_report_detects_tampering_after_verify(tmp_path, monkeypatch):
+    root = tmp_path / "ledger"
+    ledger = ledger_mod.Ledger(str(root), segment_bytes=400)
+    written = [ledger.append(_entry(i)) for i in range(8)]
+    monkeypatch.setattr(ledger_mod, "_ledger", ledger)
+
+    assert forensics_v1.get_chain_report().integrity_verified
+    assert ledger.verify()["ok"]  # everything now counts as verified
+
+    # relink a record in the active segment to the wrong predecessor
+    active = sorted(root.glob("segment-*.jsonl"))[-1]
+    data = active.read_bytes()
+    victim = written[-1]["prev_hash"].encode()
+    active.write_bytes(data.replace(victim, victim[::-1]))
+    report = forensics_v1.get_chain_report()
+    assert report.count == 8 and not report.integrity_verified
+
+    active.write_bytes(data)
+    assert forensics_v1.get_chain_report().integrity_verified
+
+    # an edit inside an already verified, sealed segment
+    sealed = root / "segment-000001.jsonl"
+    sealed.write_bytes(sealed.read_bytes().replace(b"f0.bin", b"f9.bin"))
+    assert not forensics_v1.get_chain_report().integrity_verified
@@ -0,0 +1,95 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+_spec = importlib.util.spec_from_file_location("forensics_ledger", SERVICE_DIR / "app" / "ledger.py")
+ledger_mod = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ledger_mod)
+Ledger = ledger_mod.Ledger
+
+
+def _entry(i):
+    return {"ts": f"2024-01-01T00:00:{i:02d}", "filename": f"f{i}.bin", "size": i, "sha256": f"{i:064x}"}
+
+
+def _fill(ledger, n):
+    return [ledger.append(_entry(i)) for i in range(n)]
+
+
+def test_append_links_records_and_lookup_uses_index(tmp_path):
+    ledger = Ledger(str(tmp_path / "ledger"), segment_bytes=1 << 20)
+    written = _fill(ledger, 5)
+    assert written[0]["prev_hash"] is None
+    assert all(b["prev_hash"] == a["record_hash"] for a, b in zip(written, written[1:]))
+    assert ledger.tail_hash == written[-1]["record_hash"]
+    assert ledger.get(f"{3:064x}") == written[3]
+    assert ledger.get("f" * 64) is None
+    assert ledger.verify() == {"ok": True, "records": 5, "checked": 5, "segments": 1, "sealed": 0}
+
+
+def test_segments_rotate_with_checkpoints_and_pages_span_them(tmp_path):
+    ledger = Ledger(str(tmp_path / "ledger"), segment_bytes=400)
+    written = _fill(ledger, 12)
+    assert len(list((tmp_path / "ledger").glob("segment-*.jsonl"))) > 2
+    assert [r["sha256"] for r in ledger.page(3, 6)] == [w["sha256"] for w in written[3:9]]
+    assert ledger.page(11, 10) == written[11:]
+    assert ledger.page(20, 5) == []
+    assert list(ledger.iter_records()) == written
+    result = ledger.verify()
+    assert result["ok"] and result["sealed"] >= 2
+
+    reopened = Ledger(str(tmp_path / "ledger"), segment_bytes=400)
+    assert len(reopened) == 12 and reopened.tail_hash == written[-1]["record_hash"]
+    assert reopened.append(_entry(12))["prev_hash"] == written[-1]["record_hash"]
+    assert reopened.verify()["ok"]
+
+
+def test_verify_is_incremental_and_detects_tampering(tmp_path):
+    root = tmp_path / "ledger"
+    ledger = Ledger(str(root), segment_bytes=400)
+    _fill(ledger, 8)
+    assert ledger.verify()["checked"] == 8
+    ledger.append(_entry(8))
+    assert ledger.verify()["checked"] == 1
+
+    sealed = root / "segment-000001.jsonl"
+    sealed.write_bytes(sealed.read_bytes().replace(b"f0.bin", b"f9.bin"))
+    assert ledger.verify()["ok"]  # already verified, sealed digest cached
+    result = ledger.verify(full=True)
+    assert not result["ok"] and "segment 1" in result["error"]
+
+
+def test_reopen_recovers_unindexed_records_and_torn_tail(tmp_path):
+    root = tmp_path / "ledger"
+    ledger = Ledger(str(root))
+    written = _fill(ledger, 3)
+    index = root / "index.tsv"
+    rows = index.read_text().splitlines(keepends=True)
+    index.write_text("".join(rows[:1]))
+    with open(root / "segment-000001.jsonl", "ab") as f:
+        f.write(b'{"ts": "torn')
+
+    reopened = Ledger(str(root))
+    assert len(reopened) == 3 and reopened.get(written[2]["sha256"]) == written[2]
+    assert reopened.append(_entry(3))["prev_hash"] == written[2]["record_hash"]
+    assert reopened.verify(full=True)["ok"]
+
+
+@pytest.mark.parametrize("separator", ["\n", "\\n"])
+def test_legacy_single_file_ledger_is_imported(tmp_path, separator):
+    records, prev = [], None
+    for i in range(3):
+        entry = dict(_entry(i), prev_hash=prev)
+        entry["record_hash"] = ledger_mod.sha256_bytes(json.dumps(entry, ensure_ascii=False).encode())
+        prev = entry["record_hash"]
+        records.append(entry)
+    legacy = tmp_path / "forensics_ledger.jsonl"
+    legacy.write_text("".join(json.dumps(r, ensure_ascii=False) + separator for r in records))
+
+    ledger = Ledger(str(tmp_path / "forensics_ledger"), legacy_path=str(legacy))
+    assert list(ledger.iter_records()) == records
+    assert ledger.append(_entry(3))["prev_hash"] == records[-1]["record_hash"]
+    assert ledger.verify(full=True)["ok"]
@@ -44,6 +44,8 @@ from _shared.health import make_healthz as legacy_make_healthz, make_readyz as l
 
 from it_logging import setup_logging
 from utils.neo4j_client import get_driver, neo_session
+from geo_index import geo_index
+from projection_cache import projection_cache
 from .routes.alg import router as alg_router
 from .routes.export import router as export_router
 from .routes.analytics import legacy_router as legacy_analytics_router
@@ -331,6 +333,9 @@ def execute_cypher_query(query: str, parameters: Dict[str, Any] = None, read_onl
                 with session.begin_transaction() as tx:
                     result = tx.run(query, parameters or {})
                     tx.commit()
+                # Arbitrary writes may touch any label: drop cached projections
+                projection_cache.clear()
+                geo_index.clear()
             
             records = []
             summary = None
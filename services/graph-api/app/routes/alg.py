@@ -6,12 +6,18 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from neo4j import GraphDatabase
 
+import graph_engine
+from graph_engine import CSRGraph, ENGINES, ENGINE_MEMORY
+from projection_cache import projection_cache
+
 router = APIRouter(prefix="/alg", tags=["algorithms"])
 
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://it-neo4j:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASS = os.getenv("NEO4J_PASSWORD", "test12345")
 USE_GDS = os.getenv("IT_NEO4J_GDS", "0") == "1"
+# Engine used for non-GDS algorithms: "cypher" (iterative queries) or "memory"
+DEFAULT_ENGINE = os.getenv("IT_GRAPH_ALG_ENGINE", "cypher")
 
 driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASS))
 
@@ -23,11 +29,14 @@ class DegreeIn(BaseModel):
 class CentralityIn(BaseModel):
     nodeLabel: str | None = None
     limit: int = 100
+    engine: str | None = None  # "cypher" | "memory" (non-GDS only)
+    samples: int | None = 50  # source pivots for in-memory betweenness
 
 class CommunityIn(BaseModel):
     nodeLabel: str | None = None
     relationshipType: str | None = None
     limit: int = 100
+    engine: str | None = None  # "cypher" | "memory" (non-GDS only)
 
 class ShortestIn(BaseModel):
     sourceId: int
@@ -39,6 +48,7 @@ class PageRankIn(BaseModel):
     iterations: int = 20
     dampingFactor: float = 0.85
     limit: int = 100
+    engine: str | None = None  # "cypher" | "memory" (non-GDS only)
 
 # Utility Functions
 def get_graph_data(session, node_label: str = None, relationship_type: str = None):
@@ -56,6 +66,21 @@ def get_graph_data(session, node_label: str = None, relationship_type: str = Non
     
     return nodes, edges
 
+def resolve_engine(engine: str | None) -> str:
+    """Return the requested non-GDS engine or raise 400 for unknown values"""
+    selected = (engine or DEFAULT_ENGINE).lower()
+    if selected not in ENGINES:
+        raise HTTPException(400, f"Unknown engine '{selected}', expected one of {', '.join(ENGINES)}")
+    return selected
+
+def load_csr_graph(session, node_label: str = None, relationship_type: str = None) -> CSRGraph:
+    """Return the cached CSR projection, pulling and packing it on a miss"""
+    def build() -> CSRGraph:
+        nodes, edges = get_graph_data(session, node_label, relationship_type)
+        return CSRGraph.from_records(nodes, edges)
+
+    return projection_cache.get_or_build(node_label, relationship_type, build)
+
 def build_adjacency_list(edges):
     """Build adjacency list from edges for in-memory algorithms"""
     adj_list = defaultdict(list)
@@ -278,6 +303,10 @@ def betweenness(inp: CentralityIn):
             LIMIT $limit
             """
             return {"items": s.run(q, label=inp.nodeLabel or "*", limit=inp.limit).data()}
+        elif resolve_engine(inp.engine) == ENGINE_MEMORY:
+            graph = load_csr_graph(s, inp.nodeLabel)
+            scores = graph_engine.betweenness(graph, samples=inp.samples)
+            return {"items": graph_engine.top_scores(graph, scores, inp.limit)}
         else:
             # Cypher fallback - approximation for performance
             results = cypher_betweenness_centrality(s, inp.nodeLabel, inp.limit)
@@ -341,6 +370,10 @@ def pagerank(inp: PageRankIn):
                                  iterations=inp.iterations,
                                  damping=inp.dampingFactor,
                                  limit=inp.limit).data()}
+        elif resolve_engine(inp.engine) == ENGINE_MEMORY:
+            graph = load_csr_graph(s, inp.nodeLabel)
+            scores = graph_engine.pagerank(graph, inp.iterations, inp.dampingFactor)
+            return {"items": graph_engine.top_scores(graph, scores, inp.limit)}
         else:
             # Cypher implementation
             results = cypher_pagerank(s, inp.nodeLabel, inp.iterations, inp.dampingFactor, inp.limit)
@@ -365,6 +398,10 @@ def louvain(inp: CommunityIn):
                                  label=inp.nodeLabel or "*", 
                                  relType=inp.relationshipType or "*",
                                  limit=inp.limit).data()}
+        elif resolve_engine(inp.engine) == ENGINE_MEMORY:
+            graph = load_csr_graph(s, inp.nodeLabel, inp.relationshipType)
+            membership = graph_engine.louvain(graph)
+            return {"items": graph_engine.community_items(graph, membership, inp.limit)}
         else:
             # Cypher fallback using label propagation
             results = cypher_louvain_clustering(s, inp.nodeLabel, inp.limit)
@@ -389,6 +426,10 @@ def label_propagation(inp: CommunityIn):
                                  label=inp.nodeLabel or "*", 
                                  relType=inp.relationshipType or "*",
                                  limit=inp.limit).data()}
+        elif resolve_engine(inp.engine) == ENGINE_MEMORY:
+            graph = load_csr_graph(s, inp.nodeLabel, inp.relationshipType)
+            membership = graph_engine.label_propagation(graph)
+            return {"items": graph_engine.community_items(graph, membership, inp.limit)}
         else:
             # Use the same implementation as Louvain fallback
             results = cypher_louvain_clustering(s, inp.nodeLabel, inp.limit)
@@ -464,6 +505,16 @@ def centrality_summary(node_id: int):
             "centralities": centralities
         }
 
+@router.get("/projections")
+def projections():
+    """Inspect the in-memory engine projection cache"""
+    return projection_cache.stats()
+
+@router.delete("/projections")
+def drop_projections():
+    """Drop all cached projections"""
+    return {"dropped": projection_cache.invalidate()}
+
 @router.get("/community-stats")
 def community_stats():
     """Get overall community statistics"""
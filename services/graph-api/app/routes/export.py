@@ -1,61 +1,55 @@
-import xml.etree.ElementTree as ET
-from fastapi import APIRouter, Response, HTTPException
+import os
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from graph_export import (
+    buffered,
+    graphml_chunks,
+    iter_elements,
+    json_chunks,
+    ndjson_chunks,
+    query_elements,
+)
 from .alg import driver
 
 router = APIRouter(prefix="/export", tags=["export"])
 
+# Records the driver fetches per round-trip and bytes buffered before a chunk is sent
+FETCH_SIZE = int(os.getenv("IT_EXPORT_PAGE_SIZE", "5000"))
+CHUNK_BYTES = int(os.getenv("IT_EXPORT_CHUNK_BYTES", str(64 * 1024)))
+
 
-def _fetch(node_ids=None, edge_ids=None, query=None):
-    with driver.session() as s:
+def _iter_elements(node_ids=None, edge_ids=None, query=None, nodes_first: bool = True):
+    """Stream ``(kind, element)`` pairs while holding a single session open."""
+    with driver.session(fetch_size=FETCH_SIZE) as s:
         if query:
-            g = s.run(query).graph()
+            yield from query_elements(s, query, nodes_first)
         else:
-            q = (
-                "MATCH (n) WHERE $nids IS NULL OR id(n) IN $nids "
-                "OPTIONAL MATCH (n)-[r]-() WHERE $eids IS NULL OR id(r) IN $eids "
-                "RETURN n,r"
-            )
-            g = s.run(q, nids=node_ids, eids=edge_ids).graph()
-    nodes = [
-        {"id": n.id, "labels": list(n.labels), "properties": dict(n)} for n in g.nodes
-    ]
-    rels = [
-        {
-            "id": r.id,
-            "type": r.type,
-            "source": r.start_node.id,
-            "target": r.end_node.id,
-            "properties": dict(r),
-        }
-        for r in g.relationships
-    ]
-    return nodes, rels
+            yield from iter_elements(s, node_ids, edge_ids)
+
+
+def _stream(chunks, media_type: str) -> StreamingResponse:
+    return StreamingResponse(buffered(chunks, CHUNK_BYTES), media_type=media_type)
+
+
+def _parse_ids(raw: str | None):
+    return [int(x) for x in raw.split(",") if x] if raw else None
 
 
 @router.get("/json")
 def export_json(nodeIds: str | None = None, edgeIds: str | None = None, query: str | None = None):
-    nids = [int(x) for x in nodeIds.split(",") if x] if nodeIds else None
-    eids = [int(x) for x in edgeIds.split(",") if x] if edgeIds else None
-    nodes, rels = _fetch(nids, eids, query)
-    return {"nodes": nodes, "relationships": rels}
+    elements = _iter_elements(_parse_ids(nodeIds), _parse_ids(edgeIds), query, nodes_first=True)
+    return _stream(json_chunks(elements), "application/json")
+
+
+@router.get("/ndjson")
+def export_ndjson(nodeIds: str | None = None, edgeIds: str | None = None, query: str | None = None):
+    elements = _iter_elements(_parse_ids(nodeIds), _parse_ids(edgeIds), query, nodes_first=False)
+    return _stream(ndjson_chunks(elements), "application/x-ndjson")
 
 
 @router.get("/graphml")
 def export_graphml(nodeIds: str | None = None, edgeIds: str | None = None, query: str | None = None):
-    nids = [int(x) for x in nodeIds.split(",") if x] if nodeIds else None
-    eids = [int(x) for x in edgeIds.split(",") if x] if edgeIds else None
-    nodes, rels = _fetch(nids, eids, query)
-    gml = ET.Element("graphml", xmlns="http://graphml.graphdrawing.org/xmlns")
-    graph = ET.SubElement(gml, "graph", edgedefault="undirected")
-    for n in nodes:
-        ET.SubElement(graph, "node", id=str(n["id"]))
-    for r in rels:
-        ET.SubElement(
-            graph,
-            "edge",
-            id=str(r["id"]),
-            source=str(r["source"]),
-            target=str(r["target"]),
-        )
-    xml_str = ET.tostring(gml, encoding="utf-8")
-    return Response(content=xml_str, media_type="application/graphml+xml")
+    elements = _iter_elements(_parse_ids(nodeIds), _parse_ids(edgeIds), query, nodes_first=False)
+    return _stream(graphml_chunks(elements), "application/graphml+xml")
@@ -11,6 +11,7 @@ from pathlib import Path
 SERVICE_DIR = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(SERVICE_DIR))
 
+from geo_index import geo_index
 from geospatial import GeospatialService, BoundingBox, GeocodeRequest, GeoEntity
 from metrics import GRAPH_GEO_QUERIES, GRAPH_GEO_QUERY_ERRORS, GEO_QUERY_COUNT
 
@@ -27,6 +28,7 @@ class NearbyRequest(BaseModel):
     longitude: float
     radius_km: float = 10.0
     limit: int = 50
+    engine: Optional[str] = None  # "cypher" | "memory"
 
 
 class BatchGeocodeRequest(BaseModel):
@@ -35,6 +37,14 @@ class BatchGeocodeRequest(BaseModel):
     limit: int = 100
 
 
+def geo_service_for(driver, engine: Optional[str] = None) -> GeospatialService:
+    """Build the service for the requested engine or raise 400 for unknown values."""
+    try:
+        return GeospatialService(driver, engine)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/entities")
 def get_geo_entities(
     request: Request,
@@ -42,16 +52,17 @@ def get_geo_entities(
     west: float,
     north: float, 
     east: float,
-    limit: int = 100
+    limit: int = 100,
+    engine: Optional[str] = None
 ):
     """Get entities within a bounding box."""
     driver = getattr(request.app.state, "driver", None)
     if not driver:
         raise HTTPException(status_code=503, detail="Neo4j driver not ready")
     
+    geo_service = geo_service_for(driver, engine)
     try:
         bbox = BoundingBox(south=south, west=west, north=north, east=east)
-        geo_service = GeospatialService(driver)
         entities = geo_service.get_entities_by_bbox(bbox, limit)
         GRAPH_GEO_QUERIES.labels(type="bbox").inc()
         GEO_QUERY_COUNT.labels(type="bbox").inc()
@@ -78,8 +89,8 @@ def get_nearby_entities(request: Request, nearby_request: NearbyRequest):
     if not driver:
         raise HTTPException(status_code=503, detail="Neo4j driver not ready")
     
+    geo_service = geo_service_for(driver, nearby_request.engine)
     try:
-        geo_service = GeospatialService(driver)
         entities = geo_service.get_entities_near_point(
             nearby_request.latitude,
             nearby_request.longitude,
@@ -103,6 +114,52 @@ def get_nearby_entities(request: Request, nearby_request: NearbyRequest):
         raise HTTPException(status_code=500, detail=f"Nearby query error: {str(e)}")
 
 
+@router.get("/entities/nearest")
+def get_nearest_entities(
+    request: Request,
+    latitude: float,
+    longitude: float,
+    k: int = 10,
+    max_radius_km: Optional[float] = None,
+    engine: Optional[str] = None
+):
+    """Get the k entities closest to a point."""
+    driver = getattr(request.app.state, "driver", None)
+    if not driver:
+        raise HTTPException(status_code=503, detail="Neo4j driver not ready")
+    
+    geo_service = geo_service_for(driver, engine)
+    try:
+        entities = geo_service.get_nearest_entities(latitude, longitude, k, max_radius_km)
+        GRAPH_GEO_QUERIES.labels(type="nearest").inc()
+        GEO_QUERY_COUNT.labels(type="nearest").inc()
+
+        return {
+            "center": {
+                "latitude": latitude,
+                "longitude": longitude
+            },
+            "k": k,
+            "entities": [entity.dict() for entity in entities],
+            "count": len(entities)
+        }
+    except Exception as e:
+        GRAPH_GEO_QUERY_ERRORS.labels(type="nearest").inc()
+        raise HTTPException(status_code=500, detail=f"Nearest query error: {str(e)}")
+
+
+@router.get("/index")
+def geo_index_stats():
+    """Inspect the in-memory geo engine index"""
+    return geo_index.stats()
+
+
+@router.delete("/index")
+def drop_geo_index():
+    """Drop the in-memory geo index; the next memory-engine query reloads it"""
+    return {"dropped": geo_index.invalidate()}
+
+
 @router.post("/geocode")
 def geocode_location(request: Request, geocode_request: GeocodeRequest):
     """Geocode a location string."""
@@ -265,15 +322,16 @@ def geo_heatmap(
     west: float,
     north: float,
     east: float,
-    grid_size: int = 20
+    grid_size: int = 20,
+    engine: Optional[str] = None
 ):
     """Generate heatmap data for entities in a bounding box."""
     driver = getattr(request.app.state, "driver", None)
     if not driver:
         raise HTTPException(status_code=503, detail="Neo4j driver not ready")
     
+    geo_service = geo_service_for(driver, engine)
     try:
-        geo_service = GeospatialService(driver)
         bbox = BoundingBox(south=south, west=west, north=north, east=east)
         entities = geo_service.get_entities_by_bbox(bbox, limit=1000)
         
@@ -2,14 +2,77 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Set
 
 from fastapi import APIRouter, Request
 from pydantic import BaseModel, Field
 
+from projection_cache import projection_cache
 from utils.neo4j_client import neo_session
 
+logger = logging.getLogger(__name__)
+
+# Labels and relationship types written by the threat-indicator ingest
+THREAT_INGEST_LABELS = ("ThreatFeed", "ThreatIndicator", "ThreatTag")
+THREAT_INGEST_REL_TYPES = ("PROVIDES", "TAGGED_AS")
+
+# Rows per UNWIND batch and number of concurrent write sessions
+THREAT_INGEST_BATCH_SIZE = int(os.getenv("IT_THREAT_INGEST_BATCH_SIZE", "500"))
+THREAT_INGEST_CONCURRENCY = int(os.getenv("IT_THREAT_INGEST_CONCURRENCY", "1"))
+
+# Uniqueness constraints back the MERGEs below: without them parallel batches
+# can create duplicate feeds, tags or indicators.
+THREAT_INGEST_CONSTRAINTS = (
+    "CREATE CONSTRAINT threat_feed_name IF NOT EXISTS "
+    "FOR (f:ThreatFeed) REQUIRE f.name IS UNIQUE",
+    "CREATE CONSTRAINT threat_tag_name IF NOT EXISTS "
+    "FOR (t:ThreatTag) REQUIRE t.name IS UNIQUE",
+    "CREATE CONSTRAINT threat_indicator_key IF NOT EXISTS "
+    "FOR (i:ThreatIndicator) REQUIRE (i.source, i.value) IS UNIQUE",
+)
+
+# Feeds and tags are shared by many rows, so they are merged once per request
+# before the indicator batches, which then only look them up.
+THREAT_FEEDS_TAGS_UPSERT = """
+UNWIND $feeds AS name
+MERGE (feed:ThreatFeed {name: name})
+ON CREATE SET feed.created_at = timestamp()
+SET feed.updated_at = timestamp()
+WITH count(*) AS feeds
+UNWIND $tags AS tag
+MERGE (:ThreatTag {name: tag})
+"""
+
+THREAT_INDICATOR_UPSERT = """
+UNWIND $rows AS row
+MATCH (feed:ThreatFeed {name: row.source})
+MERGE (indicator:ThreatIndicator {source: row.source, value: row.indicator})
+ON CREATE SET
+    indicator.type = row.type,
+    indicator.first_seen = row.first_seen,
+    indicator.created_at = timestamp(),
+    indicator.updated_at = timestamp()
+ON MATCH SET
+    indicator.type = row.type,
+    indicator.first_seen = row.first_seen,
+    indicator.updated_at = timestamp()
+WITH feed, indicator, row, CASE WHEN indicator.updated_at = indicator.created_at THEN true ELSE false END AS created
+MERGE (feed)-[:PROVIDES]->(indicator)
+FOREACH (tag IN row.tags |
+    MERGE (t:ThreatTag {name: tag})
+    MERGE (indicator)-[:TAGGED_AS]->(t)
+)
+RETURN count(*) AS total, sum(CASE WHEN created THEN 1 ELSE 0 END) AS created
+"""
+
 
 class PluginEntity(BaseModel):
     type: str = Field(..., description="Graph entity label")
@@ -75,6 +138,118 @@ class ThreatIndicatorBatch(BaseModel):
     items: List[ThreatIndicator] = Field(
         default_factory=list, description="Normalised threat indicators"
     )
+    batch_size: Optional[int] = Field(
+        None, ge=1, le=10000, description="Rows per UNWIND write batch"
+    )
+    concurrency: Optional[int] = Field(
+        None, ge=1, le=16, description="Concurrent write sessions"
+    )
+
+
+def _threat_rows(items: List[ThreatIndicator]) -> List[Dict[str, Any]]:
+    """Return one UNWIND row per (source, indicator), last occurrence wins.
+
+    Duplicates inside one statement would otherwise share the same
+    ``timestamp()`` and be reported as created twice.
+    """
+
+    rows: Dict[str, Dict[str, Any]] = {}
+    for item in items:
+        key = f"{item.source}:{item.indicator}"
+        tags = list(dict.fromkeys((rows.get(key, {}).get("tags") or []) + (item.tags or [])))
+        rows[key] = {
+            "indicator": item.indicator,
+            "type": item.type,
+            "source": item.source,
+            "first_seen": item.first_seen,
+            "tags": tags,
+        }
+    return list(rows.values())
+
+
+_threat_schema_lock = threading.Lock()
+_threat_schema_drivers: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def ensure_threat_schema(driver) -> None:
+    """Create the threat ingest constraints once per driver.
+
+    A constraint that cannot be created (existing duplicates, missing
+    privileges) is logged and does not block the ingest; the driver is then
+    not marked done, so the next ingest tries again.
+    """
+
+    with _threat_schema_lock:
+        if driver in _threat_schema_drivers:
+            return
+        complete = True
+        with neo_session(driver) as session:
+            for statement in THREAT_INGEST_CONSTRAINTS:
+                try:
+                    session.run(statement).consume()
+                except Exception as exc:
+                    complete = False
+                    logger.warning("Could not create threat ingest constraint %r: %s", statement, exc)
+        if complete:
+            _threat_schema_drivers.add(driver)
+
+
+def _write_threat_feeds_and_tags(driver, rows: List[Dict[str, Any]]) -> None:
+    feeds = sorted({row["source"] for row in rows})
+    tags = sorted({tag for row in rows for tag in row["tags"]})
+
+    def work(tx):
+        tx.run(THREAT_FEEDS_TAGS_UPSERT, feeds=feeds, tags=tags).consume()
+
+    with neo_session(driver) as session:
+        session.execute_write(work)
+
+
+def _write_threat_batch(driver, index: int, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Upsert one batch in a managed write transaction (retried on transient errors)."""
+
+    def work(tx):
+        record = tx.run(THREAT_INDICATOR_UPSERT, rows=rows).single()
+        return (record["total"], record["created"]) if record else (0, 0)
+
+    start = time.perf_counter()
+    with neo_session(driver) as session:
+        total, created = session.execute_write(work)
+    return {
+        "batch": index,
+        "size": len(rows),
+        "created": created or 0,
+        "updated": (total or 0) - (created or 0),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def write_threat_indicators(
+    driver,
+    items: List[ThreatIndicator],
+    batch_size: int = THREAT_INGEST_BATCH_SIZE,
+    concurrency: int = THREAT_INGEST_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """Write indicators as UNWIND batches, optionally across parallel sessions.
+
+    Constraints are ensured and shared feed/tag nodes merged serially first, so
+    parallel batches neither duplicate nor re-create them.
+    """
+
+    rows = _threat_rows(items)
+    if not rows:
+        return []
+    ensure_threat_schema(driver)
+    _write_threat_feeds_and_tags(driver, rows)
+    batches = [rows[i : i + batch_size] for i in range(0, len(rows), batch_size)]
+    if concurrency <= 1 or len(batches) <= 1:
+        return [_write_threat_batch(driver, i, batch) for i, batch in enumerate(batches)]
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as pool:
+        futures = [
+            pool.submit(_write_threat_batch, driver, i, batch)
+            for i, batch in enumerate(batches)
+        ]
+        return [future.result() for future in futures]
 
 
 router = APIRouter(prefix="/v1", tags=["Ingest"])
@@ -130,44 +305,17 @@ async def ingest_threat_indicators(
     if not payload.items:
         return {"status": "ok", "processed": 0, "ingested": 0}
 
+    batches: List[Dict[str, Any]] = []
     if driver is not None:
-        with neo_session(driver) as session:
-            for item in payload.items:
-                tags = item.tags or []
-                result = session.run(
-                    """
-                    MERGE (feed:ThreatFeed {name: $source})
-                    ON CREATE SET feed.created_at = timestamp()
-                    SET feed.updated_at = timestamp()
-                    MERGE (indicator:ThreatIndicator {source: $source, value: $indicator})
-                    ON CREATE SET
-                        indicator.type = $type,
-                        indicator.first_seen = $first_seen,
-                        indicator.created_at = timestamp(),
-                        indicator.updated_at = timestamp()
-                    ON MATCH SET
-                        indicator.type = $type,
-                        indicator.first_seen = $first_seen,
-                        indicator.updated_at = timestamp()
-                    WITH feed, indicator, CASE WHEN indicator.updated_at = indicator.created_at THEN true ELSE false END AS created
-                    MERGE (feed)-[:PROVIDES]->(indicator)
-                    FOREACH (tag IN $tags |
-                        MERGE (t:ThreatTag {name: tag})
-                        MERGE (indicator)-[:TAGGED_AS]->(t)
-                    )
-                    RETURN created
-                    """,
-                    {
-                        "indicator": item.indicator,
-                        "type": item.type,
-                        "source": item.source,
-                        "first_seen": item.first_seen,
-                        "tags": tags,
-                    },
-                )
-                record = result.single()
-                if record and record.get("created"):
-                    ingested += 1
+        batches = await asyncio.to_thread(
+            write_threat_indicators,
+            driver,
+            payload.items,
+            payload.batch_size or THREAT_INGEST_BATCH_SIZE,
+            payload.concurrency or THREAT_INGEST_CONCURRENCY,
+        )
+        ingested = sum(batch["created"] for batch in batches)
+        projection_cache.invalidate(THREAT_INGEST_LABELS, THREAT_INGEST_REL_TYPES)
     else:
         cache: Dict[str, Dict[str, Any]] = getattr(
             app.state, "threat_indicator_store", {}
@@ -188,7 +336,15 @@ async def ingest_threat_indicators(
         "ingested": ingested,
     }
 
-    return {"status": "ok", "processed": processed, "ingested": ingested}
+    response: Dict[str, Any] = {
+        "status": "ok",
+        "processed": processed,
+        "ingested": ingested,
+    }
+    if batches:
+        response["updated"] = sum(batch["updated"] for batch in batches)
+        response["batches"] = batches
+    return response
 
 
 __all__ = ["router"]
@@ -0,0 +1,407 @@
+"""In-process spatial index over geocoded graph nodes.
+
+``GeospatialService`` historically answered bbox and radius queries with a
+label-less scan over every node's ``latitude``/``longitude`` properties. The
+``memory`` geo engine instead pulls the geocoded nodes once, buckets them into
+a fixed lat/lon grid and keeps the coordinates in NumPy columns sorted by cell,
+so a query only touches the cells overlapping its bounding box:
+
+* bbox – one ``searchsorted`` range per grid row, then a vectorised filter;
+* radius – the bounding box of the circle, then vectorised haversine;
+* k-nearest – radius queries with a growing radius until ``k`` hits are found.
+
+Coordinates written through ``add_coordinates_to_node`` are applied as an
+overlay on top of the packed arrays and folded in once the overlay grows past
+``max_overlay`` entries. Only the first load blocks queries: after
+``ttl_seconds`` the index is rebuilt on a background thread while the stale
+arrays keep answering. ``invalidate`` drops everything when other writers may
+have moved nodes.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance from ``(lat, lon)``, same formula as the Cypher query."""
+
+    phi = np.radians(lats)
+    dphi = np.radians(lats - lat)
+    dlam = np.radians(lons - lon)
+    a = np.sin(dphi / 2) ** 2 + math.cos(math.radians(lat)) * np.cos(phi) * np.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def circle_bounds(lat: float, lon: float, radius_km: float) -> Tuple[float, float, List[Tuple[float, float]]]:
+    """Return ``(south, north, [(west, east), ...])`` enclosing the circle.
+
+    Longitude ranges are split at the antimeridian; circles reaching a pole
+    cover every longitude.
+    """
+
+    angular = radius_km / EARTH_RADIUS_KM
+    south = lat - math.degrees(angular)
+    north = lat + math.degrees(angular)
+    if south <= -90.0 or north >= 90.0 or angular >= math.pi / 2:
+        return max(south, -90.0), min(north, 90.0), [(-180.0, 180.0)]
+    dlon = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat)))))
+    west, east = lon - dlon, lon + dlon
+    if dlon >= 180.0:
+        return south, north, [(-180.0, 180.0)]
+    if west < -180.0:
+        return south, north, [(west + 360.0, 180.0), (-180.0, east)]
+    if east > 180.0:
+        return south, north, [(west, 180.0), (-180.0, east - 360.0)]
+    return south, north, [(west, east)]
+
+
+@dataclass
+class _Point:
+    latitude: float
+    longitude: float
+    name: Optional[str]
+    labels: Tuple[str, ...]
+
+
+class GeoIndex:
+    """Thread-safe grid index of ``node_id -> (latitude, longitude)``."""
+
+    def __init__(
+        self,
+        cell_degrees: float = 0.1,
+        ttl_seconds: float = 300.0,
+        max_overlay: int = 50_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.cell_degrees = cell_degrees
+        self.ttl_seconds = ttl_seconds
+        self.max_overlay = max_overlay
+        self._clock = clock
+        self._rows = int(math.ceil(180.0 / cell_degrees))
+        self._cols = int(math.ceil(360.0 / cell_degrees))
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._generation = 0
+        self._loading = False
+        self._loaded_at: Optional[float] = None
+        # set when a load raced with ``invalidate``: serve it, but rebuild
+        self._stale = False
+        self._rebuild: Optional[threading.Thread] = None
+        self.loads = 0
+        self._reset()
+
+    @classmethod
+    def from_env(cls) -> "GeoIndex":
+        return cls(
+            cell_degrees=float(os.getenv("IT_GRAPH_GEO_CELL_DEGREES", "0.1")),
+            ttl_seconds=float(os.getenv("IT_GRAPH_GEO_INDEX_TTL", "300")),
+        )
+
+    # -- maintenance -------------------------------------------------------
+
+    def ensure_loaded(self, loader: Callable[[], Iterable[Mapping[str, Any]]]) -> None:
+        """Load the index through ``loader`` unless a fresh copy is held.
+
+        Only a load with nothing to serve blocks; an expired index keeps
+        answering from its current arrays while one background thread
+        rebuilds it.
+        """
+
+        with self._lock:
+            if self._fresh():
+                return
+            if self._loaded_at is not None:
+                if not self._loading:
+                    self._loading = True
+                    self._rebuild = threading.Thread(
+                        target=self._rebuild_in_background,
+                        args=(loader, self._generation),
+                        name="geo-index-rebuild",
+                        daemon=True,
+                    )
+                    self._rebuild.start()
+                return
+        with self._build_lock:
+            with self._lock:
+                if self._loaded_at is not None:
+                    return
+                generation = self._generation
+                self._loading = True
+            self._load(loader, generation)
+
+    def _rebuild_in_background(self, loader: Callable[[], Iterable[Mapping[str, Any]]],
+                               generation: int) -> None:
+        try:
+            with self._build_lock:
+                self._load(loader, generation)
+        except Exception as exc:
+            # keep serving the stale arrays; the next query tries again
+            logger.warning("Geo index rebuild failed: %s", exc)
+
+    def _load(self, loader: Callable[[], Iterable[Mapping[str, Any]]], generation: int) -> None:
+        try:
+            packed = self._pack(loader())
+        except BaseException:
+            with self._lock:
+                self._loading = False
+            raise
+        with self._lock:
+            self._loading = False
+            self._install(*packed)
+            self.loads += 1
+            self._loaded_at = self._clock()
+            # An invalidate raced with the load: serve it, rebuild next time.
+            self._stale = generation != self._generation
+
+    def upsert(self, node_id: str, latitude: float, longitude: float,
+               name: Optional[str] = None, labels: Sequence[str] = ()) -> None:
+        """Apply a coordinate write; ignored until the index has been loaded."""
+
+        with self._lock:
+            if self._loaded_at is None and not self._loading:
+                return
+            pos = self._pos.get(node_id)
+            if pos is not None:
+                self._alive[pos] = False
+            self._overlay[node_id] = _Point(float(latitude), float(longitude), name, tuple(labels))
+            if len(self._overlay) > self.max_overlay and not self._loading:
+                self._install(*self._merge(), keep_overlay=False)
+
+    def remove(self, node_id: str) -> None:
+        with self._lock:
+            pos = self._pos.get(node_id)
+            if pos is not None:
+                self._alive[pos] = False
+            self._overlay.pop(node_id, None)
+
+    def invalidate(self) -> int:
+        """Drop everything; the next query reloads. Returns the entries dropped."""
+
+        with self._lock:
+            dropped = self._count()
+            self._generation += 1
+            self._loaded_at = None
+            self._stale = False
+            self._reset()
+            return dropped
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def _count(self) -> int:
+        return int(self._alive.sum()) + len(self._overlay)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "entries": self._count(),
+                "overlay": len(self._overlay),
+                "cell_degrees": self.cell_degrees,
+                "bytes": int(self._lat.nbytes + self._lon.nbytes + self._cell.nbytes + self._alive.nbytes),
+                "ttl_seconds": self.ttl_seconds,
+                "age_seconds": self._clock() - self._loaded_at if self._loaded_at is not None else None,
+                "loads": self.loads,
+            }
+
+    # -- queries -----------------------------------------------------------
+
+    def bbox(self, south: float, west: float, north: float, east: float,
+             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entities with ``south <= lat <= north`` and ``west <= lon <= east``."""
+
+        with self._lock:
+            idx = self._in_box(south, north, [(west, east)])
+            hits = [self._record(i) for i in idx[:limit].tolist()]
+            if limit is None or len(hits) < limit:
+                for node_id, p in self._overlay.items():
+                    if south <= p.latitude <= north and west <= p.longitude <= east:
+                        hits.append(self._overlay_record(node_id, p))
+                        if limit is not None and len(hits) >= limit:
+                            break
+            return hits
+
+    def within(self, latitude: float, longitude: float, radius_km: float,
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entities within ``radius_km`` of the point, nearest first."""
+
+        south, north, lon_ranges = circle_bounds(latitude, longitude, radius_km)
+        with self._lock:
+            idx = self._in_box(south, north, lon_ranges)
+            dist = haversine_km(latitude, longitude, self._lat[idx], self._lon[idx])
+            keep = dist <= radius_km
+            idx, dist = idx[keep], dist[keep]
+
+            overlay = list(self._overlay.items())
+            if overlay:
+                o_lat = np.array([p.latitude for _, p in overlay])
+                o_lon = np.array([p.longitude for _, p in overlay])
+                o_dist = haversine_km(latitude, longitude, o_lat, o_lon)
+                o_keep = np.flatnonzero(o_dist <= radius_km)
+                # overlay entries get negative positions: -1 - offset into ``overlay``
+                idx = np.concatenate((idx, -1 - o_keep))
+                dist = np.concatenate((dist, o_dist[o_keep]))
+
+            if limit is not None and limit < len(dist):
+                top = np.argpartition(dist, limit - 1)[:limit]
+                idx, dist = idx[top], dist[top]
+            order = np.argsort(dist, kind="stable")
+
+            hits = []
+            for i, d in zip(idx[order].tolist(), dist[order].tolist()):
+                record = self._record(i) if i >= 0 else self._overlay_record(*overlay[-1 - i])
+                record["distance_km"] = d
+                hits.append(record)
+            return hits
+
+    def nearest(self, latitude: float, longitude: float, k: int,
+                max_radius_km: Optional[float] = None) -> List[Dict[str, Any]]:
+        """The ``k`` entities closest to the point, optionally within a radius."""
+
+        limit_km = min(max_radius_km or HALF_CIRCUMFERENCE_KM, HALF_CIRCUMFERENCE_KM)
+        radius = min(self.cell_degrees * 111.0, limit_km)
+        while True:
+            hits = self.within(latitude, longitude, radius, k)
+            if len(hits) >= k or radius >= limit_km:
+                return hits
+            radius = min(radius * 4, limit_km)
+
+    # -- internals ---------------------------------------------------------
+
+    def _fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and not self._stale
+            and self._clock() - self._loaded_at <= self.ttl_seconds
+        )
+
+    def _reset(self) -> None:
+        self._lat = np.empty(0, dtype=np.float64)
+        self._lon = np.empty(0, dtype=np.float64)
+        self._cell = np.empty(0, dtype=np.int64)
+        self._alive = np.empty(0, dtype=bool)
+        self._ids: List[str] = []
+        self._names: List[Optional[str]] = []
+        self._labels: List[Tuple[str, ...]] = []
+        self._pos: Dict[str, int] = {}
+        self._overlay: Dict[str, _Point] = {}
+
+    def _cells(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        rows = np.clip(((lat + 90.0) // self.cell_degrees).astype(np.int64), 0, self._rows - 1)
+        cols = np.clip(((lon + 180.0) // self.cell_degrees).astype(np.int64), 0, self._cols - 1)
+        return rows * self._cols + cols
+
+    def _pack(self, records: Iterable[Mapping[str, Any]]):
+        ids, names, labels, lats, lons = [], [], [], [], []
+        interned: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        for record in records:
+            lat, lon = record["latitude"], record["longitude"]
+            if lat is None or lon is None or record["node_id"] is None:
+                continue
+            ids.append(record["node_id"])
+            names.append(record["name"])
+            key = tuple(record["labels"] or ())
+            labels.append(interned.setdefault(key, key))
+            lats.append(lat)
+            lons.append(lon)
+        return (ids, names, labels,
+                np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
+
+    def _merge(self):
+        keep = np.flatnonzero(self._alive).tolist()
+        overlay = list(self._overlay.items())
+        return (
+            [self._ids[i] for i in keep] + [node_id for node_id, _ in overlay],
+            [self._names[i] for i in keep] + [p.name for _, p in overlay],
+            [self._labels[i] for i in keep] + [p.labels for _, p in overlay],
+            np.concatenate((self._lat[keep], [p.latitude for _, p in overlay])),
+            np.concatenate((self._lon[keep], [p.longitude for _, p in overlay])),
+        )
+
+    def _install(self, ids, names, labels, lats: np.ndarray, lons: np.ndarray,
+                 keep_overlay: bool = True) -> None:
+        """Replace the packed arrays; a kept overlay still shadows its nodes."""
+
+        cells = self._cells(lats, lons)
+        order = np.argsort(cells, kind="stable")
+        overlay = self._overlay if keep_overlay else {}
+        self._cell = cells[order]
+        self._lat = lats[order]
+        self._lon = lons[order]
+        self._alive = np.ones(len(order), dtype=bool)
+        self._ids = [ids[i] for i in order.tolist()]
+        self._names = [names[i] for i in order.tolist()]
+        self._labels = [labels[i] for i in order.tolist()]
+        self._pos = {node_id: i for i, node_id in enumerate(self._ids)}
+        self._overlay = overlay
+        for node_id in overlay:
+            pos = self._pos.get(node_id)
+            if pos is not None:
+                self._alive[pos] = False
+
+    def _in_box(self, south: float, north: float, lon_ranges: List[Tuple[float, float]]) -> np.ndarray:
+        """Positions of live packed entries inside the box, in cell order."""
+
+        if not len(self._cell) or south > north:
+            return np.empty(0, dtype=np.int64)
+        r0, r1 = self._cells(np.array([south, north]), np.array([0.0, 0.0])) // self._cols
+        rows = np.arange(r0, r1 + 1, dtype=np.int64) * self._cols
+        parts = []
+        for west, east in lon_ranges:
+            if west > east:
+                continue
+            c0, c1 = self._cells(np.array([0.0, 0.0]), np.array([west, east])) % self._cols
+            lo = np.searchsorted(self._cell, rows + c0, side="left")
+            hi = np.searchsorted(self._cell, rows + c1, side="right")
+            parts.extend(np.arange(a, b) for a, b in zip(lo.tolist(), hi.tolist()) if b > a)
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        idx = np.concatenate(parts)
+        lat, lon = self._lat[idx], self._lon[idx]
+        mask = self._alive[idx] & (lat >= south) & (lat <= north)
+        lon_mask = np.zeros(len(idx), dtype=bool)
+        for west, east in lon_ranges:
+            lon_mask |= (lon >= west) & (lon <= east)
+        return idx[mask & lon_mask]
+
+    def _record(self, i: int) -> Dict[str, Any]:
+        return {
+            "node_id": self._ids[i],
+            "name": self._names[i],
+            "latitude": float(self._lat[i]),
+            "longitude": float(self._lon[i]),
+            "labels": list(self._labels[i]),
+        }
+
+    @staticmethod
+    def _overlay_record(node_id: str, point: _Point) -> Dict[str, Any]:
+        return {
+            "node_id": node_id,
+            "name": point.name,
+            "latitude": point.latitude,
+            "longitude": point.longitude,
+            "labels": list(point.labels),
+        }
+
+
+geo_index = GeoIndex.from_env()
+
+__all__ = ["GeoIndex", "circle_bounds", "geo_index", "haversine_km"]
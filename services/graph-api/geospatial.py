@@ -1,5 +1,6 @@
 # Geospatial features for InfoTerminal Graph API
 
+import math
 import os
 import time
 from typing import Any, Dict, List, Optional, Tuple
@@ -7,8 +8,13 @@ from typing import Any, Dict, List, Optional, Tuple
 import requests
 from pydantic import BaseModel
 
+from geo_index import GeoIndex, geo_index
+from graph_engine import ENGINE_MEMORY, ENGINES
 from utils.neo4j_client import neo_session
 
+# Engine for bbox/nearby/nearest queries: "cypher" (property scan) or "memory" (grid index)
+DEFAULT_GEO_ENGINE = os.getenv("IT_GRAPH_GEO_ENGINE", "cypher")
+
 
 class BoundingBox(BaseModel):
     south: float
@@ -28,11 +34,22 @@ class GeoEntity(BaseModel):
     latitude: float
     longitude: float
     labels: List[str]
+    distance_km: Optional[float] = None
+
+
+def resolve_geo_engine(engine: Optional[str]) -> str:
+    """Return the requested geo engine or raise ValueError for unknown values."""
+    selected = (engine or DEFAULT_GEO_ENGINE).lower()
+    if selected not in ENGINES:
+        raise ValueError(f"Unknown engine '{selected}', expected one of {', '.join(ENGINES)}")
+    return selected
 
 
 class GeospatialService:
-    def __init__(self, neo4j_driver):
+    def __init__(self, neo4j_driver, engine: Optional[str] = None, index: Optional[GeoIndex] = None):
         self.driver = neo4j_driver
+        self.engine = resolve_geo_engine(engine)
+        self.index = index if index is not None else geo_index
         self.geocoding_cache = {}
         self.enable_external_geocoding = os.getenv("GRAPH_ENABLE_GEOCODING", "0") == "1"
         
@@ -90,13 +107,16 @@ class GeospatialService:
         """Add coordinates to an existing node."""
         try:
             with neo_session(self.driver) as session:
-                result = session.run("""
+                record = session.run("""
                 MATCH (n {id: $node_id})
                 SET n.latitude = $lat, n.longitude = $lon, n.has_coordinates = true
-                RETURN n
-                """, node_id=node_id, lat=latitude, lon=longitude)
+                RETURN n.name as name, labels(n) as node_labels
+                """, node_id=node_id, lat=latitude, lon=longitude).single()
                 
-                return result.single() is not None
+                if record is None:
+                    return False
+                self.index.upsert(node_id, latitude, longitude, record["name"], record["node_labels"] or [])
+                return True
         except Exception as e:
             print(f"Error adding coordinates to node {node_id}: {e}")
             return False
@@ -124,20 +144,24 @@ class GeospatialService:
                     return {"success": False, "error": "Geocoding failed"}
                 
                 # Update node with coordinates
-                session.run("""
+                updated = session.run("""
                 MATCH (n {id: $node_id})
                 SET n.latitude = $lat, 
                     n.longitude = $lon,
                     n.has_coordinates = true,
                     n.geocoded_address = $address,
                     n.geocoding_confidence = $confidence
+                RETURN n.name as name, labels(n) as node_labels
                 """, 
                 node_id=node_id, 
                 lat=geo_data["latitude"], 
                 lon=geo_data["longitude"],
                 address=geo_data.get("display_name"),
                 confidence=geo_data.get("confidence")
-                )
+                ).single()
+                if updated is not None:
+                    self.index.upsert(node_id, geo_data["latitude"], geo_data["longitude"],
+                                      updated["name"], updated["node_labels"] or [])
                 
                 return {
                     "success": True,
@@ -152,9 +176,40 @@ class GeospatialService:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    @staticmethod
+    def _to_entity(record) -> GeoEntity:
+        return GeoEntity(
+            node_id=record["node_id"],
+            name=record["name"] or "Unknown",
+            latitude=record["latitude"],
+            longitude=record["longitude"],
+            labels=record["labels"] or [],
+            distance_km=record.get("distance_km")
+        )
+    
+    def _load_index_records(self) -> List[Dict[str, Any]]:
+        """Pull every geocoded node for the in-memory index."""
+        with neo_session(self.driver) as session:
+            result = session.run("""
+            MATCH (n)
+            WHERE n.has_coordinates = true
+            RETURN n.id as node_id, n.name as name,
+                   n.latitude as latitude, n.longitude as longitude,
+                   labels(n) as labels
+            """)
+            return [dict(record) for record in result]
+    
+    def _indexed(self) -> GeoIndex:
+        self.index.ensure_loaded(self._load_index_records)
+        return self.index
+    
     def get_entities_by_bbox(self, bbox: BoundingBox, limit: int = 100) -> List[GeoEntity]:
         """Get entities within a bounding box."""
         try:
+            if self.engine == ENGINE_MEMORY:
+                hits = self._indexed().bbox(bbox.south, bbox.west, bbox.north, bbox.east, limit)
+                return [self._to_entity(hit) for hit in hits]
+            
             with neo_session(self.driver) as session:
                 result = session.run("""
                 MATCH (n)
@@ -169,17 +224,7 @@ class GeospatialService:
                 south=bbox.south, north=bbox.north, 
                 west=bbox.west, east=bbox.east, limit=limit)
                 
-                entities = []
-                for record in result:
-                    entities.append(GeoEntity(
-                        node_id=record["node_id"],
-                        name=record["name"] or "Unknown",
-                        latitude=record["latitude"],
-                        longitude=record["longitude"],
-                        labels=record["labels"] or []
-                    ))
-                
-                return entities
+                return [self._to_entity(record) for record in result]
         except Exception as e:
             print(f"Error getting entities by bbox: {e}")
             return []
@@ -188,11 +233,14 @@ class GeospatialService:
                                radius_km: float = 10.0, limit: int = 50) -> List[GeoEntity]:
         """Get entities near a point within a radius (using Haversine distance approximation)."""
         try:
+            if self.engine == ENGINE_MEMORY:
+                hits = self._indexed().within(latitude, longitude, radius_km, limit)
+                return [self._to_entity(hit) for hit in hits]
+            
             with neo_session(self.driver) as session:
                 # Simple approximation using lat/lon degree differences
                 # 1 degree latitude ≈ 111 km
                 # 1 degree longitude ≈ 111 km * cos(latitude)
-                import math
                 lat_range = radius_km / 111.0
                 lon_range = radius_km / (111.0 * math.cos(math.radians(latitude)))
                 
@@ -219,23 +267,43 @@ class GeospatialService:
                 lon_min=longitude-lon_range, lon_max=longitude+lon_range,
                 radius=radius_km, limit=limit)
                 
-                entities = []
-                for record in result:
-                    entity = GeoEntity(
-                        node_id=record["node_id"],
-                        name=record["name"] or "Unknown",
-                        latitude=record["latitude"],
-                        longitude=record["longitude"],
-                        labels=record["labels"] or []
-                    )
-                    entity.distance_km = record["distance_km"]
-                    entities.append(entity)
-                
-                return entities
+                return [self._to_entity(record) for record in result]
         except Exception as e:
             print(f"Error getting entities near point: {e}")
             return []
     
+    def get_nearest_entities(self, latitude: float, longitude: float, k: int = 10,
+                             max_radius_km: Optional[float] = None) -> List[GeoEntity]:
+        """Get the k entities closest to a point, optionally within a radius."""
+        try:
+            if self.engine == ENGINE_MEMORY:
+                hits = self._indexed().nearest(latitude, longitude, k, max_radius_km)
+                return [self._to_entity(hit) for hit in hits]
+            
+            with neo_session(self.driver) as session:
+                result = session.run("""
+                MATCH (n)
+                WHERE n.has_coordinates = true
+                WITH n, 
+                     2 * 6371 * asin(sqrt(
+                         haversin(radians($lat - n.latitude)) + 
+                         cos(radians($lat)) * cos(radians(n.latitude)) * 
+                         haversin(radians($lon - n.longitude))
+                     )) as distance_km
+                WHERE $radius IS NULL OR distance_km <= $radius
+                RETURN n.id as node_id, n.name as name,
+                       n.latitude as latitude, n.longitude as longitude,
+                       labels(n) as labels, distance_km
+                ORDER BY distance_km
+                LIMIT $k
+                """,
+                lat=latitude, lon=longitude, radius=max_radius_km, k=k)
+                
+                return [self._to_entity(record) for record in result]
+        except Exception as e:
+            print(f"Error getting nearest entities: {e}")
+            return []
+    
     def get_geo_statistics(self) -> Dict[str, Any]:
         """Get statistics about geocoded entities."""
         try:
@@ -0,0 +1,395 @@
+"""In-process graph algorithm engine for graph-api.
+
+When Neo4j GDS is not installed the algorithm routes historically fell back to
+iterative Cypher that writes temporary properties onto every node. This module
+provides an alternative: the projection is pulled once (see
+``app.routes.alg.get_graph_data``), packed into NumPy CSR arrays and the
+algorithms run entirely in memory without any write-back to the database.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+ENGINE_CYPHER = "cypher"
+ENGINE_MEMORY = "memory"
+ENGINES = (ENGINE_CYPHER, ENGINE_MEMORY)
+
+
+def _csr(src: np.ndarray, dst: np.ndarray, n: int):
+    """Return ``(indptr, indices)`` for the edge list ``src -> dst``."""
+
+    order = np.argsort(src, kind="stable")
+    indices = dst[order]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, indices
+
+
+@dataclass
+class CSRGraph:
+    """Compressed sparse row projection of a (directed) graph.
+
+    ``node_ids`` holds the Neo4j ids sorted ascending; every other array refers
+    to positions in ``node_ids``. ``src``/``dst`` keep the directed edge list,
+    ``und_indptr``/``und_indices`` the symmetric adjacency used by the
+    undirected algorithms.
+    """
+
+    node_ids: np.ndarray
+    src: np.ndarray
+    dst: np.ndarray
+    und_indptr: np.ndarray
+    und_indices: np.ndarray
+
+    @property
+    def node_count(self) -> int:
+        return int(self.node_ids.size)
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.src.size)
+
+    @classmethod
+    def from_arrays(
+        cls, node_ids: Iterable[int], sources: Iterable[int], targets: Iterable[int]
+    ) -> "CSRGraph":
+        ids = np.unique(np.fromiter(node_ids, dtype=np.int64))
+        src_ext = np.fromiter(sources, dtype=np.int64)
+        dst_ext = np.fromiter(targets, dtype=np.int64)
+        n = ids.size
+
+        if n == 0 or src_ext.size == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return cls(ids, empty, empty, np.zeros(n + 1, dtype=np.int64), empty)
+
+        # Edges whose endpoints are outside the node projection are dropped.
+        src = np.searchsorted(ids, src_ext)
+        dst = np.searchsorted(ids, dst_ext)
+        src_ok = src < n
+        dst_ok = dst < n
+        valid = src_ok & dst_ok
+        valid[valid] &= (ids[src[valid]] == src_ext[valid]) & (
+            ids[dst[valid]] == dst_ext[valid]
+        )
+        src = src[valid]
+        dst = dst[valid]
+
+        # The undirected view collapses reciprocal/parallel edges and self-loops.
+        low = np.minimum(src, dst)
+        high = np.maximum(src, dst)
+        pairs = np.unique(low[low != high] * n + high[low != high])
+        low, high = pairs // n, pairs % n
+        und_indptr, und_indices = _csr(
+            np.concatenate([low, high]), np.concatenate([high, low]), n
+        )
+        return cls(ids, src, dst, und_indptr, und_indices)
+
+    @classmethod
+    def from_records(
+        cls, nodes: Iterable[Mapping[str, Any]], edges: Iterable[Mapping[str, Any]]
+    ) -> "CSRGraph":
+        """Build the projection from ``get_graph_data`` style records."""
+
+        edges = list(edges)
+        return cls.from_arrays(
+            (record["id"] for record in nodes),
+            (record["source"] for record in edges),
+            (record["target"] for record in edges),
+        )
+
+    def undirected_neighbors(self, frontier: np.ndarray):
+        """Expand ``frontier`` into parallel ``(src, dst)`` arrays of its edges."""
+
+        starts = self.und_indptr[frontier]
+        counts = self.und_indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        src = np.repeat(frontier, counts)
+        offsets = np.arange(total, dtype=np.int64) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        return src, self.und_indices[np.repeat(starts, counts) + offsets]
+
+
+# ---------------------------------------------------------------------------
+# Algorithms
+# ---------------------------------------------------------------------------
+
+
+def pagerank(
+    graph: CSRGraph,
+    iterations: int = 20,
+    damping_factor: float = 0.85,
+    tolerance: float = 1e-7,
+) -> np.ndarray:
+    """Power-iteration PageRank over directed edges; scores sum to 1."""
+
+    n = graph.node_count
+    if n == 0:
+        return np.zeros(0)
+    out_degree = np.bincount(graph.src, minlength=n).astype(np.float64)
+    dangling = out_degree == 0
+    inv_out = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max(iterations, 0)):
+        contrib = (rank * inv_out)[graph.src]
+        incoming = np.bincount(graph.dst, weights=contrib, minlength=n)
+        leaked = rank[dangling].sum() / n
+        new_rank = (1.0 - damping_factor) / n + damping_factor * (incoming + leaked)
+        delta = np.abs(new_rank - rank).sum()
+        rank = new_rank
+        if delta < tolerance:
+            break
+    return rank
+
+
+def label_propagation(
+    graph: CSRGraph, max_iterations: int = 10, seed: int = 42
+) -> np.ndarray:
+    """Semi-synchronous label propagation on the undirected projection.
+
+    Each round a random half of the nodes adopts the most frequent neighbour
+    label (ties keep the current label, then prefer the smallest id), which
+    avoids the oscillation of fully synchronous updates on bipartite regions.
+    """
+
+    n = graph.node_count
+    labels = np.arange(n, dtype=np.int64)
+    if n == 0 or graph.und_indices.size == 0:
+        return labels
+    rng = np.random.default_rng(seed)
+    owner = np.repeat(
+        np.arange(n, dtype=np.int64), np.diff(graph.und_indptr)
+    )
+    for _ in range(max(max_iterations, 0)):
+        neighbor_labels = labels[graph.und_indices]
+        keys = owner * n + neighbor_labels
+        uniq, counts = np.unique(keys, return_counts=True)
+        nodes = uniq // n
+        candidates = uniq % n
+        score = counts + 0.5 * (candidates == labels[nodes])
+        order = np.lexsort((candidates, -score, nodes))
+        nodes = nodes[order]
+        first = np.ones(nodes.size, dtype=bool)
+        first[1:] = nodes[1:] != nodes[:-1]
+        best_nodes = nodes[first]
+        best_labels = candidates[order][first]
+        update = rng.random(best_nodes.size) < 0.5
+        changed = update & (labels[best_nodes] != best_labels)
+        if not changed.any():
+            if (labels[best_nodes] == best_labels).all():
+                break
+            continue
+        labels[best_nodes[changed]] = best_labels[changed]
+    return labels
+
+
+def _louvain_local_moving(
+    indptr: List[int],
+    indices: List[int],
+    weights: List[float],
+    total_weight: float,
+    resolution: float,
+    max_passes: int,
+) -> Optional[List[int]]:
+    """Phase one of Louvain; returns the membership or ``None`` if nothing moved."""
+
+    n = len(indptr) - 1
+    community = list(range(n))
+    degree = [0.0] * n
+    for node in range(n):
+        degree[node] = sum(weights[indptr[node] : indptr[node + 1]])
+    community_total = list(degree)
+
+    moved_any = False
+    for _ in range(max_passes):
+        moved = 0
+        for node in range(n):
+            current = community[node]
+            node_degree = degree[node]
+            links: Dict[int, float] = {}
+            for pos in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[pos]
+                if neighbor == node:
+                    continue
+                target = community[neighbor]
+                links[target] = links.get(target, 0.0) + weights[pos]
+
+            community_total[current] -= node_degree
+            factor = resolution * node_degree / total_weight
+            best = current
+            best_gain = links.get(current, 0.0) - community_total[current] * factor
+            for target, weight in links.items():
+                gain = weight - community_total[target] * factor
+                if gain > best_gain + 1e-12:
+                    best, best_gain = target, gain
+            community_total[best] += node_degree
+            if best != current:
+                community[node] = best
+                moved += 1
+        if moved == 0:
+            break
+        moved_any = True
+    return community if moved_any else None
+
+
+def louvain(
+    graph: CSRGraph,
+    resolution: float = 1.0,
+    max_levels: int = 10,
+    max_passes: int = 10,
+) -> np.ndarray:
+    """Multi-level Louvain modularity optimisation on the undirected projection."""
+
+    n = graph.node_count
+    membership = np.arange(n, dtype=np.int64)
+    if n == 0 or graph.und_indices.size == 0:
+        return membership
+
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(graph.und_indptr))
+    dst = graph.und_indices
+    weight = np.ones(src.size)
+    level_nodes = n
+
+    for _ in range(max_levels):
+        indptr, indices = _csr(src, dst, level_nodes)
+        order = np.argsort(src, kind="stable")
+        community = _louvain_local_moving(
+            indptr.tolist(),
+            indices.tolist(),
+            weight[order].tolist(),
+            float(weight.sum()),
+            resolution,
+            max_passes,
+        )
+        if community is None:
+            break
+        _, compact = np.unique(np.asarray(community, dtype=np.int64), return_inverse=True)
+        membership = compact[membership]
+        new_nodes = int(compact.max()) + 1
+        if new_nodes == level_nodes:
+            break
+
+        # Aggregate: communities become nodes, parallel edges are summed.
+        keys = compact[src] * new_nodes + compact[dst]
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        weight = np.bincount(inverse, weights=weight)
+        src = uniq // new_nodes
+        dst = uniq % new_nodes
+        level_nodes = new_nodes
+
+    return membership
+
+
+def betweenness(
+    graph: CSRGraph, samples: Optional[int] = None, seed: int = 42
+) -> np.ndarray:
+    """Brandes betweenness centrality on the undirected projection.
+
+    BFS and dependency accumulation are level-synchronous array operations.
+    When ``samples`` is smaller than the node count only that many random
+    source pivots are used and the result is extrapolated.
+    """
+
+    n = graph.node_count
+    scores = np.zeros(n)
+    if n < 3 or graph.und_indices.size == 0:
+        return scores
+
+    sources = np.arange(n, dtype=np.int64)
+    if samples is not None and 0 < samples < n:
+        sources = np.random.default_rng(seed).choice(n, size=samples, replace=False)
+
+    for source in sources:
+        dist = np.full(n, -1, dtype=np.int64)
+        sigma = np.zeros(n)
+        dist[source] = 0
+        sigma[source] = 1.0
+        frontier = np.array([source], dtype=np.int64)
+        level_edges = []
+        depth = 0
+        while frontier.size:
+            src, dst = graph.undirected_neighbors(frontier)
+            fresh = dst[dist[dst] == -1]
+            nxt = np.unique(fresh)
+            dist[nxt] = depth + 1
+            on_path = dist[dst] == depth + 1
+            src, dst = src[on_path], dst[on_path]
+            if src.size:
+                sigma += np.bincount(dst, weights=sigma[src], minlength=n)
+                level_edges.append((src, dst))
+            frontier = nxt
+            depth += 1
+
+        delta = np.zeros(n)
+        for src, dst in reversed(level_edges):
+            coeff = sigma[src] / sigma[dst] * (1.0 + delta[dst])
+            delta += np.bincount(src, weights=coeff, minlength=n)
+        delta[source] = 0.0
+        scores += delta
+
+    # Undirected paths are discovered from both endpoints.
+    scores /= 2.0
+    scores *= n / sources.size
+    scores *= 2.0 / ((n - 1) * (n - 2))
+    return scores
+
+
+# ---------------------------------------------------------------------------
+# Result helpers matching the Cypher fallback payloads
+# ---------------------------------------------------------------------------
+
+
+def top_scores(graph: CSRGraph, scores: np.ndarray, limit: int) -> List[Dict[str, Any]]:
+    """Return ``[{id, score}]`` for the ``limit`` highest scores."""
+
+    limit = max(min(limit, scores.size), 0)
+    if limit == 0:
+        return []
+    top = np.argpartition(-scores, limit - 1)[:limit]
+    top = top[np.lexsort((graph.node_ids[top], -scores[top]))]
+    return [
+        {"id": int(graph.node_ids[i]), "score": float(scores[i])} for i in top
+    ]
+
+
+def community_items(
+    graph: CSRGraph, membership: np.ndarray, limit: int
+) -> List[Dict[str, Any]]:
+    """Return ``[{id, communityId}]`` ordered by community then node id.
+
+    Community ids are reported as the smallest Neo4j id of the community so
+    they are stable across runs, mirroring the ``id(n)`` seeded Cypher path.
+    """
+
+    n = graph.node_count
+    if n == 0 or limit <= 0:
+        return []
+    representative = np.full(int(membership.max()) + 1, np.iinfo(np.int64).max)
+    np.minimum.at(representative, membership, graph.node_ids)
+    community_ids = representative[membership]
+    order = np.lexsort((graph.node_ids, community_ids))[:limit]
+    return [
+        {"id": int(graph.node_ids[i]), "communityId": int(community_ids[i])}
+        for i in order
+    ]
+
+
+__all__ = [
+    "CSRGraph",
+    "ENGINES",
+    "ENGINE_CYPHER",
+    "ENGINE_MEMORY",
+    "betweenness",
+    "community_items",
+    "label_propagation",
+    "louvain",
+    "pagerank",
+    "top_scores",
+]
@@ -0,0 +1,193 @@
+"""Streaming graph export helpers.
+
+Exports are produced as an iterator of ``(kind, element)`` pairs and
+serialised incrementally. Each section (nodes, then relationships) is a single
+Cypher query whose records are consumed lazily; the driver pulls them in
+batches of the session's ``fetch_size``, so memory stays flat regardless of
+graph size and the first bytes leave before the last record is read.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import quoteattr
+
+from neo4j.graph import Node, Path, Relationship
+
+DEFAULT_CHUNK_BYTES = 64 * 1024
+
+NODES_QUERY = "MATCH (n) RETURN id(n) AS id, labels(n) AS labels, properties(n) AS properties"
+# Selected nodes plus the far endpoint of every exported relationship, so
+# filtered exports never reference an undefined node.
+FILTERED_NODES_QUERY = (
+    "MATCH (n) WHERE id(n) IN $nids "
+    "RETURN id(n) AS id, labels(n) AS labels, properties(n) AS properties "
+    "UNION "
+    "MATCH (n)-[r]-(m) WHERE id(n) IN $nids AND ($eids IS NULL OR id(r) IN $eids) "
+    "RETURN id(m) AS id, labels(m) AS labels, properties(m) AS properties"
+)
+RELS_QUERY = (
+    "MATCH (a)-[r]->(b) WHERE $eids IS NULL OR id(r) IN $eids "
+    "RETURN id(r) AS id, type(r) AS type, id(a) AS source, id(b) AS target, "
+    "properties(r) AS properties"
+)
+FILTERED_RELS_QUERY = (
+    "MATCH (n)-[r]-() WHERE id(n) IN $nids AND ($eids IS NULL OR id(r) IN $eids) "
+    "WITH DISTINCT r "
+    "RETURN id(r) AS id, type(r) AS type, id(startNode(r)) AS source, "
+    "id(endNode(r)) AS target, properties(r) AS properties"
+)
+
+Element = Tuple[str, Dict[str, Any]]
+
+
+def _node(n: Node) -> Dict[str, Any]:
+    return {"id": n.id, "labels": list(n.labels), "properties": dict(n)}
+
+
+def _relationship(r: Relationship) -> Dict[str, Any]:
+    return {
+        "id": r.id,
+        "type": r.type,
+        "source": r.start_node.id,
+        "target": r.end_node.id,
+        "properties": dict(r),
+    }
+
+
+def records(session, query: str, **params) -> Iterator[Dict[str, Any]]:
+    """Yield ``query``'s records as dicts straight off the driver cursor."""
+    for record in session.run(query, **params):
+        yield record.data()
+
+
+def iter_elements(
+    session,
+    node_ids: Optional[List[int]] = None,
+    edge_ids: Optional[List[int]] = None,
+) -> Iterator[Element]:
+    """Yield all nodes, then all relationships, of the (filtered) graph.
+
+    With ``node_ids`` the export holds those nodes, the relationships touching
+    them and the other endpoint of each such relationship.
+    """
+    if node_ids is None:
+        nodes_query, rels_query = NODES_QUERY, RELS_QUERY
+    else:
+        nodes_query, rels_query = FILTERED_NODES_QUERY, FILTERED_RELS_QUERY
+    for n in records(session, nodes_query, nids=node_ids, eids=edge_ids):
+        yield "node", n
+    for r in records(session, rels_query, nids=node_ids, eids=edge_ids):
+        yield "relationship", r
+
+
+def query_elements(session, query: str, nodes_first: bool) -> Iterator[Element]:
+    """Yield nodes/relationships found in an arbitrary query's records.
+
+    Records are consumed lazily from the driver cursor; only element ids are
+    remembered for de-duplication. With ``nodes_first`` relationships are held
+    back until the cursor is exhausted (needed for the JSON layout).
+    """
+    seen_nodes = set()
+    seen_rels = set()
+    deferred: List[Dict[str, Any]] = []
+
+    def visit(value) -> Iterator[Element]:
+        if isinstance(value, Node):
+            if value.id not in seen_nodes:
+                seen_nodes.add(value.id)
+                yield "node", _node(value)
+        elif isinstance(value, Relationship):
+            yield from visit(value.start_node)
+            yield from visit(value.end_node)
+            if value.id not in seen_rels:
+                seen_rels.add(value.id)
+                if nodes_first:
+                    deferred.append(_relationship(value))
+                else:
+                    yield "relationship", _relationship(value)
+        elif isinstance(value, Path):
+            for n in value.nodes:
+                yield from visit(n)
+            for r in value.relationships:
+                yield from visit(r)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                yield from visit(item)
+
+    for record in session.run(query):
+        for value in record.values():
+            yield from visit(value)
+    for rel in deferred:
+        yield "relationship", rel
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, default=str, separators=(",", ":"))
+
+
+def json_chunks(elements: Iterable[Element]) -> Iterator[str]:
+    yield '{"nodes":['
+    section = "node"
+    first = True
+    for kind, element in elements:
+        if kind != section:
+            yield '],"relationships":['
+            section = kind
+            first = True
+        yield ("" if first else ",") + _dumps(element)
+        first = False
+    if section == "node":
+        yield '],"relationships":['
+    yield "]}"
+
+
+def ndjson_chunks(elements: Iterable[Element]) -> Iterator[str]:
+    for kind, element in elements:
+        yield _dumps({"kind": kind, **element}) + "\n"
+
+
+def graphml_chunks(elements: Iterable[Element]) -> Iterator[str]:
+    yield '<?xml version="1.0" encoding="utf-8"?>\n'
+    yield '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">'
+    yield '<graph edgedefault="undirected">'
+    for kind, element in elements:
+        if kind == "node":
+            yield f"<node id={quoteattr(str(element['id']))} />"
+        else:
+            yield (
+                f"<edge id={quoteattr(str(element['id']))}"
+                f" source={quoteattr(str(element['source']))}"
+                f" target={quoteattr(str(element['target']))} />"
+            )
+    yield "</graph></graphml>"
+
+
+def buffered(chunks: Iterable[str], chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[bytes]:
+    """Coalesce small string pieces into ~``chunk_bytes`` sized byte chunks."""
+    parts: List[str] = []
+    size = 0
+    for piece in chunks:
+        parts.append(piece)
+        size += len(piece)
+        if size >= chunk_bytes:
+            yield "".join(parts).encode("utf-8")
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts).encode("utf-8")
+
+
+__all__ = [
+    "FILTERED_NODES_QUERY",
+    "FILTERED_RELS_QUERY",
+    "NODES_QUERY",
+    "RELS_QUERY",
+    "buffered",
+    "graphml_chunks",
+    "iter_elements",
+    "json_chunks",
+    "ndjson_chunks",
+    "query_elements",
+    "records",
+]
@@ -1,6 +1,6 @@
 """Prometheus metrics for the graph-api service."""
 
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 # Legacy request/readyz metrics retained for backwards compatibility
 GRAPH_REQS = Counter("graph_requests_total", "Graph requests", ["endpoint"])
@@ -54,3 +54,27 @@ GEO_QUERY_COUNT = Counter(
     "Compatibility counter mirroring geospatial queries by type",
     ["type"],
 )
+
+# In-memory algorithm engine projection cache
+GRAPH_PROJECTION_CACHE_REQUESTS = Counter(
+    "graph_projection_cache_requests_total",
+    "Projection cache lookups grouped by hit/miss",
+    ["result"],
+)
+
+GRAPH_PROJECTION_CACHE_EVICTIONS = Counter(
+    "graph_projection_cache_evictions_total",
+    "Projections removed from the cache grouped by reason",
+    ["reason"],
+)
+
+GRAPH_PROJECTION_CACHE_BYTES = Gauge(
+    "graph_projection_cache_bytes",
+    "Bytes held by cached graph projections",
+)
+
+GRAPH_PROJECTION_BUILD_DURATION = Histogram(
+    "graph_projection_build_duration_seconds",
+    "Time spent loading and packing a graph projection",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
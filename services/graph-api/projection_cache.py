@@ -0,0 +1,215 @@
+"""Named, memory-bounded cache of in-memory graph projections.
+
+Back-to-back ``/alg/*`` calls on the in-memory engine would otherwise reload
+every node and edge through ``get_graph_data``. Projections are cached per
+``(nodeLabel, relationshipType)`` with LRU eviction bounded by the byte size of
+the CSR arrays, a TTL, and explicit invalidation from the ingest routes.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from graph_engine import CSRGraph
+from metrics import (
+    GRAPH_PROJECTION_BUILD_DURATION,
+    GRAPH_PROJECTION_CACHE_BYTES,
+    GRAPH_PROJECTION_CACHE_EVICTIONS,
+    GRAPH_PROJECTION_CACHE_REQUESTS,
+)
+
+ProjectionKey = Tuple[Optional[str], Optional[str]]
+
+
+def projection_nbytes(graph: CSRGraph) -> int:
+    """Return the memory held by the projection's arrays."""
+
+    return int(
+        graph.node_ids.nbytes
+        + graph.src.nbytes
+        + graph.dst.nbytes
+        + graph.und_indptr.nbytes
+        + graph.und_indices.nbytes
+    )
+
+
+@dataclass
+class _Entry:
+    graph: CSRGraph
+    nbytes: int
+    built_at: float
+    build_seconds: float
+
+
+class ProjectionCache:
+    """Thread-safe LRU of :class:`CSRGraph` projections."""
+
+    def __init__(
+        self,
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[ProjectionKey, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._build_locks: Dict[ProjectionKey, threading.Lock] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "ProjectionCache":
+        return cls(
+            max_bytes=int(float(os.getenv("IT_GRAPH_PROJECTION_CACHE_MB", "512")) * 1024 * 1024),
+            ttl_seconds=float(os.getenv("IT_GRAPH_PROJECTION_TTL", "300")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl_seconds > 0
+
+    def get_or_build(
+        self,
+        node_label: Optional[str],
+        relationship_type: Optional[str],
+        builder: Callable[[], CSRGraph],
+    ) -> CSRGraph:
+        """Return the cached projection or build (and cache) it once."""
+
+        key: ProjectionKey = (node_label, relationship_type)
+        if not self.enabled:
+            return self._build(builder)[0]
+
+        graph = self._lookup(key)
+        if graph is not None:
+            return graph
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            # Another request may have built it while we waited.
+            graph = self._lookup(key, count=False)
+            if graph is not None:
+                return graph
+            with self._lock:
+                generation = self._generation
+            graph, seconds = self._build(builder)
+            with self._lock:
+                if generation == self._generation:
+                    self._store(key, graph, seconds)
+        return graph
+
+    def invalidate(
+        self,
+        labels: Optional[Iterable[str]] = None,
+        relationship_types: Optional[Iterable[str]] = None,
+    ) -> int:
+        """Drop projections that may contain the given labels or types.
+
+        Projections without a label filter see every node and are always
+        dropped; with no arguments the whole cache is cleared.
+        """
+
+        label_set = set(labels) if labels is not None else None
+        type_set = set(relationship_types) if relationship_types is not None else None
+        dropped = 0
+        with self._lock:
+            self._generation += 1
+            for key in list(self._entries):
+                node_label, rel_type = key
+                if (
+                    (label_set is None and type_set is None)
+                    or node_label is None
+                    or (label_set is not None and node_label in label_set)
+                    or (type_set is not None and rel_type in type_set)
+                ):
+                    self._drop(key, "invalidated")
+                    dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "projections": [
+                    {
+                        "nodeLabel": key[0],
+                        "relationshipType": key[1],
+                        "nodes": entry.graph.node_count,
+                        "edges": entry.graph.edge_count,
+                        "bytes": entry.nbytes,
+                        "age_seconds": now - entry.built_at,
+                        "build_seconds": entry.build_seconds,
+                    }
+                    for key, entry in self._entries.items()
+                ],
+            }
+
+    # -- internals ---------------------------------------------------------
+
+    def _build(self, builder: Callable[[], CSRGraph]) -> Tuple[CSRGraph, float]:
+        start = time.perf_counter()
+        graph = builder()
+        seconds = time.perf_counter() - start
+        GRAPH_PROJECTION_BUILD_DURATION.observe(seconds)
+        return graph, seconds
+
+    def _lookup(self, key: ProjectionKey, count: bool = True) -> Optional[CSRGraph]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry.built_at > self.ttl_seconds:
+                self._drop(key, "ttl")
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if count:
+                    self.hits += 1
+                    GRAPH_PROJECTION_CACHE_REQUESTS.labels(result="hit").inc()
+                return entry.graph
+            if count:
+                self.misses += 1
+                GRAPH_PROJECTION_CACHE_REQUESTS.labels(result="miss").inc()
+            return None
+
+    def _store(self, key: ProjectionKey, graph: CSRGraph, seconds: float) -> None:
+        nbytes = projection_nbytes(graph)
+        if key in self._entries:
+            self._drop(key, "replaced")
+        if nbytes > self.max_bytes:
+            return
+        while self._entries and self._bytes + nbytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest, "lru")
+        self._entries[key] = _Entry(graph, nbytes, self._clock(), seconds)
+        self._bytes += nbytes
+        GRAPH_PROJECTION_CACHE_BYTES.set(self._bytes)
+
+    def _drop(self, key: ProjectionKey, reason: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.nbytes
+        GRAPH_PROJECTION_CACHE_EVICTIONS.labels(reason=reason).inc()
+        GRAPH_PROJECTION_CACHE_BYTES.set(self._bytes)
+
+
+projection_cache = ProjectionCache.from_env()
+
+__all__ = ["ProjectionCache", "projection_cache", "projection_nbytes"]
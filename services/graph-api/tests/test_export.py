@@ -1,54 +1,104 @@
+import json
+import importlib
 import pytest
-import types
-import app.routes.export as export
-
-class FakeNode:
-    def __init__(self, id):
-        self.id = id
-        self.labels = []
-        self._props = {}
-    def __iter__(self):
-        return iter(self._props.items())
-    def items(self):
-        return self._props.items()
-
-class FakeRel:
-    def __init__(self, id, start, end):
-        self.id = id
-        self.type = "KNOWS"
-        self.start_node = start
-        self.end_node = end
-        self._props = {}
-    def __iter__(self):
-        return iter(self._props.items())
-    def items(self):
-        return self._props.items()
-
-class FakeGraph:
-    def __init__(self):
-        n = FakeNode(1)
-        self.nodes = [n]
-        self.relationships = [FakeRel(2, n, n)]
+
+# The app is loaded as ``graph_api_app``; patch the module its routes use.
+export = importlib.import_module("graph_api_app.routes.export")
+import graph_export
+
+NODES = [
+    {"id": 1, "labels": ["Person"], "properties": {"name": "Ada"}},
+    {"id": 2, "labels": ["Person"], "properties": {"name": "Bob & <Co>"}},
+    {"id": 3, "labels": ["Org"], "properties": {}},
+]
+RELS = [
+    {"id": 10, "type": "KNOWS", "source": 1, "target": 2, "properties": {}},
+    {"id": 11, "type": "WORKS_AT", "source": 2, "target": 3, "properties": {"since": 2020}},
+]
+
+class FakeRecord(dict):
+    def data(self):
+        return dict(self)
 
 class FakeSession:
-    def run(self, *args, **kwargs):
-        return types.SimpleNamespace(graph=lambda: FakeGraph())
+    """Answers the export queries the way Neo4j would for NODES/RELS."""
+    def __init__(self):
+        self.calls = []
+    def run(self, query, **params):
+        self.calls.append((query, params))
+        nids, eids = params.get("nids"), params.get("eids")
+        rels = [r for r in RELS if eids is None or r["id"] in eids]
+        if nids is not None:
+            rels = [r for r in rels if r["source"] in nids or r["target"] in nids]
+        if query == graph_export.NODES_QUERY:
+            rows = NODES
+        elif query == graph_export.FILTERED_NODES_QUERY:
+            wanted = set(nids) | {r["source"] for r in rels} | {r["target"] for r in rels}
+            rows = [n for n in NODES if n["id"] in wanted]
+        else:
+            rows = rels
+        return iter(FakeRecord(row) for row in rows)
     def __enter__(self):
         return self
     def __exit__(self, exc_type, exc, tb):
         pass
 
 class FakeDriver:
-    def session(self):
-        return FakeSession()
+    def __init__(self):
+        self.last = None
+    def session(self, **config):
+        self.config = config
+        self.last = FakeSession()
+        return self.last
 
 @pytest.mark.anyio
 async def test_export_roundtrip(client, monkeypatch):
     monkeypatch.setattr(export, "driver", FakeDriver())
     r = await client.get("/export/json")
     assert r.status_code == 200
-    assert r.json()["nodes"][0]["id"] == 1
+    body = r.json()
+    assert [n["id"] for n in body["nodes"]] == [1, 2, 3]
+    assert body["relationships"][1]["properties"]["since"] == 2020
     r = await client.get("/export/graphml")
     assert r.status_code == 200
     assert "<graphml" in r.text
     assert 'node id="1"' in r.text
+    assert 'edge id="11" source="2" target="3"' in r.text
+    r = await client.get("/export/ndjson")
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [line["kind"] for line in lines] == ["node"] * 3 + ["relationship"] * 2
+
+def test_export_streams_one_query_per_section(monkeypatch):
+    fake = FakeDriver()
+    monkeypatch.setattr(export, "driver", fake)
+    monkeypatch.setattr(export, "FETCH_SIZE", 2)
+    kinds = [kind for kind, _ in export._iter_elements()]
+    assert kinds == ["node"] * 3 + ["relationship"] * 2
+    assert fake.config == {"fetch_size": 2}
+    assert [query for query, _ in fake.last.calls] == [graph_export.NODES_QUERY, graph_export.RELS_QUERY]
+
+@pytest.mark.anyio
+async def test_filtered_export_includes_relationship_endpoints(client, monkeypatch):
+    fake = FakeDriver()
+    monkeypatch.setattr(export, "driver", fake)
+    r = await client.get("/export/graphml", params={"nodeIds": "1"})
+    assert r.status_code == 200
+    assert [query for query, _ in fake.last.calls] == [
+        graph_export.FILTERED_NODES_QUERY,
+        graph_export.FILTERED_RELS_QUERY,
+    ]
+    # KNOWS 1->2 is exported, so node 2 must be too; 3 is unrelated
+    assert 'edge id="10" source="1" target="2"' in r.text
+    assert 'node id="1"' in r.text and 'node id="2"' in r.text
+    assert 'node id="3"' not in r.text and 'edge id="11"' not in r.text
+
+def test_json_stream_is_valid_for_empty_and_edge_only_exports():
+    assert json.loads("".join(graph_export.json_chunks([]))) == {"nodes": [], "relationships": []}
+    chunks = graph_export.json_chunks([("relationship", RELS[0])])
+    assert json.loads("".join(chunks))["relationships"][0]["id"] == 10
+
+def test_buffered_coalesces_small_pieces():
+    chunks = list(graph_export.buffered(["ab"] * 10, chunk_bytes=8))
+    assert chunks[0] == b"abababab"
+    assert b"".join(chunks) == b"ab" * 10
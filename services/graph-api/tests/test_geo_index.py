@@ -0,0 +1,134 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from geo_index import GeoIndex, haversine_km
+
+
+def _records(lats, lons):
+    return [
+        {"node_id": f"n{i}", "name": f"Node {i}", "latitude": lat, "longitude": lon, "labels": ["Location"]}
+        for i, (lat, lon) in enumerate(zip(lats, lons))
+    ]
+
+
+def _loaded_index(n=5000, seed=3):
+    rng = np.random.default_rng(seed)
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    lons = rng.uniform(-180, 180, n)
+    index = GeoIndex(cell_degrees=1.0)
+    index.ensure_loaded(lambda: _records(lats, lons))
+    return index, lats, lons
+
+
+def test_bbox_radius_and_nearest_match_brute_force():
+    index, lats, lons = _loaded_index()
+
+    hits = {h["node_id"] for h in index.bbox(10.0, -20.0, 40.0, 35.0)}
+    expected = np.flatnonzero((lats >= 10) & (lats <= 40) & (lons >= -20) & (lons <= 35))
+    assert hits == {f"n{i}" for i in expected}
+
+    # includes the antimeridian and a pole
+    for lat, lon, radius in ((48.1, 11.6, 800.0), (-15.0, 179.5, 1500.0), (88.0, 0.0, 600.0)):
+        dist = haversine_km(lat, lon, lats, lons)
+        hits = index.within(lat, lon, radius)
+        assert {h["node_id"] for h in hits} == {f"n{i}" for i in np.flatnonzero(dist <= radius)}
+        assert [h["distance_km"] for h in hits] == sorted(h["distance_km"] for h in hits)
+
+    dist = haversine_km(48.1, 11.6, lats, lons)
+    nearest = index.nearest(48.1, 11.6, 5)
+    assert [h["node_id"] for h in nearest] == [f"n{i}" for i in np.argsort(dist)[:5]]
+    assert index.nearest(48.1, 11.6, 5, max_radius_km=1.0) == []
+
+
+def test_upserts_overlay_and_fold_into_index():
+    index, _, _ = _loaded_index(n=100)
+    index.max_overlay = 2
+
+    index.upsert("n0", 1.0, 1.0, "Moved", ["Location"])
+    index.upsert("new", 1.01, 1.01, "New", [])
+    assert {h["node_id"] for h in index.bbox(0.5, 0.5, 1.5, 1.5)} == {"n0", "new"}
+    assert index.nearest(1.0, 1.0, 1)[0]["name"] == "Moved"
+
+    index.upsert("other", 2.0, 2.0)  # third overlay entry: folded into the arrays
+    stats = index.stats()
+    assert (stats["overlay"], stats["entries"]) == (0, 102)
+    assert {h["node_id"] for h in index.bbox(0.5, 0.5, 2.5, 2.5)} == {"n0", "new", "other"}
+
+    index.remove("new")
+    assert {h["node_id"] for h in index.bbox(0.5, 0.5, 1.5, 1.5)} == {"n0"}
+
+
+def test_ttl_and_invalidation_reload():
+    now = [0.0]
+    loads = []
+    index = GeoIndex(ttl_seconds=60, clock=lambda: now[0])
+
+    def loader():
+        loads.append(1)
+        return _records([52.5], [13.4])
+
+    index.upsert("ignored", 0.0, 0.0)  # not loaded yet: nothing to keep in sync
+    index.ensure_loaded(loader)
+    index.ensure_loaded(loader)
+    assert len(loads) == 1 and index.stats()["entries"] == 1
+
+    now[0] = 61.0
+    index.ensure_loaded(loader)  # expired: rebuilt in the background
+    index._rebuild.join(5)
+    assert len(loads) == 2
+    index.ensure_loaded(loader)
+    assert len(loads) == 2
+
+    assert index.invalidate() == 1
+    assert not index.loaded
+    index.ensure_loaded(loader)
+    assert len(loads) == 3
+
+
+def test_expired_index_keeps_serving_during_rebuild():
+    now = [0.0]
+    index = GeoIndex(ttl_seconds=60, clock=lambda: now[0])
+    index.ensure_loaded(lambda: _records([52.5], [13.4]))
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        started.set()
+        assert release.wait(5)
+        return _records([52.5, 48.1], [13.4, 11.6])
+
+    now[0] = 61.0
+    index.ensure_loaded(slow_loader)
+    assert started.wait(5)
+    # the stale arrays answer while the rebuild is running, and only one runs
+    index.ensure_loaded(slow_loader)
+    assert [h["node_id"] for h in index.bbox(50.0, 10.0, 55.0, 15.0)] == ["n0"]
+    index.upsert("new", 52.6, 13.5, "New")
+
+    release.set()
+    index._rebuild.join(5)
+    assert index.loads == 2 and index.loaded
+    # the rebuilt arrays are installed and the upsert made meanwhile is kept
+    assert {h["node_id"] for h in index.bbox(40.0, 10.0, 55.0, 15.0)} == {"n0", "n1", "new"}
+
+
+def test_failed_rebuild_keeps_the_stale_index():
+    now = [0.0]
+    index = GeoIndex(ttl_seconds=60, clock=lambda: now[0])
+    index.ensure_loaded(lambda: _records([52.5], [13.4]))
+
+    def broken_loader():
+        raise RuntimeError("neo4j unavailable")
+
+    now[0] = 61.0
+    index.ensure_loaded(broken_loader)
+    index._rebuild.join(5)
+    assert index.loads == 1 and index.stats()["entries"] == 1
+
+    # the next query retries
+    index.ensure_loaded(lambda: _records([1.0, 2.0], [1.0, 2.0]))
+    index._rebuild.join(5)
+    assert index.loads == 2 and index.stats()["entries"] == 2
@@ -84,3 +84,37 @@ async def test_geo_entities_records_metrics(client):
     compat_metric = GEO_QUERY_COUNT.labels(type="bbox")._value.get()
     assert bbox_metric >= 1
     assert compat_metric >= 1
+
+
+@pytest.mark.anyio
+async def test_geo_memory_engine_serves_bbox_and_nearest_from_index(client):
+    from app import app as graph_app
+    from geo_index import geo_index
+
+    geo_index.invalidate()
+    graph_app.state.driver = DummyDriver([])
+    try:
+        response = await client.get(
+            "/geo/entities",
+            params={"south": 50.0, "west": 10.0, "north": 55.0, "east": 15.0, "engine": "memory"},
+        )
+        assert response.status_code == 200
+        assert response.json()["entities"][0]["name"] == "Berlin"
+
+        response = await client.get(
+            "/geo/entities/nearest",
+            params={"latitude": 48.1, "longitude": 11.6, "k": 1, "engine": "memory"},
+        )
+        assert response.status_code == 200
+        nearest = response.json()["entities"][0]
+        assert nearest["node_id"] == "loc:1"
+        assert 500 < nearest["distance_km"] < 510
+
+        assert (await client.get("/geo/index")).json()["entries"] == 1
+
+        response = await client.get(
+            "/geo/entities/nearest", params={"latitude": 0, "longitude": 0, "engine": "bogus"}
+        )
+        assert response.status_code == 400
+    finally:
+        geo_index.invalidate()
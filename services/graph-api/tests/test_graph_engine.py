@@ -0,0 +1,74 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import graph_engine as ge
+
+
+def _graph(edges, nodes=None):
+    if nodes is None:
+        nodes = sorted({n for edge in edges for n in edge})
+    return ge.CSRGraph.from_arrays(nodes, [s for s, _ in edges], [t for _, t in edges])
+
+
+def _two_cliques():
+    # Two 4-cliques (ids 10-13 and 20-23) joined by a single bridge 13-20
+    edges = []
+    for block in ((10, 11, 12, 13), (20, 21, 22, 23)):
+        edges += [(a, b) for i, a in enumerate(block) for b in block[i + 1 :]]
+    edges.append((13, 20))
+    return _graph(edges)
+
+
+def test_csr_drops_edges_outside_projection():
+    g = _graph([(1, 2), (2, 3), (3, 99)], nodes=[1, 2, 3])
+    assert g.node_count == 3
+    assert g.edge_count == 2
+    assert g.und_indptr.tolist() == [0, 1, 3, 4]
+
+
+def test_from_records_matches_get_graph_data_shape():
+    nodes = [{"id": 5, "labels": ["Person"]}, {"id": 7, "labels": ["Person"]}]
+    edges = [{"source": 5, "target": 7, "type": "KNOWS"}]
+    g = ge.CSRGraph.from_records(nodes, edges)
+    assert g.node_ids.tolist() == [5, 7]
+    assert g.src.tolist() == [0] and g.dst.tolist() == [1]
+
+
+def test_pagerank_sums_to_one_and_ranks_sink_first():
+    g = _graph([(1, 3), (2, 3), (3, 4), (4, 3)])
+    scores = ge.pagerank(g, iterations=100)
+    assert scores.sum() == pytest.approx(1.0)
+    top = ge.top_scores(g, scores, 2)
+    assert [item["id"] for item in top] == [3, 4]
+
+
+def test_betweenness_on_path_graph():
+    g = _graph([(1, 2), (2, 3), (3, 4), (4, 5)])
+    scores = ge.betweenness(g)
+    # Normalised undirected betweenness of a 5-node path: 0, .5, .667, .5, 0
+    assert scores.tolist() == pytest.approx([0.0, 0.5, 4 / 6, 0.5, 0.0])
+
+
+def test_betweenness_sampling_returns_scores_for_all_nodes():
+    g = _two_cliques()
+    scores = ge.betweenness(g, samples=4)
+    assert scores.shape == (8,)
+    assert scores.argmax() in (3, 4)  # one of the bridge endpoints
+
+
+@pytest.mark.parametrize("algorithm", [ge.louvain, ge.label_propagation])
+def test_community_detection_separates_cliques(algorithm):
+    g = _two_cliques()
+    items = ge.community_items(g, algorithm(g), limit=100)
+    communities = {item["id"]: item["communityId"] for item in items}
+    assert len(set(communities.values())) == 2
+    assert communities[10] == communities[13] == 10
+    assert communities[20] == communities[23] == 20
+
+
+def test_empty_graph_is_handled():
+    g = _graph([], nodes=[])
+    assert ge.pagerank(g).size == 0
+    assert ge.top_scores(g, ge.betweenness(g), 10) == []
+    assert ge.community_items(g, ge.louvain(g), 10) == []
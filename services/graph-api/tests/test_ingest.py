@@ -92,3 +92,122 @@ async def test_threat_indicator_ingest_is_idempotent(client):
 
     cache = getattr(graph_app.state, "threat_indicator_store")
     assert len(cache) == 1
+
+
+class _FakeTx:
+    def __init__(self, driver):
+        self.driver = driver
+        self.store = driver.store
+
+    def run(self, query, rows=None, feeds=None, tags=None):
+        if rows is None:
+            self.driver.shared.append((feeds, tags))
+            return type("R", (), {"consume": lambda _self: None})()
+        created = 0
+        for row in rows:
+            key = (row["source"], row["indicator"])
+            if key not in self.store:
+                created += 1
+            self.store[key] = row
+        return type("R", (), {"single": lambda _self: {"total": len(rows), "created": created}})()
+
+
+class _FakeWriteDriver:
+    def __init__(self):
+        self.store = {}
+        self.sessions = 0
+        self.statements = []
+        self.shared = []
+        self.constraint_error = None
+
+    def session(self):
+        driver = self
+
+        class _Session:
+            def __enter__(self):
+                driver.sessions += 1
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def run(self, statement):
+                driver.statements.append(statement)
+                if driver.constraint_error is not None:
+                    raise driver.constraint_error
+                return type("R", (), {"consume": lambda _self: None})()
+
+            def execute_write(self, fn):
+                return fn(_FakeTx(driver))
+
+        return _Session()
+
+
+@pytest.mark.anyio
+async def test_threat_indicator_ingest_batches_writes(client):
+    driver = _FakeWriteDriver()
+    driver.store[("Pulse Alpha", "ind-0")] = {}
+    graph_app.state.driver = driver
+    items = [
+        {"indicator": f"ind-{i % 5}", "type": "domain", "source": "Pulse Alpha", "tags": [str(i)]}
+        for i in range(7)
+    ]
+
+    try:
+        response = await client.post(
+            "/v1/ingest/threat-indicators",
+            json={"items": items, "batch_size": 2, "concurrency": 2},
+        )
+    finally:
+        graph_app.state.driver = None
+
+    assert response.status_code == 200
+    body = response.json()
+    # 7 items collapse to 5 unique indicators -> batches of 2, 2, 1
+    assert [batch["size"] for batch in body["batches"]] == [2, 2, 1]
+    assert body["processed"] == 7
+    assert body["ingested"] == 4
+    assert body["updated"] == 1
+    # constraints and the shared feed/tag merge, then one session per batch
+    assert driver.sessions == 5
+    assert len(driver.statements) == 3
+    assert all("IF NOT EXISTS" in statement for statement in driver.statements)
+    assert driver.shared == [(["Pulse Alpha"], sorted(str(i) for i in range(7)))]
+    assert driver.store[("Pulse Alpha", "ind-0")]["tags"] == ["0", "5"]
+
+    # constraints are only created once per driver
+    graph_app.state.driver = driver
+    try:
+        await client.post("/v1/ingest/threat-indicators", json={"items": items[:1]})
+    finally:
+        graph_app.state.driver = None
+    assert len(driver.statements) == 3
+
+
+@pytest.mark.anyio
+async def test_threat_ingest_survives_constraint_failures(client):
+    driver = _FakeWriteDriver()
+    driver.constraint_error = RuntimeError("existing duplicate ThreatTag nodes")
+    items = [{"indicator": "ind-1", "type": "domain", "source": "Pulse Alpha", "tags": ["x"]}]
+
+    graph_app.state.driver = driver
+    try:
+        response = await client.post("/v1/ingest/threat-indicators", json={"items": items})
+    finally:
+        graph_app.state.driver = None
+
+    # every constraint was attempted and the rows were still written
+    assert response.status_code == 200
+    assert response.json()["ingested"] == 1
+    assert len(driver.statements) == 3
+    assert ("Pulse Alpha", "ind-1") in driver.store
+
+    # the schema was not marked done, so the next ingest retries it
+    driver.constraint_error = None
+    graph_app.state.driver = driver
+    try:
+        await client.post("/v1/ingest/threat-indicators", json={"items": items})
+        await client.post("/v1/ingest/threat-indicators", json={"items": items})
+    finally:
+        graph_app.state.driver = None
+    assert len(driver.statements) == 6
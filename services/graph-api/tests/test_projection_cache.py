@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import graph_engine as ge
+from projection_cache import ProjectionCache, projection_nbytes
+
+
+def _graph():
+    return ge.CSRGraph.from_arrays([1, 2, 3], [1, 2], [2, 3])
+
+
+def test_projection_cache_hits_evicts_and_invalidates():
+    now = [0.0]
+    graph = _graph()
+    size = projection_nbytes(graph)
+    cache = ProjectionCache(max_bytes=2 * size, ttl_seconds=60, clock=lambda: now[0])
+    builds = []
+
+    def builder():
+        builds.append(1)
+        return _graph()
+
+    first = cache.get_or_build("Person", None, builder)
+    assert cache.get_or_build("Person", None, builder) is first
+    assert (cache.hits, cache.misses, len(builds)) == (1, 1, 1)
+
+    cache.get_or_build("Org", None, builder)
+    cache.get_or_build("Person", None, builder)  # refresh LRU position
+    cache.get_or_build("Host", "CONNECTS", builder)  # evicts "Org"
+    assert {p["nodeLabel"] for p in cache.stats()["projections"]} == {"Person", "Host"}
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+    assert cache.invalidate(labels=["Person"]) == 1
+    assert cache.invalidate(relationship_types=["CONNECTS"]) == 1
+    assert cache.stats()["entries"] == 0
+
+    cache.get_or_build("Person", None, builder)
+    now[0] = 61.0
+    cache.get_or_build("Person", None, builder)
+    assert len(builds) == 5  # TTL expiry forced a rebuild
+
+
+def test_disabled_cache_always_builds():
+    cache = ProjectionCache(max_bytes=0)
+    builds = []
+    cache.get_or_build(None, None, lambda: builds.append(1) or _graph())
+    cache.get_or_build(None, None, lambda: builds.append(1) or _graph())
+    assert len(builds) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidation_during_build_discards_result():
+    cache = ProjectionCache()
+
+    def builder():
+        cache.invalidate(labels=["Person"])
+        return _graph()
+
+    cache.get_or_build("Person", None, builder)
+    assert cache.stats()["entries"] == 0
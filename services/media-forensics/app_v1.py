@@ -29,6 +29,7 @@ from routers.media_forensics_v1 import (
     router as media_forensics_router,
     set_dependencies as set_media_dependencies,
 )
+from image_analysis import shutdown_pool as shutdown_media_pool
 from video_pipeline import VideoPipeline
 from metrics import VIDEO_FRAMES_PROCESSED_TOTAL  # noqa: F401 - exported for metrics discovery
 from _shared.clients.graph_ingest import GraphIngestClient
@@ -76,7 +77,7 @@ app = FastAPI(
 
 # Setup middleware
 if HAS_SHARED_STANDARDS:
-    setup_standard_middleware(app)
+    setup_standard_middleware(app, "media-forensics")
 else:
     # Fallback middleware setup
     app.add_middleware(
@@ -193,6 +194,8 @@ async def shutdown_event():
     """Service shutdown cleanup."""
     logger.info("Media Forensics service v1 shutting down...")
     await graph_ingest_client.close()
+    shutdown_media_pool()
+    video_pipeline.close()
     logger.info("Media Forensics service v1 shutdown complete")
 
 if __name__ == "__main__":
@@ -0,0 +1,200 @@
+"""CPU-bound image analysis and the process pool that runs it.
+
+EXIF extraction, perceptual hashing and the forensic checks decode the image
+with PIL and hash it with NumPy, which used to happen on the event loop
+thread. The functions here take plain bytes and return plain dicts so they
+can run in a :class:`~concurrent.futures.ProcessPoolExecutor`;
+:func:`analyze_in_pool` awaits one image and :func:`iter_bounded` drives a
+batch with at most ``limit`` uploads read and in flight at a time, yielding
+results in completion order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, TypeVar
+
+import imagehash
+from PIL import Image
+from PIL.ExifTags import TAGS
+
+POOL_WORKERS = int(os.getenv("MEDIA_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+BATCH_MAX_FILES = int(os.getenv("MEDIA_BATCH_MAX_FILES", "1000"))
+BATCH_MAX_INFLIGHT = int(os.getenv("MEDIA_BATCH_MAX_INFLIGHT", str(2 * POOL_WORKERS)))
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def extract_exif(image: Image.Image) -> Dict[str, Any]:
+    """Extract EXIF metadata from an image."""
+    exif_data = {}
+
+    try:
+        exif = image.getexif()
+        if exif:
+            for tag_id, value in exif.items():
+                tag = TAGS.get(tag_id, tag_id)
+
+                # Handle special EXIF values
+                if isinstance(value, bytes):
+                    try:
+                        value = value.decode('utf-8', errors='ignore')
+                    except Exception:
+                        value = str(value)
+                elif isinstance(value, tuple):
+                    value = list(value)
+
+                exif_data[str(tag)] = value
+    except Exception as e:
+        exif_data["extraction_error"] = str(e)
+
+    return exif_data
+
+
+def perceptual_hashes(image: Image.Image) -> Dict[str, str]:
+    """pHash, dHash and wHash as hex strings (``error_*`` placeholders on failure)."""
+    try:
+        # Convert to RGB if necessary
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return {
+            "phash": str(imagehash.phash(image)),
+            "dhash": str(imagehash.dhash(image)),
+            "whash": str(imagehash.whash(image)),
+        }
+    except Exception as e:
+        return {t: f"error_{str(e)[:16]}" for t in ("phash", "dhash", "whash")}
+
+
+def forensic_summary(image: Image.Image, image_data: bytes) -> Dict[str, Any]:
+    """File digests, basic image properties and manipulation indicators."""
+    # Compression quality estimation (for JPEG)
+    estimated_jpeg_quality = None
+    if image.format == "JPEG":
+        # Simple quality estimation based on file size vs dimensions
+        expected_size = image.width * image.height * 3  # 3 bytes per pixel for RGB
+        compression_ratio = len(image_data) / expected_size
+        estimated_jpeg_quality = min(100, int(compression_ratio * 200))
+
+    # Check for common manipulation signs
+    potential_manipulation_signs = []
+
+    # Unusual EXIF data patterns
+    exif = image.getexif()
+    if exif:
+        software = exif.get(305, "")  # Software tag
+        if any(editor in str(software).lower() for editor in ["photoshop", "gimp", "paint"]):
+            potential_manipulation_signs.append("Image editor in EXIF")
+
+    # Size inconsistencies
+    if hasattr(image, '_getexif') and image._getexif():
+        exif_dict = image._getexif()
+        if exif_dict and 40962 in exif_dict and 40963 in exif_dict:  # PixelXDimension, PixelYDimension
+            if exif_dict[40962] != image.width or exif_dict[40963] != image.height:
+                potential_manipulation_signs.append("EXIF dimensions mismatch")
+
+    return {
+        "md5_hash": hashlib.md5(image_data).hexdigest(),
+        "sha256_hash": hashlib.sha256(image_data).hexdigest(),
+        "color_depth": len(image.getbands()),
+        "has_transparency": image.mode in ("RGBA", "LA") or "transparency" in image.info,
+        "estimated_jpeg_quality": estimated_jpeg_quality,
+        "potential_manipulation_signs": potential_manipulation_signs,
+    }
+
+
+def analyze_bytes(filename: str, image_data: bytes) -> Dict[str, Any]:
+    """Full analysis of one image, shaped like ``ImageAnalysisResult``.
+
+    Decodes from memory; runs in pool workers, so it only returns plain data.
+    """
+    with Image.open(io.BytesIO(image_data)) as image:
+        return {
+            "filename": filename,
+            "file_size": len(image_data),
+            "image_format": image.format or "unknown",
+            "dimensions": {"width": image.width, "height": image.height},
+            "exif_data": extract_exif(image),
+            "perceptual_hash": perceptual_hashes(image),
+            "forensic_analysis": forensic_summary(image, image_data),
+        }
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Shared analysis pool with ``MEDIA_POOL_WORKERS`` spawned workers."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, POOL_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+async def analyze_in_pool(filename: str, image_data: bytes) -> Dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pool(), analyze_bytes, filename, image_data)
+
+
+async def iter_bounded(
+    items: Iterable[T], job: Callable[[int, T], Awaitable[R]], limit: int = BATCH_MAX_INFLIGHT
+) -> AsyncIterator[R]:
+    """Run ``job(index, item)`` with at most ``limit`` running; yield as each finishes.
+
+    Items are only started when a slot is free, so a job that reads its
+    upload first never holds more than ``limit`` files in memory.
+    """
+    pending: set = set()
+    source = iter(enumerate(items))
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max(1, limit):
+                try:
+                    index, item = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(job(index, item)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+__all__ = [
+    "BATCH_MAX_FILES",
+    "BATCH_MAX_INFLIGHT",
+    "analyze_bytes",
+    "analyze_in_pool",
+    "extract_exif",
+    "forensic_summary",
+    "get_pool",
+    "iter_bounded",
+    "perceptual_hashes",
+    "shutdown_pool",
+]
@@ -1,6 +1,6 @@
 """Prometheus collectors for the media forensics video pipeline."""
 
-from prometheus_client import Counter
+from prometheus_client import Counter, Gauge, Histogram
 
 
 VIDEO_FRAMES_PROCESSED_TOTAL = Counter(
@@ -9,6 +9,17 @@ VIDEO_FRAMES_PROCESSED_TOTAL = Counter(
     labelnames=("pipeline",),
 )
 
+VIDEO_FRAMES_PER_SECOND = Gauge(
+    "video_frames_per_second",
+    "Sampled frames analysed per second by the most recent video",
+    labelnames=("pipeline", "mode"),
+)
+
+VIDEO_PIPELINE_STAGE_SECONDS = Histogram(
+    "video_pipeline_stage_seconds",
+    "Time spent per video in each pipeline stage (decode, detect)",
+    labelnames=("pipeline", "stage"),
+)
 
-__all__ = ["VIDEO_FRAMES_PROCESSED_TOTAL"]
 
+__all__ = ["VIDEO_FRAMES_PER_SECOND", "VIDEO_FRAMES_PROCESSED_TOTAL", "VIDEO_PIPELINE_STAGE_SECONDS"]
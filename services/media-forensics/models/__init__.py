@@ -14,7 +14,9 @@ from .requests import (
     SimilarImagesResult,
     ReverseSearchResult,
     SupportedFormatsInfo,
-    ErrorDetails
+    ErrorDetails,
+    VideoAnalysisRequest,
+    VideoAnalysisResponse,
 )
 
 __all__ = [
@@ -29,5 +31,7 @@ __all__ = [
     "SimilarImagesResult",
     "ReverseSearchResult",
     "SupportedFormatsInfo",
-    "ErrorDetails"
+    "ErrorDetails",
+    "VideoAnalysisRequest",
+    "VideoAnalysisResponse",
 ]
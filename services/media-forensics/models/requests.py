@@ -138,6 +138,7 @@ class VideoAnalysisSummary(BaseModel):
     frames_processed: int = Field(..., ge=0)
     objects_detected: int = Field(..., ge=0)
     frame_interval: int = Field(..., ge=1)
+    frames_per_second: float = Field(0.0, ge=0.0, description="Sampled frames analysed per second")
 
 
 class VideoAnalysisResponse(BaseModel):
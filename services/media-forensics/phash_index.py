@@ -0,0 +1,331 @@
+"""Near-duplicate index over 64-bit perceptual hashes.
+
+``MultiIndexHash`` implements multi-index hashing (Norouzi et al.): each
+64-bit code is split into ``chunks`` 16-bit substrings and every substring
+position keeps a sorted table of ``(value, row)``. By the pigeonhole
+principle a code within Hamming distance ``r`` of the query matches it in at
+least one substring within distance ``r // chunks``, so a radius query only
+looks up the few substring values in that small ball and verifies the
+candidates with a vectorised popcount. Codes are held bit-packed in a uint64
+array; recent inserts sit in a short unsorted tail that is scanned directly
+and merged into the sorted tables once it grows past a fraction of the index.
+
+``ImageHashIndex`` keeps one ``MultiIndexHash`` per hash type (pHash, dHash,
+wHash), deduplicates images by SHA256 and persists rows to an append-only
+code file plus a JSONL metadata file, so the index survives restarts. Writers
+sharing the directory (several workers or replicas) serialise appends with an
+``flock`` and pick up each other's rows before every write and search.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import threading
+from array import array
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HASH_TYPES = ("phash", "dhash", "whash")
+CHUNK_BITS = 16
+# Beyond a per-chunk radius of 2 (radius >= 12) the probed substring ball
+# (697 values per chunk) selects more candidates than a full popcount scan
+MAX_CHUNK_RADIUS = 2
+# Below this many codes a popcount over the whole array is faster than probing
+SCAN_BELOW = 50_000
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Number of set bits of each uint64 element."""
+    values = np.asarray(values, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(values).astype(np.int64)
+    x = values - ((values >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return ((x * _H01) >> np.uint64(56)).astype(np.int64)
+
+
+def parse_hash(value: str) -> int:
+    """Parse a 16-digit hex hash as produced by ``imagehash``; raises ValueError."""
+    value = value.strip().lower()
+    if len(value) != 16:
+        raise ValueError(f"expected a 64-bit hash (16 hex digits), got {value!r}")
+    return int(value, 16)
+
+
+def _ball_masks(radius: int, bits: int = CHUNK_BITS) -> np.ndarray:
+    masks = [0]
+    for r in range(1, radius + 1):
+        for positions in combinations(range(bits), r):
+            m = 0
+            for p in positions:
+                m |= 1 << p
+            masks.append(m)
+    return np.array(masks, dtype=np.uint64)
+
+
+_BALLS = [_ball_masks(r) for r in range(MAX_CHUNK_RADIUS + 1)]
+
+
+class MultiIndexHash:
+    """Hamming-radius search over 64-bit codes."""
+
+    def __init__(self, chunks: int = 4, min_tail: int = 4096, scan_below: int = SCAN_BELOW):
+        if 64 // chunks != CHUNK_BITS or 64 % chunks:
+            raise ValueError("only 16-bit substrings (chunks=4) are supported")
+        self.chunks = chunks
+        self.min_tail = min_tail
+        self.scan_below = scan_below
+        self._codes = np.zeros(1024, dtype=np.uint64)
+        self._n = 0
+        self._indexed = 0
+        self._tables: List[np.ndarray] = []
+        self._table_rows = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def codes(self) -> np.ndarray:
+        return self._codes[: self._n]
+
+    def add_many(self, codes: Sequence[int]) -> None:
+        codes = np.asarray(codes, dtype=np.uint64)
+        need = self._n + len(codes)
+        if need > len(self._codes):
+            grown = np.zeros(max(need, 2 * len(self._codes)), dtype=np.uint64)
+            grown[: self._n] = self._codes[: self._n]
+            self._codes = grown
+        self._codes[self._n : need] = codes
+        self._n = need
+        if self._n - self._indexed > max(self.min_tail, self._indexed // 8):
+            self._merge()
+
+    def add(self, code: int) -> None:
+        self.add_many([code])
+
+    def _substrings(self, codes: np.ndarray, i: int) -> np.ndarray:
+        return (codes >> np.uint64(i * CHUNK_BITS)) & np.uint64((1 << CHUNK_BITS) - 1)
+
+    def _merge(self) -> None:
+        codes = self.codes
+        values, rows = [], []
+        for i in range(self.chunks):
+            sub = self._substrings(codes, i).astype(np.uint16)
+            order = np.argsort(sub, kind="stable")
+            values.append(sub[order])
+            rows.append(order.astype(np.int64))
+        # one flat row array (table i at offset i * n) so ranges gather in one take
+        self._tables = values
+        self._table_rows = np.concatenate(rows)
+        self._indexed = self._n
+
+    def _candidates(self, code: np.uint64, chunk_radius: int) -> np.ndarray:
+        ball = _BALLS[chunk_radius]
+        lo_parts, hi_parts = [], []
+        for i, values in enumerate(self._tables):
+            probes = (self._substrings(np.array([code]), i) ^ ball).astype(np.uint16)
+            lo_parts.append(np.searchsorted(values, probes, side="left") + i * self._indexed)
+            hi_parts.append(np.searchsorted(values, probes, side="right") + i * self._indexed)
+        lo, hi = np.concatenate(lo_parts), np.concatenate(hi_parts)
+        lengths = hi - lo
+        starts = np.repeat(lo - np.cumsum(lengths) + lengths, lengths)
+        picked = self._table_rows[starts + np.arange(lengths.sum())]
+        tail = np.arange(self._indexed, self._n, dtype=np.int64)
+        # may repeat rows matched in several substrings; deduplicated after filtering
+        return np.concatenate([picked, tail])
+
+    def search(self, code: int, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows within ``radius`` of ``code`` and their distances, nearest first."""
+        q = np.uint64(code)
+        chunk_radius = radius // self.chunks
+        if chunk_radius > MAX_CHUNK_RADIUS or self._n < self.scan_below or not self._tables:
+            rows = np.arange(self._n, dtype=np.int64)
+        else:
+            rows = self._candidates(q, chunk_radius)
+        dist = popcount64(self._codes[rows] ^ q)
+        keep = dist <= radius
+        rows, first = np.unique(rows[keep], return_index=True)
+        dist = dist[keep][first]
+        order = np.lexsort((rows, dist))
+        return rows[order], dist[order]
+
+    def scan(self, code: int, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Linear reference search; same result as :meth:`search`."""
+        dist = popcount64(self.codes ^ np.uint64(code))
+        rows = np.nonzero(dist <= radius)[0]
+        order = np.lexsort((rows, dist[rows]))
+        return rows[order], dist[rows][order]
+
+
+class ImageHashIndex:
+    """Persistent near-duplicate index of analysed images.
+
+    ``path`` holds ``codes.u64`` (one row of pHash, dHash, wHash per image)
+    and ``meta.jsonl`` (the image's SHA256 and descriptive fields); without a
+    path the index lives in memory only.
+    """
+
+    def __init__(self, path: Optional[str] = None, chunks: int = 4):
+        self.path = path
+        self._lock = threading.RLock()
+        self._indexes = {t: MultiIndexHash(chunks) for t in HASH_TYPES}
+        self._meta_offsets = array("Q")
+        self._sha_rows: Dict[bytes, int] = {}
+        self._meta_size = 0
+        self._records: List[Dict[str, Any]] = []
+        if path:
+            os.makedirs(path, exist_ok=True)
+            with self._lock, self._write_lock():
+                self._sync(recover=True)
+
+    def __len__(self) -> int:
+        return len(self._meta_offsets)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @contextlib.contextmanager
+    def _write_lock(self):
+        with open(self._file(".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _sync(self, recover: bool = False) -> None:
+        """Pick up rows appended since the last call, possibly by other processes.
+
+        Codes are written before metadata, so only rows with both a complete
+        code row and a complete metadata line are consumed. With ``recover``
+        (under the write lock) a torn metadata line or code row left by a
+        crashed writer is truncated so the two files stay aligned.
+        """
+        codes_path, meta_path = self._file("codes.u64"), self._file("meta.jsonl")
+        row_bytes = 8 * len(HASH_TYPES)
+        n = len(self._meta_offsets)
+        meta_end = os.path.getsize(meta_path) if os.path.exists(meta_path) else 0
+        codes_end = os.path.getsize(codes_path) if os.path.exists(codes_path) else 0
+        if meta_end > self._meta_size and codes_end > n * row_bytes:
+            with open(meta_path, "rb") as f:
+                f.seek(self._meta_size)
+                data = f.read(meta_end - self._meta_size)
+            lines = data[: data.rfind(b"\n") + 1].splitlines(keepends=True)
+            rows = min(len(lines), codes_end // row_bytes - n)
+            with open(codes_path, "rb") as f:
+                codes = np.fromfile(f, dtype=np.uint64, count=rows * len(HASH_TYPES), offset=n * row_bytes)
+            codes = codes.reshape(rows, len(HASH_TYPES))
+            for i, t in enumerate(HASH_TYPES):
+                self._indexes[t].add_many(codes[:, i])
+            pos = self._meta_size
+            for line in lines[:rows]:
+                self._sha_rows.setdefault(bytes.fromhex(json.loads(line)["sha256"]), len(self._meta_offsets))
+                self._meta_offsets.append(pos)
+                pos += len(line)
+            self._meta_size = pos
+        if recover and (meta_end > self._meta_size or codes_end > len(self) * row_bytes):
+            logger.warning("Hash index at %s was not closed cleanly; keeping %d complete rows", self.path, len(self))
+            for file_path, size in ((meta_path, self._meta_size), (codes_path, len(self) * row_bytes)):
+                if os.path.exists(file_path):
+                    with open(file_path, "r+b") as f:
+                        f.truncate(size)
+
+    def add(self, sha256: str, hashes: Dict[str, str], meta: Optional[Dict[str, Any]] = None) -> bool:
+        """Index an image; returns False if it is already indexed or a hash is invalid."""
+        try:
+            codes = [parse_hash(hashes[t]) for t in HASH_TYPES]
+        except (KeyError, ValueError):
+            return False
+        digest = bytes.fromhex(sha256)
+        record = dict(meta or {}, sha256=sha256, **{t: hashes[t] for t in HASH_TYPES})
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode()
+        with self._lock:
+            if not self.path:
+                if digest in self._sha_rows:
+                    return False
+                self._records.append(record)
+                offset = len(self._records) - 1
+            else:
+                with self._write_lock():
+                    # rows appended by other workers since our last look
+                    self._sync(recover=True)
+                    if digest in self._sha_rows:
+                        return False
+                    with open(self._file("codes.u64"), "ab") as f:
+                        f.write(np.array(codes, dtype=np.uint64).tobytes())
+                    with open(self._file("meta.jsonl"), "ab") as f:
+                        f.write(line)
+                    offset = self._meta_size
+                    self._meta_size += len(line)
+            for t, code in zip(HASH_TYPES, codes):
+                self._indexes[t].add(code)
+            self._sha_rows[digest] = len(self._meta_offsets)
+            self._meta_offsets.append(offset)
+        return True
+
+    def _record(self, row: int, fh) -> Dict[str, Any]:
+        if not self.path:
+            return dict(self._records[row])
+        fh.seek(self._meta_offsets[row])
+        return json.loads(fh.readline())
+
+    def search(self, hash_value: str, hash_type: str = "phash", threshold: int = 10,
+               limit: int = 50) -> List[Dict[str, Any]]:
+        """Images whose ``hash_type`` hash is within ``threshold`` bits of ``hash_value``."""
+        if hash_type not in self._indexes:
+            raise ValueError(f"unknown hash type {hash_type!r}")
+        code = parse_hash(hash_value)
+        with self._lock:
+            if self.path:
+                self._sync()
+            rows, dist = self._indexes[hash_type].search(code, threshold)
+            rows, dist = rows[:limit], dist[:limit]
+            fh = open(self._file("meta.jsonl"), "rb") if self.path else None
+            try:
+                records = [self._record(int(r), fh) for r in rows]
+            finally:
+                if fh:
+                    fh.close()
+        for record, d in zip(records, dist.tolist()):
+            record["distance"] = d
+            record["similarity_score"] = round((64 - d) / 64 * 100, 2)
+        return records
+
+
+_index: Optional[ImageHashIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_hash_index() -> ImageHashIndex:
+    """Process-wide index stored under ``MEDIA_HASH_INDEX_DIR`` (empty: in memory).
+
+    If the directory cannot be created or opened the index falls back to
+    memory, once, instead of failing every upload and search.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            path = os.getenv("MEDIA_HASH_INDEX_DIR", "/data/media_hash_index") or None
+            try:
+                _index = ImageHashIndex(path)
+            except OSError as e:
+                logger.warning("Hash index directory %s unusable (%s); keeping the index in memory", path, e)
+                _index = ImageHashIndex(None)
+        return _index
+
+
+__all__ = ["HASH_TYPES", "ImageHashIndex", "MultiIndexHash", "get_hash_index", "parse_hash", "popcount64"]
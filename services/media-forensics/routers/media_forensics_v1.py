@@ -3,7 +3,6 @@ Media Forensics v1 router for image and video analysis.
 Provides EXIF extraction, perceptual hashing, forensic analysis, and comparison.
 """
 
-import hashlib
 import json
 import logging
 import os
@@ -15,7 +14,6 @@ import imagehash
 import requests
 import numpy as np
 from PIL import Image
-from PIL.ExifTags import TAGS
 from fastapi import (
     APIRouter,
     UploadFile,
@@ -26,6 +24,7 @@ from fastapi import (
     Query,
     Depends,
 )
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # Import shared standards
@@ -52,7 +51,7 @@ except ImportError:
         size: int = 10
 
 # Import models
-from ..models import (
+from models import (
     ImageAnalysisResult,
     ComparisonResult,
     SimilarImagesResult,
@@ -65,7 +64,17 @@ from ..models import (
     VideoAnalysisRequest,
     VideoAnalysisResponse,
 )
-from ..video_pipeline import VideoPipeline
+from video_pipeline import VideoPipeline
+from image_analysis import (
+    BATCH_MAX_FILES,
+    BATCH_MAX_INFLIGHT,
+    analyze_in_pool,
+    extract_exif,
+    forensic_summary,
+    iter_bounded,
+    perceptual_hashes,
+)
+from phash_index import HASH_TYPES, get_hash_index
 from _shared.clients.graph_ingest import GraphIngestClient
 
 logger = logging.getLogger(__name__)
@@ -91,103 +100,18 @@ def set_dependencies(pipeline: VideoPipeline, ingest_client: GraphIngestClient):
 
 def extract_exif_data(image: Image.Image) -> Dict[str, Any]:
     """Extract EXIF metadata from an image."""
-    exif_data = {}
-    
-    try:
-        exif = image.getexif()
-        if exif:
-            for tag_id, value in exif.items():
-                tag = TAGS.get(tag_id, tag_id)
-                
-                # Handle special EXIF values
-                if isinstance(value, bytes):
-                    try:
-                        value = value.decode('utf-8', errors='ignore')
-                    except:
-                        value = str(value)
-                elif isinstance(value, tuple):
-                    value = list(value)
-                
-                exif_data[str(tag)] = value
-    except Exception as e:
-        exif_data["extraction_error"] = str(e)
-    
-    return exif_data
+    return extract_exif(image)
 
 
 def calculate_perceptual_hash(image: Image.Image) -> PerceptualHashes:
     """Calculate perceptual hash for similarity detection."""
-    try:
-        # Convert to RGB if necessary
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        # Calculate different types of hashes
-        phash = imagehash.phash(image)
-        dhash = imagehash.dhash(image)
-        whash = imagehash.whash(image)
-        
-        return PerceptualHashes(
-            phash=str(phash),
-            dhash=str(dhash),
-            whash=str(whash)
-        )
-    except Exception as e:
-        # Fallback hash data
-        return PerceptualHashes(
-            phash=f"error_{str(e)[:16]}",
-            dhash=f"error_{str(e)[:16]}",
-            whash=f"error_{str(e)[:16]}"
-        )
+    return PerceptualHashes(**perceptual_hashes(image))
 
 
 def forensic_analysis(image: Image.Image, image_data: bytes) -> ForensicAnalysis:
     """Perform basic forensic analysis on the image."""
     try:
-        # File hashes
-        md5_hash = hashlib.md5(image_data).hexdigest()
-        sha256_hash = hashlib.sha256(image_data).hexdigest()
-        
-        # Basic image analysis
-        color_depth = len(image.getbands())
-        has_transparency = image.mode in ("RGBA", "LA") or "transparency" in image.info
-        
-        # Compression quality estimation (for JPEG)
-        estimated_jpeg_quality = None
-        if image.format == "JPEG":
-            # Simple quality estimation based on file size vs dimensions
-            expected_size = image.width * image.height * 3  # 3 bytes per pixel for RGB
-            compression_ratio = len(image_data) / expected_size
-            estimated_jpeg_quality = min(100, int(compression_ratio * 200))
-        
-        # Check for common manipulation signs
-        potential_manipulation_signs = []
-        
-        # Unusual EXIF data patterns
-        exif = image.getexif()
-        if exif:
-            software = exif.get(305, "")  # Software tag
-            if any(editor in str(software).lower() for editor in ["photoshop", "gimp", "paint"]):
-                potential_manipulation_signs.append("Image editor in EXIF")
-        
-        # Size inconsistencies  
-        if hasattr(image, '_getexif') and image._getexif():
-            exif_dict = image._getexif()
-            if exif_dict and 40962 in exif_dict and 40963 in exif_dict:  # PixelXDimension, PixelYDimension
-                exif_width = exif_dict[40962]
-                exif_height = exif_dict[40963]
-                if exif_width != image.width or exif_height != image.height:
-                    potential_manipulation_signs.append("EXIF dimensions mismatch")
-        
-        return ForensicAnalysis(
-            md5_hash=md5_hash,
-            sha256_hash=sha256_hash,
-            color_depth=color_depth,
-            has_transparency=has_transparency,
-            estimated_jpeg_quality=estimated_jpeg_quality,
-            potential_manipulation_signs=potential_manipulation_signs
-        )
-        
+        return ForensicAnalysis(**forensic_summary(image, image_data))
     except Exception as e:
         raise_http_error("FORENSIC_ANALYSIS_FAILED", f"Forensic analysis failed: {str(e)}")
 
@@ -239,23 +163,8 @@ async def reverse_image_search(image_data: bytes) -> List[ReverseSearchResult]:
         )]
 
 
-# API Endpoints
-@router.post("/images/analyze", response_model=ImageAnalysisResult)
-async def analyze_image(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
-    include_reverse_search: bool = Query(False, description="Include reverse image search results")
-):
-    """
-    Analyze an uploaded image for forensic information.
-    
-    Extracts:
-    - EXIF metadata
-    - Perceptual hashes for similarity detection
-    - Basic forensic analysis
-    - Optional reverse image search
-    """
-    
+async def _analyze_upload(file: UploadFile, include_reverse_search: bool = False) -> ImageAnalysisResult:
+    """Validate and read one upload, analyse it in the process pool and index its hashes."""
     # Validate file
     if not file.filename:
         raise_http_error("NO_FILENAME", "No filename provided")
@@ -276,36 +185,70 @@ async def analyze_image(
                         f"File too large. Max size: {MAX_FILE_SIZE} bytes ({MAX_FILE_SIZE // (1024*1024)} MB)")
     
     try:
-        # Load image
-        with tempfile.NamedTemporaryFile() as tmp:
-            tmp.write(image_data)
-            tmp.flush()
-            
-            with Image.open(tmp.name) as image:
-                # Extract information
-                exif_data = extract_exif_data(image)
-                perceptual_hash = calculate_perceptual_hash(image)
-                forensic_data = forensic_analysis(image, image_data)
-                
-                result = ImageAnalysisResult(
-                    filename=file.filename,
-                    file_size=len(image_data),
-                    image_format=image.format or "unknown",
-                    dimensions=ImageDimensions(width=image.width, height=image.height),
-                    exif_data=exif_data,
-                    perceptual_hash=perceptual_hash,
-                    forensic_analysis=forensic_data
-                )
-                
-                # Add reverse search if requested
-                if include_reverse_search and REVERSE_SEARCH_ENABLED:
-                    search_results = await reverse_image_search(image_data)
-                    result.reverse_search_results = [res.dict() for res in search_results]
-                
-                return result
-        
+        # Decoding, EXIF, hashing and forensic checks run off the event loop
+        analysis = await analyze_in_pool(file.filename, image_data)
+        result = ImageAnalysisResult(**analysis)
     except Exception as e:
         raise_http_error("IMAGE_ANALYSIS_FAILED", f"Image analysis failed: {str(e)}")
+    
+    # Make the image findable by /images/similar
+    try:
+        get_hash_index().add(
+            analysis["forensic_analysis"]["sha256_hash"],
+            analysis["perceptual_hash"],
+            {
+                "filename": result.filename,
+                "image_format": result.image_format,
+                "width": result.dimensions.width,
+                "height": result.dimensions.height,
+            },
+        )
+    except Exception as e:
+        logger.warning("Perceptual hash indexing failed: %s", e)
+    
+    # Add reverse search if requested
+    if include_reverse_search and REVERSE_SEARCH_ENABLED:
+        search_results = await reverse_image_search(image_data)
+        result.reverse_search_results = [res.dict() for res in search_results]
+    
+    return result
+
+
+async def _batch_item(index: int, file: UploadFile, include_reverse_search: bool) -> Dict[str, Any]:
+    """Analyse one batch member; failures become result rows instead of errors."""
+    try:
+        result = await _analyze_upload(file, include_reverse_search)
+        return {"index": index, **result.dict()}
+    except HTTPException as e:
+        return {"index": index, "filename": file.filename or "unknown", "error": e.detail, "status": "failed"}
+    except Exception as e:
+        return {"index": index, "filename": file.filename or "unknown", "error": str(e), "status": "failed"}
+    finally:
+        await file.close()
+
+
+def _check_batch_size(files: List[UploadFile]) -> None:
+    if len(files) > BATCH_MAX_FILES:
+        raise_http_error("BATCH_TOO_LARGE", f"Maximum {BATCH_MAX_FILES} images per batch request")
+
+
+# API Endpoints
+@router.post("/images/analyze", response_model=ImageAnalysisResult)
+async def analyze_image(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    include_reverse_search: bool = Query(False, description="Include reverse image search results")
+):
+    """
+    Analyze an uploaded image for forensic information.
+    
+    Extracts:
+    - EXIF metadata
+    - Perceptual hashes for similarity detection
+    - Basic forensic analysis
+    - Optional reverse image search
+    """
+    return await _analyze_upload(file, include_reverse_search)
 
 
 @router.post("/images/compare", response_model=ComparisonResult)
@@ -374,19 +317,41 @@ async def compare_images(
 @router.get("/images/similar/{hash_value}", response_model=SimilarImagesResult)
 def find_similar_images(
     hash_value: str,
-    threshold: int = Query(10, description="Maximum hash distance for matches", ge=0, le=64)
+    threshold: int = Query(10, description="Maximum hash distance for matches", ge=0, le=64),
+    hash_type: str = Query("phash", description="Hash to compare: phash, dhash or whash"),
+    limit: int = Query(50, description="Maximum number of matches", ge=1, le=1000),
 ):
     """
     Find similar images by perceptual hash.
     
-    This is a placeholder for database integration.
+    Searches every image analysed by this service for hashes within
+    ``threshold`` bits (Hamming distance), nearest first.
     """
-    # This would integrate with a database of known images
+    if hash_type not in HASH_TYPES:
+        raise_http_error("INVALID_HASH_TYPE", f"Unsupported hash type {hash_type}. Supported: {list(HASH_TYPES)}")
+    
+    try:
+        index = get_hash_index()
+        matches = index.search(hash_value, hash_type=hash_type, threshold=threshold, limit=limit)
+    except ValueError as e:
+        raise_http_error("INVALID_HASH", str(e))
+    except OSError as e:
+        logger.error("Hash index unavailable: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": {
+                    "code": "HASH_INDEX_UNAVAILABLE",
+                    "message": "Perceptual hash index is not readable",
+                }
+            },
+        )
+    
     return SimilarImagesResult(
         query_hash=hash_value,
         threshold=threshold,
-        matches=[],
-        message="Image database integration not yet implemented. Consider integrating with vector database."
+        matches=matches,
+        message=f"{len(matches)} match(es) among {len(index)} indexed images"
     )
 
 
@@ -405,6 +370,7 @@ def get_supported_formats():
             "Perceptual hashing (pHash, dHash, wHash)",
             "Basic forensic analysis",
             "Image comparison with similarity scoring",
+            "Near-duplicate search over analysed images",
             "Reverse image search (if configured)",
             "Manipulation detection indicators"
         ]
@@ -419,36 +385,19 @@ async def batch_analyze_images(
     """
     Analyze multiple images in batch.
     
-    Returns paginated results with analysis for each image.
+    Images are analysed concurrently in the process pool; results are
+    returned in upload order once all have finished. Use
+    ``/images/batch/analyze/stream`` to receive each result as it completes.
     """
-    if len(files) > 10:  # Limit batch size
-        raise_http_error("BATCH_TOO_LARGE", "Maximum 10 images per batch request")
-    
-    results = []
+    _check_batch_size(files)
     
-    for file in files:
-        try:
-            # Reuse single image analysis logic
-            result = await analyze_image(
-                background_tasks=BackgroundTasks(),
-                file=file,
-                include_reverse_search=include_reverse_search
-            )
-            results.append(result.dict())
-            
-        except HTTPException as e:
-            # Include failed analysis in results
-            results.append({
-                "filename": file.filename or "unknown",
-                "error": e.detail,
-                "status": "failed"
-            })
-        except Exception as e:
-            results.append({
-                "filename": file.filename or "unknown", 
-                "error": str(e),
-                "status": "failed"
-            })
+    results = [
+        item
+        async for item in iter_bounded(
+            files, lambda i, f: _batch_item(i, f, include_reverse_search), BATCH_MAX_INFLIGHT
+        )
+    ]
+    results.sort(key=lambda item: item.pop("index"))
     
     return PaginatedResponse(
         items=results,
@@ -458,6 +407,29 @@ async def batch_analyze_images(
     )
 
 
+@router.post("/images/batch/analyze/stream")
+async def stream_batch_analyze_images(
+    files: List[UploadFile] = File(..., description="Images to analyze"),
+    include_reverse_search: bool = Query(False, description="Include reverse search for all images")
+):
+    """
+    Analyze a batch of images, streaming one NDJSON line per image as it finishes.
+    
+    At most ``MEDIA_BATCH_MAX_INFLIGHT`` uploads are read and analysed at a
+    time; each line carries the upload's ``index`` since lines arrive in
+    completion order.
+    """
+    _check_batch_size(files)
+    
+    async def lines():
+        async for item in iter_bounded(
+            files, lambda i, f: _batch_item(i, f, include_reverse_search), BATCH_MAX_INFLIGHT
+        ):
+            yield json.dumps(item, default=str) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get("/images/{sha256}/metadata")
 def get_image_metadata(sha256: str):
     """
@@ -0,0 +1,20 @@
+from pathlib import Path
+import sys
+
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = ROOT / "services" / "media-forensics"
+# the root conftest puts other services (with their own ``metrics``) first
+sys.path.insert(0, str(SERVICE_DIR))
+if str(ROOT / "services") not in sys.path:
+    sys.path.insert(0, str(ROOT / "services"))
+if Path(getattr(sys.modules.get("metrics"), "__file__", SERVICE_DIR / "metrics.py")).parent != SERVICE_DIR:
+    sys.modules.pop("metrics", None)
+
+
+def test_app_v1_imports_and_mounts_routes():
+    import app_v1  # type: ignore  # noqa: E402
+
+    paths = app_v1.app.openapi()["paths"]
+    assert "/v1/images/similar/{hash_value}" in paths
+    assert callable(app_v1.shutdown_media_pool)
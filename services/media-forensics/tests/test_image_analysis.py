@@ -0,0 +1,65 @@
+import asyncio
+import io
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = ROOT / "services" / "media-forensics"
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+import image_analysis  # type: ignore  # noqa: E402
+
+
+def _png_bytes(seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    buf = io.BytesIO()
+    Image.fromarray(rng.integers(0, 255, (48, 64, 3), dtype=np.uint8)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_analyze_bytes_matches_in_process_helpers():
+    data = _png_bytes(1)
+    result = image_analysis.analyze_bytes("a.png", data)
+    with Image.open(io.BytesIO(data)) as image:
+        assert result["perceptual_hash"] == image_analysis.perceptual_hashes(image)
+    assert result["dimensions"] == {"width": 64, "height": 48}
+    assert result["image_format"] == "PNG" and result["file_size"] == len(data)
+    assert len(result["forensic_analysis"]["sha256_hash"]) == 64
+
+
+@pytest.mark.asyncio
+async def test_analyze_in_pool_returns_worker_result(monkeypatch):
+    monkeypatch.setattr(image_analysis, "POOL_WORKERS", 2)
+    image_analysis.shutdown_pool()
+    try:
+        data = [_png_bytes(i) for i in range(4)]
+        results = await asyncio.gather(*(image_analysis.analyze_in_pool(f"{i}.png", d) for i, d in enumerate(data)))
+        assert [r["filename"] for r in results] == [f"{i}.png" for i in range(4)]
+        assert results[2] == image_analysis.analyze_bytes("2.png", data[2])
+    finally:
+        image_analysis.shutdown_pool()
+
+
+@pytest.mark.asyncio
+async def test_iter_bounded_limits_inflight_and_yields_in_completion_order():
+    running = 0
+    peak = 0
+
+    async def job(index, delay):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(delay)
+        running -= 1
+        return index
+
+    delays = [0.05, 0.01, 0.03, 0.0, 0.02, 0.01]
+    order = [i async for i in image_analysis.iter_bounded(delays, job, limit=2)]
+    assert sorted(order) == list(range(len(delays)))
+    assert order[0] == 1 and peak == 2
@@ -0,0 +1,101 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = ROOT / "services" / "media-forensics"
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from phash_index import ImageHashIndex, MultiIndexHash, popcount64  # type: ignore  # noqa: E402
+
+
+def _random_codes(n: int, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, np.iinfo(np.uint64).max, size=n, dtype=np.uint64, endpoint=True)
+
+
+def _hashes(code: int) -> dict:
+    return {t: f"{(code ^ shift) & (2**64 - 1):016x}" for t, shift in (("phash", 0), ("dhash", 1), ("whash", 2))}
+
+
+def test_popcount_matches_python():
+    codes = _random_codes(500)
+    assert popcount64(codes).tolist() == [bin(int(c)).count("1") for c in codes]
+
+
+@pytest.mark.parametrize("radius", [0, 3, 7, 10, 11, 16, 24])
+def test_multi_index_search_matches_linear_scan(radius):
+    codes = _random_codes(20_000)
+    # plant near-duplicates of one code at known distances
+    base = int(codes[0])
+    planted = [base ^ (1 << b) for b in range(5)] + [base ^ 0xFF, base ^ 0xFFFF0000FFFF]
+    index = MultiIndexHash(min_tail=1000, scan_below=0)
+    index.add_many(codes)
+    index.add_many(planted)  # stays in the unsorted tail
+    rows, dist = index.search(base, radius)
+    ref_rows, ref_dist = index.scan(base, radius)
+    assert rows.tolist() == ref_rows.tolist() and dist.tolist() == ref_dist.tolist()
+    assert dist.tolist() == sorted(dist.tolist())
+    if radius >= 1:
+        assert {len(codes) + i for i in range(5)} <= set(rows.tolist())
+
+
+def test_image_index_persists_and_deduplicates(tmp_path):
+    index = ImageHashIndex(str(tmp_path))
+    assert index.add("aa" * 32, _hashes(0x8F00FF00F0F0A5A5), {"filename": "a.jpg"})
+    assert index.add("bb" * 32, _hashes(0x8F00FF00F0F0A5A4), {"filename": "b.jpg"})
+    assert index.add("cc" * 32, _hashes(0x70FF00FF0F0F5A5A), {"filename": "c.jpg"})
+    assert not index.add("aa" * 32, _hashes(0x1234), {"filename": "again.jpg"})
+    assert not index.add("dd" * 32, {"phash": "error_x", "dhash": "0", "whash": "0"})
+
+    reopened = ImageHashIndex(str(tmp_path))
+    assert len(reopened) == 3
+    matches = reopened.search("8f00ff00f0f0a5a5", threshold=4)
+    assert [(m["filename"], m["distance"]) for m in matches] == [("a.jpg", 0), ("b.jpg", 1)]
+    assert matches[1]["similarity_score"] == pytest.approx(98.44)
+    assert reopened.search("8f00ff00f0f0a5a4", hash_type="dhash", threshold=0)[0]["filename"] == "a.jpg"
+    with pytest.raises(ValueError):
+        reopened.search("not-a-hash")
+
+
+def test_image_index_drops_torn_rows_on_load(tmp_path):
+    index = ImageHashIndex(str(tmp_path))
+    index.add("aa" * 32, _hashes(1), {"filename": "a.jpg"})
+    index.add("bb" * 32, _hashes(2), {"filename": "b.jpg"})
+    with open(tmp_path / "codes.u64", "ab") as f:
+        f.write(b"\x00" * 8)  # crash after part of a code row
+
+    reopened = ImageHashIndex(str(tmp_path))
+    assert len(reopened) == 2
+    assert reopened.add("cc" * 32, _hashes(3), {"filename": "c.jpg"})
+    assert [m["filename"] for m in ImageHashIndex(str(tmp_path)).search(f"{3:016x}", threshold=0)] == ["c.jpg"]
+
+
+def test_image_index_shares_rows_between_processes(tmp_path):
+    # two workers on the same directory: each sees the other's rows and the files stay aligned
+    first, second = ImageHashIndex(str(tmp_path)), ImageHashIndex(str(tmp_path))
+    assert first.add("aa" * 32, _hashes(1), {"filename": "a.jpg"})
+    assert second.add("bb" * 32, _hashes(2), {"filename": "b.jpg"})
+    assert not second.add("aa" * 32, _hashes(1), {"filename": "again.jpg"})
+    assert first.add("cc" * 32, _hashes(3), {"filename": "c.jpg"})
+
+    assert [m["filename"] for m in first.search(f"{2:016x}", threshold=0)] == ["b.jpg"]
+    assert [m["filename"] for m in second.search(f"{3:016x}", threshold=0)] == ["c.jpg"]
+    assert len(first) == len(second) == len(ImageHashIndex(str(tmp_path))) == 3
+    assert (tmp_path / "codes.u64").stat().st_size == 3 * 3 * 8
+
+
+def test_hash_index_falls_back_to_memory(tmp_path, monkeypatch):
+    import phash_index
+
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    monkeypatch.setenv("MEDIA_HASH_INDEX_DIR", str(blocker / "index"))
+    monkeypatch.setattr(phash_index, "_index", None)
+    index = phash_index.get_hash_index()
+    assert index.path is None and phash_index.get_hash_index() is index
+    assert index.add("aa" * 32, _hashes(1))
@@ -42,3 +42,48 @@ async def test_video_pipeline_detects_objects(tmp_path):
     assert analysis["summary"]["frames_processed"] > 0
     assert analysis["graph_entities"][0]["type"] == "Video"
     assert graph_payload["summary"]["frames_processed"] == analysis["summary"]["frames_processed"]
+
+
+@pytest.mark.asyncio
+async def test_parallel_mode_matches_serial(tmp_path):
+    frames = []
+    for idx in range(12):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        frame[5 + idx : 25 + idx, 8:28] = 255
+        frame[30:40, 40 + idx % 4 : 60] = 200
+        frames.append(Image.fromarray(frame))
+
+    video_path = tmp_path / "parallel.gif"
+    frames[0].save(video_path, save_all=True, append_images=frames[1:], duration=50, loop=0)
+    video_bytes = video_path.read_bytes()
+
+    pipeline = VideoPipeline()
+    try:
+        serial, _ = await pipeline.process_video(
+            video_bytes, "parallel.gif", frame_interval=2, min_area=20, max_frames=5, workers=0
+        )
+        parallel, _ = await pipeline.process_video(
+            video_bytes, "parallel.gif", frame_interval=2, min_area=20, max_frames=5, workers=2
+        )
+    finally:
+        pipeline.close()
+
+    assert [s["frame_index"] for s in parallel["scenes"]] == [0, 2, 4, 6, 8]
+    assert parallel["scenes"] == serial["scenes"]
+    assert parallel["graph_entities"] == serial["graph_entities"]
+    assert parallel["summary"]["frames_per_second"] > 0
+
+
+def test_pool_is_created_once_and_not_replaced():
+    from concurrent.futures import ThreadPoolExecutor
+
+    pipeline = VideoPipeline()
+    try:
+        with ThreadPoolExecutor(max_workers=8) as threads:
+            pools = list(threads.map(pipeline._get_pool, [2] * 8))
+        assert all(pool is pools[0] for pool in pools)
+        # another per-request worker count reuses the pool instead of shutting it down
+        assert pipeline._get_pool(3) is pools[0]
+        assert pools[0].submit(sum, [1, 2]).result(timeout=60) == 3
+    finally:
+        pipeline.close()
@@ -1,22 +1,45 @@
-"""Simplified video processing pipeline for the media-forensics service."""
+"""Simplified video processing pipeline for the media-forensics service.
+
+Uploads are decoded from an in-memory buffer and only the sampled frames
+(every ``frame_interval``-th, up to ``max_frames``) are seeked to and
+converted. With ``workers > 1`` contour detection runs in a process pool:
+sampled frames are decoded in chunks into one shared-memory buffer and each
+worker reads its frame from there, so pixel data is never pickled.
+"""
 
 from __future__ import annotations
 
 import asyncio
+import io
+import multiprocessing
 import os
-import tempfile
+import threading
+import time
 import uuid
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
-from PIL import Image, ImageSequence
+from PIL import Image
 
 try:  # pragma: no cover - allow direct execution in tests
-    from .metrics import VIDEO_FRAMES_PROCESSED_TOTAL
+    from .metrics import (
+        VIDEO_FRAMES_PER_SECOND,
+        VIDEO_FRAMES_PROCESSED_TOTAL,
+        VIDEO_PIPELINE_STAGE_SECONDS,
+    )
 except ImportError:  # pragma: no cover
-    from metrics import VIDEO_FRAMES_PROCESSED_TOTAL
+    from metrics import (
+        VIDEO_FRAMES_PER_SECOND,
+        VIDEO_FRAMES_PROCESSED_TOTAL,
+        VIDEO_PIPELINE_STAGE_SECONDS,
+    )
+
+
+def _default_workers() -> int:
+    return int(os.getenv("VIDEO_PIPELINE_WORKERS", "0"))
 
 
 @dataclass
@@ -25,6 +48,106 @@ class VideoPipelineConfig:
     min_area: int = 500
     max_frames: int = 240
     brightness_threshold: float = 25.0
+    # > 1: detect in that many worker processes; otherwise in the calling thread
+    workers: int = field(default_factory=_default_workers)
+
+
+def extract_components(mask: np.ndarray, min_area: int) -> List[Tuple[int, int, int, int, int]]:
+    """4-connected components of ``mask`` as ``(y0, y1, x0, x1, area)``."""
+    visited = np.zeros_like(mask, dtype=bool)
+    components: List[Tuple[int, int, int, int, int]] = []
+    height, width = mask.shape
+
+    for y, x in np.argwhere(mask):
+        if visited[y, x]:
+            continue
+        stack = [(y, x)]
+        visited[y, x] = True
+        min_y = max_y = y
+        min_x = max_x = x
+        area = 0
+
+        while stack:
+            cy, cx = stack.pop()
+            area += 1
+            min_y = min(min_y, cy)
+            max_y = max(max_y, cy)
+            min_x = min(min_x, cx)
+            max_x = max(max_x, cx)
+
+            for ny, nx in (
+                (cy - 1, cx),
+                (cy + 1, cx),
+                (cy, cx - 1),
+                (cy, cx + 1),
+            ):
+                if 0 <= ny < height and 0 <= nx < width:
+                    if mask[ny, nx] and not visited[ny, nx]:
+                        visited[ny, nx] = True
+                        stack.append((ny, nx))
+
+        if area >= max(10, min_area):
+            components.append((min_y, max_y, min_x, max_x, area))
+
+    return components
+
+
+def detect_objects(
+    frame: np.ndarray,
+    video_id: str,
+    scene_index: int,
+    min_area: int,
+    brightness_threshold: float,
+) -> List[Dict[str, Any]]:
+    """Bright-region detections of one RGB frame."""
+    gray = frame.mean(axis=2)
+    mask = gray > brightness_threshold
+    components = extract_components(mask, min_area)
+
+    detections: List[Dict[str, Any]] = []
+    frame_area = frame.shape[0] * frame.shape[1]
+    for idx, (y0, y1, x0, x1, area) in enumerate(components):
+        confidence = min(1.0, float(area) / max(frame_area, 1))
+        detections.append(
+            {
+                "object_id": f"{video_id}-obj-{scene_index}-{idx}",
+                "label": "object",
+                "confidence": round(confidence, 3),
+                "bbox": {
+                    "x": int(x0),
+                    "y": int(y0),
+                    "width": int(x1 - x0 + 1),
+                    "height": int(y1 - y0 + 1),
+                },
+            }
+        )
+    return detections
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Spawned pool workers share the parent's resource tracker, which already
+    # tracks the block; the parent unlinks it once the video is done.
+    return shared_memory.SharedMemory(name=name)
+
+
+def _detect_shared(
+    name: str,
+    shape: Tuple[int, ...],
+    slot: int,
+    video_id: str,
+    scene_index: int,
+    min_area: int,
+    brightness_threshold: float,
+) -> List[Dict[str, Any]]:
+    """Pool task: run :func:`detect_objects` on frame ``slot`` of a shared buffer."""
+    shm = _attach(name)
+    try:
+        frames = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        detections = detect_objects(frames[slot], video_id, scene_index, min_area, brightness_threshold)
+        del frames
+        return detections
+    finally:
+        shm.close()
 
 
 class VideoPipeline:
@@ -32,6 +155,29 @@ class VideoPipeline:
 
     def __init__(self, default_config: VideoPipelineConfig | None = None) -> None:
         self.default_config = default_config or VideoPipelineConfig()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_workers = 0
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self, workers: int) -> ProcessPoolExecutor:
+        # One shared pool, sized on first use (at least the configured default)
+        # and never replaced while requests may still have work in it; a
+        # per-request ``workers`` only bounds how many frames that request
+        # has in flight.
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool_workers = max(workers, self.default_config.workers)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._pool_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def close(self) -> None:
+        """Shut down the detection worker pool, if one was started (service shutdown)."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
 
     async def process_video(
         self,
@@ -41,12 +187,14 @@ class VideoPipeline:
         frame_interval: int | None = None,
         min_area: int | None = None,
         max_frames: int | None = None,
+        workers: int | None = None,
     ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         config = VideoPipelineConfig(
             frame_interval=frame_interval or self.default_config.frame_interval,
             min_area=min_area or self.default_config.min_area,
             max_frames=max_frames or self.default_config.max_frames,
             brightness_threshold=self.default_config.brightness_threshold,
+            workers=self.default_config.workers if workers is None else workers,
         )
         return await asyncio.to_thread(
             self._process_sync,
@@ -55,131 +203,177 @@ class VideoPipeline:
             config,
         )
 
-    def _process_sync(
-        self, video_bytes: bytes, filename: str, config: VideoPipelineConfig
-    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix or ".gif")
+    def _detect_serial(
+        self, img: Image.Image, sampled: List[int], video_id: str, config: VideoPipelineConfig
+    ) -> Tuple[List[List[Dict[str, Any]]], float]:
+        detections: List[List[Dict[str, Any]]] = []
+        decode_s = 0.0
+        for scene_index, frame_index in enumerate(sampled):
+            start = time.perf_counter()
+            img.seek(frame_index)
+            frame_array = np.asarray(img.convert("RGB"))
+            decode_s += time.perf_counter() - start
+            detections.append(
+                self._detect_objects(
+                    frame_array,
+                    video_id,
+                    scene_index,
+                    config.min_area,
+                    config.brightness_threshold,
+                )
+            )
+        return detections, decode_s
+
+    def _detect_parallel(
+        self, img: Image.Image, sampled: List[int], video_id: str, config: VideoPipelineConfig
+    ) -> Tuple[List[List[Dict[str, Any]]], float]:
+        pool = self._get_pool(config.workers)
+        width, height = img.size
+        chunk = min(len(sampled), 2 * config.workers)
+        shape = (chunk, height, width, 3)
+        shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        detections: List[List[Dict[str, Any]]] = []
+        decode_s = 0.0
         try:
-            temp_file.write(video_bytes)
-            temp_file.flush()
-            temp_file.close()
-
-            with Image.open(temp_file.name) as img:
-                total_frames = getattr(img, "n_frames", 1)
-                frame_duration_ms = img.info.get("duration", 100)
-                frame_interval = max(1, int(config.frame_interval))
-                max_frames = max(1, int(config.max_frames))
-                fps = 1000.0 / frame_duration_ms if frame_duration_ms else 1.0
-
-                video_id = uuid.uuid5(uuid.NAMESPACE_URL, f"{filename}-{len(video_bytes)}").hex
-                scenes: List[Dict[str, Any]] = []
-                graph_entities: List[Dict[str, Any]] = [
-                    {
-                        "type": "Video",
-                        "id": video_id,
-                        "properties": {
-                            "filename": filename,
-                            "duration_seconds": round((total_frames * frame_duration_ms) / 1000.0, 3),
-                            "total_frames": total_frames,
-                            "video_pipeline_enabled": True,
-                        },
-                    }
-                ]
-
-                processed_frames = 0
-                object_count = 0
-                for frame_index, frame in enumerate(ImageSequence.Iterator(img)):
-                    if frame_index % frame_interval != 0:
-                        continue
-                    if processed_frames >= max_frames:
-                        break
-
-                    frame_rgb = frame.convert("RGB")
-                    frame_array = np.asarray(frame_rgb)
-                    timestamp = (frame_index * frame_duration_ms) / 1000.0
-                    objects = self._detect_objects(
-                        frame_array,
+            frames = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            for start_at in range(0, len(sampled), chunk):
+                batch = sampled[start_at : start_at + chunk]
+                start = time.perf_counter()
+                for slot, frame_index in enumerate(batch):
+                    img.seek(frame_index)
+                    frames[slot] = np.asarray(img.convert("RGB"))
+                decode_s += time.perf_counter() - start
+                futures = [
+                    pool.submit(
+                        _detect_shared,
+                        shm.name,
+                        shape,
+                        slot,
                         video_id,
-                        len(scenes),
+                        start_at + slot,
                         config.min_area,
                         config.brightness_threshold,
                     )
-                    object_count += len(objects)
-
-                    scene_id = f"{video_id}-scene-{len(scenes)}"
-                    scenes.append(
-                        {
-                            "scene_id": scene_id,
-                            "frame_index": frame_index,
-                            "timestamp": round(float(timestamp), 3),
-                            "objects": objects,
-                        }
-                    )
-
-                    graph_entities.append(
-                        {
-                            "type": "VideoScene",
-                            "id": scene_id,
-                            "properties": {
-                                "frame_index": frame_index,
-                                "timestamp": round(float(timestamp), 3),
-                            },
-                            "relationships": [
-                                {"target": video_id, "type": "PART_OF"}
-                            ],
-                        }
-                    )
-
-                    for obj in objects:
-                        graph_entities.append(
-                            {
-                                "type": "VideoObject",
-                                "id": obj["object_id"],
-                                "properties": {
-                                    "label": obj["label"],
-                                    "confidence": obj["confidence"],
-                                    **{f"bbox_{k}": v for k, v in obj["bbox"].items()},
-                                },
-                                "relationships": [
-                                    {"target": scene_id, "type": "DETECTED_IN"}
-                                ],
-                            }
-                        )
-
-                    processed_frames += 1
-
-            VIDEO_FRAMES_PROCESSED_TOTAL.labels(pipeline="media_forensics").inc(
-                processed_frames
-            )
+                    for slot in range(len(batch))
+                ]
+                # the buffer is reused for the next chunk only after every read
+                detections.extend(f.result() for f in futures)
+            del frames
+        finally:
+            shm.close()
+            shm.unlink()
+        return detections, decode_s
 
-            summary = {
-                "total_frames": total_frames,
-                "frames_processed": processed_frames,
-                "objects_detected": object_count,
-                "frame_interval": frame_interval,
-            }
+    def _process_sync(
+        self, video_bytes: bytes, filename: str, config: VideoPipelineConfig
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        started = time.perf_counter()
+        with Image.open(io.BytesIO(video_bytes)) as img:
+            total_frames = getattr(img, "n_frames", 1)
+            frame_duration_ms = img.info.get("duration", 100)
+            frame_interval = max(1, int(config.frame_interval))
+            max_frames = max(1, int(config.max_frames))
+
+            video_id = uuid.uuid5(uuid.NAMESPACE_URL, f"{filename}-{len(video_bytes)}").hex
+            sampled = list(range(0, total_frames, frame_interval))[:max_frames]
+            mode = "parallel" if config.workers > 1 and len(sampled) > 1 else "serial"
+            if mode == "parallel":
+                detections, decode_s = self._detect_parallel(img, sampled, video_id, config)
+            else:
+                detections, decode_s = self._detect_serial(img, sampled, video_id, config)
+
+        elapsed = time.perf_counter() - started
+        processed_frames = len(sampled)
+        frames_per_second = processed_frames / elapsed if elapsed > 0 else 0.0
+        VIDEO_FRAMES_PROCESSED_TOTAL.labels(pipeline="media_forensics").inc(processed_frames)
+        VIDEO_FRAMES_PER_SECOND.labels(pipeline="media_forensics", mode=mode).set(frames_per_second)
+        VIDEO_PIPELINE_STAGE_SECONDS.labels(pipeline="media_forensics", stage="decode").observe(decode_s)
+        VIDEO_PIPELINE_STAGE_SECONDS.labels(pipeline="media_forensics", stage="detect").observe(
+            max(0.0, elapsed - decode_s)
+        )
 
-            analysis_payload = {
-                "video_id": video_id,
-                "filename": filename,
-                "duration_seconds": graph_entities[0]["properties"]["duration_seconds"],
-                "scenes": scenes,
-                "summary": summary,
-                "graph_entities": graph_entities,
+        graph_entities: List[Dict[str, Any]] = [
+            {
+                "type": "Video",
+                "id": video_id,
+                "properties": {
+                    "filename": filename,
+                    "duration_seconds": round((total_frames * frame_duration_ms) / 1000.0, 3),
+                    "total_frames": total_frames,
+                    "video_pipeline_enabled": True,
+                },
             }
+        ]
+        scenes: List[Dict[str, Any]] = []
+        object_count = 0
+        for scene_index, (frame_index, objects) in enumerate(zip(sampled, detections)):
+            timestamp = (frame_index * frame_duration_ms) / 1000.0
+            object_count += len(objects)
+
+            scene_id = f"{video_id}-scene-{scene_index}"
+            scenes.append(
+                {
+                    "scene_id": scene_id,
+                    "frame_index": frame_index,
+                    "timestamp": round(float(timestamp), 3),
+                    "objects": objects,
+                }
+            )
 
-            graph_payload = {
-                "video": graph_entities[0]["properties"] | {"id": video_id},
-                "scenes": scenes,
-                "summary": summary,
-            }
+            graph_entities.append(
+                {
+                    "type": "VideoScene",
+                    "id": scene_id,
+                    "properties": {
+                        "frame_index": frame_index,
+                        "timestamp": round(float(timestamp), 3),
+                    },
+                    "relationships": [
+                        {"target": video_id, "type": "PART_OF"}
+                    ],
+                }
+            )
 
-            return analysis_payload, graph_payload
-        finally:
-            try:
-                os.unlink(temp_file.name)
-            except OSError:
-                pass
+            for obj in objects:
+                graph_entities.append(
+                    {
+                        "type": "VideoObject",
+                        "id": obj["object_id"],
+                        "properties": {
+                            "label": obj["label"],
+                            "confidence": obj["confidence"],
+                            **{f"bbox_{k}": v for k, v in obj["bbox"].items()},
+                        },
+                        "relationships": [
+                            {"target": scene_id, "type": "DETECTED_IN"}
+                        ],
+                    }
+                )
+
+        summary = {
+            "total_frames": total_frames,
+            "frames_processed": processed_frames,
+            "objects_detected": object_count,
+            "frame_interval": frame_interval,
+            "frames_per_second": round(frames_per_second, 3),
+        }
+
+        analysis_payload = {
+            "video_id": video_id,
+            "filename": filename,
+            "duration_seconds": graph_entities[0]["properties"]["duration_seconds"],
+            "scenes": scenes,
+            "summary": summary,
+            "graph_entities": graph_entities,
+        }
+
+        graph_payload = {
+            "video": graph_entities[0]["properties"] | {"id": video_id},
+            "scenes": scenes,
+            "summary": summary,
+        }
+
+        return analysis_payload, graph_payload
 
     def _detect_objects(
         self,
@@ -189,68 +383,12 @@ class VideoPipeline:
         min_area: int,
         brightness_threshold: float,
     ) -> List[Dict[str, Any]]:
-        gray = frame.mean(axis=2)
-        mask = gray > brightness_threshold
-        components = self._extract_components(mask, min_area)
-
-        detections: List[Dict[str, Any]] = []
-        frame_area = frame.shape[0] * frame.shape[1]
-        for idx, (y0, y1, x0, x1, area) in enumerate(components):
-            confidence = min(1.0, float(area) / max(frame_area, 1))
-            detections.append(
-                {
-                    "object_id": f"{video_id}-obj-{scene_index}-{idx}",
-                    "label": "object",
-                    "confidence": round(confidence, 3),
-                    "bbox": {
-                        "x": int(x0),
-                        "y": int(y0),
-                        "width": int(x1 - x0 + 1),
-                        "height": int(y1 - y0 + 1),
-                    },
-                }
-            )
-        return detections
+        return detect_objects(frame, video_id, scene_index, min_area, brightness_threshold)
 
     def _extract_components(
         self, mask: np.ndarray, min_area: int
     ) -> List[Tuple[int, int, int, int, int]]:
-        visited = np.zeros_like(mask, dtype=bool)
-        components: List[Tuple[int, int, int, int, int]] = []
-        height, width = mask.shape
-
-        for y, x in np.argwhere(mask):
-            if visited[y, x]:
-                continue
-            stack = [(y, x)]
-            visited[y, x] = True
-            min_y = max_y = y
-            min_x = max_x = x
-            area = 0
-
-            while stack:
-                cy, cx = stack.pop()
-                area += 1
-                min_y = min(min_y, cy)
-                max_y = max(max_y, cy)
-                min_x = min(min_x, cx)
-                max_x = max(max_x, cx)
-
-                for ny, nx in (
-                    (cy - 1, cx),
-                    (cy + 1, cx),
-                    (cy, cx - 1),
-                    (cy, cx + 1),
-                ):
-                    if 0 <= ny < height and 0 <= nx < width:
-                        if mask[ny, nx] and not visited[ny, nx]:
-                            visited[ny, nx] = True
-                            stack.append((ny, nx))
-
-            if area >= max(10, min_area):
-                components.append((min_y, max_y, min_x, max_x, area))
-
-        return components
-
-
-__all__ = ["VideoPipeline", "VideoPipelineConfig"]
+        return extract_components(mask, min_area)
+
+
+__all__ = ["VideoPipeline", "VideoPipelineConfig", "detect_objects", "extract_components"]
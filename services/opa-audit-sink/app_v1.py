@@ -36,6 +36,9 @@ from _shared.api_standards import (
     HealthChecker,
     DependencyCheck
 )
+from _shared.obs.metrics_boot import enable_prometheus_metrics
+
+from clickhouse_writer import ClickHouseWriter
 
 # Import routers
 from routers.core_v1 import router as core_router, set_dependencies
@@ -64,8 +67,10 @@ CH_DB = os.getenv("CH_DB", "logs")
 CH_TABLE = os.getenv("CH_TABLE", "opa_decisions")
 
 # Audit Configuration
-BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))
-FLUSH_INTERVAL = int(os.getenv("AUDIT_FLUSH_INTERVAL", "60"))
+BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "5000"))  # rows per ClickHouse insert
+FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1"))  # max seconds a row stays buffered
+SPOOL_DIR = os.getenv("AUDIT_SPOOL_DIR", "/data/opa_audit_spool")
+SPOOL_MAX_BYTES = int(os.getenv("AUDIT_SPOOL_MAX_BYTES", str(512 * 1024 * 1024)))
 COMPRESSION_ENABLED = os.getenv("AUDIT_COMPRESSION", "1") == "1"
 ENCRYPTION_ENABLED = os.getenv("AUDIT_ENCRYPTION", "0") == "1"
 
@@ -204,8 +209,18 @@ async def lifespan(app: FastAPI):
                    database=CH_DB, table=CH_TABLE, 
                    batch_size=BATCH_SIZE, compression=COMPRESSION_ENABLED)
         
-        # Initialize ClickHouse client (placeholder)
-        clickhouse_client = "configured"  # Would be actual client in production
+        # Buffered writer shared by all ingest requests
+        clickhouse_client = ClickHouseWriter(
+            CH_URL,
+            CH_DB,
+            CH_TABLE,
+            max_rows=BATCH_SIZE,
+            max_age=FLUSH_INTERVAL,
+            compression=COMPRESSION_ENABLED,
+            spool_dir=SPOOL_DIR or None,
+            spool_max_bytes=SPOOL_MAX_BYTES,
+        )
+        clickhouse_client.start()
         
         # Ensure ClickHouse table exists
         try:
@@ -234,8 +249,9 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info(f"Shutting down {SERVICE_NAME}")
     
-    # Cleanup (if needed)
+    # Flush buffered rows and close the pooled connection
     if clickhouse_client:
+        await clickhouse_client.close()
         logger.info("ClickHouse client cleanup completed")
 
 
@@ -263,6 +279,9 @@ setup_standard_openapi(
     tags_metadata=get_service_tags_metadata(SERVICE_NAME)
 )
 
+# Enable Prometheus metrics if observability profile enabled
+enable_prometheus_metrics(app)
+
 # Include routers
 app.include_router(core_router, tags=["Core"])
 app.include_router(audit_router, prefix="/v1", tags=["Audit"])
@@ -0,0 +1,248 @@
+"""
+Buffered ClickHouse writer for OPA decision logs.
+
+OPA posts decision logs in small batches, and inserting each request's rows
+on its own gives ClickHouse thousands of tiny inserts (and parts) per second.
+``ClickHouseWriter`` coalesces rows from all requests into one in-memory
+buffer and flushes it as a single gzip-compressed ``JSONEachRow`` insert once
+it holds ``max_rows`` rows or its oldest row is ``max_age`` seconds old, over
+one pooled keep-alive HTTP client.
+
+Batches ClickHouse does not accept are written, already encoded, to a bounded
+on-disk spool and replayed oldest first with exponential backoff; when the
+spool exceeds ``spool_max_bytes`` the oldest batches are dropped.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+import structlog
+
+from metrics import (
+    AUDIT_BUFFER_ROWS,
+    AUDIT_FLUSH_ROWS,
+    AUDIT_FLUSH_SECONDS,
+    AUDIT_ROWS_TOTAL,
+    AUDIT_SPOOL_BYTES,
+)
+
+logger = structlog.get_logger()
+
+MAX_BACKOFF_SECONDS = 30.0
+REPLAY_BATCHES_PER_TICK = 8
+
+
+class ClickHouseWriter:
+    """Coalesce audit rows across requests into large ClickHouse inserts."""
+
+    def __init__(
+        self,
+        url: str,
+        database: str,
+        table: str,
+        *,
+        max_rows: int = 5000,
+        max_age: float = 1.0,
+        compression: bool = True,
+        spool_dir: Optional[str] = None,
+        spool_max_bytes: int = 512 * 1024 * 1024,
+        timeout: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.url = url.rstrip("/")
+        self.query = f"INSERT INTO {database}.{table} FORMAT JSONEachRow"
+        self.max_rows = max(1, max_rows)
+        self.max_age = max_age
+        self.compression = compression
+        self.spool_max_bytes = spool_max_bytes
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+            transport=transport,
+        )
+        self._buffer: List[bytes] = []
+        self._buffer_since = 0.0
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+        self.spool_dir: Optional[Path] = None
+        self._spool: Deque[Tuple[Path, int, int]] = deque()  # (path, rows, bytes)
+        self._spool_bytes = 0
+        if spool_dir:
+            try:
+                Path(spool_dir).mkdir(parents=True, exist_ok=True)
+                self.spool_dir = Path(spool_dir)
+                self._load_spool()
+            except OSError as e:
+                logger.warning("Audit spool disabled", spool_dir=spool_dir, error=str(e))
+
+    # ----- buffering -----
+
+    def add(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Buffer rows for the next flush; returns how many were accepted."""
+        encoded = [json.dumps(row, separators=(",", ":"), default=str).encode("utf-8") for row in rows]
+        if not encoded:
+            return 0
+        if not self._buffer:
+            self._buffer_since = time.monotonic()
+        self._buffer.extend(encoded)
+        AUDIT_BUFFER_ROWS.set(len(self._buffer))
+        AUDIT_ROWS_TOTAL.labels(outcome="buffered").inc(len(encoded))
+        if len(self._buffer) >= self.max_rows:
+            self._wakeup.set()
+        return len(encoded)
+
+    def _encode(self, lines: List[bytes]) -> bytes:
+        body = b"\n".join(lines) + b"\n"
+        return gzip.compress(body, compresslevel=1) if self.compression else body
+
+    async def flush(self) -> int:
+        """Send the buffered rows now; failed batches go to the spool."""
+        async with self._flush_lock:
+            lines, self._buffer = self._buffer, []
+            AUDIT_BUFFER_ROWS.set(0)
+            if not lines:
+                return 0
+            body = await asyncio.to_thread(self._encode, lines)
+            # while ClickHouse is backing off, go straight to the spool
+            if time.monotonic() >= self._retry_at and await self._post(body, self.compression, len(lines), "buffer"):
+                return len(lines)
+            await asyncio.to_thread(self._spool_write, body, len(lines))
+            return len(lines)
+
+    async def _post(self, body: bytes, compressed: bool, rows: int, source: str) -> bool:
+        headers = {"Content-Type": "application/x-ndjson"}
+        if compressed:
+            headers["Content-Encoding"] = "gzip"
+        start = time.perf_counter()
+        try:
+            response = await self._client.post(
+                f"{self.url}/", params={"query": self.query}, content=body, headers=headers
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            AUDIT_FLUSH_SECONDS.labels(source=source, result="error").observe(time.perf_counter() - start)
+            self._failures += 1
+            backoff = min(MAX_BACKOFF_SECONDS, 2.0 ** self._failures)
+            self._retry_at = time.monotonic() + backoff
+            logger.error("ClickHouse insert failed", error=str(e), rows_count=rows, retry_in=backoff)
+            return False
+        AUDIT_FLUSH_SECONDS.labels(source=source, result="ok").observe(time.perf_counter() - start)
+        AUDIT_FLUSH_ROWS.observe(rows)
+        AUDIT_ROWS_TOTAL.labels(outcome="inserted").inc(rows)
+        self._failures = 0
+        self._retry_at = 0.0
+        return True
+
+    # ----- spool -----
+
+    def _load_spool(self) -> None:
+        for path in sorted(self.spool_dir.glob("*.jsonl*")):
+            if path.suffix == ".tmp":
+                path.unlink(missing_ok=True)
+                continue
+            rows = int(path.name.split("-", 2)[1])
+            size = path.stat().st_size
+            self._spool.append((path, rows, size))
+            self._spool_bytes += size
+        AUDIT_SPOOL_BYTES.set(self._spool_bytes)
+        if self._spool:
+            logger.info("Audit spool loaded", batches=len(self._spool), bytes=self._spool_bytes)
+
+    def _spool_write(self, body: bytes, rows: int) -> None:
+        if self.spool_dir is None:
+            AUDIT_ROWS_TOTAL.labels(outcome="dropped").inc(rows)
+            logger.error("Dropping audit rows, no spool configured", rows_count=rows)
+            return
+        suffix = ".jsonl.gz" if self.compression else ".jsonl"
+        path = self.spool_dir / f"{time.time_ns():020d}-{rows}-batch{suffix}"
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+        self._spool.append((path, rows, len(body)))
+        self._spool_bytes += len(body)
+        AUDIT_ROWS_TOTAL.labels(outcome="spooled").inc(rows)
+        while self._spool_bytes > self.spool_max_bytes and len(self._spool) > 1:
+            old, old_rows, old_size = self._spool.popleft()
+            old.unlink(missing_ok=True)
+            self._spool_bytes -= old_size
+            AUDIT_ROWS_TOTAL.labels(outcome="dropped").inc(old_rows)
+            logger.warning("Audit spool full, dropped oldest batch", rows_count=old_rows)
+        AUDIT_SPOOL_BYTES.set(self._spool_bytes)
+
+    async def replay_spool(self, max_batches: int = REPLAY_BATCHES_PER_TICK) -> int:
+        """Re-send spooled batches, oldest first; stops at the first failure."""
+        replayed = 0
+        while self._spool and replayed < max_batches and time.monotonic() >= self._retry_at:
+            path, rows, size = self._spool[0]
+            try:
+                body = await asyncio.to_thread(path.read_bytes)
+            except OSError:
+                body = None
+            if body is not None and not await self._post(body, path.suffix == ".gz", rows, "spool"):
+                break
+            self._spool.popleft()
+            await asyncio.to_thread(path.unlink, missing_ok=True)
+            self._spool_bytes -= size
+            AUDIT_SPOOL_BYTES.set(self._spool_bytes)
+            replayed += 1
+        return replayed
+
+    # ----- lifecycle -----
+
+    async def _run(self) -> None:
+        while True:
+            if self._buffer:
+                timeout = max(0.0, self._buffer_since + self.max_age - time.monotonic())
+            else:
+                timeout = self.max_age
+            if self._spool:
+                timeout = min(timeout, max(0.0, self._retry_at - time.monotonic()) or self.max_age)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                if self._buffer and (
+                    len(self._buffer) >= self.max_rows
+                    or time.monotonic() - self._buffer_since >= self.max_age
+                ):
+                    await self.flush()
+                if self._spool:
+                    await self.replay_spool()
+            except Exception as e:  # keep the flusher alive
+                logger.error("Audit flush loop error", error=str(e))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the flusher and make a last attempt to insert buffered rows."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._retry_at = 0.0
+        await self.flush()
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffer_rows": len(self._buffer),
+            "spool_batches": len(self._spool),
+            "spool_rows": sum(rows for _, rows, _ in self._spool),
+            "spool_bytes": self._spool_bytes,
+            "consecutive_failures": self._failures,
+        }
@@ -0,0 +1,44 @@
+"""Prometheus collectors for the OPA audit sink."""
+
+from __future__ import annotations
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+AUDIT_BUFFER_ROWS = Gauge(
+    "audit_buffer_rows",
+    "Decision log rows buffered in memory awaiting a ClickHouse flush",
+)
+
+AUDIT_SPOOL_BYTES = Gauge(
+    "audit_spool_bytes",
+    "Size of the on-disk spool of batches ClickHouse did not accept",
+)
+
+AUDIT_FLUSH_SECONDS = Histogram(
+    "audit_flush_seconds",
+    "Latency of ClickHouse insert requests",
+    labelnames=("source", "result"),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+AUDIT_FLUSH_ROWS = Histogram(
+    "audit_flush_rows",
+    "Rows per ClickHouse insert",
+    buckets=(1, 10, 100, 500, 1000, 5000, 10000, 50000, 100000),
+)
+
+AUDIT_ROWS_TOTAL = Counter(
+    "audit_rows_total",
+    "Decision log rows by outcome (buffered, inserted, spooled, dropped)",
+    labelnames=("outcome",),
+)
+
+
+__all__ = [
+    "AUDIT_BUFFER_ROWS",
+    "AUDIT_SPOOL_BYTES",
+    "AUDIT_FLUSH_SECONDS",
+    "AUDIT_FLUSH_ROWS",
+    "AUDIT_ROWS_TOTAL",
+]
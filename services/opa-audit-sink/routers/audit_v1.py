@@ -109,32 +109,16 @@ def _transform_opa_log(log_entry: Dict[str, Any]) -> Dict[str, Any]:
 
 
 async def _insert_to_clickhouse(rows: List[Dict[str, Any]]) -> Dict[str, int]:
-    """Insert audit log rows to ClickHouse."""
+    """Hand audit log rows to the buffered ClickHouse writer.
+
+    Rows are coalesced with other requests and inserted in the background;
+    "inserted" counts rows accepted into the buffer.
+    """
     if not rows:
         return {"inserted": 0, "failed": 0}
     
-    ch_url = audit_config.get("clickhouse_url", "http://localhost:8123")
-    ch_db = audit_config.get("database", "logs")
-    ch_table = audit_config.get("table", "opa_decisions")
-    
-    # Prepare JSONEachRow format
-    data = "\n".join(json.dumps(row, separators=(",", ":")) for row in rows)
-    query = f"INSERT INTO {ch_db}.{ch_table} FORMAT JSONEachRow"
-    
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{ch_url}/?query={query}",
-                content=data,
-                headers={"Content-Type": "application/json"}
-            )
-            response.raise_for_status()
-        
-        return {"inserted": len(rows), "failed": 0}
-        
-    except Exception as e:
-        logger.error("Failed to insert to ClickHouse", error=str(e), rows_count=len(rows))
-        return {"inserted": 0, "failed": len(rows)}
+    accepted = clickhouse_client.add(rows)
+    return {"inserted": accepted, "failed": len(rows) - accepted}
 
 
 # ===== AUDIT LOG INGESTION =====
@@ -592,10 +576,12 @@ async def get_comprehensive_health() -> AuditHealthStatus:
         # Determine overall health
         overall_health = "healthy" if clickhouse_health["status"] == "healthy" else "degraded"
         
-        # Mock additional health metrics (would be real in production)
+        writer_stats = clickhouse_client.stats() if hasattr(clickhouse_client, "stats") else {}
         ingestion_health = {
-            "status": "healthy",
-            "queue_size": 0,
+            "status": "degraded" if writer_stats.get("spool_batches") else "healthy",
+            "queue_size": writer_stats.get("buffer_rows", 0),
+            "spooled_rows": writer_stats.get("spool_rows", 0),
+            "spool_bytes": writer_stats.get("spool_bytes", 0),
             "processing_rate": "1000 logs/min",
             "last_processed": datetime.utcnow().isoformat()
         }
@@ -0,0 +1,104 @@
+"""
+Tests for the buffered ClickHouse writer: coalescing, flush triggers,
+compression and the on-disk spool.
+"""
+
+import asyncio
+import gzip
+import json
+
+import httpx
+import pytest
+
+import sys
+from pathlib import Path
+
+# Add service to path
+SERVICE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SERVICE_DIR))
+if Path(getattr(sys.modules.get("metrics"), "__file__", SERVICE_DIR / "metrics.py")).parent != SERVICE_DIR:
+    sys.modules.pop("metrics", None)
+
+from clickhouse_writer import ClickHouseWriter
+
+
+class FakeClickHouse:
+    """httpx transport recording inserted rows; ``down`` makes it fail."""
+
+    def __init__(self):
+        self.down = False
+        self.inserts = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.down:
+            return httpx.Response(503, text="unavailable")
+        body = request.content
+        if request.headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        assert request.url.params["query"] == "INSERT INTO logs.opa_decisions FORMAT JSONEachRow"
+        self.inserts.append([json.loads(line) for line in body.splitlines()])
+        return httpx.Response(200)
+
+
+def _writer(server, **kwargs):
+    return ClickHouseWriter(
+        "http://clickhouse:8123", "logs", "opa_decisions",
+        transport=httpx.MockTransport(server), **kwargs
+    )
+
+
+def _rows(start, count):
+    return [{"decision_id": f"d{i}", "allowed": 1} for i in range(start, start + count)]
+
+
+@pytest.mark.asyncio
+async def test_coalesces_requests_and_flushes_by_size_and_age():
+    server = FakeClickHouse()
+    writer = _writer(server, max_rows=5, max_age=0.05)
+    writer.start()
+    try:
+        writer.add(_rows(0, 3))
+        writer.add(_rows(3, 3))  # crosses max_rows
+        await asyncio.sleep(0.01)
+        assert [len(batch) for batch in server.inserts] == [6]
+
+        writer.add(_rows(6, 2))
+        await asyncio.sleep(0.15)  # flushed by age
+        assert [len(batch) for batch in server.inserts] == [6, 2]
+    finally:
+        await writer.close()
+    assert [row["decision_id"] for batch in server.inserts for row in batch] == [f"d{i}" for i in range(8)]
+
+
+@pytest.mark.asyncio
+async def test_spools_while_clickhouse_is_down_and_replays(tmp_path):
+    server = FakeClickHouse()
+    server.down = True
+    writer = _writer(server, max_rows=100, spool_dir=str(tmp_path))
+    writer.add(_rows(0, 4))
+    await writer.flush()
+    writer.add(_rows(4, 2))
+    await writer.flush()  # backing off: spooled without a request
+    assert writer.stats()["spool_rows"] == 6 and len(list(tmp_path.iterdir())) == 2
+    await writer.close()
+
+    # a new writer picks the spool up from disk
+    server.down = False
+    writer = _writer(server, spool_dir=str(tmp_path))
+    assert await writer.replay_spool() == 2
+    await writer.close()
+    assert [len(batch) for batch in server.inserts] == [4, 2]
+    assert writer.stats()["spool_bytes"] == 0 and not list(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_spool_drops_oldest_batches_past_its_size_limit(tmp_path):
+    server = FakeClickHouse()
+    server.down = True
+    writer = _writer(server, compression=False, spool_dir=str(tmp_path), spool_max_bytes=200)
+    for start in range(0, 30, 5):
+        writer.add(_rows(start, 5))
+        await writer.flush()
+    stats = writer.stats()
+    assert stats["spool_bytes"] <= 200 and 0 < stats["spool_batches"] < 6
+    await writer.close()
@@ -267,8 +267,13 @@ async def shutdown_event():
     """Service shutdown cleanup."""
     logger.info("Performance Monitor service v1 shutting down...")
     
-    # Cleanup Redis connection
+    # Flush queued metrics, then close the Redis connection
     from routers.performance_monitor_v1 import monitor
+    if monitor.redis_writer:
+        try:
+            await monitor.redis_writer.close()
+        except Exception as e:
+            logger.warning(f"Redis metric flush failed: {e}")
     if monitor.redis:
         try:
             await monitor.redis.close()
@@ -5,7 +5,7 @@ Monitors API response times, memory usage, and system performance metrics.
 Provides alerts and optimization recommendations.
 """
 
-from fastapi import FastAPI, BackgroundTasks, Request, Response
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Request, Response
 from fastapi.middleware.base import BaseHTTPMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
@@ -23,6 +23,9 @@ import numpy as np
 from enum import Enum
 import uuid
 
+from redis_writer import RedisWriteBehind
+from timeseries import TimeSeriesStore
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -93,29 +96,42 @@ class PerformanceAnalyzer:
             }
         }
     
+    @staticmethod
+    def _slope(values: np.ndarray) -> float:
+        """Least-squares slope of values against their index (as polyfit deg=1)"""
+        x = np.arange(len(values), dtype=np.float64)
+        x -= x.mean()
+        return float(np.dot(x, values - values.mean()) / np.dot(x, x))
+    
     def analyze_response_time_trend(self, metrics: List[PerformanceMetric]) -> Dict[str, Any]:
         """Analyze response time trends"""
         if not metrics:
             return {"trend": "no_data", "recommendation": "Need more data points"}
         
-        response_times = [m.value for m in metrics if m.metric_type == MetricType.RESPONSE_TIME]
+        return self.analyze_response_time_values(np.fromiter(
+            (m.value for m in metrics if m.metric_type == MetricType.RESPONSE_TIME), dtype=np.float64
+        ))
+    
+    def analyze_response_time_values(self, response_times: np.ndarray) -> Dict[str, Any]:
+        """Analyze a column of response times (ms), oldest first"""
+        if len(response_times) == 0:
+            return {"trend": "no_data", "recommendation": "Need more data points"}
         if len(response_times) < 5:
             return {"trend": "insufficient_data", "recommendation": "Collect more data points"}
         
         # Calculate trend
-        x = np.arange(len(response_times))
-        slope = np.polyfit(x, response_times, 1)[0]
+        slope = self._slope(response_times)
         
-        avg_response_time = np.mean(response_times)
-        p95_response_time = np.percentile(response_times, 95)
+        avg_response_time = float(response_times.mean())
+        p95_response_time = float(np.percentile(response_times, 95))
         
         analysis = {
             "trend": "improving" if slope < -10 else "degrading" if slope > 10 else "stable",
             "slope": slope,
             "average_ms": avg_response_time,
             "p95_ms": p95_response_time,
-            "min_ms": min(response_times),
-            "max_ms": max(response_times),
+            "min_ms": float(response_times.min()),
+            "max_ms": float(response_times.max()),
             "recommendation": self._get_response_time_recommendation(avg_response_time, p95_response_time, slope)
         }
         
@@ -138,15 +154,18 @@ class PerformanceAnalyzer:
     
     def analyze_memory_pattern(self, metrics: List[PerformanceMetric]) -> Dict[str, Any]:
         """Analyze memory usage patterns"""
-        memory_metrics = [m for m in metrics if m.metric_type == MetricType.MEMORY_USAGE]
-        if not memory_metrics:
+        return self.analyze_memory_values(np.fromiter(
+            (m.value for m in metrics if m.metric_type == MetricType.MEMORY_USAGE), dtype=np.float64
+        ))
+    
+    def analyze_memory_values(self, memory_values: np.ndarray) -> Dict[str, Any]:
+        """Analyze a column of memory usage percentages, oldest first"""
+        if len(memory_values) == 0:
             return {"status": "no_data"}
         
-        memory_values = [m.value for m in memory_metrics]
-        
         # Check for memory leak pattern (steadily increasing memory)
         if len(memory_values) >= 10:
-            recent_trend = np.polyfit(range(len(memory_values[-10:])), memory_values[-10:], 1)[0]
+            recent_trend = self._slope(memory_values[-10:])
             if recent_trend > 1:  # Memory increasing by more than 1% per measurement
                 return {
                     "status": "memory_leak_suspected",
@@ -154,8 +173,8 @@ class PerformanceAnalyzer:
                     "recommendation": "Investigate potential memory leaks, check for unreleased resources"
                 }
         
-        avg_memory = np.mean(memory_values)
-        max_memory = max(memory_values)
+        avg_memory = float(memory_values.mean())
+        max_memory = float(memory_values.max())
         
         return {
             "status": "normal" if max_memory < 80 else "high_usage",
@@ -183,41 +202,47 @@ class PerformanceMonitor:
         self.metrics_buffer = deque(maxlen=10000)  # Keep last 10k metrics in memory
         self.alerts_buffer = deque(maxlen=1000)   # Keep last 1k alerts in memory
         self.analyzer = PerformanceAnalyzer()
-        self.service_metrics = defaultdict(lambda: defaultdict(list))  # service -> metric_type -> values
+        self.store = TimeSeriesStore()  # service -> metric_type -> timestamp/value columns + rollups
+        # Last 1000 full metric records per service/type, for the metrics listing
+        self.service_metrics = defaultdict(lambda: defaultdict(lambda: deque(maxlen=1000)))
         self.alert_cooldowns = {}  # Prevent alert spam
+        self.redis_writer: Optional[RedisWriteBehind] = None  # batched, write-behind Redis persistence
         
     async def initialize_redis(self):
         """Initialize Redis connection"""
         try:
             self.redis = await aioredis.from_url("redis://localhost:6379")
+            self.redis_writer = RedisWriteBehind(
+                self.redis,
+                encode=lambda record: json.dumps(asdict(record), default=str),
+                batch_size=int(os.getenv("PERF_REDIS_BATCH_SIZE", "500")),
+                flush_interval=float(os.getenv("PERF_REDIS_FLUSH_INTERVAL", "1.0")),
+                max_pending=int(os.getenv("PERF_REDIS_MAX_PENDING", "50000")),
+            )
+            self.redis_writer.start()
             logger.info("Connected to Redis for performance monitoring")
         except Exception as e:
             logger.warning(f"Redis connection failed: {e}")
     
+    async def close(self):
+        """Flush pending Redis writes and close the connection"""
+        if self.redis_writer:
+            await self.redis_writer.close()
+        if self.redis:
+            await self.redis.close()
+    
     async def record_metric(self, metric: PerformanceMetric):
         """Record a performance metric"""
         # Add to buffer
         self.metrics_buffer.append(metric)
         
         # Add to service-specific tracking
+        self.store.record(metric.service_name, metric.metric_type, metric.timestamp.timestamp(), metric.value)
         self.service_metrics[metric.service_name][metric.metric_type].append(metric)
         
-        # Keep only recent metrics (last 1000 per service/type)
-        if len(self.service_metrics[metric.service_name][metric.metric_type]) > 1000:
-            self.service_metrics[metric.service_name][metric.metric_type] = \
-                self.service_metrics[metric.service_name][metric.metric_type][-1000:]
-        
-        # Store in Redis if available
-        if self.redis:
-            try:
-                await self.redis.lpush(
-                    f"metrics:{metric.service_name}:{metric.metric_type}",
-                    json.dumps(asdict(metric), default=str)
-                )
-                # Keep only last 1000 metrics per service/type in Redis
-                await self.redis.ltrim(f"metrics:{metric.service_name}:{metric.metric_type}", 0, 999)
-            except Exception as e:
-                logger.warning(f"Failed to store metric in Redis: {e}")
+        # Queue for Redis; the writer keeps the last 1000 metrics per service/type
+        if self.redis_writer:
+            self.redis_writer.submit(f"metrics:{metric.service_name}:{metric.metric_type}", metric)
         
         # Check for alerts
         await self._check_alert_conditions(metric)
@@ -280,13 +305,9 @@ class PerformanceMonitor:
         """Send performance alert"""
         self.alerts_buffer.append(alert)
         
-        # Store in Redis
-        if self.redis:
-            try:
-                await self.redis.lpush("alerts:performance", json.dumps(asdict(alert), default=str))
-                await self.redis.ltrim("alerts:performance", 0, 999)
-            except Exception as e:
-                logger.warning(f"Failed to store alert in Redis: {e}")
+        # Queue for Redis
+        if self.redis_writer:
+            self.redis_writer.submit("alerts:performance", alert)
         
         # Log alert
         logger.warning(f"Performance Alert [{alert.level}]: {alert.message}")
@@ -295,29 +316,40 @@ class PerformanceMonitor:
     
     async def get_service_summary(self, service_name: str, hours: int = 24) -> Dict[str, Any]:
         """Get performance summary for a service"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        cutoff = (datetime.now() - timedelta(hours=hours)).timestamp()
         
-        service_metrics = []
-        for metric_type, metrics in self.service_metrics[service_name].items():
-            recent_metrics = [m for m in metrics if m.timestamp >= cutoff_time]
-            service_metrics.extend(recent_metrics)
-        
-        if not service_metrics:
+        window_stats = {
+            metric_type: self.store.series(service_name, metric_type).stats_since(cutoff)
+            for metric_type in self.store.metric_types(service_name)
+        }
+        if not any(stats["count"] for stats in window_stats.values()):
             return {"service_name": service_name, "status": "no_data"}
         
         # Analyze different metric types
-        response_time_analysis = self.analyzer.analyze_response_time_trend(
-            [m for m in service_metrics if m.metric_type == MetricType.RESPONSE_TIME]
+        response_time_analysis = self.analyzer.analyze_response_time_values(
+            self._window_values(service_name, MetricType.RESPONSE_TIME, cutoff)
         )
+        response_stats = window_stats.get(MetricType.RESPONSE_TIME)
+        if response_stats and response_stats["source"] != "raw" and "average_ms" in response_time_analysis:
+            # Older than the raw ring: mean/min/max from the rollups (which
+            # include the whole first bucket, see ``approximate``), percentile
+            # and trend over the retained raw samples
+            response_time_analysis.update(
+                average_ms=response_stats["mean"],
+                min_ms=response_stats["min"],
+                max_ms=response_stats["max"],
+            )
         
-        memory_analysis = self.analyzer.analyze_memory_pattern(
-            [m for m in service_metrics if m.metric_type == MetricType.MEMORY_USAGE]
+        memory_analysis = self.analyzer.analyze_memory_values(
+            self._window_values(service_name, MetricType.MEMORY_USAGE, cutoff)
         )
         
         # Calculate error rate
-        total_requests = len([m for m in service_metrics if m.metric_type == MetricType.RESPONSE_TIME])
-        error_requests = len([m for m in service_metrics if m.metric_type == MetricType.ERROR_RATE])
+        total_requests = window_stats.get(MetricType.RESPONSE_TIME, {"count": 0})["count"]
+        error_requests = window_stats.get(MetricType.ERROR_RATE, {"count": 0})["count"]
         error_rate = (error_requests / total_requests * 100) if total_requests > 0 else 0
+        covered = [stats for stats in window_stats.values() if stats["count"]]
+        window_start = datetime.fromtimestamp(min(stats["window_start"] for stats in covered))
         
         return {
             "service_name": service_name,
@@ -326,9 +358,37 @@ class PerformanceMonitor:
             "memory": memory_analysis,
             "error_rate_percent": error_rate,
             "total_requests": total_requests,
-            "recommendations": self._generate_service_recommendations(response_time_analysis, memory_analysis, error_rate)
+            "recommendations": self._generate_service_recommendations(response_time_analysis, memory_analysis, error_rate),
+            "approximate": any(stats["source"] != "raw" for stats in covered),
+            "window_start": window_start.isoformat(),
         }
     
+    def _window_values(self, service_name: str, metric_type: MetricType, since: float) -> np.ndarray:
+        series = self.store.series(service_name, metric_type)
+        return series.window(since)[1] if series is not None else np.empty(0)
+    
+    def get_rollups(self, service_name: str, metric_type: MetricType,
+                    resolution: str = "1m", hours: int = 24) -> List[Dict[str, Any]]:
+        """Pre-aggregated buckets (count/avg/min/max) for a service metric"""
+        series = self.store.series(service_name, metric_type)
+        if series is None:
+            return []
+        since = (datetime.now() - timedelta(hours=hours)).timestamp()
+        buckets = series.rollups[resolution].buckets(since)
+        return [
+            {
+                "start": datetime.fromtimestamp(start).isoformat(),
+                "count": int(count),
+                "avg": total / count,
+                "min": low,
+                "max": high,
+            }
+            for start, count, total, low, high in zip(
+                buckets["start"].tolist(), buckets["count"].tolist(), buckets["sum"].tolist(),
+                buckets["min"].tolist(), buckets["max"].tolist()
+            )
+        ]
+    
     def _generate_service_recommendations(self, response_analysis: Dict, memory_analysis: Dict, error_rate: float) -> List[str]:
         """Generate optimization recommendations for a service"""
         recommendations = []
@@ -366,6 +426,7 @@ class PerformanceMiddleware(BaseHTTPMiddleware):
         self.monitor = monitor
     
     async def dispatch(self, request: Request, call_next):
+        # record_metric only touches memory; Redis writes are flushed by monitor.redis_writer
         # Start timing
         start_time = time.time()
         request_id = str(uuid.uuid4())
@@ -392,7 +453,7 @@ class PerformanceMiddleware(BaseHTTPMiddleware):
                 metadata={
                     "status_code": response.status_code,
                     "user_agent": request.headers.get("user-agent"),
-                    "request_size": len(await request.body()) if hasattr(request, "body") else 0
+                    "request_size": int(request.headers.get("content-length") or 0)
                 }
             ))
             
@@ -525,6 +586,10 @@ async def startup_event():
     # Start system metrics collection in background
     asyncio.create_task(system_collector.start_collection())
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await monitor.close()
+
 # Add performance monitoring middleware
 app.add_middleware(PerformanceMiddleware, monitor=monitor)
 
@@ -561,9 +626,17 @@ async def get_recent_alerts(limit: int = 50):
 @app.get("/metrics/{service_name}/{metric_type}")
 async def get_metrics(service_name: str, metric_type: MetricType, limit: int = 100):
     """Get recent metrics for a service and metric type"""
-    metrics = monitor.service_metrics[service_name][metric_type][-limit:]
+    metrics = list(monitor.service_metrics[service_name][metric_type])[-limit:]
     return [asdict(metric) for metric in metrics]
 
+@app.get("/metrics/{service_name}/{metric_type}/rollups")
+async def get_metric_rollups(service_name: str, metric_type: MetricType,
+                             resolution: str = "1m", hours: int = 24):
+    """Get pre-aggregated 1m/5m/1h buckets for a service and metric type"""
+    if resolution not in monitor.store.rollup_names:
+        raise HTTPException(status_code=400, detail=f"resolution must be one of {monitor.store.rollup_names}")
+    return monitor.get_rollups(service_name, metric_type, resolution, hours)
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -571,7 +644,9 @@ async def health_check():
         "status": "healthy", 
         "service": "performance-monitor",
         "metrics_in_buffer": len(monitor.metrics_buffer),
-        "alerts_in_buffer": len(monitor.alerts_buffer)
+        "alerts_in_buffer": len(monitor.alerts_buffer),
+        "timeseries_bytes": monitor.store.nbytes(),
+        "redis_writer": monitor.redis_writer.stats() if monitor.redis_writer else None
     }
 
 if __name__ == "__main__":
@@ -17,6 +17,8 @@ from .requests import (
     ResponseTimeAnalysis,
     MemoryAnalysis,
     ServiceSummaryResponse,
+    RollupBucket,
+    RollupResponse,
     AlertsResponse,
     MetricsResponse,
     
@@ -49,6 +51,8 @@ __all__ = [
     "ResponseTimeAnalysis",
     "MemoryAnalysis",
     "ServiceSummaryResponse",
+    "RollupBucket",
+    "RollupResponse",
     "AlertsResponse",
     "MetricsResponse",
     
@@ -98,6 +98,25 @@ class ServiceSummaryResponse(BaseModel):
     error_rate_percent: float = Field(..., description="Error rate percentage")
     total_requests: int = Field(..., description="Total number of requests", ge=0)
     recommendations: List[str] = Field(..., description="Optimization recommendations")
+    approximate: bool = Field(False, description="Counts and averages come from rollup buckets that may start before the requested range")
+    window_start: Optional[datetime] = Field(None, description="Earliest time the counts and averages cover")
+
+
+class RollupBucket(BaseModel):
+    """Pre-aggregated metric bucket."""
+    start: datetime = Field(..., description="Bucket start")
+    count: int = Field(..., description="Samples in the bucket", ge=0)
+    avg: float = Field(..., description="Mean value")
+    min: float = Field(..., description="Minimum value")
+    max: float = Field(..., description="Maximum value")
+
+
+class RollupResponse(BaseModel):
+    """Rollup buckets for a service metric."""
+    service_name: str = Field(..., description="Service name")
+    metric_type: MetricType = Field(..., description="Metric type")
+    resolution: str = Field(..., description="Bucket width (1m/5m/1h)")
+    buckets: List[RollupBucket] = Field(..., description="Buckets, oldest first")
 
 
 class AlertsResponse(BaseModel):
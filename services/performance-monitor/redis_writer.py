@@ -0,0 +1,159 @@
+"""
+Write-behind persistence of metrics and alerts to Redis.
+
+``record_metric`` used to await an LPUSH and an LTRIM round-trip for every
+metric, so each instrumented request waited on Redis. ``RedisWriteBehind``
+takes items into a bounded in-memory queue instead (``submit`` never awaits)
+and a background task flushes them once ``batch_size`` items are pending or
+``flush_interval`` seconds have passed: one pipeline per batch with a single
+multi-value LPUSH and an LTRIM per list. Items are JSON-encoded at flush time,
+off the request path.
+
+When Redis is slow or down the queue holds at most ``max_pending`` items and
+the oldest are dropped first. After a failed flush the writer backs off
+exponentially (up to ``MAX_BACKOFF_SECONDS``) instead of retrying on every
+submit. ``stats()`` reports dropped items and items
+written more than ``max_lag`` seconds after they were submitted.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF_SECONDS = 30.0
+
+
+def _default_encode(item: Any) -> str:
+    return json.dumps(item, default=str)
+
+
+class RedisWriteBehind:
+    """Batch list writes (LPUSH + LTRIM) to Redis from a background task."""
+
+    def __init__(
+        self,
+        redis,
+        *,
+        encode: Callable[[Any], str] = _default_encode,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 50_000,
+        list_length: int = 1000,
+        max_lag: float = 5.0,
+    ):
+        self.redis = redis
+        self.encode = encode
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, max_pending)
+        self.list_length = list_length
+        self.max_lag = max_lag
+        self._pending: Deque[Tuple[str, Any, float]] = deque()
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.flushed = 0
+        self.dropped = 0
+        self.lagged = 0
+        self.failures = 0
+        self._consecutive_failures = 0
+        self._retry_at = 0.0
+
+    def submit(self, key: str, item: Any) -> None:
+        """Queue ``item`` for LPUSH onto ``key``; never waits on Redis."""
+        if len(self._pending) >= self.max_pending:
+            self._pending.popleft()
+            self.dropped += 1
+        self._pending.append((key, item, time.monotonic()))
+        if len(self._pending) >= self.batch_size and time.monotonic() >= self._retry_at:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write everything pending; returns the number of items written."""
+        async with self._lock:
+            written = 0
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                try:
+                    await self._write(batch)
+                except Exception as e:
+                    self.failures += 1
+                    self._consecutive_failures += 1
+                    backoff = min(MAX_BACKOFF_SECONDS, 2.0 ** self._consecutive_failures)
+                    self._retry_at = time.monotonic() + backoff
+                    self._requeue(batch)
+                    logger.warning(
+                        f"Redis metric flush failed, {len(self._pending)} pending, retry in {backoff:.0f}s: {e}"
+                    )
+                    break
+                self._consecutive_failures = 0
+                self._retry_at = 0.0
+                now = time.monotonic()
+                self.lagged += sum(1 for _, _, submitted in batch if now - submitted > self.max_lag)
+                self.flushed += len(batch)
+                written += len(batch)
+            return written
+
+    async def _write(self, batch: List[Tuple[str, Any, float]]) -> None:
+        grouped: Dict[str, List[str]] = {}
+        for key, item, _ in batch:
+            grouped.setdefault(key, []).append(self.encode(item))
+        pipe = self.redis.pipeline(transaction=False)
+        for key, payloads in grouped.items():
+            pipe.lpush(key, *payloads)
+            pipe.ltrim(key, 0, self.list_length - 1)
+        await pipe.execute()
+
+    def _requeue(self, batch: List[Tuple[str, Any, float]]) -> None:
+        # put the failed batch back in front of anything submitted meanwhile
+        self._pending.extendleft(reversed(batch))
+        while len(self._pending) > self.max_pending:
+            self._pending.popleft()
+            self.dropped += 1
+
+    async def _run(self) -> None:
+        while not self._closing:
+            timeout = max(self.flush_interval, self._retry_at - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending and time.monotonic() >= self._retry_at:
+                try:
+                    await self.flush()
+                except Exception as e:  # keep the writer alive
+                    logger.error(f"Redis metric writer error: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Let the background task finish its current flush, then flush the rest."""
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._retry_at = 0.0
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        oldest = self._pending[0][2] if self._pending else None
+        return {
+            "pending": len(self._pending),
+            "oldest_pending_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "lagged": self.lagged,
+            "failures": self.failures,
+            "consecutive_failures": self._consecutive_failures,
+            "retry_in_seconds": round(max(0.0, self._retry_at - time.monotonic()), 3),
+        }
@@ -41,6 +41,9 @@ except ImportError:
         page: int = 1
         size: int = 10
 
+from redis_writer import RedisWriteBehind
+from timeseries import TimeSeriesStore
+
 # Import models
 from ..models import (
     AlertLevel,
@@ -56,7 +59,9 @@ from ..models import (
     OverallSystemHealth,
     PerformanceReport,
     ResponseTimeAnalysis,
-    MemoryAnalysis
+    MemoryAnalysis,
+    RollupBucket,
+    RollupResponse
 )
 
 router = APIRouter(tags=["Performance Monitor"], prefix="/v1")
@@ -85,6 +90,13 @@ class PerformanceAnalyzer:
             }
         }
     
+    @staticmethod
+    def _slope(values: np.ndarray) -> float:
+        """Least-squares slope of values against their index (as polyfit deg=1)."""
+        x = np.arange(len(values), dtype=np.float64)
+        x -= x.mean()
+        return float(np.dot(x, values - values.mean()) / np.dot(x, x))
+    
     def analyze_response_time_trend(self, metrics: List[PerformanceMetric]) -> ResponseTimeAnalysis:
         """Analyze response time trends."""
         if not metrics:
@@ -93,7 +105,17 @@ class PerformanceAnalyzer:
                 recommendation="Need more data points"
             )
         
-        response_times = [m.value for m in metrics if m.metric_type == MetricType.RESPONSE_TIME]
+        return self.analyze_response_time_values(np.fromiter(
+            (m.value for m in metrics if m.metric_type == MetricType.RESPONSE_TIME), dtype=np.float64
+        ))
+    
+    def analyze_response_time_values(self, response_times: np.ndarray) -> ResponseTimeAnalysis:
+        """Analyze a column of response times (ms), oldest first."""
+        if len(response_times) == 0:
+            return ResponseTimeAnalysis(
+                trend="no_data",
+                recommendation="Need more data points"
+            )
         if len(response_times) < 5:
             return ResponseTimeAnalysis(
                 trend="insufficient_data",
@@ -101,11 +123,10 @@ class PerformanceAnalyzer:
             )
         
         # Calculate trend
-        x = np.arange(len(response_times))
-        slope = np.polyfit(x, response_times, 1)[0]
+        slope = self._slope(response_times)
         
-        avg_response_time = np.mean(response_times)
-        p95_response_time = np.percentile(response_times, 95)
+        avg_response_time = float(response_times.mean())
+        p95_response_time = float(np.percentile(response_times, 95))
         
         trend = "improving" if slope < -10 else "degrading" if slope > 10 else "stable"
         
@@ -114,8 +135,8 @@ class PerformanceAnalyzer:
             slope=slope,
             average_ms=avg_response_time,
             p95_ms=p95_response_time,
-            min_ms=min(response_times),
-            max_ms=max(response_times),
+            min_ms=float(response_times.min()),
+            max_ms=float(response_times.max()),
             recommendation=self._get_response_time_recommendation(avg_response_time, p95_response_time, slope)
         )
     
@@ -136,27 +157,30 @@ class PerformanceAnalyzer:
     
     def analyze_memory_pattern(self, metrics: List[PerformanceMetric]) -> MemoryAnalysis:
         """Analyze memory usage patterns."""
-        memory_metrics = [m for m in metrics if m.metric_type == MetricType.MEMORY_USAGE]
-        if not memory_metrics:
+        return self.analyze_memory_values(np.fromiter(
+            (m.value for m in metrics if m.metric_type == MetricType.MEMORY_USAGE), dtype=np.float64
+        ))
+    
+    def analyze_memory_values(self, memory_values: np.ndarray) -> MemoryAnalysis:
+        """Analyze a column of memory usage percentages, oldest first."""
+        if len(memory_values) == 0:
             return MemoryAnalysis(status="no_data", recommendation="No memory data available")
         
-        memory_values = [m.value for m in memory_metrics]
+        avg_memory = float(memory_values.mean())
+        max_memory = float(memory_values.max())
         
         # Check for memory leak pattern
         if len(memory_values) >= 10:
-            recent_trend = np.polyfit(range(len(memory_values[-10:])), memory_values[-10:], 1)[0]
+            recent_trend = self._slope(memory_values[-10:])
             if recent_trend > 1:
                 return MemoryAnalysis(
                     status="memory_leak_suspected",
                     trend=recent_trend,
-                    average_percent=np.mean(memory_values),
-                    peak_percent=max(memory_values),
+                    average_percent=avg_memory,
+                    peak_percent=max_memory,
                     recommendation="Investigate potential memory leaks, check for unreleased resources"
                 )
         
-        avg_memory = np.mean(memory_values)
-        max_memory = max(memory_values)
-        
         status = "normal" if max_memory < 80 else "high_usage"
         
         return MemoryAnalysis(
@@ -186,14 +210,25 @@ class PerformanceMonitor:
         self.metrics_buffer = deque(maxlen=10000)
         self.alerts_buffer = deque(maxlen=1000)
         self.analyzer = PerformanceAnalyzer()
-        self.service_metrics = defaultdict(lambda: defaultdict(list))
+        self.store = TimeSeriesStore()
+        # Last 1000 full metric records per service/type, for the metrics listing
+        self.service_metrics = defaultdict(lambda: defaultdict(lambda: deque(maxlen=1000)))
         self.alert_cooldowns = {}
+        self.redis_writer: Optional[RedisWriteBehind] = None
         
     async def initialize_redis(self):
-        """Initialize Redis connection."""
+        """Initialize Redis connection and the write-behind writer."""
         try:
             import aioredis
             self.redis = await aioredis.from_url("redis://localhost:6379")
+            self.redis_writer = RedisWriteBehind(
+                self.redis,
+                encode=lambda record: json.dumps(record.dict(), default=str),
+                batch_size=int(os.getenv("PERF_REDIS_BATCH_SIZE", "500")),
+                flush_interval=float(os.getenv("PERF_REDIS_FLUSH_INTERVAL", "1.0")),
+                max_pending=int(os.getenv("PERF_REDIS_MAX_PENDING", "50000")),
+            )
+            self.redis_writer.start()
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
@@ -202,23 +237,12 @@ class PerformanceMonitor:
     async def record_metric(self, metric: PerformanceMetric):
         """Record a performance metric."""
         self.metrics_buffer.append(metric)
+        self.store.record(metric.service_name, metric.metric_type, metric.timestamp.timestamp(), metric.value)
         self.service_metrics[metric.service_name][metric.metric_type].append(metric)
         
-        # Keep only recent metrics
-        if len(self.service_metrics[metric.service_name][metric.metric_type]) > 1000:
-            self.service_metrics[metric.service_name][metric.metric_type] = \
-                self.service_metrics[metric.service_name][metric.metric_type][-1000:]
-        
-        # Store in Redis if available
-        if self.redis:
-            try:
-                await self.redis.lpush(
-                    f"metrics:{metric.service_name}:{metric.metric_type}",
-                    json.dumps(metric.dict(), default=str)
-                )
-                await self.redis.ltrim(f"metrics:{metric.service_name}:{metric.metric_type}", 0, 999)
-            except Exception:
-                pass
+        # Queue for Redis; flushed in batches by the writer
+        if self.redis_writer:
+            self.redis_writer.submit(f"metrics:{metric.service_name}:{metric.metric_type}", metric)
         
         await self._check_alert_conditions(metric)
     
@@ -280,23 +304,19 @@ class PerformanceMonitor:
         """Send performance alert."""
         self.alerts_buffer.append(alert)
         
-        if self.redis:
-            try:
-                await self.redis.lpush("alerts:performance", json.dumps(alert.dict(), default=str))
-                await self.redis.ltrim("alerts:performance", 0, 999)
-            except Exception:
-                pass
+        if self.redis_writer:
+            self.redis_writer.submit("alerts:performance", alert)
     
     async def get_service_summary(self, service_name: str, hours: int = 24) -> ServiceSummaryResponse:
         """Get performance summary for a service."""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        cutoff = (datetime.now() - timedelta(hours=hours)).timestamp()
         
-        service_metrics = []
-        for metric_type, metrics in self.service_metrics[service_name].items():
-            recent_metrics = [m for m in metrics if m.timestamp >= cutoff_time]
-            service_metrics.extend(recent_metrics)
+        window_stats = {
+            metric_type: self.store.series(service_name, metric_type).stats_since(cutoff)
+            for metric_type in self.store.metric_types(service_name)
+        }
         
-        if not service_metrics:
+        if not any(stats["count"] for stats in window_stats.values()):
             return ServiceSummaryResponse(
                 service_name=service_name,
                 time_range_hours=hours,
@@ -308,18 +328,28 @@ class PerformanceMonitor:
             )
         
         # Analyze metrics
-        response_time_analysis = self.analyzer.analyze_response_time_trend(
-            [m for m in service_metrics if m.metric_type == MetricType.RESPONSE_TIME]
+        response_time_analysis = self.analyzer.analyze_response_time_values(
+            self._window_values(service_name, MetricType.RESPONSE_TIME, cutoff)
         )
-        
-        memory_analysis = self.analyzer.analyze_memory_pattern(
-            [m for m in service_metrics if m.metric_type == MetricType.MEMORY_USAGE]
+        response_stats = window_stats.get(MetricType.RESPONSE_TIME)
+        if response_stats and response_stats["source"] != "raw" and response_time_analysis.average_ms is not None:
+            # Older than the raw ring: mean/min/max from the rollups (which
+            # include the whole first bucket, see ``approximate``), percentile
+            # and trend over the retained raw samples
+            response_time_analysis.average_ms = response_stats["mean"]
+            response_time_analysis.min_ms = response_stats["min"]
+            response_time_analysis.max_ms = response_stats["max"]
+        
+        memory_analysis = self.analyzer.analyze_memory_values(
+            self._window_values(service_name, MetricType.MEMORY_USAGE, cutoff)
         )
         
         # Calculate error rate
-        total_requests = len([m for m in service_metrics if m.metric_type == MetricType.RESPONSE_TIME])
-        error_requests = len([m for m in service_metrics if m.metric_type == MetricType.ERROR_RATE])
+        total_requests = window_stats.get(MetricType.RESPONSE_TIME, {"count": 0})["count"]
+        error_requests = window_stats.get(MetricType.ERROR_RATE, {"count": 0})["count"]
         error_rate = (error_requests / total_requests * 100) if total_requests > 0 else 0
+        covered = [stats for stats in window_stats.values() if stats["count"]]
+        window_start = datetime.fromtimestamp(min(stats["window_start"] for stats in covered))
         
         return ServiceSummaryResponse(
             service_name=service_name,
@@ -328,9 +358,31 @@ class PerformanceMonitor:
             memory=memory_analysis,
             error_rate_percent=error_rate,
             total_requests=total_requests,
-            recommendations=self._generate_service_recommendations(response_time_analysis, memory_analysis, error_rate)
+            recommendations=self._generate_service_recommendations(response_time_analysis, memory_analysis, error_rate),
+            approximate=any(stats["source"] != "raw" for stats in covered),
+            window_start=window_start,
         )
     
+    def _window_values(self, service_name: str, metric_type: MetricType, since: float) -> np.ndarray:
+        series = self.store.series(service_name, metric_type)
+        return series.window(since)[1] if series is not None else np.empty(0)
+    
+    def get_rollups(self, service_name: str, metric_type: MetricType,
+                    resolution: str = "1m", hours: int = 24) -> List[RollupBucket]:
+        """Pre-aggregated buckets for a service metric."""
+        series = self.store.series(service_name, metric_type)
+        if series is None:
+            return []
+        since = (datetime.now() - timedelta(hours=hours)).timestamp()
+        buckets = series.rollups[resolution].buckets(since)
+        return [
+            RollupBucket(start=datetime.fromtimestamp(start), count=count, avg=total / count, min=low, max=high)
+            for start, count, total, low, high in zip(
+                buckets["start"].tolist(), buckets["count"].tolist(), buckets["sum"].tolist(),
+                buckets["min"].tolist(), buckets["max"].tolist()
+            )
+        ]
+    
     def _generate_service_recommendations(self, response_analysis: ResponseTimeAnalysis, memory_analysis: MemoryAnalysis, error_rate: float) -> List[str]:
         """Generate service recommendations."""
         recommendations = []
@@ -440,7 +492,7 @@ async def get_service_metrics(
     Returns time-series data for specific metric types.
     """
     try:
-        metrics = monitor.service_metrics[service_name][metric_type][-limit:]
+        metrics = list(monitor.service_metrics[service_name][metric_type])[-limit:]
         
         return MetricsResponse(
             metrics=metrics,
@@ -453,6 +505,32 @@ async def get_service_metrics(
         raise_http_error("METRICS_RETRIEVAL_FAILED", f"Failed to retrieve metrics: {str(e)}")
 
 
+@router.get("/services/{service_name}/metrics/{metric_type}/rollups", response_model=RollupResponse)
+async def get_service_metric_rollups(
+    service_name: str,
+    metric_type: MetricType,
+    resolution: str = Query("1m", description="Bucket width", pattern="^(1m|5m|1h)$"),
+    hours: int = Query(24, description="Time range in hours", ge=1, le=720)
+):
+    """
+    Get pre-aggregated rollups for a service and metric type.
+    
+    Returns count/avg/min/max per 1m, 5m or 1h bucket.
+    """
+    try:
+        buckets = monitor.get_rollups(service_name, metric_type, resolution, hours)
+        
+        return RollupResponse(
+            service_name=service_name,
+            metric_type=metric_type,
+            resolution=resolution,
+            buckets=buckets
+        )
+        
+    except Exception as e:
+        raise_http_error("ROLLUPS_RETRIEVAL_FAILED", f"Failed to retrieve rollups: {str(e)}")
+
+
 @router.get("/system/metrics", response_model=SystemMetrics)
 async def get_system_metrics():
     """
@@ -498,7 +576,7 @@ async def list_monitored_services(
     Returns paginated list of services with metrics.
     """
     try:
-        services = list(monitor.service_metrics.keys())
+        services = monitor.store.services()
         total = len(services)
         
         # Apply pagination
@@ -509,18 +587,15 @@ async def list_monitored_services(
         # Build service info
         service_info = []
         for service_name in paginated_services:
-            metrics_count = sum(len(metrics) for metrics in monitor.service_metrics[service_name].values())
-            metric_types = list(monitor.service_metrics[service_name].keys())
+            metric_types = monitor.store.metric_types(service_name)
+            series = [monitor.store.series(service_name, t) for t in metric_types]
+            last_seen = max((s.raw.latest() for s in series if len(s)), default=None)
             
             service_info.append({
                 "service_name": service_name,
-                "total_metrics": metrics_count,
+                "total_metrics": sum(s.total for s in series),
                 "metric_types": metric_types,
-                "last_seen": max(
-                    (max(metrics, key=lambda m: m.timestamp).timestamp 
-                     for metrics in monitor.service_metrics[service_name].values() if metrics),
-                    default=None
-                )
+                "last_seen": datetime.fromtimestamp(last_seen) if last_seen is not None else None
             })
         
         return PaginatedResponse(
@@ -547,8 +622,10 @@ async def get_monitor_health():
             "service": "performance-monitor",
             "metrics_in_buffer": len(monitor.metrics_buffer),
             "alerts_in_buffer": len(monitor.alerts_buffer),
-            "monitored_services": len(monitor.service_metrics),
+            "monitored_services": len(monitor.store.services()),
+            "timeseries_bytes": monitor.store.nbytes(),
             "redis_connected": monitor.redis is not None,
+            "redis_writer": monitor.redis_writer.stats() if monitor.redis_writer else None,
             "uptime_hours": round((time.time() - psutil.boot_time()) / 3600, 2)
         }
         
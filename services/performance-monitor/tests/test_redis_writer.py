@@ -0,0 +1,188 @@
+from pathlib import Path
+from types import SimpleNamespace
+import asyncio
+import json
+import sys
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = ROOT / "services" / "performance-monitor"
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+import redis_writer  # type: ignore  # noqa: E402
+from redis_writer import RedisWriteBehind  # type: ignore  # noqa: E402
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def lpush(self, key, *values):
+        self.commands.append(("lpush", key, values))
+
+    def ltrim(self, key, start, end):
+        self.commands.append(("ltrim", key, (start, end)))
+
+    async def execute(self):
+        self.redis.attempts += 1
+        if self.redis.failures:
+            self.redis.failures -= 1
+            raise ConnectionError("redis down")
+        for name, key, args in self.commands:
+            if name == "lpush":
+                self.redis.lists.setdefault(key, [])[:0] = reversed(args)
+            else:
+                self.redis.lists[key] = self.redis.lists[key][args[0]:args[1] + 1]
+        self.redis.executed.append(self.commands)
+
+
+class FakeRedis:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.attempts = 0
+        self.lists = {}
+        self.executed = []
+
+    def pipeline(self, transaction=True):
+        assert transaction is False
+        return FakePipeline(self)
+
+
+def _values(redis, key):
+    # LPUSH puts the newest first
+    return [json.loads(v) for v in reversed(redis.lists.get(key, []))]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(redis_writer, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.mark.asyncio
+async def test_batches_one_pipeline_per_batch_with_trimmed_lists():
+    redis = FakeRedis()
+    writer = RedisWriteBehind(redis, batch_size=3, list_length=2)
+    for i in range(4):
+        writer.submit("metrics:a" if i % 2 else "metrics:b", i)
+
+    assert await writer.flush() == 4
+    # 3 + 1 items: one multi-value LPUSH and an LTRIM per list in each pipeline
+    assert [[c[0] for c in commands] for commands in redis.executed] == [
+        ["lpush", "ltrim", "lpush", "ltrim"],
+        ["lpush", "ltrim"],
+    ]
+    assert _values(redis, "metrics:b") == [0, 2] and _values(redis, "metrics:a") == [1, 3]
+
+
+def test_max_pending_drops_oldest_and_counts_them():
+    writer = RedisWriteBehind(FakeRedis(), max_pending=3)
+    for i in range(5):
+        writer.submit("metrics", i)
+
+    assert [item for _, item, _ in writer._pending] == [2, 3, 4]
+    assert writer.dropped == 2 and writer.stats()["pending"] == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_requeued_ahead_of_newer_items(clock):
+    redis = FakeRedis(failures=1)
+    writer = RedisWriteBehind(redis, batch_size=2, max_pending=4)
+    for i in range(3):
+        writer.submit("metrics", i)
+
+    assert await writer.flush() == 0
+    assert [item for _, item, _ in writer._pending] == [0, 1, 2]
+    # newer submissions queue behind the requeued batch; overflow drops the oldest
+    writer.submit("metrics", 3)
+    writer.submit("metrics", 4)
+    assert [item for _, item, _ in writer._pending] == [1, 2, 3, 4]
+    assert (writer.failures, writer.dropped) == (1, 1)
+
+    clock[0] += 2
+    assert await writer.flush() == 4
+    assert _values(redis, "metrics") == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_backoff_suppresses_flushes_until_retry_at(clock):
+    redis = FakeRedis(failures=2)
+    writer = RedisWriteBehind(redis, batch_size=1)
+    writer.submit("metrics", 0)
+    writer._wakeup.clear()
+
+    await writer.flush()
+    assert writer.stats()["retry_in_seconds"] == 2.0
+    # a full batch does not wake the writer while backing off
+    writer.submit("metrics", 1)
+    assert not writer._wakeup.is_set()
+    clock[0] += 2
+    writer.submit("metrics", 2)
+    assert writer._wakeup.is_set()
+
+    # consecutive failures double the delay, a success resets it
+    await writer.flush()
+    assert writer.stats()["retry_in_seconds"] == 4.0
+    assert await writer.flush() == 3
+    stats = writer.stats()
+    assert (stats["consecutive_failures"], stats["retry_in_seconds"], stats["failures"]) == (0, 0.0, 2)
+
+
+@pytest.mark.asyncio
+async def test_background_writer_waits_out_the_backoff():
+    redis = FakeRedis(failures=1)
+    writer = RedisWriteBehind(redis, batch_size=1, flush_interval=0.01)
+    writer.start()
+    writer.submit("metrics", 0)
+    await asyncio.sleep(0.1)
+
+    # the first failure backs off for two seconds: no retry on every interval tick
+    assert redis.attempts == 1 and writer.stats()["pending"] == 1
+    writer._retry_at = 0.0
+    writer._wakeup.set()
+    await asyncio.sleep(0.05)
+    assert redis.attempts == 2 and _values(redis, "metrics") == [0]
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_lagged_counts_items_written_after_max_lag(clock):
+    writer = RedisWriteBehind(FakeRedis(), max_lag=5.0)
+    writer.submit("metrics", "old")
+    clock[0] += 4
+    writer.submit("metrics", "new")
+    clock[0] += 2
+
+    assert writer.stats()["oldest_pending_seconds"] == 6.0
+    assert await writer.flush() == 2
+    assert (writer.flushed, writer.lagged) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_what_is_still_pending():
+    redis = FakeRedis()
+    writer = RedisWriteBehind(redis, batch_size=100, flush_interval=60)
+    writer.start()
+    for i in range(3):
+        writer.submit("metrics", i)
+
+    await writer.close()
+    assert _values(redis, "metrics") == [0, 1, 2]
+    assert writer._task is None and writer.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_close_ignores_the_backoff(clock):
+    redis = FakeRedis(failures=1)
+    writer = RedisWriteBehind(redis)
+    writer.submit("metrics", 0)
+    await writer.flush()
+    assert writer.stats()["retry_in_seconds"] == 2.0
+
+    await writer.close()
+    assert _values(redis, "metrics") == [0]
@@ -0,0 +1,83 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = ROOT / "services" / "performance-monitor"
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from timeseries import MetricSeries, RingBuffer, Rollup  # type: ignore  # noqa: E402
+
+
+def test_ring_buffer_wraps_and_keeps_time_order():
+    ring = RingBuffer(capacity=5)
+    for t in range(8):
+        ring.append(float(t), t * 10.0)
+
+    assert len(ring) == 5 and (ring.oldest(), ring.latest()) == (3.0, 7.0)
+    ts, values = ring.window()
+    assert ts.tolist() == [3, 4, 5, 6, 7] and values.tolist() == [30, 40, 50, 60, 70]
+    # windows that start in either part of the wrapped ring
+    assert ring.window(4.0)[0].tolist() == [4, 5, 6, 7]
+    assert ring.window(6.5)[0].tolist() == [7]
+    assert ring.window(99.0)[0].tolist() == []
+    assert [ring.count_since(s) for s in (0.0, 4.0, 6.5, 99.0)] == [5, 4, 1, 0]
+
+
+def test_ring_buffer_clamps_late_samples_and_extends_in_bulk():
+    ring = RingBuffer(capacity=4)
+    ring.append(10.0, 1.0)
+    assert ring.append(5.0, 2.0) == 10.0  # older than the newest sample
+
+    used = ring.extend(np.array([12.0, 11.0, 13.0, 14.0, 15.0]), np.arange(5.0))
+    assert used.tolist() == [12, 12, 13, 14, 15]
+    ts, values = ring.window()
+    assert ts.tolist() == [12, 13, 14, 15] and values.tolist() == [1, 2, 3, 4]
+
+    # a bulk write longer than the ring keeps its newest samples
+    ring.extend(np.arange(20.0, 30.0), np.arange(10.0))
+    assert ring.window()[1].tolist() == [6, 7, 8, 9]
+
+
+def test_rollup_buckets_match_per_sample_adds():
+    rng = np.random.default_rng(5)
+    timestamps = np.sort(rng.uniform(0, 600, 400))
+    values = rng.normal(50, 10, 400)
+
+    one_by_one, bulk = Rollup(60, 5), Rollup(60, 5)
+    for t, v in zip(timestamps, values):
+        one_by_one.add(t, v)
+    bulk.add_many(timestamps[:150], values[:150])
+    bulk.add_many(timestamps[150:], values[150:])
+
+    # ten minutes of data in a five-bucket ring: only the last five remain
+    a, b = one_by_one.buckets(), bulk.buckets()
+    assert a["start"].tolist() == b["start"].tolist() == [300, 360, 420, 480, 540]
+    assert a["count"].tolist() == b["count"].tolist()
+    assert np.allclose(a["sum"], b["sum"]) and a["max"].tolist() == b["max"].tolist()
+    kept = timestamps >= 300
+    assert a["count"].sum() == kept.sum() and a["min"].min() == values[kept].min()
+    assert one_by_one.buckets(since=430)["start"].tolist() == [420, 480, 540]
+
+
+def test_stats_since_is_exact_on_raw_and_flags_rollup_windows():
+    series = MetricSeries(raw_capacity=500, rollups=(("1m", 60, 100),))
+    # 600 samples, one per second; the raw ring keeps the last 500 (t >= 100)
+    series.extend(np.arange(600.0), np.arange(600.0))
+
+    raw = series.stats_since(150.0)
+    assert raw["source"] == "raw" and raw["window_start"] == 150.0
+    assert (raw["count"], raw["min"], raw["max"]) == (450, 150.0, 599.0)
+    assert raw["mean"] == pytest.approx(np.arange(150, 600).mean())
+
+    # before the raw ring: whole 1m buckets, starting at the one holding ``since``
+    rolled = series.stats_since(100.0 - 1)
+    assert rolled["source"] == "1m" and rolled["window_start"] == 60.0
+    assert (rolled["count"], rolled["min"], rolled["max"]) == (540, 60.0, 599.0)
+    assert rolled["mean"] == pytest.approx(np.arange(60, 600).mean())
+
+    assert series.stats_since(1000.0) == {"count": 0, "source": "raw"}
@@ -0,0 +1,304 @@
+"""
+Columnar time-series storage for the performance monitor.
+
+Every (service, metric type) series keeps its raw samples in a fixed-capacity
+ring of two float64 columns (unix timestamp, value) and maintains 1m/5m/1h
+rollups (count, sum, min, max per bucket) in rings of their own. Memory per
+series is fixed when the series is created and recording a sample is O(1),
+with no per-sample objects and no list copies.
+
+Samples are appended in time order (a timestamp older than the newest one is
+clamped to it), so window queries are a ``searchsorted`` on each contiguous
+part of the ring and hand NumPy arrays straight to the analyzer. Windows that
+reach back past the oldest raw sample are aggregated from the finest rollup
+that still covers them.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+RAW_CAPACITY = int(os.getenv("PERF_RAW_SAMPLES_PER_SERIES", "32768"))
+
+# name, bucket width in seconds, buckets kept (1 day, 1 week, 30 days)
+ROLLUPS: Tuple[Tuple[str, int, int], ...] = (
+    ("1m", 60, 1440),
+    ("5m", 300, 2016),
+    ("1h", 3600, 720),
+)
+
+_EMPTY = np.empty(0, dtype=np.float64)
+
+
+class RingBuffer:
+    """Fixed-capacity ring of (timestamp, value) float64 columns."""
+
+    def __init__(self, capacity: int = RAW_CAPACITY):
+        self.capacity = max(1, capacity)
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.values = np.zeros(self.capacity, dtype=np.float64)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.values.nbytes
+
+    def latest(self) -> Optional[float]:
+        return float(self.timestamps[self._next - 1]) if self._size else None
+
+    def oldest(self) -> Optional[float]:
+        if not self._size:
+            return None
+        return float(self.timestamps[self._next if self._size == self.capacity else 0])
+
+    def append(self, timestamp: float, value: float) -> float:
+        """Store one sample; returns the (possibly clamped) timestamp used."""
+        if self._size and timestamp < self.timestamps[self._next - 1]:
+            timestamp = float(self.timestamps[self._next - 1])
+        self.timestamps[self._next] = timestamp
+        self.values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return timestamp
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Store samples in bulk; returns the timestamps actually used."""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if not len(timestamps):
+            return timestamps
+        floor = self.timestamps[self._next - 1] if self._size else -np.inf
+        timestamps = np.maximum.accumulate(np.maximum(timestamps, floor))
+        ts, vs = timestamps[-self.capacity:], values[-self.capacity:]
+        n = len(ts)
+        first = min(n, self.capacity - self._next)
+        self.timestamps[self._next:self._next + first] = ts[:first]
+        self.values[self._next:self._next + first] = vs[:first]
+        self.timestamps[:n - first] = ts[first:]
+        self.values[:n - first] = vs[first:]
+        self._next = (self._next + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+        return timestamps
+
+    def _segments(self) -> List[slice]:
+        if self._size < self.capacity:
+            return [slice(0, self._size)]
+        return [slice(self._next, self.capacity), slice(0, self._next)]
+
+    def window(self, since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples with ``timestamp >= since`` (all if None), oldest first."""
+        ts_parts, value_parts = [], []
+        for segment in self._segments():
+            ts = self.timestamps[segment]
+            start = 0 if since is None else int(np.searchsorted(ts, since, side="left"))
+            if start < len(ts):
+                ts_parts.append(ts[start:])
+                value_parts.append(self.values[segment][start:])
+        if not ts_parts:
+            return _EMPTY, _EMPTY
+        if len(ts_parts) == 1:
+            return ts_parts[0].copy(), value_parts[0].copy()
+        return np.concatenate(ts_parts), np.concatenate(value_parts)
+
+    def count_since(self, since: float) -> int:
+        return sum(
+            len(self.timestamps[segment]) - int(np.searchsorted(self.timestamps[segment], since, side="left"))
+            for segment in self._segments()
+        )
+
+
+class Rollup:
+    """Ring of fixed-width buckets holding count, sum, min and max."""
+
+    def __init__(self, resolution: int, capacity: int):
+        self.resolution = resolution
+        self.capacity = max(1, capacity)
+        self.starts = np.zeros(self.capacity, dtype=np.float64)
+        self.count = np.zeros(self.capacity, dtype=np.int64)
+        self.sum = np.zeros(self.capacity, dtype=np.float64)
+        self.min = np.zeros(self.capacity, dtype=np.float64)
+        self.max = np.zeros(self.capacity, dtype=np.float64)
+        self._head = -1
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.starts, self.count, self.sum, self.min, self.max))
+
+    def oldest(self) -> Optional[float]:
+        if not self._size:
+            return None
+        return float(self.starts[(self._head - self._size + 1) % self.capacity])
+
+    def _open(self, start: float) -> int:
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.starts[self._head] = start
+        self.count[self._head] = 0
+        self.sum[self._head] = 0.0
+        self.min[self._head] = np.inf
+        self.max[self._head] = -np.inf
+        return self._head
+
+    def add(self, timestamp: float, value: float) -> None:
+        start = timestamp - timestamp % self.resolution
+        i = self._head
+        if not self._size or start > self.starts[i]:
+            i = self._open(start)
+        self.count[i] += 1
+        self.sum[i] += value
+        if value < self.min[i]:
+            self.min[i] = value
+        if value > self.max[i]:
+            self.max[i] = value
+
+    def add_many(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Fold time-ordered samples in with one reduction per bucket."""
+        if not len(timestamps):
+            return
+        starts = timestamps - timestamps % self.resolution
+        bounds = np.flatnonzero(np.diff(starts)) + 1
+        offsets = np.concatenate(([0], bounds))
+        counts = np.diff(np.concatenate((offsets, [len(values)])))
+        sums = np.add.reduceat(values, offsets)
+        mins = np.minimum.reduceat(values, offsets)
+        maxs = np.maximum.reduceat(values, offsets)
+        for j, offset in enumerate(offsets):
+            start = starts[offset]
+            i = self._head
+            if not self._size or start > self.starts[i]:
+                i = self._open(start)
+            self.count[i] += counts[j]
+            self.sum[i] += sums[j]
+            self.min[i] = min(self.min[i], mins[j])
+            self.max[i] = max(self.max[i], maxs[j])
+
+    def _order(self) -> np.ndarray:
+        return (np.arange(self._head - self._size + 1, self._head + 1)) % self.capacity
+
+    def buckets(self, since: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Buckets overlapping ``[since, now]``, oldest first."""
+        order = self._order()
+        if since is not None and len(order):
+            order = order[self.starts[order] > since - self.resolution]
+        return {
+            "start": self.starts[order],
+            "count": self.count[order],
+            "sum": self.sum[order],
+            "min": self.min[order],
+            "max": self.max[order],
+        }
+
+
+class MetricSeries:
+    """Raw ring plus rollups for one (service, metric type)."""
+
+    def __init__(self, raw_capacity: int = RAW_CAPACITY, rollups: Iterable[Tuple[str, int, int]] = ROLLUPS):
+        self.raw = RingBuffer(raw_capacity)
+        self.rollups: Dict[str, Rollup] = {name: Rollup(res, cap) for name, res, cap in rollups}
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    @property
+    def nbytes(self) -> int:
+        return self.raw.nbytes + sum(r.nbytes for r in self.rollups.values())
+
+    def add(self, timestamp: float, value: float) -> None:
+        timestamp = self.raw.append(timestamp, value)
+        for rollup in self.rollups.values():
+            rollup.add(timestamp, value)
+        self.total += 1
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        timestamps = self.raw.extend(timestamps, values)
+        for rollup in self.rollups.values():
+            rollup.add_many(timestamps, values)
+        self.total += len(values)
+
+    def raw_covers(self, since: float) -> bool:
+        """True if every sample since ``since`` is still in the raw ring."""
+        return len(self.raw) < self.raw.capacity or self.raw.oldest() <= since
+
+    def window(self, since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        return self.raw.window(since)
+
+    def stats_since(self, since: float) -> Dict[str, float]:
+        """count/mean/min/max since ``since``, exact while the raw ring covers it.
+
+        Older windows come from the finest rollup reaching back far enough and
+        are approximate: they include the whole bucket that ``since`` falls
+        into, so up to one bucket width of earlier samples. ``window_start``
+        is the start actually covered.
+        """
+        if self.raw_covers(since):
+            _, values = self.raw.window(since)
+            if not len(values):
+                return {"count": 0, "source": "raw"}
+            return {
+                "count": int(len(values)),
+                "mean": float(values.mean()),
+                "min": float(values.min()),
+                "max": float(values.max()),
+                "source": "raw",
+                "window_start": since,
+            }
+        name, rollup = next(
+            ((n, r) for n, r in self.rollups.items() if r.oldest() is not None and r.oldest() <= since),
+            list(self.rollups.items())[-1],
+        )
+        b = rollup.buckets(since)
+        count = int(b["count"].sum())
+        if not count:
+            return {"count": 0, "source": name}
+        return {
+            "count": count,
+            "mean": float(b["sum"].sum() / count),
+            "min": float(b["min"].min()),
+            "max": float(b["max"].max()),
+            "source": name,
+            "window_start": float(b["start"][0]),
+        }
+
+
+class TimeSeriesStore:
+    """Registry of ``MetricSeries`` keyed by service and metric type."""
+
+    rollup_names = tuple(name for name, _, _ in ROLLUPS)
+
+    def __init__(self, raw_capacity: int = RAW_CAPACITY):
+        self.raw_capacity = raw_capacity
+        self._series: Dict[str, Dict[str, MetricSeries]] = {}
+
+    def series(self, service_name: str, metric_type: str, create: bool = False) -> Optional[MetricSeries]:
+        by_type = self._series.get(service_name)
+        if by_type is None:
+            if not create:
+                return None
+            by_type = self._series[service_name] = {}
+        series = by_type.get(metric_type)
+        if series is None and create:
+            series = by_type[metric_type] = MetricSeries(self.raw_capacity)
+        return series
+
+    def record(self, service_name: str, metric_type: str, timestamp: float, value: float) -> None:
+        self.series(service_name, metric_type, create=True).add(timestamp, value)
+
+    def services(self) -> List[str]:
+        return list(self._series)
+
+    def metric_types(self, service_name: str) -> List[str]:
+        return list(self._series.get(service_name, {}))
+
+    def nbytes(self) -> int:
+        return sum(s.nbytes for by_type in self._series.values() for s in by_type.values())
@@ -15,7 +15,6 @@ This service replaces the legacy app.py with:
 
 import os
 import sys
-import asyncio
 import tempfile
 from pathlib import Path
 from contextlib import asynccontextmanager
@@ -46,6 +45,7 @@ from _shared.obs.metrics_boot import enable_prometheus_metrics
 
 # Import plugin system components
 from registry import PluginRegistry
+from scheduler import JobScheduler, ScheduledJob
 from metrics import (
     PLUGIN_RUN_DURATION_SECONDS,
     PLUGIN_RUN_FAILURE_TOTAL,
@@ -69,138 +69,127 @@ PLUGINS_DIR = Path(os.getenv("PLUGINS_DIR", "/app/plugins"))
 RESULTS_DIR = Path(os.getenv("RESULTS_DIR", "/app/results"))
 DOCKER_ENABLED = os.getenv("PLUGIN_DOCKER_ENABLED", "1") == "1"
 MAX_EXECUTION_TIME = int(os.getenv("PLUGIN_MAX_EXECUTION_TIME", "300"))  # 5 minutes
-MAX_CONCURRENT_JOBS = int(os.getenv("PLUGIN_MAX_CONCURRENT", "5"))
+MAX_CONCURRENT_JOBS = int(os.getenv("PLUGIN_MAX_CONCURRENT", "5"))  # scheduler workers
 
 # Global state
 plugin_registry = None
 running_jobs = {}
-job_queue = None
-job_processor_task = None
+job_queue: JobScheduler | None = None
 docker_client = None
 health_checker = HealthChecker(SERVICE_NAME, SERVICE_VERSION)
 graph_client: GraphIngestClient | None = None
 
 
-async def job_processor():
-    """Background job processor for plugin executions."""
-    global running_jobs, job_queue, plugin_registry
-    
-    logger.info("Starting job processor")
-    
-    while True:
-        try:
-            # Get next job from queue
-            job_id, plugin_name, parameters, output_format = await job_queue.get()
-            
-            # Check concurrent job limit
-            active_jobs = sum(1 for job in running_jobs.values() if job["status"] == "running")
-            if active_jobs >= MAX_CONCURRENT_JOBS:
-                # Put job back in queue and wait
-                await job_queue.put((job_id, plugin_name, parameters, output_format))
-                await asyncio.sleep(5)
-                continue
-            
-            # Update job status
-            if job_id in running_jobs:
-                running_jobs[job_id]["status"] = "running"
-                running_jobs[job_id]["started_at"] = datetime.utcnow()
-                
-                logger.info("Starting plugin execution", job_id=job_id, plugin=plugin_name)
-                
-                try:
-                    # Execute plugin
-                    result = await plugin_registry.execute_plugin(
-                        plugin_name, parameters, job_id, output_format
-                    )
-                    
-                    # Update job with results
-                    running_jobs[job_id].update(
-                        {
-                            "status": result.status,
-                            "completed_at": result.completed_at,
-                            "execution_time": result.execution_time,
-                            "results": result.parsed_output,
-                            "graph_entities": getattr(result, "graph_entities", []),
-                            "search_documents": getattr(result, "search_documents", []),
-                            "error": result.error,
-                            "output_files": getattr(result, "output_files", []),
-                        }
-                    )
-
-                    execution_time = result.execution_time or 0.0
-                    PLUGIN_RUN_TOTAL.labels(plugin=plugin_name).inc()
-                    if result.status != "completed":
-                        PLUGIN_RUN_FAILURE_TOTAL.labels(plugin=plugin_name).inc()
-                    else:
-                        PLUGIN_RUN_DURATION_SECONDS.labels(plugin=plugin_name).observe(
-                            execution_time
-                        )
-
-                    if graph_client is not None:
-                        ingest_payload = {
-                            "job_id": job_id,
-                            "plugin_name": plugin_name,
-                            "status": result.status,
-                            "completed_at": result.completed_at.isoformat()
-                            if result.completed_at
-                            else None,
-                            "execution_time": execution_time,
-                            "graph_entities": getattr(result, "graph_entities", []),
-                            "search_documents": getattr(result, "search_documents", []),
-                        }
-                        try:
-                            ingest_result = await graph_client.ingest_plugin_run(
-                                ingest_payload
-                            )
-                            running_jobs[job_id]["graph_ingest"] = ingest_result
-                        except Exception as exc:  # pragma: no cover
-                            logger.warning(
-                                "Graph ingest failed", job_id=job_id, error=str(exc)
-                            )
-                    
-                    # Save results to file if configured
-                    if running_jobs[job_id].get("save_output", True):
-                        result_file = RESULTS_DIR / f"{job_id}.json"
-                        import json
-                        import aiofiles
-                        async with aiofiles.open(result_file, 'w') as f:
-                            await f.write(json.dumps({
-                                "job_id": job_id,
-                                "plugin_name": plugin_name,
-                                "status": result.status,
-                                "results": result.parsed_output,
-                                "execution_time": result.execution_time,
-                                "completed_at": result.completed_at.isoformat() if result.completed_at else None,
-                                "error": result.error
-                            }, indent=2, default=str))
-                    
-                    logger.info("Plugin execution completed", 
-                               job_id=job_id, 
-                               plugin=plugin_name, 
-                               status=result.status,
-                               execution_time=result.execution_time)
-                    
-                except Exception as e:
-                    PLUGIN_RUN_TOTAL.labels(plugin=plugin_name).inc()
-                    PLUGIN_RUN_FAILURE_TOTAL.labels(plugin=plugin_name).inc()
-                    logger.error(
-                        "Plugin execution failed",
-                        job_id=job_id,
-                        plugin=plugin_name,
-                        error=str(e),
-                    )
-                    if job_id in running_jobs:
-                        running_jobs[job_id].update(
-                            {
-                                "status": "failed",
-                                "error": str(e),
-                                "completed_at": datetime.utcnow(),
-                            }
-                        )
-            
-        except Exception as e:
-            logger.error("Job processor error", error=str(e))
-            await asyncio.sleep(1)
+async def run_job(job: ScheduledJob):
+    """Execute one scheduled plugin job and record its outcome."""
+    job_id, plugin_name = job.job_id, job.plugin_name
+    parameters, output_format = job.parameters, job.output_format
+
+    # Skip jobs cancelled or dropped after they were queued
+    if running_jobs.get(job_id, {}).get("status") != "queued":
+        return
+
+    running_jobs[job_id]["status"] = "running"
+    running_jobs[job_id]["started_at"] = datetime.utcnow()
+
+    logger.info("Starting plugin execution", job_id=job_id, plugin=plugin_name)
+
+    try:
+        # Execute plugin
+        result = await plugin_registry.execute_plugin(
+            plugin_name,
+            parameters,
+            job_id,
+            output_format,
+            use_cache=running_jobs[job_id].get("use_cache", True),
+        )
+        
+        # Update job with results
+        running_jobs[job_id].update(
+            {
+                "status": result.status,
+                "completed_at": result.completed_at,
+                "execution_time": result.execution_time,
+                "results": result.parsed_output,
+                "graph_entities": getattr(result, "graph_entities", []),
+                "search_documents": getattr(result, "search_documents", []),
+                "error": result.error,
+                "output_files": getattr(result, "output_files", []),
+            }
+        )
+        if result.cache_status:
+            running_jobs[job_id].setdefault("metadata", {})["cache"] = result.cache_status
+
+        execution_time = result.execution_time or 0.0
+        PLUGIN_RUN_TOTAL.labels(plugin=plugin_name).inc()
+        if result.status != "completed":
+            PLUGIN_RUN_FAILURE_TOTAL.labels(plugin=plugin_name).inc()
+        elif result.cache_status not in ("hit", "stale"):
+            PLUGIN_RUN_DURATION_SECONDS.labels(plugin=plugin_name).observe(
+                execution_time
+            )
+
+        if graph_client is not None:
+            ingest_payload = {
+                "job_id": job_id,
+                "plugin_name": plugin_name,
+                "status": result.status,
+                "completed_at": result.completed_at.isoformat()
+                if result.completed_at
+                else None,
+                "execution_time": execution_time,
+                "graph_entities": getattr(result, "graph_entities", []),
+                "search_documents": getattr(result, "search_documents", []),
+            }
+            try:
+                ingest_result = await graph_client.ingest_plugin_run(
+                    ingest_payload
+                )
+                running_jobs[job_id]["graph_ingest"] = ingest_result
+            except Exception as exc:  # pragma: no cover
+                logger.warning(
+                    "Graph ingest failed", job_id=job_id, error=str(exc)
+                )
+        
+        # Save results to file if configured
+        if running_jobs[job_id].get("save_output", True):
+            result_file = RESULTS_DIR / f"{job_id}.json"
+            import json
+            import aiofiles
+            async with aiofiles.open(result_file, 'w') as f:
+                await f.write(json.dumps({
+                    "job_id": job_id,
+                    "plugin_name": plugin_name,
+                    "status": result.status,
+                    "results": result.parsed_output,
+                    "execution_time": result.execution_time,
+                    "completed_at": result.completed_at.isoformat() if result.completed_at else None,
+                    "error": result.error
+                }, indent=2, default=str))
+        
+        logger.info("Plugin execution completed", 
+                   job_id=job_id, 
+                   plugin=plugin_name, 
+                   status=result.status,
+                   execution_time=result.execution_time)
+        
+    except Exception as e:
+        PLUGIN_RUN_TOTAL.labels(plugin=plugin_name).inc()
+        PLUGIN_RUN_FAILURE_TOTAL.labels(plugin=plugin_name).inc()
+        logger.error(
+            "Plugin execution failed",
+            job_id=job_id,
+            plugin=plugin_name,
+            error=str(e),
+        )
+        if job_id in running_jobs:
+            running_jobs[job_id].update(
+                {
+                    "status": "failed",
+                    "error": str(e),
+                    "completed_at": datetime.utcnow(),
+                }
+            )
 
 
 def check_plugin_registry() -> DependencyCheck:
@@ -263,7 +252,7 @@ def check_job_queue() -> DependencyCheck:
             )
         
         queue_size = job_queue.qsize()
-        active_jobs = sum(1 for job in running_jobs.values() if job["status"] == "running")
+        active_jobs = job_queue.running
         
         return DependencyCheck(
             status="healthy",
@@ -280,7 +269,7 @@ def check_job_queue() -> DependencyCheck:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management."""
-    global plugin_registry, job_queue, job_processor_task, docker_client, graph_client
+    global plugin_registry, job_queue, docker_client, graph_client
     
     logger.info(f"Starting {SERVICE_NAME} v{SERVICE_VERSION}")
     
@@ -302,11 +291,17 @@ async def lifespan(app: FastAPI):
         plugin_registry = PluginRegistry(PLUGINS_DIR)
         logger.info("Plugin registry initialized", plugins_count=len(plugin_registry.plugins))
         
-        # Initialize job queue
-        job_queue = asyncio.Queue()
+        plugin_registry.start_warm_pool()
         
-        # Start job processor
-        job_processor_task = asyncio.create_task(job_processor())
+        # Start the job scheduler
+        job_queue = JobScheduler(
+            run_job,
+            workers=MAX_CONCURRENT_JOBS,
+            plugin_limit=plugin_registry.concurrency_limit,
+        )
+        job_queue.start()
+        # stale cache refreshes queue behind the same workers and plugin caps
+        plugin_registry.scheduler = job_queue
 
         # Prepare graph ingestion helper (optional when graph-api offline)
         graph_client = GraphIngestClient(
@@ -320,7 +315,7 @@ async def lifespan(app: FastAPI):
         
         # Set dependencies in routers
         set_dependencies(plugin_registry, docker_client)
-        set_plugin_system(plugin_registry, running_jobs, job_queue, job_processor_task)
+        set_plugin_system(plugin_registry, running_jobs, job_queue, job_queue)
         
         logger.info(f"{SERVICE_NAME} startup completed successfully")
         
@@ -333,13 +328,12 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info(f"Shutting down {SERVICE_NAME}")
     
-    # Cancel job processor
-    if job_processor_task:
-        job_processor_task.cancel()
-        try:
-            await job_processor_task
-        except asyncio.CancelledError:
-            pass
+    # Stop scheduler workers
+    if job_queue:
+        await job_queue.stop()
+
+    if plugin_registry:
+        await plugin_registry.close()
     
     # Close Docker client
     if docker_client:
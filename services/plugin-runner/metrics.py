@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 
 PLUGIN_RUN_TOTAL = Counter(
@@ -24,10 +24,46 @@ PLUGIN_RUN_DURATION_SECONDS = Histogram(
     buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600),
 )
 
+PLUGIN_QUEUE_DEPTH = Gauge(
+    "plugin_queue_depth",
+    "Plugin jobs waiting for a worker, per priority lane",
+    labelnames=("priority",),
+)
+
+PLUGIN_QUEUE_WAIT_SECONDS = Histogram(
+    "plugin_queue_wait_seconds",
+    "Time plugin jobs spent queued before a worker picked them up",
+    labelnames=("plugin",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+
+PLUGIN_JOBS_RUNNING = Gauge(
+    "plugin_jobs_running",
+    "Plugin jobs currently executing",
+    labelnames=("plugin",),
+)
+
+PLUGIN_WARM_CONTAINER_TOTAL = Counter(
+    "plugin_warm_container_total",
+    "Docker executions by whether a pre-started container was available",
+    labelnames=("plugin", "result"),
+)
+
+PLUGIN_RESULT_CACHE_TOTAL = Counter(
+    "plugin_result_cache_total",
+    "Plugin result cache lookups by outcome (hit, stale, miss, bypass)",
+    labelnames=("plugin", "result"),
+)
+
 
 __all__ = [
     "PLUGIN_RUN_TOTAL",
     "PLUGIN_RUN_FAILURE_TOTAL",
     "PLUGIN_RUN_DURATION_SECONDS",
+    "PLUGIN_QUEUE_DEPTH",
+    "PLUGIN_QUEUE_WAIT_SECONDS",
+    "PLUGIN_JOBS_RUNNING",
+    "PLUGIN_WARM_CONTAINER_TOTAL",
+    "PLUGIN_RESULT_CACHE_TOTAL",
 ]
 
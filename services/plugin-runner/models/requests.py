@@ -47,6 +47,11 @@ class PluginExecutionRequest(BaseModel):
         description="Whether to save output files"
     )
     
+    use_cache: bool = Field(
+        default=True,
+        description="Serve cached results of deterministic plugins; false forces a fresh run"
+    )
+    
     notification_webhook: Optional[str] = Field(
         default=None,
         description="Webhook URL for completion notification"
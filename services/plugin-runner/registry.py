@@ -14,12 +14,21 @@ import docker
 from docker.errors import DockerException
 import xml.etree.ElementTree as ET
 import re
+from contextlib import suppress
 
 from pydantic import BaseModel, validator
 import structlog
 
+from metrics import PLUGIN_RESULT_CACHE_TOTAL, PLUGIN_WARM_CONTAINER_TOTAL
+from result_cache import FRESH, STALE, ResultCache, cache_key
+from scheduler import PRIORITY_LANES, JobScheduler
+from warm_pool import WarmContainerPool
+
 logger = structlog.get_logger()
 
+DEFAULT_PLUGIN_CONCURRENCY = int(os.getenv("PLUGIN_MAX_CONCURRENT_PER_PLUGIN", "2"))
+RESULT_CACHE_SIZE = int(os.getenv("PLUGIN_RESULT_CACHE_SIZE", "1024"))
+
 
 class PluginConfig(BaseModel):
     name: str
@@ -37,6 +46,8 @@ class PluginConfig(BaseModel):
     security: Dict[str, Any]
     output_parsing: Dict[str, Any]
     integration: Dict[str, Any]
+    # result caching for deterministic plugins: {"ttl": s, "stale_while_revalidate": s}
+    cache: Dict[str, Any] = {}
 
 
 class PluginExecutionResult(BaseModel):
@@ -52,6 +63,8 @@ class PluginExecutionResult(BaseModel):
     graph_entities: List[Dict[str, Any]] = []
     search_documents: List[Dict[str, Any]] = []
     error: Optional[str] = None
+    # hit, stale, miss or bypass; None for plugins without a cache policy
+    cache_status: Optional[str] = None
 
 
 class PluginRegistry:
@@ -61,9 +74,17 @@ class PluginRegistry:
         self.plugins_dir = plugins_dir
         self.plugins: Dict[str, PluginConfig] = {}
         self.docker_client = None
+        self.warm_pool: Optional[WarmContainerPool] = None
+        self.result_cache = ResultCache(RESULT_CACHE_SIZE)
+        self._refreshing: Dict[str, asyncio.Future] = {}
+        # background refreshes still waiting in the scheduler: key -> (job id, runner)
+        self._queued_refreshes: Dict[str, tuple] = {}
+        # set by the service so background refreshes share the job worker and plugin caps
+        self.scheduler: Optional[JobScheduler] = None
         self.test_mode = os.getenv("PLUGIN_TEST_MODE", "0") == "1"
         self._init_docker()
         self._load_plugins()
+        self._configure_warm_pool()
     
     def _init_docker(self):
         """Initialize Docker client if available."""
@@ -104,6 +125,33 @@ class PluginRegistry:
         
         logger.info("Plugin registry initialized", total_plugins=loaded_count)
     
+    def _configure_warm_pool(self):
+        """Register plugins that declare ``security.warm_containers``."""
+        if self.docker_client is None or self.test_mode:
+            return
+        pool = WarmContainerPool(self.docker_client)
+        for config in self.plugins.values():
+            size = int(config.security.get("warm_containers", 0) or 0)
+            if size > 0 and config.docker_image and config.security.get("sandbox") == "docker":
+                pool.configure(config.name, size, config.docker_image, self._container_options(config))
+        self.warm_pool = pool
+
+    def start_warm_pool(self):
+        """Start filling warm containers (needs a running event loop)."""
+        if self.warm_pool:
+            self.warm_pool.start()
+
+    async def close(self):
+        if self.warm_pool:
+            await self.warm_pool.close()
+
+    def concurrency_limit(self, name: str) -> int:
+        """Max concurrent runs of a plugin (``security.max_concurrent``)."""
+        config = self.plugins.get(name)
+        if config is None:
+            return DEFAULT_PLUGIN_CONCURRENCY
+        return int(config.security.get("max_concurrent", DEFAULT_PLUGIN_CONCURRENCY))
+
     def _validate_plugin_security(self, plugin_config: PluginConfig) -> bool:
         """Validate plugin security configuration."""
         security = plugin_config.security
@@ -150,12 +198,164 @@ class PluginRegistry:
         return self.plugins.get(name)
     
     async def execute_plugin(self, plugin_name: str, parameters: Dict[str, Any], 
-                           job_id: str, output_format: str = "json") -> PluginExecutionResult:
-        """Execute a plugin with the given parameters."""
+                           job_id: str, output_format: str = "json",
+                           use_cache: bool = True) -> PluginExecutionResult:
+        """Execute a plugin with the given parameters.
+
+        Plugins that declare ``cache.ttl`` are served from the result cache;
+        ``use_cache=False`` forces a fresh run (which still refreshes the cache).
+        """
         plugin_config = self.get_plugin(plugin_name)
         if not plugin_config:
             raise ValueError(f"Plugin '{plugin_name}' not found")
-        
+
+        ttl = float(plugin_config.cache.get("ttl", 0) or 0)
+        if ttl <= 0:
+            return await self._run_plugin(plugin_config, parameters, job_id, output_format)
+
+        try:
+            key = cache_key(
+                plugin_name,
+                plugin_config.version,
+                self._validate_parameters(plugin_config, parameters),
+                output_format,
+            )
+        except ValueError:
+            # invalid parameters: let the run report the failure
+            return await self._run_plugin(plugin_config, parameters, job_id, output_format)
+
+        if use_cache:
+            entry, state = self.result_cache.lookup(key)
+            if state == STALE:
+                self._refresh(key, plugin_config, parameters, output_format)
+            if entry is not None:
+                status = "hit" if state == FRESH else "stale"
+                PLUGIN_RESULT_CACHE_TOTAL.labels(plugin=plugin_name, result=status).inc()
+                return self._from_cache(entry.value, job_id, status)
+
+            # a refresh for the same key is already running: share its result
+            pending = self._refreshing.get(key)
+            if pending is not None:
+                await self._claim_queued_refresh(key)
+                PLUGIN_RESULT_CACHE_TOTAL.labels(plugin=plugin_name, result="hit").inc()
+                return self._from_cache(await asyncio.shield(pending), job_id, "hit")
+
+        if not use_cache:
+            # a forced run never joins a pending refresh, which may be queued
+            # behind this job; it runs now and supersedes a queued refresh
+            PLUGIN_RESULT_CACHE_TOTAL.labels(plugin=plugin_name, result="bypass").inc()
+            result = await self._run_plugin(plugin_config, parameters, job_id, output_format)
+            self._store(key, plugin_config, result)
+            self._supersede_queued_refresh(key, result)
+            result.cache_status = "bypass"
+            return result
+
+        PLUGIN_RESULT_CACHE_TOTAL.labels(plugin=plugin_name, result="miss").inc()
+        task = self._refresh(key, plugin_config, parameters, output_format, job_id)
+        result = await asyncio.shield(task)
+        if result.job_id != job_id:  # joined a refresh started by another job
+            return self._from_cache(result, job_id, "miss")
+        result.cache_status = "miss"
+        return result
+
+    def _store(self, key: str, plugin_config: PluginConfig, result: PluginExecutionResult) -> None:
+        if result.status == "completed":
+            self.result_cache.store(
+                key,
+                result.model_copy(deep=True),
+                plugin_config.name,
+                ttl=float(plugin_config.cache.get("ttl", 0)),
+                stale_ttl=float(plugin_config.cache.get("stale_while_revalidate", 0)),
+            )
+
+    def _refresh(self, key: str, plugin_config: PluginConfig, parameters: Dict[str, Any],
+                 output_format: str, job_id: Optional[str] = None) -> asyncio.Future:
+        """Run the plugin once for ``key`` and cache a completed result (single flight).
+
+        With ``job_id`` the run belongs to a job that already holds a scheduler
+        slot and starts right away. Background (stale) refreshes are queued on
+        the scheduler at the lowest priority, so they count against the worker
+        pool and ``security.max_concurrent`` like any other run.
+        """
+        task = self._refreshing.get(key)
+        if task is not None:
+            return task
+
+        async def _run() -> PluginExecutionResult:
+            try:
+                result = await self._run_plugin(
+                    plugin_config, parameters, job_id or f"cache-refresh-{key[:12]}", output_format
+                )
+                self._store(key, plugin_config, result)
+                return result
+            finally:
+                self._refreshing.pop(key, None)
+
+        if job_id is not None or self.scheduler is None:
+            task = asyncio.create_task(_run())
+            self._refreshing[key] = task
+            return task
+
+        future = asyncio.get_running_loop().create_future()
+        refresh_id = f"cache-refresh-{key[:12]}"
+
+        async def _scheduled() -> None:
+            self._queued_refreshes.pop(key, None)
+            try:
+                future.set_result(await _run())
+            except Exception as e:
+                future.set_exception(e)
+                # nobody may be waiting for a background refresh
+                future.exception()
+            finally:
+                if not future.done():  # scheduler stopped mid-run
+                    future.cancel()
+
+        self._refreshing[key] = future
+        self._queued_refreshes[key] = (refresh_id, _scheduled)
+        self.scheduler.submit(
+            refresh_id, plugin_config.name, parameters, output_format,
+            priority=PRIORITY_LANES, run=_scheduled,
+        )
+        return future
+
+    def _supersede_queued_refresh(self, key: str, result: PluginExecutionResult) -> None:
+        """Drop a not-yet-started background refresh, answering its waiters with ``result``."""
+        queued = self._queued_refreshes.get(key)
+        if queued is None or self.scheduler is None or not self.scheduler.cancel(queued[0]):
+            return
+        del self._queued_refreshes[key]
+        future = self._refreshing.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(result.model_copy(deep=True))
+
+    async def _claim_queued_refresh(self, key: str) -> None:
+        """Run a still-queued background refresh in the caller's scheduler slot.
+
+        A job waiting on a refresh that is itself queued behind it could
+        otherwise hold the last free worker forever.
+        """
+        queued = self._queued_refreshes.pop(key, None)
+        if queued is not None and self.scheduler is not None and self.scheduler.cancel(queued[0]):
+            await queued[1]()
+
+    def _from_cache(self, cached: PluginExecutionResult, job_id: str, status: str) -> PluginExecutionResult:
+        now = datetime.utcnow()
+        return cached.model_copy(
+            deep=True,
+            update={
+                "job_id": job_id,
+                "started_at": now,
+                "completed_at": now,
+                "execution_time": 0.0,
+                "cache_status": status,
+            },
+        )
+
+    async def _run_plugin(self, plugin_config: PluginConfig, parameters: Dict[str, Any],
+                          job_id: str, output_format: str) -> PluginExecutionResult:
+        """Validate parameters, run the plugin and parse its output."""
+        plugin_name = plugin_config.name
         result = PluginExecutionResult(
             job_id=job_id,
             plugin_name=plugin_name,
@@ -259,8 +459,24 @@ class PluginRegistry:
         
         return validated
     
+    def _container_options(self, plugin_config: PluginConfig) -> Dict[str, Any]:
+        """Sandbox constraints applied to every plugin container."""
+        security = plugin_config.security
+        return {
+            "network_mode": "bridge" if plugin_config.requires_network else "none",
+            "read_only": security.get("read_only_filesystem", True),
+            "mem_limit": security.get("memory_limit", "256m"),
+            "cpu_quota": int(float(security.get("cpu_limit", "1.0")) * 100000),
+            "cpu_period": 100000,
+            "security_opt": ["no-new-privileges:true"] if security.get("no_new_privileges", True) else [],
+            "cap_drop": ["ALL"] if not plugin_config.requires_root else [],
+        }
+
     async def _execute_in_docker(self, plugin_config: PluginConfig, parameters: Dict[str, Any]) -> str:
-        """Execute plugin in Docker container for security."""
+        """Execute plugin in Docker container for security.
+
+        The docker SDK is blocking, so every call runs in a worker thread.
+        """
         if not self.docker_client:
             raise RuntimeError("Docker not available")
 
@@ -269,34 +485,35 @@ class PluginRegistry:
             plugin_config, parameters.get("scan_type")
         )
         command = command_template.format(**parameters)
-        
-        # Security settings
-        security = plugin_config.security
-        
+        timeout = plugin_config.security.get("timeout", 300)
+
         try:
+            if self.warm_pool and plugin_config.name in self.warm_pool:
+                container = self.warm_pool.take(plugin_config.name)
+                PLUGIN_WARM_CONTAINER_TOTAL.labels(
+                    plugin=plugin_config.name, result="hit" if container else "miss"
+                ).inc()
+                if container is not None:
+                    return await self.warm_pool.exec(plugin_config.name, container, command, timeout)
+
             # Run container with security constraints
-            container = self.docker_client.containers.run(
+            container = await asyncio.to_thread(
+                self.docker_client.containers.run,
                 plugin_config.docker_image,
                 command,
                 detach=True,
                 remove=True,
-                network_mode="bridge" if plugin_config.requires_network else "none",
-                read_only=security.get("read_only_filesystem", True),
-                mem_limit=security.get("memory_limit", "256m"),
-                cpu_quota=int(float(security.get("cpu_limit", "1.0")) * 100000),
-                cpu_period=100000,
-                security_opt=["no-new-privileges:true"] if security.get("no_new_privileges", True) else [],
-                cap_drop=["ALL"] if not plugin_config.requires_root else [],
+                **self._container_options(plugin_config),
             )
             
             # Wait for completion with timeout
-            timeout = security.get("timeout", 300)
             try:
-                container.wait(timeout=timeout)
-                logs = container.logs().decode('utf-8', errors='ignore')
-                return logs
-            except:
-                container.kill()
+                await asyncio.to_thread(container.wait, timeout=timeout)
+                logs = await asyncio.to_thread(container.logs)
+                return logs.decode('utf-8', errors='ignore')
+            except Exception:
+                with suppress(DockerException):
+                    await asyncio.to_thread(container.kill)
                 raise asyncio.TimeoutError(f"Plugin execution timed out after {timeout} seconds")
                 
         except DockerException as e:
@@ -0,0 +1,90 @@
+# Plugin result cache for InfoTerminal
+# Content-addressed cache of completed runs of deterministic plugins
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+def _normalise(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {str(k): _normalise(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalise(v) for v in value]
+    return value
+
+
+def cache_key(plugin_name: str, version: str, parameters: Dict[str, Any], output_format: str) -> str:
+    """SHA256 over plugin identity and normalised, validated parameters."""
+    material = {
+        "plugin": plugin_name,
+        "version": version,
+        "output_format": output_format,
+        "parameters": _normalise(parameters),
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    plugin_name: str
+    stored_at: float
+    fresh_until: float
+    stale_until: float
+
+
+class ResultCache:
+    """Bounded in-process LRU with a fresh and a stale-while-revalidate window.
+
+    An entry is ``fresh`` for ``ttl`` seconds after it is stored and
+    ``stale`` for a further ``stale_ttl`` seconds, during which callers may
+    serve it while a refresh runs; after that it is a ``miss``.
+    """
+
+    def __init__(self, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: str) -> Tuple[Optional[CacheEntry], str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, MISS
+        now = self.clock()
+        if now >= entry.stale_until:
+            del self._entries[key]
+            return None, MISS
+        self._entries.move_to_end(key)
+        return entry, FRESH if now < entry.fresh_until else STALE
+
+    def store(self, key: str, value: Any, plugin_name: str, ttl: float, stale_ttl: float = 0.0) -> None:
+        now = self.clock()
+        self._entries[key] = CacheEntry(value, plugin_name, now, now + ttl, now + ttl + stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, plugin_name: Optional[str] = None) -> int:
+        """Drop all entries, or those of one plugin; returns how many were dropped."""
+        if plugin_name is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+            return dropped
+        keys = [k for k, e in self._entries.items() if e.plugin_name == plugin_name]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
@@ -318,6 +318,7 @@ async def execute_plugin(
             "search_documents": [],
             "tags": request.tags,
             "save_output": request.save_output,
+            "use_cache": request.use_cache,
             "notification_webhook": request.notification_webhook
         }
         
@@ -325,7 +326,13 @@ async def execute_plugin(
         
         # Add to execution queue
         if job_queue:
-            await job_queue.put((job_id, plugin_name, request.parameters, request.output_format))
+            job_queue.submit(
+                job_id,
+                plugin_name,
+                request.parameters,
+                request.output_format,
+                priority=request.priority,
+            )
         else:
             raise APIError(
                 code=ErrorCodes.SERVICE_UNAVAILABLE,
@@ -403,6 +410,7 @@ async def execute_plugin_batch(
                 "output_format": execution.output_format,
                 "priority": execution.priority,
                 "timeout": execution.timeout,
+                "use_cache": execution.use_cache,
                 "sequential": request.sequential,
                 "stop_on_error": request.stop_on_error,
                 "batch_index": i
@@ -412,7 +420,13 @@ async def execute_plugin_batch(
             
             # Queue the job
             if job_queue:
-                await job_queue.put((job_id, execution.plugin_name, execution.parameters, execution.output_format))
+                job_queue.submit(
+                    job_id,
+                    execution.plugin_name,
+                    execution.parameters,
+                    execution.output_format,
+                    priority=execution.priority,
+                )
         
         return BatchExecutionResponse(
             batch_id=batch_id,
@@ -575,6 +589,10 @@ def cancel_job(job_id: str) -> Dict[str, Any]:
         )
     
     try:
+        # Drop it from the scheduler if it has not started yet
+        if job_queue and job["status"] == "queued":
+            job_queue.cancel(job_id)
+
         # Mark as cancelled
         job["status"] = "cancelled"
         job["completed_at"] = datetime.utcnow()
@@ -806,8 +824,11 @@ def get_plugin_system_health() -> PluginHealthStatus:
         docker_available = True  # Placeholder
         
         # Count active jobs
-        active_jobs = sum(1 for job in running_jobs.values() if job["status"] == "running")
-        queued_jobs = sum(1 for job in running_jobs.values() if job["status"] == "queued")
+        if job_queue:
+            active_jobs, queued_jobs = job_queue.running, job_queue.qsize()
+        else:
+            active_jobs = sum(1 for job in running_jobs.values() if job["status"] == "running")
+            queued_jobs = sum(1 for job in running_jobs.values() if job["status"] == "queued")
         
         # Find last execution
         last_execution = None
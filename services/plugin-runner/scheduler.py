@@ -0,0 +1,150 @@
+# Plugin job scheduler for InfoTerminal
+# Priority lanes, a fixed pool of workers and per-plugin concurrency caps
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import structlog
+
+from metrics import (
+    PLUGIN_JOBS_RUNNING,
+    PLUGIN_QUEUE_DEPTH,
+    PLUGIN_QUEUE_WAIT_SECONDS,
+)
+
+logger = structlog.get_logger()
+
+PRIORITY_LANES = 5  # PluginExecutionRequest.priority: 1=highest, 5=lowest
+
+
+@dataclass
+class ScheduledJob:
+    job_id: str
+    plugin_name: str
+    parameters: Dict[str, Any]
+    output_format: str = "json"
+    priority: int = 1
+    enqueued_at: float = field(default_factory=time.monotonic)
+    # internal work (e.g. cache refreshes) runs this instead of ``run_job``
+    run: Optional[Callable[[], Awaitable[None]]] = None
+
+
+class JobScheduler:
+    """Run queued plugin jobs on ``workers`` concurrent worker tasks.
+
+    Jobs wait in one FIFO lane per priority. A free worker takes the oldest
+    job of the highest-priority lane whose plugin is below its concurrency
+    limit, so a plugin at its cap never blocks jobs for other plugins queued
+    behind it. The number of workers is the global concurrency cap.
+    """
+
+    def __init__(
+        self,
+        run_job: Callable[[ScheduledJob], Awaitable[None]],
+        workers: int = 5,
+        plugin_limit: Optional[Callable[[str], int]] = None,
+    ):
+        self.run_job = run_job
+        self.workers = max(1, workers)
+        self.plugin_limit = plugin_limit or (lambda name: self.workers)
+        self._lanes: List[Deque[ScheduledJob]] = [deque() for _ in range(PRIORITY_LANES)]
+        self._running: Dict[str, int] = {}
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    # ----- queue -----
+
+    def submit(
+        self,
+        job_id: str,
+        plugin_name: str,
+        parameters: Dict[str, Any],
+        output_format: str = "json",
+        priority: int = 1,
+        run: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> ScheduledJob:
+        """Queue a job; ``priority`` is clamped to the available lanes."""
+        lane = min(max(int(priority), 1), PRIORITY_LANES)
+        job = ScheduledJob(job_id, plugin_name, parameters, output_format, lane, run=run)
+        self._lanes[lane - 1].append(job)
+        PLUGIN_QUEUE_DEPTH.labels(priority=str(lane)).inc()
+        self._wakeup.set()
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a job that has not started yet."""
+        for lane, jobs in enumerate(self._lanes, start=1):
+            for job in jobs:
+                if job.job_id == job_id:
+                    jobs.remove(job)
+                    PLUGIN_QUEUE_DEPTH.labels(priority=str(lane)).dec()
+                    return True
+        return False
+
+    def qsize(self) -> int:
+        return sum(len(jobs) for jobs in self._lanes)
+
+    @property
+    def running(self) -> int:
+        return sum(self._running.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": dict(self._running),
+            "queued": {str(lane): len(jobs) for lane, jobs in enumerate(self._lanes, start=1)},
+        }
+
+    def _pop_eligible(self) -> Optional[ScheduledJob]:
+        for lane, jobs in enumerate(self._lanes, start=1):
+            for job in jobs:
+                if self._running.get(job.plugin_name, 0) < max(1, self.plugin_limit(job.plugin_name)):
+                    jobs.remove(job)
+                    PLUGIN_QUEUE_DEPTH.labels(priority=str(lane)).dec()
+                    return job
+        return None
+
+    # ----- workers -----
+
+    async def _next_job(self) -> ScheduledJob:
+        while True:
+            job = self._pop_eligible()
+            if job is not None:
+                return job
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._next_job()
+            plugin = job.plugin_name
+            self._running[plugin] = self._running.get(plugin, 0) + 1
+            PLUGIN_JOBS_RUNNING.labels(plugin=plugin).inc()
+            PLUGIN_QUEUE_WAIT_SECONDS.labels(plugin=plugin).observe(time.monotonic() - job.enqueued_at)
+            try:
+                await (job.run() if job.run is not None else self.run_job(job))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Job worker error", worker=index, job_id=job.job_id, error=str(e))
+            finally:
+                self._running[plugin] -= 1
+                if not self._running[plugin]:
+                    del self._running[plugin]
+                PLUGIN_JOBS_RUNNING.labels(plugin=plugin).dec()
+                # a plugin slot freed up; jobs skipped for it may now run
+                self._wakeup.set()
+
+    def start(self) -> None:
+        if not self._tasks:
+            logger.info("Starting job scheduler", workers=self.workers)
+            self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
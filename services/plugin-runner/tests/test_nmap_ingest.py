@@ -7,8 +7,10 @@ import pytest
 
 ROOT = Path(__file__).resolve().parents[3]
 SERVICE_DIR = ROOT / "services" / "plugin-runner"
-if str(SERVICE_DIR) not in sys.path:
-    sys.path.insert(0, str(SERVICE_DIR))
+# the root conftest puts other services (with their own ``metrics``) first
+sys.path.insert(0, str(SERVICE_DIR))
+if Path(getattr(sys.modules.get("metrics"), "__file__", SERVICE_DIR / "metrics.py")).parent != SERVICE_DIR:
+    sys.modules.pop("metrics", None)
 if str(ROOT / "services") not in sys.path:
     sys.path.insert(0, str(ROOT / "services"))
 
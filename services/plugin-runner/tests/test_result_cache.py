@@ -0,0 +1,183 @@
+from pathlib import Path
+import asyncio
+import sys
+
+import pytest
+import yaml
+
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = ROOT / "services" / "plugin-runner"
+# the root conftest puts other services (with their own ``metrics``) first
+sys.path.insert(0, str(SERVICE_DIR))
+if Path(getattr(sys.modules.get("metrics"), "__file__", SERVICE_DIR / "metrics.py")).parent != SERVICE_DIR:
+    sys.modules.pop("metrics", None)
+
+from registry import PluginRegistry  # type: ignore  # noqa: E402
+from result_cache import FRESH, MISS, STALE, ResultCache, cache_key  # type: ignore  # noqa: E402
+from scheduler import PRIORITY_LANES, JobScheduler  # type: ignore  # noqa: E402
+
+
+WHOIS_OUTPUT = "Domain Name: EXAMPLE.COM\nRegistrar: Example Registrar\nName Server: NS1.EXAMPLE.COM\n"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_windows_and_lru():
+    clock = Clock()
+    cache = ResultCache(max_entries=2, clock=clock)
+    cache.store("a", 1, "whois", ttl=10, stale_ttl=5)
+    assert cache.lookup("a")[1] == FRESH
+    clock.now = 12
+    assert cache.lookup("a")[1] == STALE
+    clock.now = 15
+    assert cache.lookup("a") == (None, MISS) and len(cache) == 0
+
+    cache.store("a", 1, "whois", ttl=10)
+    cache.store("b", 2, "subfinder", ttl=10)
+    cache.lookup("a")
+    cache.store("c", 3, "whois", ttl=10)  # evicts b, the least recently used
+    assert cache.lookup("b")[1] == MISS
+    assert cache.invalidate("whois") == 2 and len(cache) == 0
+
+
+def test_cache_key_normalises_parameters():
+    base = cache_key("whois", "1.0.0", {"target": "example.com", "server": None}, "json")
+    assert base == cache_key("whois", "1.0.0", {"target": " example.com "}, "json")
+    assert base != cache_key("whois", "1.1.0", {"target": "example.com"}, "json")
+    assert base != cache_key("whois", "1.0.0", {"target": "example.com"}, "text")
+
+
+@pytest.fixture
+def cached_registry(tmp_path, monkeypatch):
+    monkeypatch.setenv("PLUGIN_TEST_MODE", "1")
+    config = yaml.safe_load((ROOT / "plugins" / "whois" / "plugin.yaml").read_text())
+    config["cache"] = {"ttl": 60, "stale_while_revalidate": 60}
+    plugin_dir = tmp_path / "whois"
+    plugin_dir.mkdir()
+    (plugin_dir / "plugin.yaml").write_text(yaml.safe_dump(config))
+    (plugin_dir / "mock_output.txt").write_text(WHOIS_OUTPUT)
+
+    registry = PluginRegistry(tmp_path)
+    clock = Clock()
+    registry.result_cache.clock = clock
+    calls = []
+    load = registry._load_mock_output
+
+    def counting_load(plugin_config):
+        calls.append(plugin_config.name)
+        return load(plugin_config)
+
+    monkeypatch.setattr(registry, "_load_mock_output", counting_load)
+    return registry, clock, calls
+
+
+@pytest.mark.asyncio
+async def test_execute_plugin_serves_cache_and_revalidates(cached_registry):
+    registry, clock, calls = cached_registry
+    params = {"target": "example.com"}
+
+    first = await registry.execute_plugin("whois", params, "job-1")
+    second = await registry.execute_plugin("whois", {"server": None, "target": "example.com"}, "job-2")
+    assert (first.cache_status, second.cache_status) == ("miss", "hit")
+    assert second.job_id == "job-2" and second.parsed_output == first.parsed_output
+    assert calls == ["whois"]
+
+    bypass = await registry.execute_plugin("whois", params, "job-3", use_cache=False)
+    assert bypass.cache_status == "bypass" and len(calls) == 2
+
+    clock.now = 90  # past ttl, inside the stale window
+    stale = await registry.execute_plugin("whois", params, "job-4")
+    assert stale.cache_status == "stale"
+    await asyncio.gather(*registry._refreshing.values())
+    assert len(calls) == 3
+    assert (await registry.execute_plugin("whois", params, "job-5")).cache_status == "hit"
+
+
+@pytest.mark.asyncio
+async def test_stale_refresh_runs_through_the_scheduler(cached_registry):
+    registry, clock, calls = cached_registry
+    params = {"target": "example.com"}
+
+    async def no_user_jobs(job):
+        raise AssertionError("only refresh jobs are queued here")
+
+    scheduler = JobScheduler(no_user_jobs, workers=1, plugin_limit=registry.concurrency_limit)
+    registry.scheduler = scheduler
+    await registry.execute_plugin("whois", params, "job-1")
+
+    clock.now = 90
+    assert (await registry.execute_plugin("whois", params, "job-2")).cache_status == "stale"
+    # queued at the lowest priority instead of running on its own task
+    assert scheduler.stats()["queued"][str(PRIORITY_LANES)] == 1 and len(calls) == 1
+
+    scheduler.start()
+    try:
+        await asyncio.gather(*registry._refreshing.values())
+        assert len(calls) == 2 and scheduler.qsize() == 0
+        assert (await registry.execute_plugin("whois", params, "job-3")).cache_status == "hit"
+    finally:
+        await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_miss_takes_over_a_queued_refresh(cached_registry):
+    registry, clock, calls = cached_registry
+    params = {"target": "example.com"}
+    scheduler = JobScheduler(lambda job: None, workers=1)  # never started: the refresh stays queued
+    registry.scheduler = scheduler
+    await registry.execute_plugin("whois", params, "job-1")
+
+    clock.now = 90
+    await registry.execute_plugin("whois", params, "job-2")
+    assert scheduler.qsize() == 1
+
+    clock.now = 200  # past the stale window: a miss that joins the pending refresh
+    result = await asyncio.wait_for(registry.execute_plugin("whois", params, "job-3"), timeout=5)
+    assert result.status == "completed" and result.job_id == "job-3"
+    assert scheduler.qsize() == 0 and len(calls) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 5])
+async def test_bypass_runs_do_not_wait_on_a_queued_refresh(cached_registry, workers):
+    registry, clock, calls = cached_registry
+    params = {"target": "example.com"}
+    results = {}
+
+    async def run_job(job):
+        use_cache = job.parameters.pop("_use_cache")
+        results[job.job_id] = await registry.execute_plugin(
+            job.plugin_name, job.parameters, job.job_id, use_cache=use_cache
+        )
+
+    scheduler = JobScheduler(run_job, workers=workers, plugin_limit=registry.concurrency_limit)
+    registry.scheduler = scheduler
+    await registry.execute_plugin("whois", params, "job-1")
+    clock.now = 90
+    assert (await registry.execute_plugin("whois", params, "job-2")).cache_status == "stale"
+    waiting = registry._refreshing[next(iter(registry._refreshing))]
+
+    # both whois slots (default cap 2) go to forced runs queued ahead of the refresh
+    for job_id in ("bypass-1", "bypass-2"):
+        scheduler.submit(job_id, "whois", dict(params, _use_cache=False), priority=1)
+    scheduler.submit("later", "whois", dict(params, _use_cache=True), priority=1)
+    scheduler.start()
+    try:
+        for _ in range(300):
+            if len(results) == 3 and scheduler.running == 0 and not scheduler.qsize():
+                break
+            await asyncio.sleep(0.01)
+        assert set(results) == {"bypass-1", "bypass-2", "later"}
+        assert [results[j].cache_status for j in ("bypass-1", "bypass-2")] == ["bypass", "bypass"]
+        assert results["later"].status == "completed"
+        # the queued refresh was superseded by the first forced run
+        assert waiting.done() and not registry._refreshing and len(calls) == 3
+    finally:
+        await scheduler.stop()
@@ -0,0 +1,80 @@
+from pathlib import Path
+import asyncio
+import sys
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = ROOT / "services" / "plugin-runner"
+# the root conftest puts other services (with their own ``metrics``) first
+sys.path.insert(0, str(SERVICE_DIR))
+if Path(getattr(sys.modules.get("metrics"), "__file__", SERVICE_DIR / "metrics.py")).parent != SERVICE_DIR:
+    sys.modules.pop("metrics", None)
+
+from scheduler import JobScheduler  # type: ignore  # noqa: E402
+
+
+class Recorder:
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.order = []
+        self.running = {}
+        self.peak = {}
+        self.peak_total = 0
+
+    async def __call__(self, job):
+        self.order.append(job.job_id)
+        self.running[job.plugin_name] = self.running.get(job.plugin_name, 0) + 1
+        self.peak[job.plugin_name] = max(self.peak.get(job.plugin_name, 0), self.running[job.plugin_name])
+        self.peak_total = max(self.peak_total, sum(self.running.values()))
+        await asyncio.sleep(self.delay)
+        self.running[job.plugin_name] -= 1
+
+
+async def _drain(scheduler, expected: int, recorder: Recorder):
+    for _ in range(500):
+        if len(recorder.order) == expected and scheduler.running == 0:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("scheduler did not finish")
+
+
+@pytest.mark.asyncio
+async def test_enforces_global_and_per_plugin_limits():
+    recorder = Recorder()
+    limits = {"nmap": 1, "whois": 3}
+    scheduler = JobScheduler(recorder, workers=3, plugin_limit=limits.__getitem__)
+    for i in range(4):
+        scheduler.submit(f"nmap-{i}", "nmap", {})
+    for i in range(4):
+        scheduler.submit(f"whois-{i}", "whois", {})
+    scheduler.start()
+    try:
+        await _drain(scheduler, 8, recorder)
+    finally:
+        await scheduler.stop()
+
+    assert recorder.peak == {"nmap": 1, "whois": 2}
+    assert recorder.peak_total == 3
+    # whois jobs queued behind the capped nmap jobs are not held up by them
+    assert recorder.order.index("whois-0") < recorder.order.index("nmap-1")
+
+
+@pytest.mark.asyncio
+async def test_priority_lanes_and_cancel():
+    recorder = Recorder(delay=0)
+    scheduler = JobScheduler(recorder, workers=1)
+    scheduler.submit("low", "dig", {}, priority=5)
+    scheduler.submit("normal", "dig", {}, priority=3)
+    scheduler.submit("urgent", "dig", {}, priority=1)
+    scheduler.submit("dropped", "dig", {}, priority=1)
+    assert scheduler.cancel("dropped") and not scheduler.cancel("dropped")
+    assert scheduler.qsize() == 3
+
+    scheduler.start()
+    try:
+        await _drain(scheduler, 3, recorder)
+    finally:
+        await scheduler.stop()
+    assert recorder.order == ["urgent", "normal", "low"]
@@ -0,0 +1,80 @@
+from pathlib import Path
+from types import SimpleNamespace
+import asyncio
+import sys
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = ROOT / "services" / "plugin-runner"
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from warm_pool import WarmContainerPool  # type: ignore  # noqa: E402
+
+
+class FakeContainer:
+    def __init__(self):
+        self.commands = []
+        self.killed = False
+
+    def exec_run(self, command):
+        self.commands.append(command)
+        return SimpleNamespace(output=b"done")
+
+    def kill(self):
+        self.killed = True
+
+
+class FakeDockerClient:
+    def __init__(self, entrypoints):
+        self.entrypoints = entrypoints
+        self.started = []
+        self.images = SimpleNamespace(get=self._image)
+        self.containers = SimpleNamespace(run=self._run)
+
+    def _image(self, name):
+        return SimpleNamespace(attrs={"Config": {"Entrypoint": self.entrypoints.get(name)}})
+
+    def _run(self, image, command, **kwargs):
+        container = FakeContainer()
+        self.started.append((image, command, kwargs["entrypoint"], container))
+        return container
+
+
+async def _warm(pool, plugin_name):
+    pool.start()
+    for _ in range(200):
+        if pool.idle_count(plugin_name):
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("warm container was not started")
+
+
+@pytest.mark.asyncio
+async def test_exec_prefixes_image_entrypoint():
+    docker = FakeDockerClient({"instrumentisto/nmap": ["nmap"], "alpine": None})
+    pool = WarmContainerPool(docker)
+    pool.configure("nmap", 1, "instrumentisto/nmap", {})
+    pool.configure("dig", 1, "alpine", {})
+    await _warm(pool, "nmap")
+    await _warm(pool, "dig")
+
+    # parked on sleep, whatever the image's entrypoint is
+    assert {(image, tuple(entrypoint)) for image, _, entrypoint, _ in docker.started} == {
+        ("instrumentisto/nmap", ("sleep",)),
+        ("alpine", ("sleep",)),
+    }
+
+    container = pool.take("nmap")
+    assert await pool.exec("nmap", container, "-sS -p '1-100' 192.0.2.10", timeout=5) == "done"
+    assert container.commands == [["nmap", "-sS", "-p", "1-100", "192.0.2.10"]]
+
+    container = pool.take("dig")
+    await pool.exec("dig", container, "sh -c 'dig example.com'", timeout=5)
+    assert container.commands == [["sh", "-c", "dig example.com"]]
+
+    await asyncio.sleep(0.05)
+    assert all(c.killed for *_, c in docker.started[:2])
+    await pool.close()
@@ -0,0 +1,126 @@
+# Warm container pool for InfoTerminal plugins
+# Pre-started, single-use sandbox containers for frequently used plugins
+
+import asyncio
+import shlex
+from collections import deque
+from contextlib import suppress
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from docker.errors import DockerException
+import structlog
+
+logger = structlog.get_logger()
+
+
+class WarmContainerPool:
+    """Keep ``size`` idle containers started per plugin.
+
+    A warm container is started with the plugin's image and sandbox options
+    but parked on ``sleep infinity``; an execution runs its command with
+    ``exec_run`` (prefixed with the image's own ENTRYPOINT, as
+    ``containers.run`` would use it) and then kills the container (they are started with
+    ``auto_remove``), so every run still gets a fresh sandbox while container
+    creation and start-up happen off the request path. Plugins opt in with
+    ``security.warm_containers`` in their ``plugin.yaml``.
+    """
+
+    def __init__(self, docker_client):
+        self.docker_client = docker_client
+        self._specs: Dict[str, Dict[str, Any]] = {}
+        self._idle: Dict[str, Deque[Any]] = {}
+        self._filling: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def configure(self, plugin_name: str, size: int, image: str, options: Dict[str, Any]) -> None:
+        if size <= 0:
+            return
+        self._specs[plugin_name] = {"size": size, "image": image, "options": options, "entrypoint": None}
+        self._idle.setdefault(plugin_name, deque())
+
+    def __contains__(self, plugin_name: str) -> bool:
+        return plugin_name in self._specs
+
+    def idle_count(self, plugin_name: str) -> int:
+        return len(self._idle.get(plugin_name, ()))
+
+    def take(self, plugin_name: str) -> Optional[Any]:
+        """Claim an idle container and schedule a replacement."""
+        idle = self._idle.get(plugin_name)
+        container = idle.popleft() if idle else None
+        if plugin_name in self._specs:
+            self.refill(plugin_name)
+        return container
+
+    def _start(self, plugin_name: str) -> Any:
+        spec = self._specs[plugin_name]
+        if spec["entrypoint"] is None:
+            entrypoint = self.docker_client.images.get(spec["image"]).attrs.get("Config", {}).get("Entrypoint")
+            spec["entrypoint"] = shlex.split(entrypoint) if isinstance(entrypoint, str) else list(entrypoint or [])
+        return self.docker_client.containers.run(
+            spec["image"],
+            ["infinity"],
+            entrypoint=["sleep"],
+            detach=True,
+            remove=True,
+            labels={"infoterminal.plugin": plugin_name, "infoterminal.warm": "1"},
+            **spec["options"],
+        )
+
+    async def _fill(self, plugin_name: str) -> None:
+        try:
+            while self.idle_count(plugin_name) < self._specs[plugin_name]["size"]:
+                container = await asyncio.to_thread(self._start, plugin_name)
+                self._idle[plugin_name].append(container)
+        except DockerException as e:
+            logger.warning("Failed to start warm container", plugin=plugin_name, error=str(e))
+        finally:
+            self._filling.discard(plugin_name)
+
+    def refill(self, plugin_name: str) -> None:
+        if plugin_name in self._filling:
+            return
+        self._filling.add(plugin_name)
+        task = asyncio.create_task(self._fill(plugin_name))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def start(self) -> None:
+        for plugin_name in self._specs:
+            self.refill(plugin_name)
+
+    def exec_command(self, plugin_name: str, command: str) -> List[str]:
+        """The argv a cold ``containers.run(image, command)`` would execute."""
+        return (self._specs[plugin_name]["entrypoint"] or []) + shlex.split(command)
+
+    async def exec(self, plugin_name: str, container: Any, command: str, timeout: float) -> str:
+        """Run ``command`` in a claimed container, then discard the container."""
+        try:
+            result = await asyncio.wait_for(
+                asyncio.to_thread(container.exec_run, self.exec_command(plugin_name, command)),
+                timeout=timeout,
+            )
+            return result.output.decode("utf-8", errors="ignore")
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"Plugin execution timed out after {timeout} seconds")
+        finally:
+            self.discard(container)
+
+    def discard(self, container: Any) -> None:
+        def _kill():
+            with suppress(DockerException):
+                container.kill()
+
+        task = asyncio.create_task(asyncio.to_thread(_kill))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        containers = [c for idle in self._idle.values() for c in idle]
+        self._idle.clear()
+        for container in containers:
+            with suppress(DockerException):
+                await asyncio.to_thread(container.kill)
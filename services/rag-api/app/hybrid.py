@@ -0,0 +1,61 @@
+"""Score fusion for hybrid (BM25 + kNN) retrieval.
+
+Both legs are fetched together by ``OSClient.hybrid_legs``; this module only
+merges the two ranked lists. Two strategies are available:
+
+* ``alpha`` – each leg's scores are divided by that leg's maximum and blended
+  as ``alpha * bm25 + (1 - alpha) * knn`` (the original behaviour).
+* ``rrf`` – reciprocal-rank fusion, ``sum(1 / (rrf_k + rank))`` over the
+  legs a document appears in. It ignores raw scores, so it is robust to the
+  very different scales of BM25 and vector similarity.
+"""
+
+from typing import Any, Dict, List
+
+RRF_K = 60
+FUSION_METHODS = ("alpha", "rrf")
+
+
+def _combine(legs: List[List[Dict[str, Any]]], contribution) -> List[Dict[str, Any]]:
+    docs: Dict[Any, Dict[str, Any]] = {}
+    scores: Dict[Any, float] = {}
+    for leg_no, items in enumerate(legs):
+        for rank, it in enumerate(items, start=1):
+            id_ = it.get('id')
+            docs.setdefault(id_, it)
+            scores[id_] = scores.get(id_, 0.0) + contribution(leg_no, rank, it)
+    out = []
+    for id_, doc in docs.items():
+        doc = dict(doc)
+        doc['hybrid_score'] = scores[id_]
+        out.append(doc)
+    out.sort(key=lambda x: x['hybrid_score'], reverse=True)
+    return out
+
+
+def alpha_blend(bm25: List[Dict[str, Any]], knn: List[Dict[str, Any]], alpha: float = 0.5) -> List[Dict[str, Any]]:
+    """Blend max-normalised leg scores with weight ``alpha`` on BM25."""
+    alpha = max(0.0, min(1.0, alpha))
+    max_b = max(((it.get('score') or 0.0) for it in bm25), default=1.0) or 1.0
+    max_k = max(((it.get('score') or 0.0) for it in knn), default=1.0) or 1.0
+    weights = ((alpha, max_b), (1 - alpha, max_k))
+
+    def contribution(leg_no: int, rank: int, it: Dict[str, Any]) -> float:
+        weight, top = weights[leg_no]
+        return weight * (it.get('score') or 0.0) / top
+
+    return _combine([bm25, knn], contribution)
+
+
+def rrf(bm25: List[Dict[str, Any]], knn: List[Dict[str, Any]], rrf_k: int = RRF_K) -> List[Dict[str, Any]]:
+    """Reciprocal-rank fusion of the two legs."""
+    return _combine([bm25, knn], lambda leg_no, rank, it: 1.0 / (rrf_k + rank))
+
+
+def fuse(bm25: List[Dict[str, Any]], knn: List[Dict[str, Any]], method: str = "alpha",
+         alpha: float = 0.5, rrf_k: int = RRF_K) -> List[Dict[str, Any]]:
+    if method == "rrf":
+        return rrf(bm25, knn, rrf_k)
+    if method == "alpha":
+        return alpha_blend(bm25, knn, alpha)
+    raise ValueError(f"unknown fusion method: {method}")
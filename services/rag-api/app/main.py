@@ -1,11 +1,12 @@
 import os
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 
 import structlog
 from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
 
 from .opensearch_client import OSClient
+from .hybrid import RRF_K, fuse
 from .neo4j_client import Neo4jClient
 import re
 from typing import Optional
@@ -92,14 +93,14 @@ def _dot(a: List[float], b: List[float]) -> float:
 @app.get("/law/retrieve", response_model=RetrieveResponse)
 def retrieve_laws(q: str = Query(..., min_length=2), top_k: int = 10, rerank: int = 0):
     """Retrieve relevant law paragraphs from OpenSearch index."""
-    res = os_client.search(q, top_k=top_k)
+    res = os_client.search(q, top_k=top_k, include_vector=rerank == 2)
     items = res["items"]
     if rerank == 1:
         items = _basic_rerank(q, items)
     elif rerank == 2:
-        # embedding dot-product rerank (client-side)
+        # embedding dot-product rerank (client-side); vectors are not returned
         qvec = os_client._embed(q)
-        items = sorted(items, key=lambda it: _dot(qvec, it.get('vector') or []), reverse=True)
+        items = sorted(items, key=lambda it: _dot(qvec, it.pop('vector', None) or []), reverse=True)
     return {"total": res["total"], "items": items}
 
 
@@ -126,36 +127,16 @@ class HybridRequest(BaseModel):
     top_k: int = 10
     k: int = 10
     alpha: float = 0.5  # weight for BM25 vs kNN
+    fusion: Literal["alpha", "rrf"] = "alpha"
+    rrf_k: int = RRF_K
     filters: Optional[dict] = None
 
 
 @app.post("/law/hybrid", response_model=RetrieveResponse)
 def hybrid_search(req: HybridRequest):
-    # text search
-    s = os_client.search(req.q, top_k=req.top_k, filters=req.filters)
-    # knn
-    k = os_client.knn_search(req.q, k=req.k, filters=req.filters)
-    # normalize and combine
-    bm = {it['id']: (it.get('score') or 0.0, it) for it in s['items']}
-    km = {it['id']: (it.get('score') or 0.0, it) for it in k['items']}
-    max_b = max((v[0] for v in bm.values()), default=1.0)
-    max_k = max((v[0] for v in km.values()), default=1.0)
-    combined = {}
-    for id_, (sc, it) in bm.items():
-        combined.setdefault(id_, {'doc': it, 'b': 0.0, 'k': 0.0})
-        combined[id_]['b'] = sc / (max_b or 1.0)
-    for id_, (sc, it) in km.items():
-        combined.setdefault(id_, {'doc': it, 'b': 0.0, 'k': 0.0})
-        combined[id_]['k'] = sc / (max_k or 1.0)
-    alpha = max(0.0, min(1.0, req.alpha))
-    items = []
-    for id_, comp in combined.items():
-        score = alpha * comp['b'] + (1 - alpha) * comp['k']
-        doc = comp['doc']
-        doc = dict(doc)
-        doc['hybrid_score'] = score
-        items.append(doc)
-    items.sort(key=lambda x: x.get('hybrid_score', 0.0), reverse=True)
+    # both legs in one msearch round-trip
+    s, k = os_client.hybrid_legs(req.q, top_k=req.top_k, k=req.k, filters=req.filters)
+    items = fuse(s['items'], k['items'], method=req.fusion, alpha=req.alpha, rrf_k=req.rrf_k)
     items = items[: req.top_k]
     return {"total": len(items), "items": items}
 
@@ -192,6 +173,21 @@ def index_law(doc: LawDoc):
     return {"status": "indexed", "id": doc.id}
 
 
+class BulkLawRequest(BaseModel):
+    documents: List[LawDoc]
+    refresh: Optional[str] = None  # batch|interval
+
+
+@app.post("/law/index/bulk")
+def index_laws_bulk(req: BulkLawRequest):
+    """Bulk index law paragraphs with one refresh per batch."""
+    try:
+        res = os_client.bulk_index([d.model_dump() for d in req.documents], refresh=req.refresh)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {"status": "indexed" if not res["failed"] else "partial", **res}
+
+
 @app.post("/graph/law/upsert")
 def upsert_law_graph(
     doc: LawDoc,
@@ -1,9 +1,55 @@
 from typing import Dict, Any
 from opensearchpy import OpenSearch, helpers
+import functools
 import hashlib
-from typing import List, Optional
+import time
+from typing import Iterable, List, Optional, Tuple
 import os
 
+import numpy as np
+
+# Bulk ingest chunking: whichever limit is reached first closes a request
+BULK_CHUNK_DOCS = int(os.getenv('RAG_OS_BULK_CHUNK_DOCS', '500'))
+BULK_CHUNK_BYTES = int(os.getenv('RAG_OS_BULK_CHUNK_BYTES', str(10 * 1024 * 1024)))
+# "batch": one explicit refresh after each bulk call; "interval": rely on the
+# index refresh_interval (RAG_OS_REFRESH_INTERVAL, applied on index creation)
+BULK_REFRESH = os.getenv('RAG_OS_BULK_REFRESH', 'batch')
+REFRESH_INTERVAL = os.getenv('RAG_OS_REFRESH_INTERVAL', '')
+
+
+@functools.lru_cache(maxsize=65536)
+def _token_bucket(tok: str, dims: int) -> int:
+    return int(hashlib.md5(tok.encode()).hexdigest(), 16) % dims
+
+
+def embed_matrix(texts: Iterable[str], dims: int = 64) -> np.ndarray:
+    """Hash embeddings for many texts as one L2-normalised float32 matrix.
+
+    Same bag-of-words hashing as ``OSClient._embed``; token buckets are
+    memoised so repeated vocabulary is hashed once, and counting and
+    normalisation are single NumPy operations over the whole batch.
+    """
+    rows: List[int] = []
+    cols: List[int] = []
+    n = 0
+    for n, text in enumerate(texts, start=1):
+        if not text:
+            continue
+        buckets = [_token_bucket(tok, dims) for tok in text.lower().split()]
+        rows.extend([n - 1] * len(buckets))
+        cols.extend(buckets)
+    counts = np.bincount(
+        np.asarray(rows, dtype=np.int64) * dims + np.asarray(cols, dtype=np.int64),
+        minlength=n * dims,
+    ).astype(np.float32).reshape(n, dims)
+    norms = np.linalg.norm(counts, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return counts / norms
+
+
+def _doc_text(doc: Dict[str, Any]) -> str:
+    return f"{doc.get('title','')} {doc.get('paragraph','')} {doc.get('text','')}"
+
 
 class OSClient:
     def __init__(self, url: str, index: str):
@@ -21,8 +67,11 @@ class OSClient:
 
     def _ensure_index(self):
         if not self.client.indices.exists(self.index):
+            index_settings: Dict[str, Any] = {"number_of_shards": 1}
+            if REFRESH_INTERVAL:
+                index_settings["refresh_interval"] = REFRESH_INTERVAL
             body = {
-                "settings": {"index": {"number_of_shards": 1}},
+                "settings": {"index": index_settings},
                 "mappings": {
                     "properties": {
                         "id": {"type": "keyword"},
@@ -69,17 +118,7 @@ class OSClient:
 
     def _embed(self, text: str, dims: int = 64) -> List[float]:
         """Deterministic bag-of-words hash embedding (placeholder)."""
-        vec = [0.0] * dims
-        if not text:
-            return vec
-        for tok in text.lower().split():
-            h = int(hashlib.md5(tok.encode()).hexdigest(), 16)
-            idx = h % dims
-            vec[idx] += 1.0
-        # L2 normalize
-        import math
-        norm = math.sqrt(sum(v*v for v in vec)) or 1.0
-        return [v / norm for v in vec]
+        return embed_matrix([text], dims)[0].tolist()
 
     def _build_filters(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         clauses: List[Dict[str, Any]] = []
@@ -101,81 +140,143 @@ class OSClient:
             clauses.append({"range": {"effective_date": rng}})
         return clauses
 
-    def search(self, q: str, top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _text_body(self, q: str, size: int, filters: Optional[Dict[str, Any]] = None,
+                   include_vector: bool = False) -> Dict[str, Any]:
         must = {"multi_match": {"query": q, "fields": ["title^3", "paragraph^2", "text"]}}
         bool_q: Dict[str, Any] = {"must": [must]}
         filts = self._build_filters(filters)
         if filts:
             bool_q["filter"] = filts
-        resp = self.client.search(index=self.index, body={"query": {"bool": bool_q}, "size": top_k})
-        hits = resp.get("hits", {}).get("hits", [])
-        items = [
-            {
-                "id": h.get("_source", {}).get("id"),
-                "title": h.get("_source", {}).get("title"),
-                "paragraph": h.get("_source", {}).get("paragraph"),
-                "text": h.get("_source", {}).get("text", "")[:500],
-                "score": h.get("_score"),
-                "vector": h.get("_source", {}).get("vector"),
-            }
-            for h in hits
-        ]
-        total = resp.get("hits", {}).get("total", {}).get("value", len(items))
-        return {"total": total, "items": items}
+        body: Dict[str, Any] = {"query": {"bool": bool_q}, "size": size}
+        if not include_vector:
+            body["_source"] = {"excludes": ["vector"]}
+        return body
 
-    def knn_search(self, q: str, k: int = 10, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        if not self.use_knn:
-            # fallback to text + embedding rerank client-side at API
-            return self.search(q, top_k=k, filters=filters)
-        qvec = self._embed(q)
+    def _knn_body(self, qvec: List[float], k: int, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         filts = self._build_filters(filters)
         if filts:
             body = {"size": k, "query": {"bool": {"must": [{"knn": {"vector": {"vector": qvec, "k": k}}}], "filter": filts}}}
         else:
             body = {"size": k, "query": {"knn": {"vector": {"vector": qvec, "k": k}}}}
-        resp = self.client.search(index=self.index, body=body)
+        body["_source"] = {"excludes": ["vector"]}
+        return body
+
+    @staticmethod
+    def _items(resp: Dict[str, Any], include_vector: bool = False) -> Dict[str, Any]:
         hits = resp.get("hits", {}).get("hits", [])
-        items = [
-            {
-                "id": h.get("_source", {}).get("id"),
-                "title": h.get("_source", {}).get("title"),
-                "paragraph": h.get("_source", {}).get("paragraph"),
-                "text": h.get("_source", {}).get("text", "")[:500],
+        items = []
+        for h in hits:
+            src = h.get("_source", {})
+            item = {
+                "id": src.get("id"),
+                "title": src.get("title"),
+                "paragraph": src.get("paragraph"),
+                "text": src.get("text", "")[:500],
                 "score": h.get("_score"),
             }
-            for h in hits
-        ]
+            if include_vector:
+                item["vector"] = src.get("vector")
+            items.append(item)
         total = resp.get("hits", {}).get("total", {}).get("value", len(items))
         return {"total": total, "items": items}
 
+    def search(self, q: str, top_k: int = 10, filters: Optional[Dict[str, Any]] = None,
+               include_vector: bool = False) -> Dict[str, Any]:
+        """BM25 search; ``include_vector`` returns stored embeddings for client-side rerank."""
+        resp = self.client.search(index=self.index, body=self._text_body(q, top_k, filters, include_vector))
+        return self._items(resp, include_vector)
+
+    def knn_search(self, q: str, k: int = 10, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if not self.use_knn:
+            # fallback to text + embedding rerank client-side at API
+            return self.search(q, top_k=k, filters=filters)
+        resp = self.client.search(index=self.index, body=self._knn_body(self._embed(q), k, filters))
+        return self._items(resp)
+
+    def hybrid_legs(self, q: str, top_k: int = 10, k: int = 10,
+                    filters: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Run the BM25 and kNN legs of a hybrid query in one ``msearch``.
+
+        OpenSearch executes the searches of an msearch request concurrently,
+        so latency is that of the slower leg rather than the sum of two
+        round-trips. Without kNN the second leg is the text fallback used by
+        :meth:`knn_search`.
+        """
+        second = (
+            self._knn_body(self._embed(q), k, filters) if self.use_knn
+            else self._text_body(q, k, filters)
+        )
+        resp = self.client.msearch(
+            body=[{"index": self.index}, self._text_body(q, top_k, filters), {"index": self.index}, second]
+        )
+        legs = []
+        for r in resp.get("responses", []):
+            if "error" in r:
+                raise RuntimeError(f"hybrid search leg failed: {r['error']}")
+            legs.append(self._items(r))
+        if len(legs) != 2:
+            raise RuntimeError("hybrid search returned an incomplete msearch response")
+        return legs[0], legs[1]
+
     def knn_search_vector(self, vector: List[float], k: int = 10, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         if not self.use_knn:
             return {"total": 0, "items": []}
-        filts = self._build_filters(filters)
-        if filts:
-            body = {"size": k, "query": {"bool": {"must": [{"knn": {"vector": {"vector": vector, "k": k}}}], "filter": filts}}}
-        else:
-            body = {"size": k, "query": {"knn": {"vector": {"vector": vector, "k": k}}}}
-        resp = self.client.search(index=self.index, body=body)
-        hits = resp.get("hits", {}).get("hits", [])
-        items = [{
-            "id": h.get("_source", {}).get("id"),
-            "title": h.get("_source", {}).get("title"),
-            "paragraph": h.get("_source", {}).get("paragraph"),
-            "text": h.get("_source", {}).get("text", "")[:500],
-            "score": h.get("_score"),
-        } for h in hits]
-        total = resp.get("hits", {}).get("total", {}).get("value", len(items))
-        return {"total": total, "items": items}
+        resp = self.client.search(index=self.index, body=self._knn_body(vector, k, filters))
+        return self._items(resp)
 
     def index_doc(self, doc: Dict[str, Any]) -> bool:
         body = dict(doc)
         # add vector embedding
-        text = f"{body.get('title','')} {body.get('paragraph','')} {body.get('text','')}"
-        body['vector'] = self._embed(text)
+        body['vector'] = self._embed(_doc_text(body))
         self.client.index(index=self.index, id=body.get("id"), body=body, refresh=True)
         return True
 
+    def bulk_index(
+        self,
+        docs: List[Dict[str, Any]],
+        refresh: Optional[str] = None,
+        chunk_docs: Optional[int] = None,
+        chunk_bytes: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Embed ``docs`` as one matrix and upsert them via ``helpers.bulk``.
+
+        Requests are bounded by ``chunk_docs`` documents and ``chunk_bytes``
+        bytes and never refresh individually; with ``refresh="batch"`` the
+        index is refreshed once at the end, with ``"interval"`` the index's
+        own refresh interval makes the documents visible.
+        """
+        refresh = refresh or BULK_REFRESH
+        if refresh not in ("batch", "interval"):
+            raise ValueError(f"unknown refresh mode {refresh!r}")
+        start = time.perf_counter()
+        vectors = embed_matrix((_doc_text(d) for d in docs), 64)
+        actions = (
+            {
+                "_op_type": "index",
+                "_index": self.index,
+                "_id": doc.get("id"),
+                "_source": {**doc, "vector": vec.tolist()},
+            }
+            for doc, vec in zip(docs, vectors)
+        )
+        indexed, errors = helpers.bulk(
+            self.client,
+            actions,
+            chunk_size=chunk_docs or BULK_CHUNK_DOCS,
+            max_chunk_bytes=chunk_bytes or BULK_CHUNK_BYTES,
+            raise_on_error=False,
+            refresh=False,
+        )
+        if refresh == "batch" and indexed:
+            self.client.indices.refresh(index=self.index)
+        return {
+            "indexed": indexed,
+            "failed": len(errors),
+            "errors": errors[:10],
+            "refresh": refresh,
+            "took_ms": int((time.perf_counter() - start) * 1000),
+        }
+
     def set_ef_search(self, ef_search: int) -> Dict[str, Any]:
         try:
             resp = self.client.indices.put_settings(index=self.index, body={
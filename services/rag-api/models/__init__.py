@@ -10,6 +10,8 @@ from .requests import (
     HybridRequest,
     EfSearchRequest,
     IndexResponse,
+    BulkIndexRequest,
+    BulkIndexResponse,
     GraphUpsertRequest,
     GraphUpsertResponse,
     ExtractEventsRequest,
@@ -30,6 +32,8 @@ __all__ = [
     "HybridRequest",
     "EfSearchRequest",
     "IndexResponse",
+    "BulkIndexRequest",
+    "BulkIndexResponse",
     "GraphUpsertRequest",
     "GraphUpsertResponse",
     "ExtractEventsRequest",
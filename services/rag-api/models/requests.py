@@ -42,6 +42,8 @@ class HybridRequest(BaseModel):
     top_k: int = Field(10, description="Number of results from text search", ge=1, le=100)
     k: int = Field(10, description="Number of results from vector search", ge=1, le=100)
     alpha: float = Field(0.5, description="Weight for BM25 vs KNN (0.0-1.0)", ge=0.0, le=1.0)
+    fusion: str = Field("alpha", description="Score fusion: alpha (weighted blend) or rrf (reciprocal rank)", pattern="^(alpha|rrf)$")
+    rrf_k: int = Field(60, description="Rank constant for reciprocal-rank fusion", ge=1)
     filters: Optional[Dict[str, Any]] = Field(None, description="Search filters")
 
 
@@ -57,6 +59,26 @@ class IndexResponse(BaseModel):
     message: str = Field(default="Document successfully indexed")
 
 
+class BulkIndexRequest(BaseModel):
+    """Request for bulk indexing of law documents."""
+    documents: List[LawDoc] = Field(..., description="Documents to index", min_length=1, max_length=50000)
+    refresh: Optional[str] = Field(
+        None,
+        description="'batch' refreshes once after the bulk call, 'interval' relies on the index refresh interval",
+        pattern="^(batch|interval)$",
+    )
+
+
+class BulkIndexResponse(BaseModel):
+    """Response for bulk indexing."""
+    status: str = Field(..., description="Indexing status")
+    indexed: int = Field(..., description="Number of documents indexed", ge=0)
+    failed: int = Field(0, description="Number of documents rejected", ge=0)
+    errors: List[Dict[str, Any]] = Field(default_factory=list, description="First bulk item errors")
+    refresh: str = Field(..., description="Refresh mode applied")
+    took_ms: int = Field(..., description="Time spent embedding and indexing in milliseconds")
+
+
 class GraphUpsertRequest(BaseModel):
     """Request for upserting law into graph database."""
     doc: LawDoc = Field(..., description="Law document to upsert")
@@ -43,6 +43,8 @@ from ..models import (
     HybridRequest,
     EfSearchRequest,
     IndexResponse,
+    BulkIndexRequest,
+    BulkIndexResponse,
     GraphUpsertRequest,
     GraphUpsertResponse,
     ExtractEventsRequest,
@@ -56,6 +58,7 @@ from ..models import (
 
 # Import clients
 from ..app.opensearch_client import OSClient
+from ..app.hybrid import fuse
 from ..app.neo4j_client import Neo4jClient
 
 router = APIRouter(tags=["RAG API"], prefix="/v1")
@@ -112,15 +115,15 @@ def search_documents(
     """
     try:
         os_client = get_opensearch_client()
-        res = os_client.search(q, top_k=top_k)
+        res = os_client.search(q, top_k=top_k, include_vector=rerank == 2)
         items = res["items"]
         
         if rerank == 1:
             items = _basic_rerank(q, items)
         elif rerank == 2:
-            # Embedding dot-product rerank (client-side)
+            # Embedding dot-product rerank (client-side); vectors are not returned
             qvec = os_client._embed(q)
-            items = sorted(items, key=lambda it: _dot(qvec, it.get('vector') or []), reverse=True)
+            items = sorted(items, key=lambda it: _dot(qvec, it.pop('vector', None) or []), reverse=True)
         
         return RetrieveResponse(total=res["total"], items=items)
         
@@ -168,43 +171,20 @@ def hybrid_search(req: HybridRequest):
     """
     Perform hybrid search combining BM25 text search and KNN vector search.
     
-    Combines results from both search methods using configurable weighting.
+    Both searches run concurrently in a single msearch request. Results are
+    combined with a max-normalised alpha blend or reciprocal-rank fusion.
     """
     try:
         os_client = get_opensearch_client()
         
-        # Text search
-        text_results = os_client.search(req.q, top_k=req.top_k, filters=req.filters)
-        
-        # KNN search
-        knn_results = os_client.knn_search(req.q, k=req.k, filters=req.filters)
-        
-        # Normalize and combine scores
-        bm = {it['id']: (it.get('score') or 0.0, it) for it in text_results['items']}
-        km = {it['id']: (it.get('score') or 0.0, it) for it in knn_results['items']}
-        
-        max_b = max((v[0] for v in bm.values()), default=1.0)
-        max_k = max((v[0] for v in km.values()), default=1.0)
-        
-        combined = {}
-        for id_, (sc, it) in bm.items():
-            combined.setdefault(id_, {'doc': it, 'b': 0.0, 'k': 0.0})
-            combined[id_]['b'] = sc / (max_b or 1.0)
-            
-        for id_, (sc, it) in km.items():
-            combined.setdefault(id_, {'doc': it, 'b': 0.0, 'k': 0.0})
-            combined[id_]['k'] = sc / (max_k or 1.0)
-        
-        # Calculate hybrid scores
-        alpha = max(0.0, min(1.0, req.alpha))
-        items = []
-        for id_, comp in combined.items():
-            score = alpha * comp['b'] + (1 - alpha) * comp['k']
-            doc = dict(comp['doc'])
-            doc['hybrid_score'] = score
-            items.append(doc)
-        
-        items.sort(key=lambda x: x.get('hybrid_score', 0.0), reverse=True)
+        # Both legs in one msearch round-trip, then fuse
+        text_results, knn_results = os_client.hybrid_legs(
+            req.q, top_k=req.top_k, k=req.k, filters=req.filters
+        )
+        items = fuse(
+            text_results['items'], knn_results['items'],
+            method=req.fusion, alpha=req.alpha, rrf_k=req.rrf_k,
+        )
         items = items[:req.top_k]
         
         return RetrieveResponse(total=len(items), items=items)
@@ -260,6 +240,27 @@ def index_document(doc: LawDoc):
         raise_http_error("INDEX_OPERATION_FAILED", f"Failed to index document: {str(e)}")
 
 
+@router.post("/documents/bulk", response_model=BulkIndexResponse)
+def bulk_index_documents(req: BulkIndexRequest):
+    """
+    Index many law documents in one call.
+    
+    Embeds the batch as a matrix, sends size-bounded bulk requests and
+    refreshes the index once per batch instead of once per document.
+    """
+    try:
+        os_client = get_opensearch_client()
+        res = os_client.bulk_index([doc.model_dump() for doc in req.documents], refresh=req.refresh)
+        
+        return BulkIndexResponse(
+            status="indexed" if not res["failed"] else "partial",
+            **res
+        )
+        
+    except Exception as e:
+        raise_http_error("BULK_INDEX_FAILED", f"Bulk indexing failed: {str(e)}")
+
+
 @router.post("/graph/documents", response_model=GraphUpsertResponse)
 def upsert_document_graph(req: GraphUpsertRequest):
     """
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import math
+
+from opensearchpy.serializer import JSONSerializer
+
+from app.opensearch_client import OSClient, embed_matrix
+
+
+def _reference_embed(text, dims=64):
+    vec = [0.0] * dims
+    for tok in text.lower().split():
+        vec[int(hashlib.md5(tok.encode()).hexdigest(), 16) % dims] += 1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+class FakeIndices:
+    def __init__(self):
+        self.refreshes = 0
+
+    def refresh(self, index):
+        self.refreshes += 1
+
+
+class FakeOpenSearch:
+    def __init__(self):
+        self.transport = type("T", (), {"serializer": JSONSerializer()})()
+        self.indices = FakeIndices()
+        self.requests = []
+
+    def bulk(self, body, **kwargs):
+        lines = body.strip().split("\n")
+        self.requests.append((lines, kwargs))
+        ids = [json.loads(line)["index"]["_id"] for line in lines[::2]]
+        return {"errors": False, "items": [{"index": {"_id": i, "status": 201}} for i in ids]}
+
+
+def _client():
+    client = OSClient.__new__(OSClient)
+    client.index = "laws"
+    client.client = FakeOpenSearch()
+    return client
+
+
+def test_embed_matrix_matches_per_document_embedding():
+    texts = ["Dies ist ein Test.", "", "a a b", "§1 ArbSchG Arbeitsschutz"]
+    matrix = embed_matrix(texts)
+    assert matrix.shape == (4, 64) and str(matrix.dtype) == "float32"
+    for row, text in zip(matrix, texts):
+        assert max(abs(a - b) for a, b in zip(row.tolist(), _reference_embed(text))) < 1e-6
+
+
+def test_bulk_index_chunks_and_refreshes_once():
+    client = _client()
+    docs = [{"id": f"law-{i}", "title": "T", "text": f"Paragraph {i}"} for i in range(7)]
+    res = client.bulk_index(docs, chunk_docs=3)
+    fake = client.client
+    assert res["indexed"] == 7 and res["failed"] == 0
+    assert [len(lines) // 2 for lines, _ in fake.requests] == [3, 3, 1]
+    assert all(kwargs.get("refresh") is False for _, kwargs in fake.requests)
+    assert fake.indices.refreshes == 1
+    source = json.loads(fake.requests[0][0][1])
+    assert len(source["vector"]) == 64
+
+    client.bulk_index(docs, refresh="interval")
+    assert fake.indices.refreshes == 1
@@ -0,0 +1,92 @@
+import pytest
+
+from app.hybrid import alpha_blend, fuse, rrf
+from app.opensearch_client import OSClient
+
+
+def _hit(id_, score, vector=True):
+    src = {"id": id_, "title": f"T{id_}", "paragraph": "§1", "text": "Text"}
+    if vector:
+        src["vector"] = [0.1] * 64
+    return {"_score": score, "_source": src}
+
+
+class FakeOpenSearch:
+    def __init__(self, text_hits, knn_hits):
+        self.text_hits = text_hits
+        self.knn_hits = knn_hits
+        self.calls = []
+
+    def _resp(self, hits):
+        return {"hits": {"total": {"value": len(hits)}, "hits": hits}}
+
+    def search(self, index, body):
+        self.calls.append(("search", body))
+        return self._resp(self.text_hits)
+
+    def msearch(self, body):
+        self.calls.append(("msearch", body))
+        return {"responses": [self._resp(self.text_hits), self._resp(self.knn_hits)]}
+
+
+def _client(text_hits, knn_hits, use_knn=True):
+    client = OSClient.__new__(OSClient)
+    client.index = "laws"
+    client.use_knn = use_knn
+    client.client = FakeOpenSearch(text_hits, knn_hits)
+    return client
+
+
+def test_hybrid_legs_use_single_msearch_without_vectors():
+    client = _client([_hit("a", 4.0), _hit("b", 2.0)], [_hit("b", 0.9), _hit("c", 0.5)])
+    text, knn = client.hybrid_legs("Arbeitsschutz", top_k=2, k=2, filters={"domain": "labour"})
+    assert [name for name, _ in client.client.calls] == ["msearch"]
+    header, text_body, _, knn_body = client.client.calls[0][1]
+    assert header == {"index": "laws"}
+    assert text_body["_source"] == {"excludes": ["vector"]}
+    assert "knn" in str(knn_body["query"]) and knn_body["_source"] == {"excludes": ["vector"]}
+    assert [it["id"] for it in text["items"]] == ["a", "b"]
+    assert [it["id"] for it in knn["items"]] == ["b", "c"]
+    assert all("vector" not in it for it in text["items"] + knn["items"])
+
+
+def test_hybrid_legs_fall_back_to_text_without_knn():
+    client = _client([_hit("a", 4.0)], [_hit("a", 4.0)], use_knn=False)
+    client.hybrid_legs("Arbeitsschutz", top_k=3, k=5)
+    _, text_body, _, second = client.client.calls[0][1]
+    assert second["size"] == 5 and "multi_match" in str(second["query"])
+
+
+def test_hybrid_legs_raise_on_failed_leg():
+    client = _client([], [])
+    client.client.msearch = lambda body: {"responses": [{"hits": {"hits": []}}, {"error": "boom"}]}
+    with pytest.raises(RuntimeError):
+        client.hybrid_legs("q")
+
+
+def test_search_returns_vector_only_when_requested():
+    client = _client([_hit("a", 1.0)], [])
+    assert "vector" not in client.search("q")["items"][0]
+    assert client.client.calls[-1][1]["_source"] == {"excludes": ["vector"]}
+    assert len(client.search("q", include_vector=True)["items"][0]["vector"]) == 64
+    assert "_source" not in client.client.calls[-1][1]
+
+
+def test_alpha_blend_matches_max_normalised_weighting():
+    bm = [{"id": "a", "score": 4.0}, {"id": "b", "score": 2.0}]
+    kn = [{"id": "b", "score": 0.8}, {"id": "c", "score": 0.4}]
+    out = {it["id"]: it["hybrid_score"] for it in alpha_blend(bm, kn, alpha=0.5)}
+    assert out == pytest.approx({"a": 0.5, "b": 0.75, "c": 0.25})
+
+
+def test_rrf_rewards_documents_in_both_legs():
+    bm = [{"id": "a", "score": 40.0}, {"id": "b", "score": 2.0}]
+    kn = [{"id": "b", "score": 0.8}, {"id": "c", "score": 0.4}]
+    out = rrf(bm, kn, rrf_k=60)
+    assert [it["id"] for it in out] == ["b", "a", "c"]
+    assert out[0]["hybrid_score"] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_fuse_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        fuse([], [], method="max")
@@ -12,6 +12,8 @@ class Settings(BaseSettings):
     rerank_model: str = Field("sentence-transformers/all-MiniLM-L6-v2", alias="RERANK_MODEL")
     rerank_timeout_ms: int = Field(800, alias="RERANK_TIMEOUT_MS")
     rerank_cache_ttl_s: int = Field(1800, alias="RERANK_CACHE_TTL_S")
+    rerank_vector_store_dir: str = Field("", alias="RERANK_VECTOR_STORE_DIR")
+    rerank_vector_store_max_rows: int = Field(1_000_000, alias="RERANK_VECTOR_STORE_MAX_ROWS")
 
     knn_enabled: bool = Field(False, alias="KNN_ENABLED")
 
@@ -332,12 +332,23 @@ def search_documents(
             else:
                 query = {"match_all": {}}
             
+            # Reranking reorders a deeper BM25 candidate pool (rerank_topk) and
+            # the requested page is cut from the reranked list afterwards
+            want_rerank = bool(
+                enable_rerank and settings.rerank_enabled and
+                request.q and len(request.q.strip()) > 2
+            )
+            page_end = pagination.offset + pagination.size
+
             # Build request body
-            body = {
-                "query": query,
-                "size": pagination.size,
-                "from": pagination.offset
-            }
+            if want_rerank:
+                body = {"query": query, "size": max(page_end, settings.rerank_topk), "from": 0}
+            else:
+                body = {
+                    "query": query,
+                    "size": pagination.size,
+                    "from": pagination.offset
+                }
             
             # Add facets
             if request.facets:
@@ -405,16 +416,17 @@ def search_documents(
             
             # Apply reranking if requested
             reranked = False
-            if (enable_rerank and settings.rerank_enabled and 
-                len(results) > 1 and request.q and len(request.q.strip()) > 2):
+            if want_rerank and len(results) > 1:
                 
                 try:
                     RERANK_REQS.inc()
                     with RERANK_LATENCY.time():
-                        results = _apply_reranking(request.q, results)
+                        results = _apply_reranking(request.q, results, keep=page_end)
                         reranked = True
                 except Exception as e:
                     logger.warning(f"Reranking failed: {e}")
+            if want_rerank:
+                results = results[pagination.offset:page_end]
             
             # Create paginated response
             paginated_results = PaginatedResponse.create(
@@ -661,8 +673,14 @@ def delete_document(
         )
 
 
-def _apply_reranking(query: str, results: List[SearchResult]) -> List[SearchResult]:
-    """Apply AI-powered reranking to search results."""
+def _apply_reranking(
+    query: str, results: List[SearchResult], keep: Optional[int] = None
+) -> List[SearchResult]:
+    """Apply AI-powered reranking to search results.
+
+    Only the best ``keep`` reranked results are guaranteed to be in order;
+    the rest of the top-k follow in unspecified order.
+    """
     if not settings.rerank_enabled or len(results) <= 1:
         return results
     
@@ -675,37 +693,33 @@ def _apply_reranking(query: str, results: List[SearchResult]) -> List[SearchResu
         (results[i].snippet or results[i].body or results[i].title or "")[:1024]
         for i in range(topk)
     ]
-    doc_vecs = np.vstack([
-        rr.get_doc_embedding(provider, results[i].id, doc_texts[i]) 
-        for i in range(topk)
-    ])
-    
-    # Calculate similarity scores
-    ranks = rr.cosine_rank(query_vec, doc_vecs)
-    cos_scores = [r[1] for r in ranks]
-    bm25_scores = [results[r[0]].score for r in ranks]
+    doc_vecs = rr.get_doc_embeddings(
+        provider, [(results[i].id, doc_texts[i]) for i in range(topk)]
+    )
     
-    # Normalize and blend scores
-    norm_cos = rr.normalize(cos_scores)
-    norm_bm = rr.normalize(bm25_scores)
-    blended = [0.7 * norm_cos[i] + 0.3 * norm_bm[i] for i in range(len(ranks))]
+    # Similarity and blended scores as float32 arrays
+    cos_scores = rr.cosine_scores(query_vec, doc_vecs)
+    bm25_scores = np.fromiter((r.score or 0.0 for r in results[:topk]), dtype=np.float32, count=topk)
+    blended = rr.blend(cos_scores, bm25_scores, weight=0.7)
+    order = rr.top_k(blended, keep or topk)
     
     # Update results with reranking metadata
     reranked_results = []
-    for (idx, cos), final in zip(ranks, blended):
+    for idx in order.tolist():
         result = results[idx]
         if result.meta is None:
             result.meta = {}
         result.meta["rerank"] = {
-            "cosine": float(cos),
-            "blended": float(final)
+            "cosine": float(cos_scores[idx]),
+            "blended": float(blended[idx])
         }
-        result.score = float(final)
+        result.score = float(blended[idx])
         reranked_results.append(result)
     
-    # Sort by blended score and append remaining results
-    reranked_results.sort(key=lambda x: x.score, reverse=True)
-    return reranked_results + results[topk:]
+    # Remaining top-k candidates, then the results beyond top-k
+    selected = set(order.tolist())
+    rest = [results[i] for i in range(topk) if i not in selected]
+    return reranked_results + rest + results[topk:]
 
 
 # Include V1 router
@@ -1,7 +1,13 @@
+import contextlib
+import fcntl
 import hashlib
+import json
 import logging
+import os
+import re
 import threading
-from typing import List, Tuple
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 from cachetools import TTLCache
@@ -14,7 +20,19 @@ settings = Settings()
 # caches
 query_cache = TTLCache(maxsize=1024, ttl=settings.rerank_cache_ttl_s)
 doc_cache = TTLCache(maxsize=4096, ttl=settings.rerank_cache_ttl_s)
-cache_stats = {"q_hits": 0, "q_miss": 0, "d_hits": 0, "d_miss": 0}
+cache_stats = {
+    "q_hits": 0,
+    "q_miss": 0,
+    "d_hits": 0,
+    "d_miss": 0,
+    # batched doc encodes and the texts they covered
+    "d_batches": 0,
+    "d_embedded": 0,
+    # disk-backed vector store (RERANK_VECTOR_STORE_DIR)
+    "store_hits": 0,
+    "store_writes": 0,
+    "store_rows": 0,
+}
 
 
 def _hash(text: str) -> str:
@@ -51,7 +69,8 @@ class EmbeddingProvider:
     def embed(self, texts: List[str]) -> np.ndarray:
         model = self._load()
         return np.asarray(
-            model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+            model.encode(texts, convert_to_numpy=True, normalize_embeddings=True),
+            dtype=np.float32,
         )
 
 
@@ -71,31 +90,240 @@ def get_query_embedding(provider: EmbeddingProvider, text: str) -> np.ndarray:
     return vec
 
 
+class VectorStore:
+    """Append-only float32 vector store memory-mapped from disk.
+
+    ``vectors.f32`` holds fixed-width rows and ``keys.tsv`` maps each cache key
+    to its row. Rows are written before their key line, under an exclusive
+    ``flock``, so every worker sharing the directory can read the keys it has
+    not seen yet and find their vectors in place. Once ``max_rows`` is reached
+    new vectors stay in the in-memory cache only.
+    """
+
+    def __init__(self, path: str, dim: Optional[int] = None, max_rows: int = 1_000_000):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta = self.path / "meta.json"
+        stored = json.loads(meta.read_text()).get("dim") if meta.exists() else None
+        if dim is None:
+            dim = stored
+        if dim is None:
+            raise ValueError(f"vector store {path} is empty and no dimension was given")
+        self.dim = dim
+        self.max_rows = max_rows
+        self._row_bytes = dim * 4
+        self._vectors = self.path / "vectors.f32"
+        self._keys = self.path / "keys.tsv"
+        self._lockfile = self.path / "lock"
+        self._index: Dict[str, int] = {}
+        self._keys_offset = 0
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+
+        with self._flock():
+            if meta.exists():
+                stored = json.loads(meta.read_text()).get("dim")
+                if stored != dim:
+                    raise ValueError(f"vector store {path} has dim {stored}, expected {dim}")
+            else:
+                meta.write_text(json.dumps({"dim": dim, "dtype": "float32"}))
+            self._vectors.touch()
+            self._keys.touch()
+        self._refresh()
+
+    @contextlib.contextmanager
+    def _flock(self):
+        """Exclusive lock shared by every process using this directory."""
+        with open(self._lockfile, "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _refresh(self) -> None:
+        """Pick up keys appended by other workers and remap the vectors."""
+        with open(self._keys, "rb") as fh:
+            fh.seek(self._keys_offset)
+            data = fh.read()
+        # ignore a trailing partial line; it is re-read on the next refresh
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.decode("utf-8").splitlines():
+            key, _, row = line.partition("\t")
+            self._index[key] = int(row)
+        self._keys_offset += len(complete)
+        rows = os.path.getsize(self._vectors) // self._row_bytes
+        if rows and (self._mmap is None or self._mmap.shape[0] != rows):
+            self._mmap = np.memmap(self._vectors, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        with self._lock:
+            if any(k not in self._index for k in keys):
+                self._refresh()
+            found = {}
+            for key in keys:
+                row = self._index.get(key)
+                if row is not None and self._mmap is not None and row < self._mmap.shape[0]:
+                    found[key] = np.array(self._mmap[row])
+            return found
+
+    def put_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> int:
+        items = [(k, v) for k, v in items if k not in self._index]
+        if not items:
+            return 0
+        with self._lock, self._flock():
+            self._refresh()
+            items = [(k, v) for k, v in items if k not in self._index]
+            start = os.path.getsize(self._vectors) // self._row_bytes
+            items = items[: max(0, self.max_rows - start)]
+            if not items:
+                return 0
+            matrix = np.asarray([v for _, v in items], dtype=np.float32).reshape(len(items), self.dim)
+            with open(self._vectors, "r+b") as fh:
+                fh.seek(start * self._row_bytes)
+                fh.write(matrix.tobytes())
+            with open(self._keys, "a", encoding="utf-8") as fh:
+                fh.writelines(f"{key}\t{start + i}\n" for i, (key, _) in enumerate(items))
+            self._refresh()
+            return len(items)
+
+
+_stores: Dict[str, VectorStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_vector_store(provider: EmbeddingProvider, dim: Optional[int] = None) -> Optional[VectorStore]:
+    """Disk store for ``provider``'s model, or ``None`` when not configured.
+
+    Without ``dim`` an existing store is opened with its recorded dimension;
+    a store that has never been written to is only created once ``dim`` is
+    known from a first encode.
+    """
+    if not settings.rerank_vector_store_dir:
+        return None
+    model = getattr(provider, "model_name", None) or "default"
+    path = os.path.join(settings.rerank_vector_store_dir, re.sub(r"[^\w.-]+", "_", model))
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            if dim is None and not os.path.exists(os.path.join(path, "meta.json")):
+                return None
+            try:
+                store = VectorStore(path, dim, settings.rerank_vector_store_max_rows)
+            except (OSError, ValueError) as exc:
+                logger.warning("vector store disabled: %s", exc)
+                return None
+            _stores[path] = store
+            cache_stats["store_rows"] = len(store)
+        return store
+
+
+def get_doc_embeddings(
+    provider: EmbeddingProvider, docs: Sequence[Tuple[str, str]]
+) -> np.ndarray:
+    """Embeddings for ``(doc_id, text)`` pairs, encoding all misses in one batch.
+
+    Lookups go to the in-memory TTL cache first, then to the disk store when
+    one is configured; the remaining texts are passed to a single
+    ``provider.embed`` call and written back to both.
+    """
+    keys = [f"de:{doc_id}:{_hash(text)}" for doc_id, text in docs]
+    vecs: Dict[str, np.ndarray] = {}
+    for key in keys:
+        vec = doc_cache.get(key)
+        if vec is not None:
+            vecs[key] = vec
+    cache_stats["d_hits"] += sum(1 for key in keys if key in vecs)
+
+    missing = {key: text for key, (_, text) in zip(keys, docs) if key not in vecs}
+    store = get_vector_store(provider) if missing else None
+    if store is not None:
+        found = store.get_many(list(missing))
+        for key, vec in found.items():
+            vecs[key] = doc_cache[key] = vec
+            del missing[key]
+        cache_stats["store_hits"] += len(found)
+        cache_stats["d_hits"] += sum(1 for key in keys if key in found)
+
+    if missing:
+        embedded = provider.embed(list(missing.values()))
+        cache_stats["d_batches"] += 1
+        cache_stats["d_embedded"] += len(missing)
+        cache_stats["d_miss"] += sum(1 for key in keys if key in missing)
+        for key, vec in zip(missing, embedded):
+            vecs[key] = doc_cache[key] = vec
+        store = store or get_vector_store(provider, int(np.asarray(embedded).shape[-1]))
+        if store is not None:
+            cache_stats["store_writes"] += store.put_many((key, vecs[key]) for key in missing)
+            cache_stats["store_rows"] = len(store)
+
+    return np.vstack([vecs[key] for key in keys])
+
+
 def get_doc_embedding(provider: EmbeddingProvider, doc_id: str, text: str) -> np.ndarray:
-    key = f"de:{doc_id}:{_hash(text)}"
-    vec = doc_cache.get(key)
-    if vec is None:
-        vec = provider.embed([text])[0]
-        doc_cache[key] = vec
-        cache_stats["d_miss"] += 1
+    return get_doc_embeddings(provider, [(doc_id, text)])[0]
+
+
+def cosine_scores(query_vec: np.ndarray, doc_vecs: np.ndarray, normalized: bool = True) -> np.ndarray:
+    """Cosine similarity of each doc row to the query as float32.
+
+    Embeddings are normalised at encode time, so by default this is a single
+    matrix-vector product; pass ``normalized=False`` for arbitrary vectors.
+    """
+    q = np.asarray(query_vec, dtype=np.float32)
+    docs = np.asarray(doc_vecs, dtype=np.float32)
+    if docs.size == 0:
+        return np.empty(0, dtype=np.float32)
+    if not normalized:
+        q = q / (np.linalg.norm(q) + 1e-9)
+        docs = docs / (np.linalg.norm(docs, axis=1, keepdims=True) + 1e-9)
+    return docs @ q
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first.
+
+    ``argpartition`` selects the candidates in O(n); only those ``k`` are
+    sorted. Ties keep their original (BM25) order.
+    """
+    n = scores.shape[0]
+    k = max(0, min(k, n))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        idx = np.sort(np.argpartition(-scores, k - 1)[:k])
     else:
-        cache_stats["d_hits"] += 1
-    return vec
+        idx = np.arange(n)
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+def normalize_array(scores: np.ndarray) -> np.ndarray:
+    """Min-max scale to [0, 1] in float32; constant input maps to zeros."""
+    a = np.asarray(scores, dtype=np.float32)
+    if a.size == 0:
+        return a
+    mn, mx = a.min(), a.max()
+    if mx - mn < 1e-9:
+        return np.zeros_like(a)
+    return (a - mn) / (mx - mn)
+
+
+def blend(cos: np.ndarray, bm25: np.ndarray, weight: float = 0.7) -> np.ndarray:
+    """``weight`` * normalised cosine + (1 - ``weight``) * normalised BM25."""
+    return np.float32(weight) * normalize_array(cos) + np.float32(1.0 - weight) * normalize_array(bm25)
 
 
 def cosine_rank(query_vec: np.ndarray, doc_vecs: np.ndarray) -> List[Tuple[int, float]]:
     if doc_vecs.size == 0:
         return []
-    q = query_vec / (np.linalg.norm(query_vec) + 1e-9)
-    docs = doc_vecs / (np.linalg.norm(doc_vecs, axis=1, keepdims=True) + 1e-9)
-    scores = docs.dot(q)
-    return sorted(list(enumerate(scores)), key=lambda x: x[1], reverse=True)
+    scores = cosine_scores(query_vec, doc_vecs, normalized=False)
+    return [(int(i), float(scores[i])) for i in top_k(scores, scores.shape[0])]
 
 
 def normalize(scores: List[float]) -> List[float]:
     if not scores:
         return scores
-    mn, mx = min(scores), max(scores)
-    if mx - mn < 1e-9:
-        return [0.0 for _ in scores]
-    return [(s - mn) / (mx - mn) for s in scores]
+    return normalize_array(np.asarray(scores)).tolist()
@@ -164,3 +164,108 @@ def test_cosine_rank_and_normalize():
     assert rr.cosine_rank(np.array([1.0]), np.empty((0, 1))) == []
     assert rr.normalize([]) == []
     assert rr.normalize([1.0, 1.0]) == [0.0, 0.0]
+
+
+def test_doc_embeddings_batch_misses(monkeypatch):
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return np.asarray([[float(len(t)), 1.0] for t in texts])
+
+    provider = types.SimpleNamespace(embed=embed)
+    rr.doc_cache.clear()
+    rr.get_doc_embedding(provider, "1", "a")
+    vecs = rr.get_doc_embeddings(provider, [("1", "a"), ("2", "bb"), ("3", "ccc"), ("2", "bb")])
+    assert calls == [["a"], ["bb", "ccc"]]
+    assert vecs.shape == (4, 2)
+    assert vecs[:, 0].tolist() == [1.0, 2.0, 3.0, 2.0]
+
+
+def test_vector_store_survives_restart(monkeypatch, tmp_path):
+    monkeypatch.setenv("RERANK_VECTOR_STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(rr, "settings", AppSettings())
+    monkeypatch.setattr(rr, "_stores", {})
+    provider = types.SimpleNamespace(
+        model_name="org/model", embed=lambda texts: np.asarray([[1.0, 0.5, 0.25] for _ in texts])
+    )
+    rr.doc_cache.clear()
+    rr.get_doc_embeddings(provider, [("1", "x"), ("2", "y")])
+    assert rr.cache_stats["store_rows"] == 2
+    assert (tmp_path / "org_model" / "vectors.f32").stat().st_size == 2 * 3 * 4
+
+    # a fresh worker: empty memory cache, no open stores, encoder must not run
+    monkeypatch.setattr(rr, "_stores", {})
+    rr.doc_cache.clear()
+    hits = rr.cache_stats["store_hits"]
+
+    def fail(texts):
+        raise AssertionError("should be served from the vector store")
+
+    provider.embed = fail
+    vecs = rr.get_doc_embeddings(provider, [("2", "y"), ("1", "x")])
+    assert vecs.dtype == np.float32
+    assert vecs.tolist() == [[1.0, 0.5, 0.25]] * 2
+    assert rr.cache_stats["store_hits"] == hits + 2
+
+
+def test_vector_store_shared_and_bounded(tmp_path):
+    a = rr.VectorStore(str(tmp_path), dim=2, max_rows=3)
+    b = rr.VectorStore(str(tmp_path), max_rows=3)
+    assert b.dim == 2
+    assert a.put_many([("k1", np.array([1.0, 2.0])), ("k2", np.array([3.0, 4.0]))]) == 2
+    assert b.get_many(["k2"])["k2"].tolist() == [3.0, 4.0]
+    assert b.put_many([("k2", np.zeros(2)), ("k3", np.ones(2)), ("k4", np.ones(2))]) == 1
+    assert len(a.get_many(["k1", "k2", "k3", "k4"])) == 3
+    with pytest.raises(ValueError):
+        rr.VectorStore(str(tmp_path), dim=4)
+
+
+def test_top_k_partial_selection_matches_full_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.random(1000, dtype=np.float32)
+    full = np.argsort(-scores, kind="stable")
+    assert rr.top_k(scores, 20).tolist() == full[:20].tolist()
+    assert rr.top_k(scores, 5000).tolist() == full.tolist()
+    assert rr.top_k(np.array([0.5, 0.9, 0.5], dtype=np.float32), 3).tolist() == [1, 0, 2]
+    assert rr.top_k(scores, 0).size == 0
+
+
+def test_blend_and_cosine_scores_are_float32():
+    q = np.array([1.0, 0.0], dtype=np.float32)
+    docs = np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]], dtype=np.float32)
+    cos = rr.cosine_scores(q, docs)
+    assert cos.dtype == np.float32
+    assert cos.tolist() == pytest.approx([1.0, 0.0, 0.6])
+    blended = rr.blend(cos, np.array([0.0, 2.0, 1.0]))
+    assert blended.dtype == np.float32
+    assert blended.tolist() == pytest.approx([0.7, 0.3, 0.57])
+    assert rr.cosine_scores(q, np.empty((0, 2))).size == 0
+
+
+def test_apply_reranking_keeps_ordered_prefix(monkeypatch):
+    from search_api.app import main_v1
+
+    monkeypatch.setattr(main_v1, "settings", AppSettings(RERANK_ENABLED=True, RERANK_TOPK=1000))
+    rr.query_cache.clear()
+    rr.doc_cache.clear()
+    rng = np.random.default_rng(1)
+    vecs = rng.random((1200, 8)).astype(np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    lookup = {f"t{i}": vecs[i] for i in range(1200)}
+    lookup["query"] = vecs[0]
+
+    def embed(self, texts):
+        return np.asarray([lookup[t] for t in texts])
+
+    monkeypatch.setattr(rr.EmbeddingProvider, "embed", embed, raising=False)
+    results = [
+        main_v1.SearchResult(id=str(i), title=f"t{i}", score=float(1200 - i)) for i in range(1200)
+    ]
+    out = main_v1._apply_reranking("query", results, keep=10)
+    assert len(out) == 1200
+    assert [r.id for r in out[1000:]] == [str(i) for i in range(1000, 1200)]
+    head = [r.meta["rerank"]["blended"] for r in out[:10]]
+    assert head == sorted(head, reverse=True)
+    assert head[0] == max(r.meta["rerank"]["blended"] for r in out[:10])
+    assert {r.id for r in out[:1000]} == {str(i) for i in range(1000)}
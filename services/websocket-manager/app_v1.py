@@ -46,7 +46,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         # Start periodic ping task
         async def ping_task():
             while True:
-                await asyncio.sleep(30)  # Ping every 30 seconds
+                await asyncio.sleep(ws_manager.heartbeat_interval)
                 await ws_manager.ping_clients()
         
         ping_task_handle = asyncio.create_task(ping_task())
@@ -0,0 +1,196 @@
+"""
+Broadcast fan-out for the WebSocket manager.
+
+Every connected client gets a ``ClientOutbox``: a bounded queue of already
+encoded frames drained by one writer task that owns the socket. Broadcasting
+encodes a message once and appends the same string to each recipient's
+outbox without awaiting anything, so a slow or stalled socket only backs up
+its own queue instead of delaying everyone else in the room.
+
+When an outbox is full the ``SlowConsumerPolicy`` decides what happens:
+
+- ``drop_oldest``: discard the oldest queued frame to make room.
+- ``coalesce``: replace a queued frame with the same coalescing key (cursor
+  moves, plugin progress, ...) with the newer one; otherwise drop the oldest.
+- ``disconnect``: close the client, which can reconnect and resync.
+
+``DeliveryLatency`` records, per route, the time from a frame being queued
+to its send completing.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import asdict
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# Latency samples kept per route for percentiles
+LATENCY_WINDOW = 1024
+
+# Message types whose newer value supersedes an older undelivered one
+COALESCIBLE_TYPES = {"cursor_moved", "selection_changed", "plugin_progress", "health_status"}
+
+
+class SlowConsumerPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+def encode_message(message: Any) -> str:
+    """Serialise a ``WebSocketMessage`` into the text frame sent to clients."""
+    message_data = asdict(message)
+    # Convert datetime to ISO string for JSON serialization
+    message_data["timestamp"] = message.timestamp.isoformat()
+    return json.dumps(message_data, default=str)
+
+
+def coalesce_key(message: Any) -> Optional[str]:
+    """Key identifying frames that a newer frame of the same key supersedes."""
+    message_type = getattr(message.type, "value", message.type)
+    if message_type not in COALESCIBLE_TYPES:
+        return None
+    data = message.data or {}
+    return "|".join(
+        str(part) for part in (
+            message_type,
+            message.sender_id or data.get("user_id"),
+            message.investigation_id,
+            data.get("plugin_id"),
+        )
+    )
+
+
+class DeliveryLatency:
+    """Queue-to-socket latency per route over a sliding window of sends."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+
+    def record(self, route: str, seconds: float) -> None:
+        samples = self._samples.get(route)
+        if samples is None:
+            samples = self._samples[route] = deque(maxlen=self.window)
+            self._counts[route] = 0
+        samples.append(seconds)
+        self._counts[route] += 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for route, samples in self._samples.items():
+            ordered = sorted(samples)
+            result[route] = {
+                "count": self._counts[route],
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+                "p99_ms": round(ordered[int(0.99 * (len(ordered) - 1))] * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return result
+
+
+class ClientOutbox:
+    """Bounded outbound queue for one client, drained by a writer task."""
+
+    def __init__(
+        self,
+        websocket: Any,
+        *,
+        max_size: int = 256,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.DROP_OLDEST,
+        send_timeout: float = 10.0,
+        stats: Optional[Dict[str, int]] = None,
+        latency: Optional[DeliveryLatency] = None,
+        on_close: Optional[Callable[[str], None]] = None,
+    ):
+        self.websocket = websocket
+        self.max_size = max(1, max_size)
+        self.policy = SlowConsumerPolicy(policy)
+        self.send_timeout = send_timeout
+        self.stats = stats if stats is not None else {}
+        self.latency = latency
+        self.on_close = on_close
+        self.closed = False
+        self.last_sent: Optional[datetime] = None
+        # entries are [key, frame, route, queued_at] so coalescing can swap
+        # the frame in place
+        self._queue: Deque[List[Any]] = deque()
+        self._keyed: Dict[str, List[Any]] = {}
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def put(self, frame: str, key: Optional[str] = None, route: str = "direct") -> bool:
+        """Queue a frame; returns False if it was not (and will not be) sent."""
+        if self.closed:
+            return False
+        if len(self._queue) >= self.max_size:
+            if self.policy is SlowConsumerPolicy.DISCONNECT:
+                self._count("slow_consumer_disconnects")
+                self._close("slow consumer")
+                return False
+            if self.policy is SlowConsumerPolicy.COALESCE and key is not None and key in self._keyed:
+                self._keyed[key][1] = frame
+                self._count("messages_coalesced")
+                return True
+            self._forget(self._queue.popleft())
+            self._count("messages_dropped")
+        entry = [key, frame, route, time.perf_counter()]
+        self._queue.append(entry)
+        if key is not None:
+            self._keyed[key] = entry
+        self._ready.set()
+        return True
+
+    def close(self) -> None:
+        """Stop the writer; queued frames are discarded."""
+        self.closed = True
+        self._queue.clear()
+        self._keyed.clear()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._task = None
+
+    def _forget(self, entry: List[Any]) -> None:
+        key = entry[0]
+        if key is not None and self._keyed.get(key) is entry:
+            del self._keyed[key]
+
+    def _count(self, name: str) -> None:
+        self.stats[name] = self.stats.get(name, 0) + 1
+
+    def _close(self, reason: str) -> None:
+        self.close()
+        if self.on_close is not None:
+            self.on_close(reason)
+
+    async def _run(self) -> None:
+        while True:
+            while not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+            entry = self._queue.popleft()
+            self._forget(entry)
+            try:
+                async with asyncio.timeout(self.send_timeout):
+                    await self.websocket.send_text(entry[1])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Connection likely broken (or stalled past send_timeout)
+                self._close(f"send failed: {e!r}")
+                return
+            self.last_sent = datetime.now()
+            if self.latency is not None:
+                self.latency.record(entry[2], time.perf_counter() - entry[3])
+            self._count("messages_sent")
@@ -16,7 +16,7 @@ import logging
 import uuid
 from datetime import datetime
 from typing import Dict, List, Set, Optional, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 import redis
 import aioredis
@@ -24,6 +24,9 @@ from pydantic import BaseModel
 import jwt
 import os
 
+from fanout import ClientOutbox, DeliveryLatency, SlowConsumerPolicy, coalesce_key, encode_message
+from timer_wheel import TimerWheel
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -102,6 +105,7 @@ class ConnectedClient:
     subscribed_channels: Set[Channel]
     investigation_ids: Set[str]
     metadata: Dict[str, Any]
+    outbox: Optional[ClientOutbox] = None
 
 class WebSocketManager:
     """Manages WebSocket connections and message broadcasting"""
@@ -118,18 +122,37 @@ class WebSocketManager:
         # Investigation room subscriptions
         self.investigation_rooms: Dict[str, Set[str]] = {}
         
+        # User -> connection ids, so targeted sends don't scan all connections
+        self.user_connections: Dict[str, Set[str]] = {}
+        
         # Redis for pub/sub across multiple service instances
         self.redis: Optional[aioredis.Redis] = None
         
         # Message queue for offline users
         self.offline_messages: Dict[str, List[WebSocketMessage]] = {}
         
+        # Per-client outbound queues
+        self.send_queue_size = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+        self.send_timeout = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+        self.slow_consumer_policy = SlowConsumerPolicy(
+            os.getenv("WS_SLOW_CONSUMER_POLICY", SlowConsumerPolicy.DROP_OLDEST.value)
+        )
+        self.delivery_latency = DeliveryLatency()
+        
+        # Heartbeats and liveness deadlines
+        self.heartbeat_interval = float(os.getenv("HEARTBEAT_INTERVAL", "30"))
+        self.connection_timeout = float(os.getenv("CONNECTION_TIMEOUT", "60"))
+        self.liveness = TimerWheel(tick=1.0)
+        
         # Statistics
         self.stats = {
             "total_connections": 0,
             "active_connections": 0,
             "messages_sent": 0,
             "messages_received": 0,
+            "messages_dropped": 0,
+            "messages_coalesced": 0,
+            "slow_consumer_disconnects": 0,
             "channels_active": 0
         }
     
@@ -198,8 +221,28 @@ class WebSocketManager:
                 investigation_ids=set(),
                 metadata={}
             )
+            client.outbox = ClientOutbox(
+                websocket,
+                max_size=self.send_queue_size,
+                policy=self.slow_consumer_policy,
+                send_timeout=self.send_timeout,
+                stats=self.stats,
+                latency=self.delivery_latency,
+                on_close=lambda reason: self._on_outbox_closed(client, reason),
+            )
+            
+            # Stop the writer of a stale connection that reused this client id
+            previous = self.connections.get(client_id)
+            if previous is not None:
+                if previous.outbox is not None:
+                    previous.outbox.close()
+                self._unindex_user(previous)
             
             self.connections[client_id] = client
+            client.outbox.start()
+            if user_id:
+                self.user_connections.setdefault(user_id, set()).add(client_id)
+            self.liveness.schedule(client_id, client.last_ping.timestamp() + self.connection_timeout)
             self.stats["total_connections"] += 1
             self.stats["active_connections"] = len(self.connections)
             
@@ -238,6 +281,10 @@ class WebSocketManager:
             return
         
         client = self.connections[client_id]
+        if client.outbox is not None:
+            client.outbox.close()
+        self._unindex_user(client)
+        self.liveness.cancel(client_id)
         
         # Remove from all channel subscriptions
         for channel in client.subscribed_channels:
@@ -256,6 +303,15 @@ class WebSocketManager:
         
         logger.info(f"WebSocket client disconnected: {client_id}")
     
+    def _unindex_user(self, client: ConnectedClient):
+        if not client.user_id:
+            return
+        user_clients = self.user_connections.get(client.user_id)
+        if user_clients is not None:
+            user_clients.discard(client.client_id)
+            if not user_clients:
+                del self.user_connections[client.user_id]
+    
     async def subscribe_to_channel(self, client_id: str, channel: Channel) -> bool:
         """Subscribe client to a specific channel"""
         if client_id not in self.connections:
@@ -343,15 +399,10 @@ class WebSocketManager:
     
     async def send_to_user(self, user_id: str, message: WebSocketMessage):
         """Send message to a specific user"""
-        # Find all connections for this user
-        user_clients = [
-            client_id for client_id, client in self.connections.items()
-            if client.user_id == user_id
-        ]
+        user_clients = self.user_connections.get(user_id)
         
         if user_clients:
-            for client_id in user_clients:
-                await self._send_to_client(client_id, message)
+            self._fanout(user_clients, message, route="user")
         else:
             # Queue message for offline user
             if user_id not in self.offline_messages:
@@ -370,8 +421,7 @@ class WebSocketManager:
         if exclude_client:
             subscribers.discard(exclude_client)
         
-        for client_id in subscribers:
-            await self._send_to_client(client_id, message)
+        self._fanout(subscribers, message, route=f"channel:{channel.value}")
     
     async def broadcast_to_investigation(self, investigation_id: str, message: WebSocketMessage,
                                        exclude_client: Optional[str] = None):
@@ -384,8 +434,7 @@ class WebSocketManager:
         if exclude_client:
             room_members.discard(exclude_client)
         
-        for client_id in room_members:
-            await self._send_to_client(client_id, message)
+        self._fanout(room_members, message, route="investigation")
     
     async def broadcast_to_all(self, message: WebSocketMessage, 
                               exclude_client: Optional[str] = None):
@@ -395,31 +444,46 @@ class WebSocketManager:
         if exclude_client:
             clients = [c for c in clients if c != exclude_client]
         
-        for client_id in clients:
-            await self._send_to_client(client_id, message)
+        self._fanout(clients, message, route="all")
     
     async def _send_to_client(self, client_id: str, message: WebSocketMessage):
         """Send message to a specific client"""
-        if client_id not in self.connections:
+        self._fanout((client_id,), message)
+    
+    def _fanout(self, client_ids, message: WebSocketMessage, route: str = "direct") -> int:
+        """Encode message once and queue it on each client's outbox.
+        
+        Never awaits: delivery happens in the per-client writer tasks, so a
+        slow socket cannot hold up the other recipients.
+        """
+        frame = None
+        key = coalesce_key(message)
+        queued = 0
+        for client_id in client_ids:
+            client = self.connections.get(client_id)
+            if client is None or client.outbox is None:
+                continue
+            if frame is None:
+                frame = encode_message(message)
+            if client.outbox.put(frame, key, route):
+                queued += 1
+        return queued
+    
+    def _on_outbox_closed(self, client: ConnectedClient, reason: str):
+        """Drop a client whose writer failed or that fell too far behind"""
+        if self.connections.get(client.client_id) is not client:
             return
-        
-        client = self.connections[client_id]
-        
+        logger.warning(f"Dropping WebSocket client {client.client_id}: {reason}")
+        asyncio.get_running_loop().create_task(self._drop_client(client))
+    
+    async def _drop_client(self, client: ConnectedClient):
+        if self.connections.get(client.client_id) is client:
+            await self.disconnect(client.client_id)
         try:
-            message_data = asdict(message)
-            # Convert datetime to ISO string for JSON serialization
-            message_data["timestamp"] = message.timestamp.isoformat()
-            
-            await client.websocket.send_text(json.dumps(message_data, default=str))
-            self.stats["messages_sent"] += 1
-            
-            # Update last ping
-            client.last_ping = datetime.now()
-            
-        except Exception as e:
-            logger.warning(f"Failed to send message to client {client_id}: {e}")
-            # Connection likely broken, remove client
-            await self.disconnect(client_id)
+            # 1013: try again later
+            await asyncio.wait_for(client.websocket.close(code=1013), self.send_timeout)
+        except Exception:
+            pass
     
     async def _distribute_message(self, message: WebSocketMessage):
         """Distribute message based on its routing information"""
@@ -442,28 +506,40 @@ class WebSocketManager:
             return False
     
     async def ping_clients(self):
-        """Ping all clients to check connection health"""
+        """Disconnect clients past their liveness deadline and ping the rest.
+        
+        Only connections whose deadline has come due in the timer wheel are
+        examined; the ping is encoded once and shared by every client.
+        """
         current_time = datetime.now()
+        now = current_time.timestamp()
         disconnected_clients = []
         
-        for client_id, client in self.connections.items():
-            # Check if client hasn't responded in 60 seconds
-            if (current_time - client.last_ping).total_seconds() > 60:
-                disconnected_clients.append(client_id)
+        for client_id in self.liveness.advance(now):
+            client = self.connections.get(client_id)
+            if client is None:
+                continue
+            # Successful deliveries count as liveness, like pongs
+            if client.outbox is not None and client.outbox.last_sent:
+                client.last_ping = max(client.last_ping, client.outbox.last_sent)
+            deadline = client.last_ping.timestamp() + self.connection_timeout
+            if deadline > now:
+                self.liveness.schedule(client_id, deadline)
             else:
-                # Send ping
-                ping_message = WebSocketMessage(
-                    id=str(uuid.uuid4()),
-                    type=MessageType.HEALTH_STATUS,
-                    channel=Channel.GLOBAL,
-                    timestamp=current_time,
-                    data={"type": "ping"}
-                )
-                await self._send_to_client(client_id, ping_message)
+                disconnected_clients.append(client_id)
         
         # Disconnect stale clients
         for client_id in disconnected_clients:
             await self.disconnect(client_id)
+        
+        ping_message = WebSocketMessage(
+            id=str(uuid.uuid4()),
+            type=MessageType.HEALTH_STATUS,
+            channel=Channel.GLOBAL,
+            timestamp=current_time,
+            data={"type": "ping"}
+        )
+        self._fanout(self.connections.keys(), ping_message, route="heartbeat")
     
     def get_stats(self) -> Dict[str, Any]:
         """Get WebSocket manager statistics"""
@@ -472,10 +548,19 @@ class WebSocketManager:
             if subscribers
         )
         
+        queue_depths = [
+            len(client.outbox) for client in self.connections.values() if client.outbox is not None
+        ]
+        
         return {
             **self.stats,
+            "active_connections": len(self.connections),
+            "connected_users": len(self.user_connections),
             "investigation_rooms": len(self.investigation_rooms),
-            "offline_message_queues": len(self.offline_messages)
+            "offline_message_queues": len(self.offline_messages),
+            "send_queue_depth": sum(queue_depths),
+            "send_queue_depth_max": max(queue_depths, default=0),
+            "delivery_latency": self.delivery_latency.summary()
         }
 
 # Initialize WebSocket manager
@@ -488,7 +573,7 @@ async def startup_event():
     # Start periodic ping task
     async def ping_task():
         while True:
-            await asyncio.sleep(30)  # Ping every 30 seconds
+            await asyncio.sleep(ws_manager.heartbeat_interval)
             await ws_manager.ping_clients()
     
     asyncio.create_task(ping_task())
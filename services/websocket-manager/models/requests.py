@@ -193,6 +193,12 @@ class WebSocketStats(BaseModel):
     active_connections: int = Field(..., description="Currently active connections", ge=0)
     messages_sent: int = Field(..., description="Total messages sent", ge=0)
     messages_received: int = Field(..., description="Total messages received", ge=0)
+    messages_dropped: int = Field(0, description="Messages dropped from full client send queues", ge=0)
+    slow_consumer_disconnects: int = Field(0, description="Clients disconnected for falling behind", ge=0)
+    send_queue_depth: int = Field(0, description="Frames queued across all client send queues", ge=0)
+    delivery_latency: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict, description="Queue-to-socket latency per route (count, p50/p99/max ms)"
+    )
     channels_active: int = Field(..., description="Active channels with subscribers", ge=0)
     investigation_rooms: int = Field(..., description="Active investigation rooms", ge=0)
     offline_message_queues: int = Field(..., description="Users with queued offline messages", ge=0)
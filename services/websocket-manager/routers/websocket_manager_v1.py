@@ -520,6 +520,10 @@ async def get_websocket_stats() -> WebSocketStats:
         active_connections=stats["active_connections"],
         messages_sent=stats["messages_sent"],
         messages_received=stats["messages_received"],
+        messages_dropped=stats["messages_dropped"],
+        slow_consumer_disconnects=stats["slow_consumer_disconnects"],
+        send_queue_depth=stats["send_queue_depth"],
+        delivery_latency=stats["delivery_latency"],
         channels_active=stats["channels_active"],
         investigation_rooms=stats["investigation_rooms"],
         offline_message_queues=stats["offline_message_queues"]
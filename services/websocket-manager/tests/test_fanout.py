@@ -0,0 +1,183 @@
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Optional
+import asyncio
+import json
+import sys
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = ROOT / "services" / "websocket-manager"
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from fanout import (  # type: ignore  # noqa: E402
+    ClientOutbox,
+    DeliveryLatency,
+    SlowConsumerPolicy,
+    coalesce_key,
+    encode_message,
+)
+
+
+class MessageType(str, Enum):
+    CURSOR_MOVED = "cursor_moved"
+    PLUGIN_PROGRESS = "plugin_progress"
+    CHAT = "chat_message"
+
+
+@dataclass
+class Message:
+    # same shape as main.WebSocketMessage, which needs aioredis to import
+    id: str
+    type: MessageType
+    channel: str
+    timestamp: datetime
+    data: Dict[str, Any]
+    sender_id: Optional[str] = None
+    target_user_id: Optional[str] = None
+    investigation_id: Optional[str] = None
+    metadata: Dict[str, Any] = None
+
+
+class FakeWebSocket:
+    def __init__(self, fail: bool = False):
+        self.sent = []
+        self.fail = fail
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def send_text(self, frame):
+        await self.gate.wait()
+        if self.fail:
+            raise ConnectionError("gone")
+        self.sent.append(frame)
+
+
+def test_encode_message_serialises_timestamp_and_enums():
+    message = Message("m1", MessageType.CHAT, "general", datetime(2025, 1, 2, 3, 4, 5), {"text": "hi"})
+    frame = json.loads(encode_message(message))
+    assert frame["timestamp"] == "2025-01-02T03:04:05"
+    assert (frame["type"], frame["data"]) == ("chat_message", {"text": "hi"})
+
+
+def test_coalesce_key_only_for_superseding_message_types():
+    now = datetime(2025, 1, 1)
+    cursor = Message("m1", MessageType.CURSOR_MOVED, "c", now, {}, sender_id="alice", investigation_id="inv")
+    progress = Message("m2", MessageType.PLUGIN_PROGRESS, "c", now, {"user_id": "bob", "plugin_id": "nmap"})
+    chat = Message("m3", MessageType.CHAT, "c", now, {}, sender_id="alice")
+
+    assert coalesce_key(cursor) == "cursor_moved|alice|inv|None"
+    assert coalesce_key(progress) == "plugin_progress|bob|None|nmap"
+    assert coalesce_key(chat) is None
+
+
+def test_delivery_latency_summary_over_sliding_window():
+    latency = DeliveryLatency(window=100)
+    for ms in range(1, 201):
+        latency.record("room", ms / 1000)
+    latency.record("direct", 0.002)
+
+    summary = latency.summary()
+    # all sends are counted, percentiles cover the last ``window`` samples
+    assert summary["room"] == {"count": 200, "p50_ms": 151.0, "p99_ms": 199.0, "max_ms": 200.0}
+    assert summary["direct"]["count"] == 1 and summary["direct"]["max_ms"] == 2.0
+
+
+async def _settle(outbox, websocket, expected):
+    for _ in range(200):
+        if len(websocket.sent) >= expected and not len(outbox):
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError(f"sent {websocket.sent}")
+
+
+def test_drop_oldest_keeps_newest_frames():
+    stats = {}
+    outbox = ClientOutbox(FakeWebSocket(), max_size=2, stats=stats)
+    assert all(outbox.put(frame) for frame in ("1", "2", "3"))
+    assert [entry[1] for entry in outbox._queue] == ["2", "3"]
+    assert stats == {"messages_dropped": 1}
+
+
+def test_coalesce_replaces_queued_frame_with_same_key():
+    stats = {}
+    outbox = ClientOutbox(FakeWebSocket(), max_size=2, policy=SlowConsumerPolicy.COALESCE, stats=stats)
+    outbox.put("cursor-1", key="cursor|alice")
+    outbox.put("chat-1")
+    assert outbox.put("cursor-2", key="cursor|alice")
+    assert [entry[1] for entry in outbox._queue] == ["cursor-2", "chat-1"]
+    # no queued frame to merge with: falls back to dropping the oldest
+    outbox.put("cursor-bob", key="cursor|bob")
+    assert [entry[1] for entry in outbox._queue] == ["chat-1", "cursor-bob"]
+    assert "cursor|alice" not in outbox._keyed
+    assert stats == {"messages_coalesced": 1, "messages_dropped": 1}
+
+
+def test_disconnect_policy_closes_slow_consumer():
+    reasons, stats = [], {}
+    outbox = ClientOutbox(
+        FakeWebSocket(), max_size=1, policy="disconnect", stats=stats, on_close=reasons.append
+    )
+    assert outbox.put("1")
+    assert not outbox.put("2")
+    assert outbox.closed and len(outbox) == 0 and reasons == ["slow consumer"]
+    assert not outbox.put("3")
+    assert stats == {"slow_consumer_disconnects": 1}
+
+
+@pytest.mark.asyncio
+async def test_writer_sends_in_order_and_records_latency():
+    websocket, latency, stats = FakeWebSocket(), DeliveryLatency(), {}
+    outbox = ClientOutbox(websocket, stats=stats, latency=latency)
+    outbox.start()
+    for i in range(5):
+        outbox.put(str(i), route="room")
+    await _settle(outbox, websocket, 5)
+
+    assert websocket.sent == ["0", "1", "2", "3", "4"]
+    assert stats["messages_sent"] == 5 and latency.summary()["room"]["count"] == 5
+    assert outbox.last_sent is not None
+    outbox.close()
+
+
+@pytest.mark.asyncio
+async def test_close_stops_writer_and_discards_queue():
+    websocket = FakeWebSocket()
+    websocket.gate.clear()  # the socket stalls on the first frame
+    outbox = ClientOutbox(websocket)
+    outbox.start()
+    outbox.put("1")
+    outbox.put("2")
+    await asyncio.sleep(0.01)
+    task = outbox._task
+
+    outbox.close()
+    await asyncio.gather(task, return_exceptions=True)
+    assert task.cancelled() and len(outbox) == 0 and not outbox.put("3")
+    websocket.gate.set()
+    await asyncio.sleep(0.01)
+    assert websocket.sent == []
+
+
+@pytest.mark.asyncio
+async def test_send_failure_and_timeout_close_the_client():
+    reasons = []
+    outbox = ClientOutbox(FakeWebSocket(fail=True), on_close=reasons.append)
+    outbox.start()
+    outbox.put("1")
+    outbox.put("2")
+    await asyncio.sleep(0.02)
+    assert outbox.closed and reasons == ["send failed: ConnectionError('gone')"]
+
+    stalled = FakeWebSocket()
+    stalled.gate.clear()
+    outbox = ClientOutbox(stalled, send_timeout=0.01, on_close=reasons.append)
+    outbox.start()
+    outbox.put("1")
+    await asyncio.sleep(0.05)
+    assert outbox.closed and reasons[-1].startswith("send failed: TimeoutError")
@@ -0,0 +1,54 @@
+from pathlib import Path
+import sys
+
+
+ROOT = Path(__file__).resolve().parents[3]
+SERVICE_DIR = ROOT / "services" / "websocket-manager"
+if str(SERVICE_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICE_DIR))
+
+from timer_wheel import TimerWheel  # type: ignore  # noqa: E402
+
+
+def test_keys_expire_on_their_tick():
+    wheel = TimerWheel(tick=1.0, slots=8)
+    wheel.advance(0.0)
+    wheel.schedule("a", 2.0)
+    wheel.schedule("b", 2.5)  # rounded up to tick 3
+    wheel.schedule("c", 5.0)
+
+    assert wheel.advance(1.9) == []
+    assert wheel.advance(2.0) == ["a"]
+    assert wheel.advance(3.0) == ["b"]
+    assert "c" in wheel and len(wheel) == 1
+    assert wheel.advance(10.0) == ["c"] and len(wheel) == 0
+
+
+def test_deadlines_beyond_one_revolution_wait_for_their_own():
+    wheel = TimerWheel(tick=1.0, slots=4)
+    wheel.advance(0.0)
+    wheel.schedule("near", 2.0)
+    wheel.schedule("far", 10.0)  # same slot as tick 2, two revolutions later
+    wheel.schedule("farther", 14.0)
+
+    assert wheel.advance(2.0) == ["near"]
+    assert wheel.advance(6.0) == []  # passes the slot again, one revolution early
+    assert wheel.advance(9.0) == []
+    assert wheel.advance(10.0) == ["far"]
+    # a jump longer than a revolution scans every slot once
+    assert wheel.advance(30.0) == ["farther"]
+
+
+def test_reschedule_and_cancel():
+    wheel = TimerWheel(tick=1.0, slots=8)
+    wheel.advance(0.0)
+    wheel.schedule("a", 3.0)
+    wheel.schedule("a", 6.0)  # heartbeat pushes the deadline out
+    wheel.schedule("b", 3.0)
+    wheel.cancel("b")
+    wheel.cancel("missing")
+
+    assert wheel.advance(5.0) == [] and len(wheel) == 1
+    # a deadline already in the past fires on the next tick instead of being lost
+    wheel.schedule("late", 1.0)
+    assert sorted(wheel.advance(6.0)) == ["a", "late"]
@@ -0,0 +1,64 @@
+"""
+Hashed timer wheel used for connection liveness.
+
+Deadlines are hashed into ``slots`` buckets of ``tick`` seconds each, so
+scheduling and cancelling are O(1) and ``advance`` only looks at the buckets
+that came due since the previous call instead of at every connection.
+Deadlines further out than one revolution stay in their bucket and are
+skipped until the revolution in which they fall due. Deadlines are rounded
+up to a whole tick, so a key can expire up to ``tick`` seconds late.
+"""
+
+import math
+from typing import Dict, Hashable, List, Optional
+
+
+class TimerWheel:
+    """Map of key -> deadline that yields keys as their deadline passes."""
+
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        # each slot maps key -> the tick it expires on
+        self._slots: List[Dict[Hashable, int]] = [{} for _ in range(max(1, slots))]
+        self._where: Dict[Hashable, int] = {}
+        self._current: Optional[int] = None  # last tick processed by advance()
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """(Re)schedule ``key`` to expire at ``deadline``."""
+        self.cancel(key)
+        tick = math.ceil(deadline / self.tick)
+        if self._current is not None:
+            tick = max(tick, self._current + 1)
+        slot = tick % len(self._slots)
+        self._slots[slot][key] = tick
+        self._where[key] = slot
+
+    def cancel(self, key: Hashable) -> None:
+        slot = self._where.pop(key, None)
+        if slot is not None:
+            self._slots[slot].pop(key, None)
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Remove and return the keys whose deadline tick is at or before ``now``."""
+        target = math.floor(now / self.tick)
+        n = len(self._slots)
+        if self._current is None or target - self._current >= n:
+            slots = range(n)
+        else:
+            slots = (t % n for t in range(self._current + 1, target + 1))
+        self._current = target if self._current is None else max(self._current, target)
+
+        expired = []
+        for slot in slots:
+            bucket = self._slots[slot]
+            for key in [k for k, tick in bucket.items() if tick <= target]:
+                del bucket[key]
+                del self._where[key]
+                expired.append(key)
+        return expired